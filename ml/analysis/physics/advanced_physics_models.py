@@ -43,6 +43,8 @@ except ImportError:
     HAS_MAGPYLIB = False
     print("✗ Magpylib not available")
 
+from ml.physics import DipoleFitProblem, combo_states, dipole_hand_spec
+
 # Physical constants
 MU_0_OVER_4PI = 1e-7  # T·m/A
 
@@ -466,11 +468,7 @@ class AdvancedPhysicsOptimizer:
 
     def _combos_to_states(self, combos: np.ndarray) -> np.ndarray:
         """Convert combo strings to binary states."""
-        states = np.zeros((len(combos), 5))
-        for i, combo in enumerate(combos):
-            for j, c in enumerate(combo):
-                states[i, j] = 1.0 if c == 'f' else 0.0
-        return states
+        return combo_states(combos)
 
     def optimize_improved_dipole(self, maxiter: int = 200) -> Dict:
         """Run optimization for improved dipole model."""
@@ -478,45 +476,40 @@ class AdvancedPhysicsOptimizer:
         print("MODEL 1: IMPROVED DIPOLE WITH CONSTRAINTS")
         print(f"{'='*70}")
 
-        def objective(params):
-            # Compute physics-based prediction
-            pos_ext = params[0:15].reshape(5, 3)
-            pos_flex = params[15:30].reshape(5, 3)
-            dipoles = params[30:45].reshape(5, 3)
-            baseline = params[45:48]
-
-            predicted = self.dipole_model.compute_total_field(
-                self.finger_states, pos_ext, pos_flex, dipoles, baseline
-            )
-
-            # Compute error
-            errors = predicted - self.observed_fields
-            squared_errors = np.sum(errors ** 2, axis=1)
-            weighted_errors = squared_errors * self.weights
-            total_error = np.sum(weighted_errors)
-
-            # Add physical constraints penalty
-            penalty = self.dipole_model.add_physical_constraints(params)
-
-            return total_error + penalty
-
-        # Initial guess (smart initialization)
+        # Weighted error plus the physical-constraint penalties of
+        # ImprovedDipoleModel.add_physical_constraints, with exact gradients
         x0 = self._create_smart_initial_guess()
-
-        # Bounds
-        bounds = self.dipole_model.create_physical_bounds()
+        bounds = np.array(self.dipole_model.create_physical_bounds())
+        spec = dipole_hand_spec(
+            pos_extended=x0[0:15].reshape(5, 3),
+            pos_flexed=x0[15:30].reshape(5, 3),
+            moment=x0[30:45].reshape(5, 3),
+            baseline=x0[45:48],
+            extended_bounds=(bounds[0:15, 0].reshape(5, 3), bounds[0:15, 1].reshape(5, 3)),
+            flexed_bounds=(bounds[15:30, 0].reshape(5, 3), bounds[15:30, 1].reshape(5, 3)),
+            moment_bounds=(bounds[30:45, 0].reshape(5, 3), bounds[30:45, 1].reshape(5, 3)),
+            baseline_bounds=(bounds[45:48, 0], bounds[45:48, 1]),
+        )
+        problem = DipoleFitProblem(spec, self.finger_states, self.observed_fields,
+                                   weights=self.weights, penalty_weight=1000, max_travel=0.15)
 
         # Optimize
         t0 = time.time()
         result = differential_evolution(
-            objective,
-            bounds,
+            problem.population_objective,
+            spec.bounds(),
             maxiter=maxiter,
-            workers=1,
-            updating='immediate',
+            vectorized=True,
+            updating='deferred',
+            polish=False,
             disp=True,
             seed=42
         )
+        # Polish with exact gradients instead of DE's finite-difference L-BFGS-B
+        polished = problem.fit(result.x, method='L-BFGS-B')
+        if polished.cost < result.fun:
+            result.x, result.fun = polished.x, polished.cost
+
         elapsed = time.time() - t0
 
         print(f"\n✓ Optimization complete in {elapsed:.1f}s")
@@ -18,7 +18,7 @@ Date: January 2026
 """
 
 import numpy as np
-from scipy.optimize import minimize, differential_evolution, basinhopping
+from scipy.optimize import OptimizeResult, minimize, differential_evolution, basinhopping
 from scipy.spatial.transform import Rotation as R
 from pathlib import Path
 import json
@@ -27,6 +27,10 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 import time
 
+from ml.simulation.dipole import dipole_field_batch
+from ml.physics import (CONVERGED, DipoleFitProblem, MultiStartOptimizer, combo_states,
+                        dipole_hand_spec)
+
 # Try to import GPU libraries (optional)
 try:
     import jax
@@ -118,17 +122,8 @@ class VectorizedDipoleModel:
         Returns:
             Magnetic field in μT [3]
         """
-        r_mag = self.np.linalg.norm(r)
-
-        # Avoid singularity
-        if self.np.any(r_mag < 1e-6):
-            return self.np.zeros(3)
-
-        r_hat = r / r_mag
-        m_dot_r = self.np.dot(m, r_hat)
-
-        # Dipole field formula
-        B = MU_0_OVER_4PI * (3 * m_dot_r * r_hat - m) / (r_mag ** 3)
+        # Dipole at -r seen from a sensor at the origin
+        B = dipole_field_batch(-r[None, :], m[None, :], xp=self.np)
 
         # Convert T to μT
         return B * 1e6
@@ -148,20 +143,8 @@ class VectorizedDipoleModel:
         Returns:
             Fields [N_samples, N_magnets, 3] (μT)
         """
-        # Compute magnitudes: [N_samples, N_magnets]
-        r_mag = self.np.linalg.norm(r_batch, axis=-1, keepdims=True)
-
-        # Avoid division by zero
-        r_mag = self.np.maximum(r_mag, 1e-6)
-
-        # Normalize: [N_samples, N_magnets, 3]
-        r_hat = r_batch / r_mag
-
-        # Dot products: [N_samples, N_magnets]
-        m_dot_r = self.np.sum(r_hat * m_batch[None, :, :], axis=-1, keepdims=True)
-
-        # Dipole field: [N_samples, N_magnets, 3]
-        B = MU_0_OVER_4PI * (3 * m_dot_r * r_hat - m_batch[None, :, :]) / (r_mag ** 3)
+        # One dipole per (sample, magnet): add a magnet axis of length 1
+        B = dipole_field_batch(-r_batch[..., None, :], m_batch[:, None, :], xp=self.np)
 
         # Convert T to μT
         return B * 1e6
@@ -197,16 +180,9 @@ class VectorizedDipoleModel:
             finger_states[:, :, None] * (magnet_positions_flex - magnet_positions_ext)[None, :, :]
         )
 
-        # Compute position vectors from magnets to sensor at origin
-        # r[i,j,:] = sensor_position - magnet_position[i,j,:]
-        # Assuming sensor at origin: r = -positions
-        r_batch = -positions  # [N_samples, 5, 3]
-
-        # Compute fields from all magnets
-        B_magnets = self.dipole_field_vectorized(r_batch, dipole_moments)  # [N_samples, 5, 3]
-
-        # Sum over magnets and add baseline
-        B_total = self.np.sum(B_magnets, axis=1) + baseline[None, :]  # [N_samples, 3]
+        # Sum fields from all magnets at the sensor (origin), add baseline
+        B_magnets = dipole_field_batch(positions, dipole_moments, xp=self.np)  # [N_samples, 3] T
+        B_total = B_magnets * 1e6 + baseline[None, :]  # [N_samples, 3] μT
 
         return B_total
 
@@ -235,6 +211,9 @@ class PhysicsOptimizer:
         # Prepare observation arrays
         self._prepare_observations()
 
+        # Batched objective with analytic gradients (see ml.physics)
+        self.problem = self._build_problem()
+
     def _prepare_observations(self):
         """Convert observed data to arrays for efficient computation."""
         # Extract observations
@@ -280,11 +259,26 @@ class PhysicsOptimizer:
         Returns:
             Binary states [N, 5] where 0=extended, 1=flexed
         """
-        states = np.zeros((len(combos), 5))
-        for i, combo in enumerate(combos):
-            for j, c in enumerate(combo):
-                states[i, j] = 1.0 if c == 'f' else 0.0
-        return states
+        return combo_states(combos)
+
+    def _build_problem(self) -> DipoleFitProblem:
+        """
+        Fitting problem over the 48-parameter vector
+        [15 pos_ext, 15 pos_flex, 15 dipoles, 3 baseline].
+        """
+        x0 = self.create_initial_guess()
+        spec = dipole_hand_spec(
+            pos_extended=x0[0:15].reshape(5, 3),
+            pos_flexed=x0[15:30].reshape(5, 3),
+            moment=x0[30:45].reshape(5, 3),
+            baseline=x0[45:48],
+            extended_bounds=(-0.15, 0.15),    # Extended positions: 5-15cm from sensor
+            flexed_bounds=(-0.08, 0.08),      # Flexed positions: 1-8cm from sensor
+            moment_bounds=(-1.0, 1.0),        # Dipole moments: -1 to 1 A·m²
+            baseline_bounds=(-100, 100),      # Baseline: -100 to 100 μT
+        )
+        return DipoleFitProblem(spec, self.finger_states, self.observed_fields,
+                                weights=self.weights)
 
     def objective(self, params_vec: np.ndarray) -> float:
         """
@@ -296,39 +290,7 @@ class PhysicsOptimizer:
         Returns:
             Total weighted squared error
         """
-        # Unpack parameters
-        # 5 magnets * 6 params each = 30 params
-        # + 3 baseline = 33 total
-
-        # Extended positions (5 magnets * 3 coords)
-        pos_ext = params_vec[0:15].reshape(5, 3)
-
-        # Flexed positions (5 magnets * 3 coords)
-        pos_flex = params_vec[15:30].reshape(5, 3)
-
-        # Dipole moments (5 magnets * 3 coords)
-        dipoles = params_vec[30:45].reshape(5, 3)
-
-        # Baseline field
-        baseline = params_vec[45:48]
-
-        # Compute predictions
-        predicted = self.model.compute_total_field(
-            self.finger_states,
-            pos_ext,
-            pos_flex,
-            dipoles,
-            baseline
-        )
-
-        # Compute weighted errors
-        errors = predicted - self.observed_fields  # [N_obs, 3]
-        squared_errors = np.sum(errors ** 2, axis=1)  # [N_obs]
-        weighted_errors = squared_errors * self.weights
-
-        total_error = np.sum(weighted_errors)
-
-        return total_error
+        return self.problem.objective(params_vec)
 
     def create_initial_guess(self) -> np.ndarray:
         """
@@ -394,14 +356,18 @@ class PhysicsOptimizer:
     def optimize(
         self,
         method: str = 'differential_evolution',
-        maxiter: int = 1000
+        maxiter: int = 1000,
+        checkpoint: Optional[Path] = None
     ) -> Tuple[np.ndarray, Dict]:
         """
         Run optimization to find best-fit parameters.
 
         Args:
-            method: Optimization method ('differential_evolution', 'basinhopping', 'minimize')
+            method: Optimization method ('differential_evolution', 'basinhopping',
+                    'multistart', 'minimize')
             maxiter: Maximum iterations
+            checkpoint: 'multistart' only: .npz file to save progress to and
+                        resume from (None = no checkpointing)
 
         Returns:
             (best_params, results_dict)
@@ -413,27 +379,9 @@ class PhysicsOptimizer:
         print(f"Observations: {len(self.combo_codes)}")
         print(f"Parameters: 48 (15 pos_ext + 15 pos_flex + 15 dipoles + 3 baseline)")
 
-        # Initial guess
-        x0 = self.create_initial_guess()
-
-        # Parameter bounds
-        bounds = []
-
-        # Extended positions: 5-15cm from sensor
-        for _ in range(15):
-            bounds.append((-0.15, 0.15))
-
-        # Flexed positions: 1-8cm from sensor
-        for _ in range(15):
-            bounds.append((-0.08, 0.08))
-
-        # Dipole moments: -1 to 1 A·m²
-        for _ in range(15):
-            bounds.append((-1.0, 1.0))
-
-        # Baseline: -100 to 100 μT
-        for _ in range(3):
-            bounds.append((-100, 100))
+        # Initial guess and parameter bounds
+        x0 = self.problem.spec.initial()
+        bounds = self.problem.spec.bounds()
 
         # Initial objective
         initial_error = self.objective(x0)
@@ -443,27 +391,42 @@ class PhysicsOptimizer:
         t0 = time.time()
 
         if method == 'differential_evolution':
+            # Whole generation per call: one (S, combos, fingers, 3) evaluation
             result = differential_evolution(
-                self.objective,
+                self.problem.population_objective,
                 bounds,
                 maxiter=maxiter,
-                workers=1,  # Single worker (avoid pickling issues with self.model)
-                updating='immediate',
+                vectorized=True,
+                updating='deferred',
+                polish=False,
                 disp=True
             )
+            # Polish with exact gradients instead of DE's finite-difference L-BFGS-B
+            polished = self.problem.fit(result.x, method='L-BFGS-B', maxiter=maxiter)
+            if polished.cost < result.fun:
+                result.x, result.fun = polished.x, polished.cost
         elif method == 'basinhopping':
-            minimizer_kwargs = {'method': 'L-BFGS-B', 'bounds': bounds}
+            minimizer_kwargs = {'method': 'L-BFGS-B', 'bounds': bounds, 'jac': True}
             result = basinhopping(
-                self.objective,
+                self.problem.value_and_grad,
                 x0,
                 minimizer_kwargs=minimizer_kwargs,
                 niter=maxiter,
                 disp=True
             )
+        elif method == 'multistart':
+            # Parallel L-BFGS-B from Sobol starts, resumable from the checkpoint
+            multi = MultiStartOptimizer(
+                self.problem, n_starts=64, max_rounds=max(1, maxiter // 50),
+                checkpoint=checkpoint
+            ).run()
+            result = OptimizeResult(x=multi.x, fun=multi.cost, nit=multi.rounds,
+                                    success=bool(multi.status[multi.leaderboard[0][0]] == CONVERGED))
         else:  # 'minimize'
             result = minimize(
-                self.objective,
+                self.problem.value_and_grad,
                 x0,
+                jac=True,
                 method='L-BFGS-B',
                 bounds=bounds,
                 options={'maxiter': maxiter, 'disp': True}
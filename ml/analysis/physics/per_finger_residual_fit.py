@@ -15,6 +15,8 @@ from pathlib import Path
 from typing import Dict, Tuple
 from scipy.optimize import minimize
 
+from ml.session_arrays import combo_residuals, load_session_arrays
+
 print("=" * 70)
 print("PER-FINGER RESIDUAL ANALYSIS")
 print("=" * 70)
@@ -23,54 +25,7 @@ print("=" * 70)
 def load_observed_residuals() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
     """Load observed residual means and stds from real data."""
     session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
-    with open(session_path, 'r') as f:
-        data = json.load(f)
-
-    baseline_mags = []
-    combo_samples = {}
-
-    for lbl in data['labels']:
-        if 'labels' in lbl and isinstance(lbl['labels'], dict):
-            fingers = lbl['labels'].get('fingers', {})
-            start, end = lbl.get('start_sample', 0), lbl.get('end_sample', 0)
-        else:
-            fingers = lbl.get('fingers', {})
-            start, end = lbl.get('startIndex', 0), lbl.get('endIndex', 0)
-
-        if not fingers or all(v == 'unknown' for v in fingers.values()):
-            continue
-
-        combo = ''.join(['e' if fingers.get(f, '?') == 'extended' else 'f' if fingers.get(f, '?') == 'flexed' else '?'
-                        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']])
-
-        segment = data['samples'][start:end]
-        if len(segment) < 5:
-            continue
-
-        mags = []
-        for s in segment:
-            if 'mx_ut' in s:
-                mx, my, mz = s['mx_ut'], s['my_ut'], s['mz_ut']
-            else:
-                mx, my, mz = s.get('mx', 0)/10.24, s.get('my', 0)/10.24, s.get('mz', 0)/10.24
-            mags.append([mx, my, mz])
-
-        if combo not in combo_samples:
-            combo_samples[combo] = []
-        combo_samples[combo].extend(mags)
-
-        if combo == 'eeeee':
-            baseline_mags.extend(mags)
-
-    baseline = np.mean(baseline_mags, axis=0)
-
-    result = {}
-    for combo, mags in combo_samples.items():
-        mags = np.array(mags)
-        residuals = mags - baseline
-        result[combo] = (residuals.mean(axis=0), residuals.std(axis=0))
-
-    return result
+    return combo_residuals(load_session_arrays(session_path))
 
 
 def extract_single_finger_effects(observed: Dict) -> Dict[str, np.ndarray]:
@@ -25,6 +25,8 @@ from typing import Dict, Tuple, List
 from scipy.optimize import minimize, differential_evolution
 import magpylib as magpy
 
+from ml.session_arrays import combo_samples as group_combo_samples, load_session_arrays
+
 np.random.seed(42)
 
 print("=" * 70)
@@ -35,33 +37,7 @@ print("=" * 70)
 def load_observed_data() -> Dict[str, Dict]:
     """Load all observed combo residuals."""
     session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
-    with open(session_path) as f:
-        data = json.load(f)
-
-    baseline_mags = []
-    combo_samples = {}
-
-    for lbl in data['labels']:
-        if 'labels' in lbl and isinstance(lbl['labels'], dict):
-            fingers = lbl['labels'].get('fingers', {})
-            start, end = lbl.get('start_sample', 0), lbl.get('end_sample', 0)
-        else:
-            fingers = lbl.get('fingers', {})
-            start, end = lbl.get('startIndex', 0), lbl.get('endIndex', 0)
-
-        if not fingers or all(v == 'unknown' for v in fingers.values()):
-            continue
-
-        combo = ''.join(['e' if fingers.get(f, '?') == 'extended' else 'f'
-                        if fingers.get(f, '?') == 'flexed' else '?'
-                        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']])
-
-        if combo not in combo_samples:
-            combo_samples[combo] = []
-
-        for s in data['samples'][start:end]:
-            if 'mx_ut' in s:
-                combo_samples[combo].append([s['mx_ut'], s['my_ut'], s['mz_ut']])
+    combo_samples = group_combo_samples(load_session_arrays(session_path))
 
     baseline = np.mean(combo_samples.get('eeeee', [[46, -46, 31]]), axis=0)
 
@@ -25,6 +25,9 @@ from dataclasses import dataclass, field
 import magpylib as magpy
 from scipy.optimize import minimize, differential_evolution
 
+from ml.physics import combo_fields, cylinder_fields
+from ml.session_arrays import combo_residuals, load_session_arrays
+
 print("=" * 70)
 print("PHYSICS-BASED MAGNETIC FIELD SIMULATION")
 print("Using magpylib for accurate dipole modeling")
@@ -187,55 +190,7 @@ def compute_residual_field(hand: HandModel, combo: str, baseline_combo: str = 'e
 def load_observed_residuals() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
     """Load observed residual means and stds from real data."""
     session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
-    with open(session_path, 'r') as f:
-        data = json.load(f)
-
-    baseline_mags = []
-    combo_samples = {}
-
-    for lbl in data['labels']:
-        if 'labels' in lbl and isinstance(lbl['labels'], dict):
-            fingers = lbl['labels'].get('fingers', {})
-            start, end = lbl.get('start_sample', 0), lbl.get('end_sample', 0)
-        else:
-            fingers = lbl.get('fingers', {})
-            start, end = lbl.get('startIndex', 0), lbl.get('endIndex', 0)
-
-        if not fingers or all(v == 'unknown' for v in fingers.values()):
-            continue
-
-        combo = ''.join(['e' if fingers.get(f, '?') == 'extended' else 'f' if fingers.get(f, '?') == 'flexed' else '?'
-                        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']])
-
-        segment = data['samples'][start:end]
-        if len(segment) < 5:
-            continue
-
-        mags = []
-        for s in segment:
-            if 'mx_ut' in s:
-                mx, my, mz = s['mx_ut'], s['my_ut'], s['mz_ut']
-            else:
-                mx, my, mz = s.get('mx', 0)/10.24, s.get('my', 0)/10.24, s.get('mz', 0)/10.24
-            mags.append([mx, my, mz])
-
-        if combo not in combo_samples:
-            combo_samples[combo] = []
-        combo_samples[combo].extend(mags)
-
-        if combo == 'eeeee':
-            baseline_mags.extend(mags)
-
-    baseline = np.mean(baseline_mags, axis=0)
-
-    # Compute residual statistics per combo
-    result = {}
-    for combo, mags in combo_samples.items():
-        mags = np.array(mags)
-        residuals = mags - baseline
-        result[combo] = (residuals.mean(axis=0), residuals.std(axis=0))
-
-    return result
+    return combo_residuals(load_session_arrays(session_path))
 
 
 def fit_hand_model(observed: Dict[str, Tuple[np.ndarray, np.ndarray]],
@@ -278,21 +233,33 @@ def fit_hand_model(observed: Dict[str, Tuple[np.ndarray, np.ndarray]],
             finger.extended_pos = params[idx:idx+3].copy()
             idx += 3
 
-    def objective(params: np.ndarray) -> float:
-        """Compute fitting error."""
-        unpack_params(params, hand)
-
-        total_error = 0
-        for combo in fit_combos:
-            obs_mean, obs_std = observed[combo]
-            sim_residual = compute_residual_field(hand, combo)
-
-            # Weighted MSE (weight by inverse std)
-            weights = 1.0 / (obs_std + 10)  # Add small value to avoid div by zero
-            error = np.sum(weights * (sim_residual - obs_mean) ** 2)
-            total_error += error
-
-        return total_error
+    # Only positions are fitted, so polarizations and targets are fixed arrays
+    orientations = np.array([hand.fingers[name].orientation for name in finger_names], dtype=np.float64)
+    orientations /= np.linalg.norm(orientations, axis=1, keepdims=True) + 1e-9
+    polarizations = 1400 * orientations[:, None, :]             # (5, 1, 3) mT, both states
+    # As in HandModel.get_magnet_positions, anything but 'e' is flexed
+    states = np.array([[c != 'e' for c in combo] for combo in fit_combos], dtype=np.intp)
+    obs_means = np.array([observed[combo][0] for combo in fit_combos])
+    # Weighted MSE (weight by inverse std)
+    weights = 1.0 / (np.array([observed[combo][1] for combo in fit_combos]) + 10)  # Add small value to avoid div by zero
+
+    def objective(population: np.ndarray) -> np.ndarray:
+        """
+        Compute fitting error of a population of parameter vectors.
+
+        Args:
+            population: Shape (30, S) (or (30,) for a single vector)
+
+        Returns:
+            Errors, shape (S,)
+        """
+        p = np.asarray(population).reshape(len(x0), -1).T.reshape(-1, 5, 2, 3)
+        # Per finger the vector holds flexed then extended; state 0 = extended
+        positions = p[:, :, ::-1] - hand.sensor_pos
+        state_fields = cylinder_fields(positions, polarizations)  # (S, 5, 2, 3) in one getB call
+        baseline = state_fields[:, :, 0].sum(axis=1)
+        sim_residuals = combo_fields(state_fields, states) - baseline[:, None]
+        return np.sum(weights * (sim_residuals - obs_means) ** 2, axis=(-2, -1))
 
     # Initial parameters
     x0 = pack_params(hand)
@@ -304,14 +271,15 @@ def fit_hand_model(observed: Dict[str, Tuple[np.ndarray, np.ndarray]],
 
     print(f"Optimizing {len(x0)} parameters...")
 
-    # Use differential evolution for global optimization (single worker for pickling)
+    # Differential evolution, evaluating each generation in one batched call
     result = differential_evolution(
         objective,
         bounds,
         maxiter=max_iter,
         seed=42,
         disp=True,
-        workers=1,  # Single worker to avoid pickle issues
+        vectorized=True,
+        updating='deferred',
         polish=True
     )
 
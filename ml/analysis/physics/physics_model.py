@@ -23,13 +23,17 @@ Date: January 2026
 """
 
 import numpy as np
-from scipy.optimize import minimize, differential_evolution
+from scipy.optimize import OptimizeResult, minimize, differential_evolution
 from scipy.spatial.transform import Rotation as R
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 import json
 from pathlib import Path
 
+from ml.physics import (BINARY_STATES, DipoleFitProblem, MultiStartOptimizer, combo_states,
+                        dipole_hand_spec)
+from ml.simulation.dipole import dipole_field_batch
+
 
 # Physical constants
 MU_0_OVER_4PI = 1e-7  # T·m/A (μ₀/4π)
@@ -131,22 +135,8 @@ class HandModel:
         Returns:
             Dict mapping state code (e.g., '00000') to predicted field (μT)
         """
-        predictions = {}
-
-        for state_int in range(32):
-            # Convert to binary string representing finger states
-            state_bits = format(state_int, '05b')
-            state_code = ''.join('2' if b == '1' else '0' for b in state_bits)
-
-            # Build finger state dict
-            finger_states = {
-                name: int(state_code[i])
-                for i, name in enumerate(self.FINGER_NAMES)
-            }
-
-            predictions[state_code] = self.compute_field(finger_states)
-
-        return predictions
+        fields = predict_fields(pack_parameters(self))
+        return dict(zip(BINARY_STATE_CODES, fields))
 
 
 def create_initial_hand_model() -> HandModel:
@@ -234,6 +224,37 @@ def unpack_parameters(params: np.ndarray) -> HandModel:
     return HandModel(magnets=magnets)
 
 
+# State codes ('00000' .. '22222') of the 32 binary combos, in base-2 code order
+BINARY_STATE_CODES = [''.join('02'[b] for b in row) for row in BINARY_STATES]
+BINARY_CODE_INDEX = {code: i for i, code in enumerate(BINARY_STATE_CODES)}
+
+
+def predict_fields(params: np.ndarray, states: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Predicted fields as a pure array function of flat parameter vectors.
+
+    Same model as HandModel.compute_field, without building HandModel objects.
+
+    Args:
+        params: Parameter vectors in pack_parameters layout, shape (..., 45);
+                leading dimensions (e.g. a population of candidates) are kept
+        states: Finger states (0=extended, 1=partial, 2=flexed), shape (K, 5)
+                (default: the 32 binary combos, in BINARY_STATE_CODES order)
+
+    Returns:
+        Field (μT), shape (..., K, 3)
+    """
+    params = np.asarray(params, dtype=np.float64)
+    p = params.reshape(params.shape[:-1] + (5, 9))
+    pos_ext, pos_flex, dipole = p[..., 0:3], p[..., 3:6], p[..., 6:9]
+
+    t = (2 * BINARY_STATES if states is None else np.asarray(states)) / 2.0
+    positions = (pos_ext[..., None, :, :]
+                 + t[:, :, None] * (pos_flex - pos_ext)[..., None, :, :])   # (..., K, 5, 3)
+    B = dipole_field_batch(positions, dipole[..., None, :, :], min_distance=1e-10)
+    return B * 1e6
+
+
 def load_observations(data_path: Path) -> Tuple[List[str], List[np.ndarray], List[np.ndarray]]:
     """
     Load labeled observations from session data.
@@ -345,22 +366,18 @@ def objective_function(params: np.ndarray,
 
     Minimizes the sum of squared errors between predicted and observed
     magnetic field centroids, plus regularization on parameter magnitudes.
+    params may be a population of shape (P, 45), giving P objective values.
     """
-    model = unpack_parameters(params)
-    predictions = model.predict_all_states()
+    codes = [code for code in target_centroids if code in BINARY_CODE_INDEX]
+    index = [BINARY_CODE_INDEX[code] for code in codes]
+    targets = np.array([target_centroids[code] for code in codes]).reshape(-1, 3)
 
-    total_error = 0.0
-    n_states = 0
-
-    for state_code, target in target_centroids.items():
-        if state_code in predictions:
-            pred = predictions[state_code]
-            error = np.sum((pred - target) ** 2)
-            total_error += error
-            n_states += 1
+    predictions = predict_fields(params)[..., index, :]
+    total_error = np.sum((predictions - targets) ** 2, axis=(-2, -1))
+    n_states = len(codes)
 
     # Regularization to prevent extreme parameter values
-    reg_term = regularization * np.sum(params ** 2)
+    reg_term = regularization * np.sum(np.asarray(params) ** 2, axis=-1)
 
     return total_error / max(n_states, 1) + reg_term
 
@@ -373,7 +390,7 @@ def optimize_model(target_centroids: Dict[str, np.ndarray],
 
     Args:
         target_centroids: Dict mapping state codes to observed field centroids
-        method: Optimization method ('differential_evolution' or 'minimize')
+        method: Optimization method ('differential_evolution', 'multistart' or 'minimize')
         verbose: Print progress
 
     Returns:
@@ -391,34 +408,55 @@ def optimize_model(target_centroids: Dict[str, np.ndarray],
     # Parameter bounds (reasonable physical limits)
     # Positions: -0.15m to 0.15m (15cm from sensor)
     # Dipole moments: -0.1 to 0.1 A·m²
-    bounds = []
-    for i in range(5):  # 5 fingers
-        # Position extended (x, y, z)
-        bounds.extend([(-0.15, 0.15), (-0.02, 0.15), (-0.05, 0.05)])
-        # Position flexed (x, y, z)
-        bounds.extend([(-0.15, 0.15), (-0.02, 0.10), (-0.08, 0.02)])
-        # Dipole moment (mx, my, mz)
-        bounds.extend([(-0.1, 0.1), (-0.1, 0.1), (-0.1, 0.1)])
+    spec = dipole_hand_spec(
+        pos_extended=np.array([initial_model.magnets[n].pos_extended for n in HandModel.FINGER_NAMES]),
+        pos_flexed=np.array([initial_model.magnets[n].pos_flexed for n in HandModel.FINGER_NAMES]),
+        moment=np.array([initial_model.magnets[n].dipole_moment for n in HandModel.FINGER_NAMES]),
+        extended_bounds=([-0.15, -0.02, -0.05], [0.15, 0.15, 0.05]),
+        flexed_bounds=([-0.15, -0.02, -0.08], [0.15, 0.10, 0.02]),
+        moment_bounds=(-0.1, 0.1),
+        layout='finger',   # same vector as pack_parameters
+    )
+
+    # Same objective as objective_function (mean squared error over the
+    # binary target states plus ridge term), evaluated for all states at once
+    codes = [code for code in target_centroids if set(code) <= {'0', '2'}]
+    problem = DipoleFitProblem(
+        spec, combo_states(codes), np.array([target_centroids[c] for c in codes]),
+        weights=np.full(len(codes), 1.0 / max(len(codes), 1)),
+        regularization=0.001
+    )
+    bounds = spec.bounds()
 
     if method == 'differential_evolution':
         # Global optimization (slower but more robust)
+        # Whole generation per call, in-process (no per-generation pickling)
         result = differential_evolution(
-            objective_function,
+            problem.population_objective,
             bounds=bounds,
-            args=(target_centroids, 0.001),
             maxiter=500,
             tol=1e-6,
             seed=42,
-            workers=-1,
+            vectorized=True,
             updating='deferred',
+            polish=False,
             disp=verbose
         )
+        # Polish with exact gradients
+        polished = problem.fit(result.x, method='L-BFGS-B')
+        if polished.cost < result.fun:
+            result.x, result.fun = polished.x, polished.cost
+    elif method == 'multistart':
+        # Parallel L-BFGS-B from Sobol starts (observations in shared memory)
+        multi = MultiStartOptimizer(problem, n_starts=64, seed=42,
+                                    round_iters=100, max_rounds=10).run(verbose=verbose)
+        result = OptimizeResult(x=multi.x, fun=multi.cost)
     else:
         # Local optimization (faster but may find local minimum)
         result = minimize(
-            objective_function,
+            problem.value_and_grad,
             initial_params,
-            args=(target_centroids, 0.001),
+            jac=True,
             method='L-BFGS-B',
             bounds=bounds,
             options={'maxiter': 1000, 'disp': verbose}
@@ -16,10 +16,12 @@ Physical setup (per user clarification):
 import json
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple, List
-import magpylib as magpy
+from typing import Dict, Tuple, List, Sequence
 from scipy.optimize import minimize
 
+from ml.physics import combo_fields, cylinder_fields
+from ml.session_arrays import combo_residuals, load_session_arrays
+
 print("=" * 70)
 print("PHYSICS SIMULATION - ANATOMICALLY CONSTRAINED")
 print("Sensor on palm, magnets on mid-finger, flexed = closer to sensor")
@@ -136,99 +138,89 @@ class AnatomicalHand:
             return np.array([0.1, tilt_y, -1.0])
 
 
-def compute_field(hand: AnatomicalHand, combo: str,
-                  magnet_diameter: float = 6.0,
-                  magnet_height: float = 3.0,
-                  polarization: float = 1400) -> np.ndarray:
-    """Compute total magnetic field at sensor from all magnets."""
-    finger_names = ['thumb', 'index', 'middle', 'ring', 'pinky']
+FINGER_NAMES = ['thumb', 'index', 'middle', 'ring', 'pinky']
 
-    magnets = []
-    for name, state in zip(finger_names, combo):
-        is_flexed = (state == 'f')
-        pos = hand.get_magnet_position(name, is_flexed)
-        orientation = hand.get_magnet_orientation(name, is_flexed)
-        orientation = orientation / np.linalg.norm(orientation)
 
-        # Scale polarization by magnet strength
-        pol = polarization * hand.magnet_strength * orientation
+def flexed_only_f_indices(combos: Sequence[str]) -> np.ndarray:
+    """
+    Combo strings -> state index per finger, shape (K, 5).
 
-        magnet = magpy.magnet.Cylinder(
-            polarization=tuple(pol),
-            dimension=(magnet_diameter, magnet_height),
-            position=pos,
-        )
-        magnets.append(magnet)
+    Only 'f' is flexed; any other character (extended, partial, '?') uses
+    the extended position. This script's two-state model differs from
+    ml.physics.combo_state_indices, which maps 'p' to a partial state and
+    rejects '?'.
+    """
+    return np.array([[c == 'f' for c in combo] for combo in combos],
+                    dtype=np.intp).reshape(len(combos), 5)
 
-    collection = magpy.Collection(*magnets)
-    B = collection.getB([0, 0, 0])  # Sensor at origin
 
-    return B * 1000  # Convert to μT
+def compute_state_fields(hand: AnatomicalHand,
+                         magnet_diameter: float = 6.0,
+                         magnet_height: float = 3.0,
+                         polarization: float = 1400) -> np.ndarray:
+    """
+    Compute the field at the sensor of every finger magnet in both states.
 
+    Returns:
+        Field in μT of shape (5, 2, 3): finger, state (0 = extended, 1 = flexed)
+    """
+    positions = np.array([[hand.get_magnet_position(name, flexed) for flexed in (False, True)]
+                          for name in FINGER_NAMES], dtype=np.float64)
+    orientations = np.array([[hand.get_magnet_orientation(name, flexed) for flexed in (False, True)]
+                             for name in FINGER_NAMES], dtype=np.float64)
+    orientations /= np.linalg.norm(orientations, axis=-1, keepdims=True)
 
-def compute_residual(hand: AnatomicalHand, combo: str) -> np.ndarray:
-    """Compute residual field relative to baseline (eeeee)."""
-    field = compute_field(hand, combo)
-    baseline = compute_field(hand, 'eeeee')
-    return field - baseline
+    # Scale polarization by magnet strength
+    pol = polarization * hand.magnet_strength * orientations
 
+    # Sensor at origin
+    return cylinder_fields(positions, pol, dimension=(magnet_diameter, magnet_height))
 
-def load_observed_residuals() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
-    """Load observed residual means and stds from real data."""
-    session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
-    with open(session_path, 'r') as f:
-        data = json.load(f)
 
-    baseline_mags = []
-    combo_samples = {}
+def compute_fields(hand: AnatomicalHand, combos: Sequence[str]) -> np.ndarray:
+    """Compute total magnetic field at sensor (μT) for several combos, shape (K, 3)."""
+    return combo_fields(compute_state_fields(hand), flexed_only_f_indices(combos))
 
-    for lbl in data['labels']:
-        if 'labels' in lbl and isinstance(lbl['labels'], dict):
-            fingers = lbl['labels'].get('fingers', {})
-            start, end = lbl.get('start_sample', 0), lbl.get('end_sample', 0)
-        else:
-            fingers = lbl.get('fingers', {})
-            start, end = lbl.get('startIndex', 0), lbl.get('endIndex', 0)
 
-        if not fingers or all(v == 'unknown' for v in fingers.values()):
-            continue
+def compute_residuals(hand: AnatomicalHand, combos: Sequence[str]) -> np.ndarray:
+    """Compute residual fields relative to baseline (eeeee) for several combos, shape (K, 3)."""
+    state_fields = compute_state_fields(hand)
+    baseline = state_fields[:, 0].sum(axis=0)
+    return combo_fields(state_fields, flexed_only_f_indices(combos)) - baseline
 
-        combo = ''.join(['e' if fingers.get(f, '?') == 'extended' else 'f' if fingers.get(f, '?') == 'flexed' else '?'
-                        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']])
 
-        segment = data['samples'][start:end]
-        if len(segment) < 5:
-            continue
+def compute_field(hand: AnatomicalHand, combo: str,
+                  magnet_diameter: float = 6.0,
+                  magnet_height: float = 3.0,
+                  polarization: float = 1400) -> np.ndarray:
+    """Compute total magnetic field at sensor from all magnets."""
+    state_fields = compute_state_fields(hand, magnet_diameter, magnet_height, polarization)
+    return combo_fields(state_fields, flexed_only_f_indices([combo]))[0]
 
-        mags = []
-        for s in segment:
-            if 'mx_ut' in s:
-                mx, my, mz = s['mx_ut'], s['my_ut'], s['mz_ut']
-            else:
-                mx, my, mz = s.get('mx', 0)/10.24, s.get('my', 0)/10.24, s.get('mz', 0)/10.24
-            mags.append([mx, my, mz])
 
-        if combo not in combo_samples:
-            combo_samples[combo] = []
-        combo_samples[combo].extend(mags)
+def compute_residual(hand: AnatomicalHand, combo: str) -> np.ndarray:
+    """Compute residual field relative to baseline (eeeee)."""
+    return compute_residuals(hand, [combo])[0]
 
-        if combo == 'eeeee':
-            baseline_mags.extend(mags)
 
-    baseline = np.mean(baseline_mags, axis=0)
+def load_observed_residuals() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Load observed residual means and stds from real data."""
+    session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
+    return combo_residuals(load_session_arrays(session_path))
 
-    result = {}
-    for combo, mags in combo_samples.items():
-        mags = np.array(mags)
-        residuals = mags - baseline
-        result[combo] = (residuals.mean(axis=0), residuals.std(axis=0))
 
-    return result
+def prepare_observed(observed: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Observed residuals as (combos, means (K, 3), weights (K, 3)), excluding eeeee."""
+    combos = [combo for combo in observed if combo != 'eeeee']
+    means = np.array([observed[combo][0] for combo in combos]).reshape(-1, 3)
+    # Weighted MSE (weight by inverse std, with floor)
+    weights = 1.0 / (np.array([observed[combo][1] for combo in combos]).reshape(-1, 3) + 50)
+    return combos, means, weights
 
 
-def objective(params: np.ndarray, observed: Dict) -> float:
+def objective(params: np.ndarray, targets: Tuple[List[str], np.ndarray, np.ndarray]) -> float:
     """
-    Compute fitting error.
+    Compute fitting error (targets from prepare_observed).
 
     Parameters:
     - params[0:3]: sensor offset (dx, dy, dz)
@@ -248,22 +240,12 @@ def objective(params: np.ndarray, observed: Dict) -> float:
         flexed_height=flexed_height,
     )
 
-    total_error = 0
-    for combo, (obs_mean, obs_std) in observed.items():
-        if combo == 'eeeee':
-            continue
-
-        try:
-            sim_residual = compute_residual(hand, combo)
-            # Weighted MSE (weight by inverse std, with floor)
-            weights = 1.0 / (obs_std + 50)
-            error = np.sum(weights * (sim_residual - obs_mean) ** 2)
-            total_error += error
-        except Exception as e:
-            print(f"Error computing {combo}: {e}")
-            total_error += 1e10
-
-    return total_error
+    combos, means, weights = targets
+    sim_residuals = compute_residuals(hand, combos)
+    errors = np.sum(weights * (sim_residuals - means) ** 2, axis=1)
+    for combo in np.array(combos)[~np.isfinite(errors)]:
+        print(f"Error computing {combo}: non-finite field")
+    return float(np.sum(np.where(np.isfinite(errors), errors, 1e10)))
 
 
 def validate(hand: AnatomicalHand, observed: Dict) -> float:
@@ -274,15 +256,13 @@ def validate(hand: AnatomicalHand, observed: Dict) -> float:
     print(f"\n{'Combo':<8} {'Observed (μT)':<35} {'Simulated (μT)':<35} {'Error'}")
     print("-" * 95)
 
+    combos = sorted(observed.keys())
+    sims = compute_residuals(hand, combos)
+
     errors = []
-    for combo in sorted(observed.keys()):
+    for combo, sim in zip(combos, sims):
         obs_mean, obs_std = observed[combo]
 
-        if combo == 'eeeee':
-            sim = np.zeros(3)
-        else:
-            sim = compute_residual(hand, combo)
-
         error = np.linalg.norm(sim - obs_mean)
         rel_error = error / (np.linalg.norm(obs_mean) + 1e-6) * 100
         errors.append(error)
@@ -340,7 +320,7 @@ def main():
     result = minimize(
         objective,
         x0,
-        args=(observed,),
+        args=(prepare_observed(observed),),
         method='L-BFGS-B',
         bounds=bounds,
         options={'maxiter': 200, 'disp': True}
@@ -379,13 +359,9 @@ def main():
     print(f"\n{'Combo':<8} {'Predicted Residual (μT)':<35} {'Status'}")
     print("-" * 60)
 
+    all_combos = sorted(all_combos)
     predictions = {}
-    for combo in sorted(all_combos):
-        if combo == 'eeeee':
-            pred = np.zeros(3)
-        else:
-            pred = compute_residual(fitted_hand, combo)
-
+    for combo, pred in zip(all_combos, compute_residuals(fitted_hand, all_combos)):
         predictions[combo] = pred.tolist()
         status = "OBSERVED" if combo in observed else "PREDICTED"
         pred_str = f"[{pred[0]:+7.0f}, {pred[1]:+7.0f}, {pred[2]:+7.0f}]"
@@ -9,10 +9,12 @@ Magnets: Mid-finger (middle phalanx), palmar/curl side
 import json
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple
-import magpylib as magpy
+from typing import Dict, List, Sequence, Tuple
 from scipy.optimize import minimize
 
+from ml.physics import combo_fields, cylinder_fields
+from ml.session_arrays import combo_residuals, load_session_arrays
+
 print("=" * 70)
 print("PHYSICS SIMULATION - FAST FITTING")
 print("Sensor on palm, magnets on mid-finger palmar side")
@@ -23,59 +25,12 @@ print("=" * 70)
 def load_observed_residuals() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
     """Load observed residual means and stds from real data."""
     session_path = Path(__file__).parent.parent / 'data' / 'GAMBIT' / '2025-12-31T14_06_18.270Z.json'
-    with open(session_path, 'r') as f:
-        data = json.load(f)
-
-    baseline_mags = []
-    combo_samples = {}
-
-    for lbl in data['labels']:
-        if 'labels' in lbl and isinstance(lbl['labels'], dict):
-            fingers = lbl['labels'].get('fingers', {})
-            start, end = lbl.get('start_sample', 0), lbl.get('end_sample', 0)
-        else:
-            fingers = lbl.get('fingers', {})
-            start, end = lbl.get('startIndex', 0), lbl.get('endIndex', 0)
-
-        if not fingers or all(v == 'unknown' for v in fingers.values()):
-            continue
-
-        combo = ''.join(['e' if fingers.get(f, '?') == 'extended' else 'f' if fingers.get(f, '?') == 'flexed' else '?'
-                        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']])
-
-        segment = data['samples'][start:end]
-        if len(segment) < 5:
-            continue
-
-        mags = []
-        for s in segment:
-            if 'mx_ut' in s:
-                mx, my, mz = s['mx_ut'], s['my_ut'], s['mz_ut']
-            else:
-                mx, my, mz = s.get('mx', 0)/10.24, s.get('my', 0)/10.24, s.get('mz', 0)/10.24
-            mags.append([mx, my, mz])
+    return combo_residuals(load_session_arrays(session_path))
 
-        if combo not in combo_samples:
-            combo_samples[combo] = []
-        combo_samples[combo].extend(mags)
 
-        if combo == 'eeeee':
-            baseline_mags.extend(mags)
-
-    baseline = np.mean(baseline_mags, axis=0)
-
-    result = {}
-    for combo, mags in combo_samples.items():
-        mags = np.array(mags)
-        residuals = mags - baseline
-        result[combo] = (residuals.mean(axis=0), residuals.std(axis=0))
-
-    return result
-
-
-def compute_field_from_params(params: np.ndarray, combo: str) -> np.ndarray:
+def compute_state_fields(params: np.ndarray) -> np.ndarray:
     """
-    Compute magnetic field given parameters.
+    Compute the field of every finger magnet in both states.
 
     Parameters (50 total):
     - Per finger (5 fingers × 10 params each):
@@ -83,44 +38,56 @@ def compute_field_from_params(params: np.ndarray, combo: str) -> np.ndarray:
       - Flexed pos: x, y, z (3)
       - Orientation: ox, oy, oz (3) - will be normalized
       - Magnet strength scale (1)
+
+    Returns:
+        Field in μT of shape (5, 2, 3): finger, state (0 = extended, 1 = flexed)
     """
-    finger_names = ['thumb', 'index', 'middle', 'ring', 'pinky']
+    p = np.asarray(params, dtype=np.float64).reshape(5, 10)
+
+    positions = np.stack([p[:, 0:3], p[:, 3:6]], axis=1)
+    orientation = p[:, 6:9] / (np.linalg.norm(p[:, 6:9], axis=1, keepdims=True) + 1e-9)
+
+    # Polarization along orientation, same in both states
+    pol = 1400 * p[:, 9:10] * orientation  # mT
 
-    magnets = []
-    for i, (name, state) in enumerate(zip(finger_names, combo)):
-        base_idx = i * 10
+    # 6mm diameter, 3mm height; sensor at origin
+    return cylinder_fields(positions, pol[:, None, :], dimension=(6, 3))
+
+
+def flexed_unless_e_indices(combos: Sequence[str]) -> np.ndarray:
+    """
+    Combo strings -> state index per finger, shape (K, 5).
 
-        if state == 'e':
-            pos = params[base_idx:base_idx+3]
-        else:
-            pos = params[base_idx+3:base_idx+6]
+    Only 'e' is extended; any other character (flexed, partial, '?') uses
+    the flexed position. This script's two-state model differs from
+    ml.physics.combo_state_indices, which maps 'p' to a partial state and
+    rejects '?'.
+    """
+    return np.array([[c != 'e' for c in combo] for combo in combos],
+                    dtype=np.intp).reshape(len(combos), 5)
 
-        orientation = params[base_idx+6:base_idx+9]
-        orientation = orientation / (np.linalg.norm(orientation) + 1e-9)
 
-        strength = params[base_idx+9]
+def compute_fields_from_params(params: np.ndarray, combos: Sequence[str]) -> np.ndarray:
+    """Compute magnetic fields (μT) of several combos, shape (K, 3)."""
+    states = flexed_unless_e_indices(combos)
+    return combo_fields(compute_state_fields(params), states)
 
-        # Create magnet with polarization along orientation
-        pol = 1400 * strength * orientation  # mT
 
-        magnet = magpy.magnet.Cylinder(
-            polarization=tuple(pol),
-            dimension=(6, 3),  # 6mm diameter, 3mm height
-            position=pos,
-        )
-        magnets.append(magnet)
+def compute_residuals_from_params(params: np.ndarray, combos: Sequence[str]) -> np.ndarray:
+    """Compute residual fields (relative to eeeee baseline) of several combos, shape (K, 3)."""
+    state_fields = compute_state_fields(params)
+    baseline = state_fields[:, 0].sum(axis=0)
+    return combo_fields(state_fields, flexed_unless_e_indices(combos)) - baseline
 
-    collection = magpy.Collection(*magnets)
-    B = collection.getB([0, 0, 0])  # Sensor at origin
 
-    return B * 1000  # Convert to μT
+def compute_field_from_params(params: np.ndarray, combo: str) -> np.ndarray:
+    """Compute magnetic field (μT) of one combo."""
+    return compute_fields_from_params(params, [combo])[0]
 
 
 def compute_residual_from_params(params: np.ndarray, combo: str) -> np.ndarray:
     """Compute residual field (relative to eeeee baseline)."""
-    field = compute_field_from_params(params, combo)
-    baseline = compute_field_from_params(params, 'eeeee')
-    return field - baseline
+    return compute_residuals_from_params(params, [combo])[0]
 
 
 def create_initial_params() -> np.ndarray:
@@ -172,24 +139,21 @@ def create_initial_params() -> np.ndarray:
     return np.array(params)
 
 
-def objective(params: np.ndarray, observed: Dict) -> float:
-    """Compute fitting error."""
-    total_error = 0
-
-    for combo, (obs_mean, obs_std) in observed.items():
-        if combo == 'eeeee':
-            continue
+def prepare_observed(observed: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Observed residuals as (combos, means (K, 3), weights (K, 3)), excluding eeeee."""
+    combos = [combo for combo in observed if combo != 'eeeee']
+    means = np.array([observed[combo][0] for combo in combos]).reshape(-1, 3)
+    # Weighted MSE
+    weights = 1.0 / (np.array([observed[combo][1] for combo in combos]).reshape(-1, 3) + 50)
+    return combos, means, weights
 
-        try:
-            sim_residual = compute_residual_from_params(params, combo)
-            # Weighted MSE
-            weights = 1.0 / (obs_std + 50)
-            error = np.sum(weights * (sim_residual - obs_mean) ** 2)
-            total_error += error
-        except Exception:
-            total_error += 1e10
 
-    return total_error
+def objective(params: np.ndarray, targets: Tuple[List[str], np.ndarray, np.ndarray]) -> float:
+    """Compute fitting error (targets from prepare_observed)."""
+    combos, means, weights = targets
+    sim_residuals = compute_residuals_from_params(params, combos)
+    errors = np.sum(weights * (sim_residuals - means) ** 2, axis=1)
+    return float(np.sum(np.where(np.isfinite(errors), errors, 1e10)))
 
 
 def validate(params: np.ndarray, observed: Dict):
@@ -200,15 +164,13 @@ def validate(params: np.ndarray, observed: Dict):
     print(f"\n{'Combo':<8} {'Observed (μT)':<35} {'Simulated (μT)':<35} {'Error'}")
     print("-" * 90)
 
+    combos = sorted(observed.keys())
+    sims = compute_residuals_from_params(params, combos)
+
     errors = []
-    for combo in sorted(observed.keys()):
+    for combo, sim in zip(combos, sims):
         obs_mean, obs_std = observed[combo]
 
-        if combo == 'eeeee':
-            sim = np.zeros(3)
-        else:
-            sim = compute_residual_from_params(params, combo)
-
         error = np.linalg.norm(sim - obs_mean)
         rel_error = error / (np.linalg.norm(obs_mean) + 1e-6) * 100
         errors.append(error)
@@ -227,14 +189,7 @@ def generate_all_predictions(params: np.ndarray) -> Dict[str, np.ndarray]:
     all_combos = [f"{t}{i}{m}{r}{p}"
                   for t in 'ef' for i in 'ef' for m in 'ef' for r in 'ef' for p in 'ef']
 
-    predictions = {}
-    for combo in all_combos:
-        if combo == 'eeeee':
-            predictions[combo] = np.zeros(3)
-        else:
-            predictions[combo] = compute_residual_from_params(params, combo)
-
-    return predictions
+    return dict(zip(all_combos, compute_residuals_from_params(params, all_combos)))
 
 
 def main():
@@ -273,7 +228,7 @@ def main():
     result = minimize(
         objective,
         x0,
-        args=(observed,),
+        args=(prepare_observed(observed),),
         method='L-BFGS-B',
         bounds=bounds,
         options={'maxiter': 500, 'disp': True}
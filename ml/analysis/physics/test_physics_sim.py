@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test the batched Magpylib objectives of the physics simulation scripts.
+
+physics_sim_fast, physics_sim_constrained and physics_magnetic_simulation
+evaluate every combo from one functional getB call. These tests compare them
+against per-combo Magpylib Collections, including combos with partial ('p')
+and unknown ('?') fingers as produced by ml.session_arrays.combo_residuals.
+"""
+
+import contextlib
+import io
+import re
+import sys
+
+import numpy as np
+import magpylib as magpy
+
+import ml.analysis.physics.physics_sim_fast as sim_fast
+import ml.analysis.physics.physics_sim_constrained as sim_constrained
+import ml.analysis.physics.physics_magnetic_simulation as sim_magnetic
+
+FINGER_NAMES = ['thumb', 'index', 'middle', 'ring', 'pinky']
+
+# Observed combos include partial and unknown fingers
+COMBOS = ['eeeee', 'effff', 'fefef', 'eeeef', 'e?fff', 'pefee', '?????']
+
+
+def make_observed(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return {combo: (rng.normal(0, 300, 3), rng.uniform(5, 80, 3)) for combo in COMBOS}
+
+
+def collection_field(positions, polarizations, dimension=(6, 3)) -> np.ndarray:
+    """Reference: field at the origin from a Collection of Cylinder magnets (μT)."""
+    magnets = [magpy.magnet.Cylinder(polarization=tuple(pol), dimension=dimension, position=pos)
+               for pos, pol in zip(positions, polarizations)]
+    return magpy.Collection(*magnets).getB([0, 0, 0]) * 1000
+
+
+def reference_fast_residual(params: np.ndarray, combo: str) -> np.ndarray:
+    """Per-combo physics_sim_fast model: anything but 'e' is flexed."""
+    def field(c):
+        positions, pols = [], []
+        for i, state in enumerate(c):
+            p = params[i * 10:(i + 1) * 10]
+            positions.append(p[0:3] if state == 'e' else p[3:6])
+            pols.append(1400 * p[9] * p[6:9] / (np.linalg.norm(p[6:9]) + 1e-9))
+        return collection_field(positions, pols)
+    return field(combo) - field('eeeee')
+
+
+def reference_constrained_residual(hand, combo: str) -> np.ndarray:
+    """Per-combo physics_sim_constrained model: anything but 'f' is extended."""
+    def field(c):
+        positions, pols = [], []
+        for name, state in zip(FINGER_NAMES, c):
+            flexed = state == 'f'
+            orientation = hand.get_magnet_orientation(name, flexed)
+            positions.append(hand.get_magnet_position(name, flexed))
+            pols.append(1400 * hand.magnet_strength * orientation / np.linalg.norm(orientation))
+        return collection_field(positions, pols)
+    return field(combo) - field('eeeee')
+
+
+def test_fast_objective():
+    """physics_sim_fast objective matches per-combo Collections, '?' combos included."""
+    print("\n" + "=" * 70)
+    print("TEST 1: physics_sim_fast batched objective")
+    print("=" * 70)
+
+    observed = make_observed()
+    params = sim_fast.create_initial_params() + np.random.default_rng(1).normal(0, 1, 50)
+
+    expected = 0.0
+    for combo, (mean, std) in observed.items():
+        if combo != 'eeeee':
+            residual = reference_fast_residual(params, combo)
+            expected += np.sum(1.0 / (std + 50) * (residual - mean) ** 2)
+
+    value = sim_fast.objective(params, sim_fast.prepare_observed(observed))
+    assert np.isclose(value, expected, rtol=1e-10), \
+        f"Objective {value} != reference {expected}"
+    print(f"✅ Objective matches reference ({value:.2f})")
+
+    for combo in COMBOS:
+        assert np.allclose(sim_fast.compute_residual_from_params(params, combo),
+                           reference_fast_residual(params, combo), atol=1e-9), \
+            f"Residual mismatch for {combo}"
+    print(f"✅ Per-combo residuals match for {', '.join(COMBOS)}")
+
+
+def test_constrained_objective():
+    """physics_sim_constrained objective matches per-combo Collections, '?' combos included."""
+    print("\n" + "=" * 70)
+    print("TEST 2: physics_sim_constrained batched objective")
+    print("=" * 70)
+
+    observed = make_observed()
+    x = np.array([1.0, -2.0, 3.0, 1.2, 32.0, 11.0])
+    hand = sim_constrained.AnatomicalHand(sensor_offset=x[0:3], magnet_strength=x[3],
+                                          extended_height=x[4], flexed_height=x[5])
+
+    expected = 0.0
+    for combo, (mean, std) in observed.items():
+        if combo != 'eeeee':
+            residual = reference_constrained_residual(hand, combo)
+            expected += np.sum(1.0 / (std + 50) * (residual - mean) ** 2)
+
+    value = sim_constrained.objective(x, sim_constrained.prepare_observed(observed))
+    assert np.isclose(value, expected, rtol=1e-10), \
+        f"Objective {value} != reference {expected}"
+    print(f"✅ Objective matches reference ({value:.2f})")
+
+    for combo in COMBOS:
+        assert np.allclose(sim_constrained.compute_residual(hand, combo),
+                           reference_constrained_residual(hand, combo), atol=1e-9), \
+            f"Residual mismatch for {combo}"
+    print(f"✅ Per-combo residuals match for {', '.join(COMBOS)}")
+
+
+def test_magnetic_simulation_fit():
+    """physics_magnetic_simulation batched fit objective agrees with per-combo fields, '?' combos included."""
+    print("\n" + "=" * 70)
+    print("TEST 3: physics_magnetic_simulation fit with partial/unknown combos")
+    print("=" * 70)
+
+    observed = make_observed()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        hand = sim_magnetic.fit_hand_model(observed, max_iter=1)
+    reported = float(re.search(r'Final error: ([-\d.]+)', output.getvalue()).group(1))
+
+    # Reference: the fitted model evaluated with per-combo Collections
+    expected = 0.0
+    for combo, (mean, std) in observed.items():
+        if combo != 'eeeee':
+            residual = sim_magnetic.compute_residual_field(hand, combo)
+            expected += np.sum(1.0 / (std + 10) * (residual - mean) ** 2)
+
+    assert np.isclose(reported, expected, rtol=1e-6, atol=0.01), \
+        f"Fit objective {reported} != reference {expected}"
+    print(f"✅ Fit objective matches per-combo reference ({reported:.2f})")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("physics_sim_fast objective", test_fast_objective),
+        ("physics_sim_constrained objective", test_constrained_objective),
+        ("physics_magnetic_simulation fit", test_magnetic_simulation_fit),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
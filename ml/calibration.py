@@ -42,6 +42,35 @@ def quaternion_to_rotation_matrix(q: Union[Dict, np.ndarray]) -> np.ndarray:
     return R
 
 
+def quaternions_to_rotation_matrices(q: np.ndarray) -> np.ndarray:
+    """
+    Convert a batch of quaternions to rotation matrices.
+
+    Vectorized equivalent of quaternion_to_rotation_matrix.
+
+    Args:
+        q: Array of shape (N, 4) with columns [w, x, y, z]
+
+    Returns:
+        Array of shape (N, 3, 3)
+    """
+    q = np.asarray(q, dtype=np.float64)
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+
+    R = np.empty((len(q), 3, 3))
+    R[:, 0, 0] = 1 - 2*(y*y + z*z)
+    R[:, 0, 1] = 2*(x*y - w*z)
+    R[:, 0, 2] = 2*(x*z + w*y)
+    R[:, 1, 0] = 2*(x*y + w*z)
+    R[:, 1, 1] = 1 - 2*(x*x + z*z)
+    R[:, 1, 2] = 2*(y*z - w*x)
+    R[:, 2, 0] = 2*(x*z - w*y)
+    R[:, 2, 1] = 2*(y*z + w*x)
+    R[:, 2, 2] = 1 - 2*(x*x + y*y)
+
+    return R
+
+
 class EnvironmentalCalibration:
     """
     Environmental calibration for magnetometer data.
@@ -265,6 +294,49 @@ class EnvironmentalCalibration:
 
         return {'x': float(m[0]), 'y': float(m[1]), 'z': float(m[2])}
 
+    def correct_iron_only_batch(self, mag: np.ndarray) -> np.ndarray:
+        """
+        Vectorized correct_iron_only for a whole session.
+
+        Args:
+            mag: Magnetometer readings, shape (N, 3)
+
+        Returns:
+            Iron-corrected readings, shape (N, 3) (Earth field still present)
+        """
+        mag = np.asarray(mag, dtype=np.float64)
+        return (mag - self.hard_iron_offset) @ self.soft_iron_matrix.T
+
+    def correct_batch(self, mag: np.ndarray,
+                      orientations: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized correct for a whole session.
+
+        Args:
+            mag: Magnetometer readings, shape (N, 3)
+            orientations: Optional quaternions [w, x, y, z], shape (N, 4).
+                         Rows containing NaN fall back to static Earth subtraction.
+
+        Returns:
+            Corrected readings with iron correction and Earth field subtraction, shape (N, 3)
+        """
+        m = self.correct_iron_only_batch(mag)
+
+        if orientations is None:
+            return m - self.earth_field
+
+        orientations = np.asarray(orientations, dtype=np.float64)
+        has_q = ~np.isnan(orientations).any(axis=1)
+
+        # Earth field in sensor frame: R^T @ earth_field for every sample
+        earth_sensor = np.empty_like(m)
+        earth_sensor[:] = self.earth_field
+        if has_q.any():
+            R = quaternions_to_rotation_matrices(orientations[has_q])
+            earth_sensor[has_q] = np.einsum('nji,j->ni', R, self.earth_field)
+
+        return m - earth_sensor
+
     def has_calibration(self, cal_type: str) -> bool:
         """Check if a specific calibration has been performed."""
         return self.calibrations.get(cal_type, False)
@@ -307,6 +379,10 @@ class EnvironmentalCalibration:
         with open(filepath, 'r') as f:
             data = json.load(f)
 
+        self.load_dict(data)
+
+    def load_dict(self, data: Dict):
+        """Load calibration from an already-parsed dict (either format, see load)."""
         # Detect format by checking for camelCase or snake_case keys
         if 'hardIronOffset' in data:
             # JS format (camelCase)
@@ -336,6 +412,41 @@ class EnvironmentalCalibration:
             self.soft_iron_matrix = np.array(data.get('soft_iron_matrix', np.eye(3).tolist()))
 
 
+def calibrate_arrays(mag: np.ndarray,
+                     calibration: EnvironmentalCalibration,
+                     orientations: Optional[np.ndarray] = None) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Compute calibrated and fused magnetometer arrays for a whole session.
+
+    Array equivalent of decorate_telemetry_with_calibration, without
+    per-sample dicts.
+
+    Args:
+        mag: Raw magnetometer readings, shape (N, 3)
+        calibration: EnvironmentalCalibration instance
+        orientations: Optional quaternions [w, x, y, z], shape (N, 4); NaN rows
+                      use static Earth subtraction
+
+    Returns:
+        Dict with:
+        - 'calibrated': Iron corrected (N, 3), or None without iron calibration
+        - 'fused': Iron + Earth field subtraction (N, 3), or None without
+                   iron and Earth calibration
+    """
+    has_iron_cal = (calibration.has_calibration('hard_iron') and
+                    calibration.has_calibration('soft_iron'))
+    has_earth_cal = calibration.has_calibration('earth_field')
+
+    result = {'calibrated': None, 'fused': None}
+    if not has_iron_cal:
+        return result
+
+    result['calibrated'] = calibration.correct_iron_only_batch(mag)
+    if has_earth_cal:
+        result['fused'] = calibration.correct_batch(mag, orientations)
+    return result
+
+
 def decorate_telemetry_with_calibration(telemetry_data: List[Dict],
                                        calibration: EnvironmentalCalibration,
                                        use_orientation: bool = True) -> List[Dict]:
@@ -346,7 +457,8 @@ def decorate_telemetry_with_calibration(telemetry_data: List[Dict],
 
     This function reproduces the same calibration stages as the real-time JavaScript
     pipeline, allowing validation and post-processing of data even if real-time
-    decoration wasn't applied.
+    decoration wasn't applied. The math runs in one batch over the session
+    (see calibrate_arrays); use that directly when dicts are not needed.
 
     Args:
         telemetry_data: List of telemetry dictionaries with mx, my, mz fields
@@ -365,55 +477,39 @@ def decorate_telemetry_with_calibration(telemetry_data: List[Dict],
         + calibration file, enabling validation even if JavaScript real-time processing
         didn't persist the decorated fields.
     """
-    decorated = []
+    def _value(sample, key):
+        value = sample.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        return np.nan
+
+    mag = np.array([[_value(s, 'mx'), _value(s, 'my'), _value(s, 'mz')]
+                    for s in telemetry_data], dtype=np.float64).reshape(-1, 3)
+
+    orientations = None
+    if use_orientation:
+        orientations = np.array([
+            [_value(s, 'orientation_w'), _value(s, 'orientation_x'),
+             _value(s, 'orientation_y'), _value(s, 'orientation_z')]
+            for s in telemetry_data
+        ], dtype=np.float64).reshape(-1, 4)
+
+    arrays = calibrate_arrays(mag, calibration, orientations)
+    valid = ~np.isnan(mag).any(axis=1)
 
-    for sample in telemetry_data:
+    decorated = []
+    for i, sample in enumerate(telemetry_data):
         # Create decorated copy
         decorated_sample = sample.copy()
 
-        # Check if we have iron calibration (minimum requirement)
-        has_iron_cal = (calibration.has_calibration('hard_iron') and
-                       calibration.has_calibration('soft_iron'))
-        has_earth_cal = calibration.has_calibration('earth_field')
-
-        if has_iron_cal:
-            try:
-                # Stage 1: Iron correction only (calibrated_ fields)
-                iron_corrected = calibration.correct_iron_only({
-                    'x': sample['mx'],
-                    'y': sample['my'],
-                    'z': sample['mz']
-                })
-                decorated_sample['calibrated_mx'] = iron_corrected['x']
-                decorated_sample['calibrated_my'] = iron_corrected['y']
-                decorated_sample['calibrated_mz'] = iron_corrected['z']
-
-                # Stage 2: Fused (iron + Earth subtraction with orientation if available)
-                if has_earth_cal:
-                    orientation = None
-                    if use_orientation and 'orientation_w' in sample:
-                        # Extract orientation quaternion from sample
-                        orientation = {
-                            'w': sample['orientation_w'],
-                            'x': sample['orientation_x'],
-                            'y': sample['orientation_y'],
-                            'z': sample['orientation_z']
-                        }
-
-                    # Apply full correction (iron + Earth field)
-                    fused = calibration.correct({
-                        'x': sample['mx'],
-                        'y': sample['my'],
-                        'z': sample['mz']
-                    }, orientation=orientation)
-
-                    decorated_sample['fused_mx'] = fused['x']
-                    decorated_sample['fused_my'] = fused['y']
-                    decorated_sample['fused_mz'] = fused['z']
-
-            except Exception as e:
-                # Calibration failed, skip decoration for this sample
-                pass
+        # Samples without a usable reading are passed through undecorated
+        if valid[i]:
+            for prefix in ('calibrated', 'fused'):
+                values = arrays[prefix]
+                if values is not None:
+                    decorated_sample[f'{prefix}_mx'] = float(values[i, 0])
+                    decorated_sample[f'{prefix}_my'] = float(values[i, 1])
+                    decorated_sample[f'{prefix}_mz'] = float(values[i, 2])
 
         decorated.append(decorated_sample)
 
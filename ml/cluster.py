@@ -21,8 +21,8 @@ except ImportError:
     HAS_SKLEARN = False
 
 from .data_loader import (
-    GambitDataset, load_session_data, load_session_metadata,
-    normalize_data
+    GambitDataset, find_session_files, load_session_data, load_session_metadata,
+    normalize_data, sliding_windows, window_starts
 )
 from .schema import Gesture, SessionMetadata, LabeledSegment
 
@@ -94,10 +94,7 @@ def load_unlabeled_windows(dataset: GambitDataset) -> Tuple[np.ndarray, List[Dic
     all_windows = []
     all_metadata = []
     
-    for json_path in sorted(dataset.data_dir.glob('*.json')):
-        if json_path.name.endswith('.meta.json'):
-            continue
-        
+    for json_path in find_session_files(dataset.data_dir):
         meta = load_session_metadata(json_path)
         
         # Skip labeled sessions
@@ -108,27 +105,23 @@ def load_unlabeled_windows(dataset: GambitDataset) -> Tuple[np.ndarray, List[Dic
         data = load_session_data(json_path)
         data = normalize_data(data, dataset.stats, dataset.normalize_method)
         
-        # Create windows (without labels)
-        num_samples = len(data)
-        window_idx = 0
-        
-        for start in range(0, num_samples - dataset.window_size + 1, dataset.stride):
-            end = start + dataset.window_size
-            window_data = data[start:end]
-            
-            all_windows.append(window_data)
+        # Create windows (without labels) as strided views; copied once below
+        starts = window_starts(len(data), dataset.window_size, dataset.stride)
+        if not len(starts):
+            continue
+        all_windows.append(sliding_windows(data, dataset.window_size, dataset.stride))
+        for window_idx, start in enumerate(starts.tolist()):
             all_metadata.append({
                 'session_file': json_path.name,
                 'window_index': window_idx,
                 'start_sample': start,
-                'end_sample': end
+                'end_sample': start + dataset.window_size
             })
-            window_idx += 1
     
     if not all_windows:
         return np.array([]).reshape(0, dataset.window_size, 9), []
     
-    return np.array(all_windows), all_metadata
+    return np.concatenate(all_windows), all_metadata
 
 
 def cluster_kmeans(features: np.ndarray, n_clusters: int = 10,
@@ -8,18 +8,31 @@ Supports both V1 (single-label) and V2 (multi-label) formats.
 """
 
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any, Set, Union
 from dataclasses import dataclass
 
 from .schema import (
     Gesture, SessionMetadata, LabeledSegment, LabeledSegmentV2,
-    MultiLabel, FingerLabels, FingerState,
+    MultiLabel, FingerLabels, FingerState, MagnetConfig,
     SENSOR_RANGES, FEATURE_NAMES, NUM_FEATURES
 )
-from .calibration import EnvironmentalCalibration, decorate_telemetry_with_calibration
-from .filters import KalmanFilter3D, decorate_telemetry_with_filtering
+from .calibration import EnvironmentalCalibration, calibrate_arrays
+from .filters import KalmanFilter3D
+from .session_cache import SessionCache, processing_key, samples_to_columns
+from .session_stream import SessionStreamReader
+from .session_index import SessionIndex
+from .session_npz import (
+    COMPACT_SUFFIX, is_compact_session, read_compact_header,
+    read_compact_columns, read_compact_samples
+)
+
+# Kalman settings used by load_session_data (part of the feature cache key)
+DEFAULT_FILTER_PARAMS = {'process_noise': 1.0, 'measurement_noise': 1.0}
 
 
 @dataclass
@@ -45,6 +58,90 @@ class DatasetStats:
         )
 
 
+@dataclass
+class SessionStats:
+    """
+    Per-feature sufficient statistics for one or more sessions.
+
+    Stores Welford moments (count, mean, sum of squared deviations) plus
+    min/max, so statistics of independent sessions can be merged exactly
+    without revisiting their samples.
+    """
+    count: int
+    mean: np.ndarray  # Shape: (NUM_FEATURES,)
+    m2: np.ndarray    # Sum of squared deviations from the mean
+    min_val: np.ndarray
+    max_val: np.ndarray
+
+    @classmethod
+    def from_data(cls, data: np.ndarray) -> 'SessionStats':
+        """Compute statistics for a (N, NUM_FEATURES) feature array."""
+        data = np.asarray(data, dtype=np.float64)
+        if len(data) == 0:
+            width = data.shape[1] if data.ndim == 2 else NUM_FEATURES
+            return cls(
+                count=0,
+                mean=np.zeros(width),
+                m2=np.zeros(width),
+                min_val=np.full(width, np.inf),
+                max_val=np.full(width, -np.inf)
+            )
+        mean = data.mean(axis=0)
+        return cls(
+            count=len(data),
+            mean=mean,
+            m2=((data - mean) ** 2).sum(axis=0),
+            min_val=data.min(axis=0),
+            max_val=data.max(axis=0)
+        )
+
+    def merge(self, other: 'SessionStats') -> 'SessionStats':
+        """Combine with another set of statistics (Chan et al. parallel update)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return SessionStats(
+            count=count,
+            mean=self.mean + delta * (other.count / count),
+            m2=self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count),
+            min_val=np.minimum(self.min_val, other.min_val),
+            max_val=np.maximum(self.max_val, other.max_val)
+        )
+
+    def to_dataset_stats(self) -> DatasetStats:
+        """Population statistics in the form used for normalization."""
+        if self.count == 0:
+            raise ValueError("Cannot build dataset statistics from zero samples")
+        return DatasetStats(
+            mean=self.mean.astype(np.float32),
+            std=(np.sqrt(self.m2 / self.count) + 1e-8).astype(np.float32),  # Avoid division by zero
+            min_val=self.min_val.astype(np.float32),
+            max_val=self.max_val.astype(np.float32)
+        )
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            'count': np.array(self.count),
+            'mean': self.mean,
+            'm2': self.m2,
+            'min_val': self.min_val,
+            'max_val': self.max_val
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, np.ndarray]) -> 'SessionStats':
+        return cls(
+            count=int(d['count']),
+            mean=np.asarray(d['mean'], dtype=np.float64),
+            m2=np.asarray(d['m2'], dtype=np.float64),
+            min_val=np.asarray(d['min_val'], dtype=np.float64),
+            max_val=np.asarray(d['max_val'], dtype=np.float64)
+        )
+
+
 @dataclass
 class SessionInfo:
     """Information about a loaded session, including embedded metadata."""
@@ -54,6 +151,12 @@ class SessionInfo:
     firmware_version: Optional[str] = None
     labels: Optional[List[Dict]] = None
     metadata: Optional[Dict] = None
+    sample_count: Optional[int] = None  # Set when samples were not materialized
+
+    @property
+    def num_samples(self) -> int:
+        """Number of samples, whether or not they were loaded."""
+        return self.sample_count if self.sample_count is not None else len(self.samples)
 
     @property
     def has_embedded_metadata(self) -> bool:
@@ -70,12 +173,19 @@ def load_session_raw(json_path: Path) -> SessionInfo:
     - V2.0: Wrapper object: {version: "2.0", timestamp: "...", samples: [...]}
     - V2.1: Wrapper with embedded metadata: {version: "2.1", samples: [...], labels: [...], metadata: {...}}
 
+    Compact .session.npz files (see ml.session_npz) are read as well; their
+    sample dicts are rebuilt from the stored columns.
+
     Args:
         json_path: Path to the .json data file
 
     Returns:
         SessionInfo with samples, version info, and any embedded metadata
     """
+    if is_compact_session(json_path):
+        header, samples = read_compact_samples(json_path)
+        return _session_info_from_header(json_path, header, samples)
+
     with open(json_path, 'r') as f:
         raw_json = json.load(f)
 
@@ -103,9 +213,125 @@ def load_session_raw(json_path: Path) -> SessionInfo:
         raise ValueError(f"Unknown JSON format in {json_path}: expected array or object with 'samples' key")
 
 
+def _session_info_from_header(json_path: Path, header: Dict[str, Any],
+                              samples: Optional[List[Dict]] = None) -> SessionInfo:
+    """SessionInfo from a cache or compact-session header."""
+    metadata = header.get('metadata')
+    return SessionInfo(
+        samples=samples if samples is not None else [],
+        version=header['version'],
+        timestamp=header.get('timestamp') or json_path.stem,
+        firmware_version=metadata.get('firmware_version') if metadata else None,
+        labels=header.get('labels'),
+        metadata=metadata,
+        sample_count=header['sample_count'] if samples is None else None
+    )
+
+
+def find_session_files(data_dir: Path) -> List[Path]:
+    """
+    Session files in a directory: session JSON and compact .session.npz files.
+
+    Skips legacy .meta.json sidecars. Sorted by filename.
+    """
+    data_dir = Path(data_dir)
+    paths = [p for p in data_dir.glob('*.json') if not p.name.endswith('.meta.json')]
+    paths.extend(data_dir.glob(f'*{COMPACT_SUFFIX}'))
+    return sorted(paths)
+
+
+def find_calibration_file(json_path: Path,
+                          calibration_file: Optional[str] = None) -> Optional[Path]:
+    """
+    Locate the calibration file that applies to a session.
+
+    Args:
+        json_path: Path to the .json data file
+        calibration_file: Explicit calibration path (default: search
+                          'gambit_calibration.json' next to the data, then ~/.gambit)
+
+    Returns:
+        Path to an existing calibration file, or None
+    """
+    if calibration_file is None:
+        cal_paths = [
+            json_path.parent / 'gambit_calibration.json',
+            Path.home() / '.gambit' / 'calibration.json'
+        ]
+    else:
+        cal_paths = [Path(calibration_file)]
+
+    for cal_path in cal_paths:
+        if cal_path.exists():
+            return cal_path
+    return None
+
+
+def _resolve_calibration_file(json_path: Path, apply_calibration: bool,
+                              calibration_file: Optional[str]) -> Optional[Path]:
+    if not apply_calibration:
+        return None
+    try:
+        return find_calibration_file(json_path, calibration_file)
+    except Exception as e:
+        print(f"Warning: Failed to load calibration: {e}")
+        return None
+
+
+def _feature_key(cal_path: Optional[Path], apply_calibration: bool,
+                 apply_filtering: bool) -> str:
+    return processing_key(cal_path, apply_calibration, apply_filtering,
+                          DEFAULT_FILTER_PARAMS if apply_filtering else None)
+
+
+def load_session_columns(json_path: Path, cache: Optional[SessionCache] = None
+                         ) -> Tuple[SessionInfo, List[str], np.ndarray]:
+    """
+    Session header and numeric sample columns, through the session cache.
+
+    On a cache miss the session is parsed once and its header and columns are
+    stored, so later loads memory-map the columns instead of re-parsing JSON.
+
+    Args:
+        json_path: Path to the session file (.json or .session.npz)
+        cache: Session cache to read and populate (None = always parse)
+
+    Returns:
+        Tuple of (SessionInfo, column_names, array of shape (N, C)); the
+        SessionInfo carries samples only when the JSON had to be parsed
+    """
+    json_path = Path(json_path)
+    if cache is not None:
+        header = cache.load_header(json_path)
+        cached = cache.load_columns(json_path) if header is not None else None
+        if cached is not None:
+            return (_session_info_from_header(json_path, header), *cached)
+
+    if is_compact_session(json_path):
+        # Already columnar: cache the header only, not a second copy of the columns
+        header, names, columns = read_compact_columns(json_path)
+        session_info = _session_info_from_header(json_path, header)
+    else:
+        session_info = load_session_raw(json_path)
+        names, columns = samples_to_columns(session_info.samples)
+
+    if cache is not None:
+        try:
+            cache.store(json_path, names, columns, session_info.version,
+                        timestamp=session_info.timestamp,
+                        labels=session_info.labels,
+                        metadata=session_info.metadata,
+                        write_columns=not is_compact_session(json_path))
+        except OSError as e:
+            print(f"Warning: Failed to write session cache: {e}")
+
+    return session_info, names, columns
+
+
 def load_session_data(json_path: Path, apply_calibration: bool = True,
                       apply_filtering: bool = True,
-                      calibration_file: Optional[str] = None) -> np.ndarray:
+                      calibration_file: Optional[str] = None,
+                      use_cache: bool = True) -> np.ndarray:
     """
     Load raw sensor data from a JSON file with optional calibration and filtering.
 
@@ -119,72 +345,213 @@ def load_session_data(json_path: Path, apply_calibration: bool = True,
     - V2.0: Wrapper object: {version: "2.0", timestamp: "...", samples: [...]}
     - V2.1: Wrapper with embedded metadata: {version: "2.1", samples: [...], labels: [...], metadata: {...}}
 
+    Results are cached per session under ``<data_dir>/.cache/`` (see
+    ml.session_cache), keyed by file path/mtime, calibration file hash and
+    filter settings. Warm loads return a copy-on-write memory-mapped array,
+    writable like the in-memory array of a cold load.
+
     Args:
         json_path: Path to the .json data file
         apply_calibration: Apply magnetometer calibration if available
         apply_filtering: Apply Kalman filtering if available
         calibration_file: Path to calibration JSON (default: 'gambit_calibration.json')
+        use_cache: Read/write the on-disk session cache
 
     Returns:
         numpy array of shape (N, 9) where N is number of samples
         and 9 is the IMU features [ax, ay, az, gx, gy, gz, mx, my, mz]
         Note: mx, my, mz will be filtered/calibrated if available, otherwise raw
     """
-    session_info = load_session_raw(json_path)
-    data = session_info.samples
+    json_path = Path(json_path)
+
+    cal_path = _resolve_calibration_file(json_path, apply_calibration, calibration_file)
+
+    cache = None
+    feature_key = None
+    if use_cache:
+        cache = SessionCache.for_data_dir(json_path.parent)
+        feature_key = _feature_key(cal_path, apply_calibration, apply_filtering)
+        cached = cache.load_features(json_path, feature_key)
+        if cached is not None:
+            return cached
+
+    session_info, *columns = load_session_columns(json_path, cache)
+
+    # Try to load calibration
+    calibration = None
+    if cal_path is not None:
+        try:
+            calibration = EnvironmentalCalibration()
+            calibration.load(str(cal_path))
+            print(f"Loaded calibration from {cal_path}")
+        except Exception as e:
+            calibration = None
+            print(f"Warning: Failed to load calibration: {e}")
+
+    features = compute_session_features(*columns, calibration=calibration,
+                                        apply_filtering=apply_filtering)
+
+    if cache is not None:
+        try:
+            cache.store_features(json_path, feature_key, features)
+        except OSError as e:
+            print(f"Warning: Failed to write session cache: {e}")
+
+    return features
+
+
+def load_session_stats(json_path: Path, apply_calibration: bool = True,
+                       apply_filtering: bool = True,
+                       calibration_file: Optional[str] = None,
+                       use_cache: bool = True) -> SessionStats:
+    """
+    Per-session feature statistics, persisted in the session cache.
 
-    # Preserve raw data, apply decorations
-    if apply_calibration or apply_filtering:
-        # Try to load calibration
-        calibration = None
-        if apply_calibration:
-            try:
-                if calibration_file is None:
-                    # Try default locations
-                    cal_paths = [
-                        json_path.parent / 'gambit_calibration.json',
-                        Path.home() / '.gambit' / 'calibration.json'
-                    ]
-                else:
-                    cal_paths = [Path(calibration_file)]
-
-                for cal_path in cal_paths:
-                    if cal_path.exists():
-                        calibration = EnvironmentalCalibration()
-                        calibration.load(str(cal_path))
-                        print(f"Loaded calibration from {cal_path}")
-                        break
-            except Exception as e:
-                print(f"Warning: Failed to load calibration: {e}")
+    Statistics are keyed like the processed features (file version,
+    calibration file hash, filter settings), so only new or modified
+    sessions are ever reloaded.
 
-        # Apply calibration decoration
-        if calibration is not None:
-            data = decorate_telemetry_with_calibration(data, calibration)
+    Args:
+        json_path: Path to the .json data file
+        apply_calibration, apply_filtering, calibration_file, use_cache:
+            As for load_session_data
 
-        # Apply filtering decoration
-        if apply_filtering:
-            try:
-                mag_filter = KalmanFilter3D(process_noise=1.0, measurement_noise=1.0)
-                data = decorate_telemetry_with_filtering(data, mag_filter)
-            except Exception as e:
-                print(f"Warning: Failed to apply filtering: {e}")
-
-    # Extract IMU features, using best available magnetometer data
-    samples = []
-    for sample in data:
-        # Use filtered > calibrated > raw for magnetometer
-        mx = sample.get('filtered_mx', sample.get('calibrated_mx', sample.get('mx', 0)))
-        my = sample.get('filtered_my', sample.get('calibrated_my', sample.get('my', 0)))
-        mz = sample.get('filtered_mz', sample.get('calibrated_mz', sample.get('mz', 0)))
-
-        row = [
-            sample['ax'], sample['ay'], sample['az'],
-            sample['gx'], sample['gy'], sample['gz'],
-            mx, my, mz
-        ]
-        samples.append(row)
+    Returns:
+        SessionStats for the session's processed features
+    """
+    json_path = Path(json_path)
+
+    cache = None
+    stats_key = None
+    if use_cache:
+        cache = SessionCache.for_data_dir(json_path.parent)
+        cal_path = _resolve_calibration_file(json_path, apply_calibration, calibration_file)
+        stats_key = _feature_key(cal_path, apply_calibration, apply_filtering)
+        cached = cache.load_stats(json_path, stats_key)
+        if cached is not None:
+            return SessionStats.from_dict(cached)
+
+    data = load_session_data(json_path, apply_calibration=apply_calibration,
+                             apply_filtering=apply_filtering,
+                             calibration_file=calibration_file,
+                             use_cache=use_cache)
+    stats = SessionStats.from_data(data)
+
+    if cache is not None:
+        try:
+            cache.store_stats(json_path, stats_key, stats.to_dict())
+        except OSError as e:
+            print(f"Warning: Failed to write session cache: {e}")
+
+    return stats
+
+
+def _column(names: List[str], columns: np.ndarray, key: str,
+            default: Optional[float] = None) -> Optional[np.ndarray]:
+    """Get one field from a columnar session, or a constant/None if absent."""
+    if key in names:
+        return np.asarray(columns[:, names.index(key)], dtype=np.float64)
+    if default is None:
+        return None
+    return np.full(len(columns), default, dtype=np.float64)
+
+
+def _vector_columns(names: List[str], columns: np.ndarray, keys: List[str],
+                    default: Optional[float] = None) -> Optional[np.ndarray]:
+    """Stack several fields into an (N, len(keys)) array, or None if any is absent."""
+    cols = [_column(names, columns, k, default) for k in keys]
+    if any(c is None for c in cols):
+        return None
+    return np.stack(cols, axis=1)
+
+
+def compute_session_features(names: List[str], columns: np.ndarray,
+                             calibration: Optional[EnvironmentalCalibration] = None,
+                             apply_filtering: bool = True) -> np.ndarray:
+    """
+    Build the (N, 9) IMU feature array from columnar session data.
+
+    Array equivalent of decorating samples with calibration and filtering and
+    then picking the best magnetometer value per sample:
+    filtered > calibrated > raw. Missing values (NaN) fall through to the
+    next source, exactly as absent dict keys do.
+
+    Args:
+        names: Column names (see ml.session_cache.samples_to_columns)
+        columns: Columnar sample data, shape (N, C)
+        calibration: Calibration to apply (None = use stored calibrated_* fields)
+        apply_filtering: Re-run Kalman filtering (False = use stored filtered_* fields)
 
-    return np.array(samples, dtype=np.float32)
+    Returns:
+        float32 array of shape (N, 9)
+    """
+    imu = _vector_columns(names, columns, ['ax', 'ay', 'az', 'gx', 'gy', 'gz'])
+    if imu is None:
+        missing = [k for k in ['ax', 'ay', 'az', 'gx', 'gy', 'gz'] if k not in names]
+        raise KeyError(missing[0])
+
+    raw = _vector_columns(names, columns, ['mx', 'my', 'mz'], default=0.0)
+    calibrated = _vector_columns(names, columns, ['calibrated_mx', 'calibrated_my', 'calibrated_mz'])
+    filtered = _vector_columns(names, columns, ['filtered_mx', 'filtered_my', 'filtered_mz'])
+
+    if calibration is not None:
+        orientations = _vector_columns(names, columns, ['orientation_w', 'orientation_x',
+                                                        'orientation_y', 'orientation_z'])
+        iron = calibrate_arrays(raw, calibration, orientations)['calibrated']
+        if iron is not None:
+            valid = ~np.isnan(raw).any(axis=1)
+            calibrated = np.where(valid[:, None], iron,
+                                  calibrated if calibrated is not None else np.nan)
+
+    if apply_filtering:
+        try:
+            filter_input = np.nan_to_num(raw, nan=0.0)
+            if calibrated is not None:
+                filter_input = np.where(np.isnan(calibrated), filter_input, calibrated)
+            mag_filter = KalmanFilter3D(**DEFAULT_FILTER_PARAMS)
+            filtered = mag_filter.filter_batch(filter_input)
+        except Exception as e:
+            print(f"Warning: Failed to apply filtering: {e}")
+
+    mag = raw
+    for source in (calibrated, filtered):
+        if source is not None:
+            mag = np.where(np.isnan(source), mag, source)
+
+    return np.concatenate([imu, mag], axis=1).astype(np.float32)
+
+
+def load_session_header(json_path: Path) -> SessionInfo:
+    """
+    Load session header fields without materializing samples.
+
+    Reads the session cache header when available; otherwise streams the file
+    (see ml.session_stream) so memory use does not grow with session length.
+
+    Args:
+        json_path: Path to the .json data file
+
+    Returns:
+        SessionInfo with empty samples and sample_count set
+    """
+    json_path = Path(json_path)
+
+    header = SessionCache.for_data_dir(json_path.parent).load_header(json_path)
+    if header is None and is_compact_session(json_path):
+        header = read_compact_header(json_path)
+    if header is not None:
+        return _session_info_from_header(json_path, header)
+
+    streamed = SessionStreamReader(json_path).header()
+    return SessionInfo(
+        samples=[],
+        version=streamed.version,
+        timestamp=streamed.timestamp or json_path.stem,
+        firmware_version=streamed.firmware_version,
+        labels=streamed.labels,
+        metadata=streamed.metadata,
+        sample_count=streamed.sample_count
+    )
 
 
 def load_session_metadata(json_path: Path) -> Optional[SessionMetadata]:
@@ -201,9 +568,9 @@ def load_session_metadata(json_path: Path) -> Optional[SessionMetadata]:
     Returns:
         SessionMetadata if available, else None
     """
-    # First, try to load embedded metadata from v2.1 format
+    # First, try to load embedded metadata from v2.1 format (header only)
     try:
-        session_info = load_session_raw(json_path)
+        session_info = load_session_header(json_path)
         if session_info.has_embedded_metadata:
             # Build SessionMetadata from embedded data
             meta = session_info.metadata
@@ -230,7 +597,7 @@ def load_session_metadata(json_path: Path) -> Optional[SessionMetadata]:
                 labels_v2=labels_v2,
                 session_notes=meta.get('notes', ''),
                 sample_rate_hz=meta.get('sample_rate', 26),
-                magnet_config=MagnetConfig.from_dict(meta['magnet_config']) if meta.get('magnet_config') else None,
+                magnet_config=MagnetConfig.from_dict(meta['magnet_config']) if isinstance(meta.get('magnet_config'), dict) else None,
                 calibration_data=meta.get('calibration'),
                 custom_label_definitions=meta.get('custom_label_definitions', []),
                 # Extended fields for v2.1
@@ -247,59 +614,120 @@ def load_session_metadata(json_path: Path) -> Optional[SessionMetadata]:
     return None
 
 
-def compute_dataset_stats(data_dir: Path) -> DatasetStats:
+def _magnet_config_value(json_path: Path, header_metadata: Optional[Dict]) -> Any:
+    """Raw magnet_config from embedded metadata, falling back to .meta.json."""
+    value = header_metadata.get('magnet_config') if header_metadata else None
+    if value is None:
+        meta_path = json_path.with_suffix('.meta.json')
+        if meta_path.exists():
+            try:
+                with open(meta_path, 'r') as f:
+                    value = json.load(f).get('magnet_config')
+            except (OSError, ValueError):
+                pass
+    return value
+
+
+def magnet_config_has_magnets(value: Any) -> bool:
     """
-    Compute global statistics across all data files for normalization.
+    Interpret a stored magnet_config value.
+
+    The collector writes either a preset name ('none', 'alternating', ...) or
+    a MagnetConfig dict. Missing values are treated as baseline (no magnets).
+    """
+    if isinstance(value, dict):
+        config = MagnetConfig.from_dict(value)
+        return any([config.thumb_present, config.index_present, config.middle_present,
+                    config.ring_present, config.pinky_present])
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', 'none')
+    return False
+
+
+def session_has_magnets(json_path: Path) -> bool:
+    """
+    Whether a session was recorded with finger magnets.
+
+    Reads ``metadata.magnet_config`` from the session header, falling back to
+    a legacy .meta.json file (see magnet_config_has_magnets).
+    """
+    json_path = Path(json_path)
+    try:
+        metadata = load_session_header(json_path).metadata
+    except Exception:
+        metadata = None
+    return magnet_config_has_magnets(_magnet_config_value(json_path, metadata))
+
+
+def compute_grouped_dataset_stats(data_dir: Path) -> Dict[str, DatasetStats]:
+    """
+    Compute normalization statistics for all sessions and per magnet config.
+
+    Per-session statistics come from the session cache (see
+    load_session_stats) and are merged, so the cost is one small read per
+    session and only new or modified sessions are reprocessed.
 
     Args:
         data_dir: Directory containing .json data files
 
     Returns:
-        DatasetStats with mean, std, min, max for each feature
-    
-    TODO: Task 5 - Enhance with magnetic-specific normalization stats
-        Current implementation computes stats across ALL sessions (with and without magnets),
-        which can lead to poor normalization for magnetic finger tracking.
-        
-        Enhancement needed:
-        1. Add `with_magnets: bool = False` parameter
-        2. Filter sessions based on metadata.magnet_config field
-        3. Compute separate stats for:
-           - Baseline (no magnets): for calibration sessions
-           - With magnets: for finger tracking sessions
-        4. Save both stat sets: dataset_stats.npz and dataset_stats_magnetic.npz
-        5. Update GambitDataset.__init__ to load appropriate stats based on use case
-        
-        Impact: Currently acceptable for initial training, but may reduce accuracy
-                by 5-10% if magnetometer magnitude scales differ significantly between
-                calibration and tracking sessions.
-        
-        Priority: Low (implement only if finger tracking model accuracy < 60%)
-        
-        Reference: docs/design/magnetic-tracking-pipeline-analysis.md Section 3.4
-    """
-    all_data = []
-
-    for json_path in data_dir.glob('*.json'):
+        Dict with 'all' plus 'baseline' (no magnets) and/or 'magnetic'
+        entries for the groups that have sessions
+    """
+    totals: Dict[str, SessionStats] = {}
+
+    for json_path in find_session_files(data_dir):
         # Skip non-session files
-        if (json_path.name.endswith('.meta.json') or
-            json_path.name.endswith('.full.json') or
+        if (json_path.name.endswith('.full.json') or
             'calibration' in json_path.name.lower()):
             continue
-        data = load_session_data(json_path)
-        all_data.append(data)
+        stats = load_session_stats(json_path)
+        group = 'magnetic' if session_has_magnets(json_path) else 'baseline'
+        for name in ('all', group):
+            totals[name] = totals[name].merge(stats) if name in totals else stats
 
-    if not all_data:
+    if 'all' not in totals or totals['all'].count == 0:
         raise ValueError(f"No data files found in {data_dir}")
 
-    combined = np.concatenate(all_data, axis=0)
+    return {name: stats.to_dataset_stats()
+            for name, stats in totals.items() if stats.count > 0}
 
-    return DatasetStats(
-        mean=np.mean(combined, axis=0),
-        std=np.std(combined, axis=0) + 1e-8,  # Avoid division by zero
-        min_val=np.min(combined, axis=0),
-        max_val=np.max(combined, axis=0)
-    )
+
+def compute_dataset_stats(data_dir: Path,
+                          with_magnets: Optional[bool] = None) -> DatasetStats:
+    """
+    Compute global statistics across all data files for normalization.
+
+    Merges cached per-session statistics instead of concatenating every
+    session, so adding a recording only processes that recording.
+
+    Args:
+        data_dir: Directory containing .json data files
+        with_magnets: None for all sessions, True for sessions recorded with
+            finger magnets only, False for baseline (no magnet) sessions only
+
+    Returns:
+        DatasetStats with mean, std, min, max for each feature
+    """
+    if with_magnets is None:
+        total: Optional[SessionStats] = None
+        for json_path in find_session_files(data_dir):
+            # Skip non-session files
+            if (json_path.name.endswith('.full.json') or
+                'calibration' in json_path.name.lower()):
+                continue
+            stats = load_session_stats(json_path)
+            total = stats if total is None else total.merge(stats)
+
+        if total is None or total.count == 0:
+            raise ValueError(f"No data files found in {data_dir}")
+        return total.to_dataset_stats()
+
+    group = 'magnetic' if with_magnets else 'baseline'
+    grouped = compute_grouped_dataset_stats(data_dir)
+    if group not in grouped:
+        raise ValueError(f"No {group} sessions found in {data_dir}")
+    return grouped[group]
 
 
 def normalize_data(data: np.ndarray, stats: DatasetStats,
@@ -324,12 +752,61 @@ def normalize_data(data: np.ndarray, stats: DatasetStats,
         raise ValueError(f"Unknown normalization method: {method}")
 
 
+def window_starts(num_samples: int, window_size: int, stride: int) -> np.ndarray:
+    """Start indices of all full windows over num_samples samples."""
+    return np.arange(0, max(num_samples - window_size + 1, 0), stride)
+
+
+def sliding_windows(data: np.ndarray, window_size: int, stride: int = 1) -> np.ndarray:
+    """
+    Zero-copy sliding windows over the first axis.
+
+    Args:
+        data: Sequential data, shape (N, ...)
+        window_size: Number of samples per window
+        stride: Step size between windows
+
+    Returns:
+        Read-only strided view of shape (num_windows, window_size, ...).
+        With stride=1, indexing it with the start indices returned by
+        create_windows(..., return_indices=True) gathers those windows.
+    """
+    data = np.asarray(data)
+    if len(data) < window_size:
+        return np.empty((0, window_size) + data.shape[1:], dtype=data.dtype)
+    view = sliding_window_view(data, window_size, axis=0)  # (N-w+1, ..., w)
+    return np.moveaxis(view, -1, 1)[::stride]
+
+
+def _run_ids(labels: np.ndarray) -> np.ndarray:
+    """Run-length segment id per sample (rows compared as a whole for 2D labels)."""
+    changed = labels[1:] != labels[:-1]
+    if changed.ndim > 1:
+        changed = changed.any(axis=1)
+    return np.concatenate([[0], np.cumsum(changed)])
+
+
+def _window_modes(labels: np.ndarray, starts: np.ndarray, window_size: int) -> np.ndarray:
+    """Most frequent non-negative integer label per window (ties -> smallest)."""
+    labels = labels.astype(int)
+    if len(labels) and labels.min() < 0:
+        raise ValueError("Majority vote requires non-negative integer labels")
+    num_classes = labels.max() + 1 if len(labels) else 1
+    counts = np.zeros((len(labels) + 1, num_classes), dtype=np.int32)
+    np.cumsum(np.eye(num_classes, dtype=np.int32)[labels], axis=0, out=counts[1:])
+    return (counts[starts + window_size] - counts[starts]).argmax(axis=1)
+
+
 def create_windows(data: np.ndarray, labels: np.ndarray,
                    window_size: int = 50, stride: int = 25,
-                   require_single_label: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+                   require_single_label: bool = True,
+                   return_indices: bool = False) -> Tuple[np.ndarray, np.ndarray]:
     """
     Create sliding windows from sequential data.
 
+    Windows are taken from a strided view of ``data`` and copied once;
+    label consistency is checked from run-length boundaries of ``labels``.
+
     Args:
         data: Sensor data, shape (N, 9)
         labels: Per-sample labels, shape (N,)
@@ -337,37 +814,35 @@ def create_windows(data: np.ndarray, labels: np.ndarray,
         stride: Step size between windows (25 = 50% overlap)
         require_single_label: If True, only include windows where all samples
                               have the same label
+        return_indices: If True, return window start indices instead of
+                        materialized windows (see sliding_windows)
 
     Returns:
         Tuple of (windows, window_labels):
-        - windows: shape (num_windows, window_size, 9)
+        - windows: shape (num_windows, window_size, 9), or start indices of
+          shape (num_windows,) if return_indices
         - window_labels: shape (num_windows,)
     """
-    windows = []
-    window_labels = []
-
-    num_samples = len(data)
-
-    for start in range(0, num_samples - window_size + 1, stride):
-        end = start + window_size
-        window_data = data[start:end]
-        window_label_seq = labels[start:end]
+    labels = np.asarray(labels)
+    starts = window_starts(len(data), window_size, stride)
+
+    if require_single_label:
+        # Only include if all samples have the same label
+        if len(starts):
+            run_ids = _run_ids(labels)
+            starts = starts[run_ids[starts] == run_ids[starts + window_size - 1]]
+        window_labels = labels[starts]
+    else:
+        # Use majority vote for window label
+        window_labels = _window_modes(labels, starts, window_size)
 
-        if require_single_label:
-            # Only include if all samples have the same label
-            unique_labels = np.unique(window_label_seq)
-            if len(unique_labels) == 1:
-                windows.append(window_data)
-                window_labels.append(unique_labels[0])
-        else:
-            # Use majority vote for window label
-            window_labels.append(np.bincount(window_label_seq.astype(int)).argmax())
-            windows.append(window_data)
+    if return_indices:
+        return starts, window_labels
 
-    if not windows:
+    if not len(starts):
         return np.array([]).reshape(0, window_size, NUM_FEATURES), np.array([])
 
-    return np.array(windows), np.array(window_labels)
+    return sliding_windows(data, window_size)[starts], window_labels
 
 
 def create_windows_multilabel(
@@ -375,7 +850,8 @@ def create_windows_multilabel(
     label_matrix: np.ndarray,
     window_size: int = 50,
     stride: int = 25,
-    require_consistent: bool = True
+    require_consistent: bool = True,
+    return_indices: bool = False
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Create sliding windows from sequential data with multi-label support.
@@ -387,42 +863,40 @@ def create_windows_multilabel(
         stride: Step size between windows
         require_consistent: If True, only include windows where all samples
                             have the same label vector
+        return_indices: If True, return window start indices instead of
+                        materialized windows (see sliding_windows)
 
     Returns:
         Tuple of (windows, window_labels):
-        - windows: shape (num_windows, window_size, 9)
+        - windows: shape (num_windows, window_size, 9), or start indices of
+          shape (num_windows,) if return_indices
         - window_labels: shape (num_windows, num_labels)
     """
-    windows = []
-    window_labels = []
-
-    num_samples = len(data)
+    label_matrix = np.asarray(label_matrix)
+    starts = window_starts(len(data), window_size, stride)
+
+    if require_consistent:
+        # Check if all rows are identical
+        if len(starts):
+            run_ids = _run_ids(label_matrix)
+            starts = starts[run_ids[starts] == run_ids[starts + window_size - 1]]
+        window_labels = label_matrix[starts]
+    else:
+        # Use mode for each label dimension
+        columns = label_matrix.reshape(len(label_matrix), -1).T
+        window_labels = np.stack(
+            [_window_modes(col, starts, window_size) for col in columns], axis=1
+        ) if len(starts) else np.empty((0, len(columns)), dtype=int)
 
-    for start in range(0, num_samples - window_size + 1, stride):
-        end = start + window_size
-        window_data = data[start:end]
-        window_label_seq = label_matrix[start:end]
+    if return_indices:
+        return starts, window_labels
 
-        if require_consistent:
-            # Check if all rows are identical
-            if np.all(window_label_seq == window_label_seq[0]):
-                windows.append(window_data)
-                window_labels.append(window_label_seq[0])
-        else:
-            # Use mode for each label dimension
-            mode_labels = []
-            for col in range(window_label_seq.shape[1]):
-                counts = np.bincount(window_label_seq[:, col].astype(int))
-                mode_labels.append(counts.argmax())
-            windows.append(window_data)
-            window_labels.append(mode_labels)
-
-    if not windows:
+    if not len(starts):
         num_labels = label_matrix.shape[1] if len(label_matrix.shape) > 1 else 1
         return (np.array([]).reshape(0, window_size, NUM_FEATURES),
                 np.array([]).reshape(0, num_labels))
 
-    return np.array(windows), np.array(window_labels)
+    return sliding_windows(data, window_size)[starts], window_labels
 
 
 def labels_from_segments(num_samples: int, segments: List[LabeledSegment],
@@ -533,6 +1007,100 @@ def _extract_label_value(labels: MultiLabel, column: str) -> Optional[int]:
     return None
 
 
+def _index_row(json_path: Path) -> Dict[str, Any]:
+    """Session index row (see ml.session_index) for one session file."""
+    try:
+        info = load_session_header(json_path)
+        header = {
+            'version': info.version,
+            'timestamp': info.timestamp,
+            'firmware_version': info.firmware_version,
+            'sample_count': info.num_samples,
+            'metadata': info.metadata,
+        }
+    except Exception:
+        info = None
+        header = None
+    meta = load_session_metadata(json_path)
+    magnet_config = _magnet_config_value(json_path, info.metadata if info else None)
+
+    return {
+        'header': header,
+        'metadata': meta.to_dict() if meta else None,
+        'version': info.version if info else None,
+        'firmware_version': info.firmware_version if info else None,
+        'sample_count': info.num_samples if info else None,
+        'session_type': meta.session_type if meta else None,
+        'split': meta.split if meta else None,
+        'label_segments': len(meta.labels) + len(meta.labels_v2) if meta else 0,
+        'custom_labels': sorted(set(
+            label for seg in meta.labels_v2 for label in seg.labels.custom
+        )) if meta else [],
+        'magnet_config': magnet_config,
+        'has_magnets': magnet_config_has_magnets(magnet_config),
+    }
+
+
+def _session_from_row(row: Dict[str, Any]) -> Tuple[Optional[SessionInfo], Optional[SessionMetadata]]:
+    """Rebuild header SessionInfo and SessionMetadata from an index row."""
+    header = row.get('header')
+    info = None
+    if header is not None:
+        info = SessionInfo(
+            samples=[],
+            version=header['version'],
+            timestamp=header['timestamp'],
+            firmware_version=header['firmware_version'],
+            metadata=header['metadata'],
+            sample_count=header['sample_count']
+        )
+    meta = SessionMetadata.from_dict(row['metadata']) if row.get('metadata') else None
+    return info, meta
+
+
+def _map_sessions(fn, json_paths: List[Path], max_workers: Optional[int]) -> List[Any]:
+    """Apply fn to each path, in a process pool if max_workers > 1 (None = all cores). Order is preserved."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    workers = min(max_workers, len(json_paths))
+    if workers <= 1:
+        return [fn(json_path) for json_path in json_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, json_paths))
+
+
+def load_sessions_parallel(json_paths: List[Path],
+                           max_workers: Optional[int] = 1) -> List[np.ndarray]:
+    """
+    Load many sessions with load_session_data, parsing cold ones in parallel.
+
+    With max_workers > 1, sessions without cached features are parsed,
+    calibrated and filtered in a process pool (which also populates the
+    session cache); cached sessions are memory-mapped in this process. The
+    pool is opt-in: on spawn platforms (macOS, Windows) the calling script
+    needs an ``if __name__ == '__main__':`` guard.
+
+    Args:
+        json_paths: Session files
+        max_workers: Worker processes (default 1 = serial; None = os.cpu_count())
+
+    Returns:
+        Feature arrays in the same order as json_paths
+    """
+    json_paths = [Path(p) for p in json_paths]
+    cold = []
+    for json_path in json_paths:
+        cal_path = _resolve_calibration_file(json_path, True, None)
+        key = _feature_key(cal_path, True, True)
+        if SessionCache.for_data_dir(json_path.parent).load_features(json_path, key) is None:
+            cold.append(json_path)
+
+    loaded = {}
+    if len(cold) > 1 and max_workers != 1:
+        loaded = dict(zip(cold, _map_sessions(load_session_data, cold, max_workers)))
+    return [loaded[p] if p in loaded else load_session_data(p) for p in json_paths]
+
+
 class GambitDataset:
     """
     Dataset class for loading and preparing GAMBIT data for training.
@@ -541,7 +1109,8 @@ class GambitDataset:
     """
 
     def __init__(self, data_dir: str, window_size: int = 50, stride: int = 25,
-                 normalize_method: str = 'standardize'):
+                 normalize_method: str = 'standardize',
+                 max_workers: Optional[int] = 1):
         """
         Initialize the dataset.
 
@@ -550,11 +1119,16 @@ class GambitDataset:
             window_size: Samples per window
             stride: Window stride
             normalize_method: 'standardize' or 'minmax'
+            max_workers: Processes used to parse uncached sessions
+                         (default 1 = serial; None = os.cpu_count())
         """
         self.data_dir = Path(data_dir)
         self.window_size = window_size
         self.stride = stride
         self.normalize_method = normalize_method
+        self.max_workers = max_workers
+        self._sessions: Optional[List[Tuple[Path, Optional[SessionInfo], Optional[SessionMetadata]]]] = None
+        self._index_rows: Optional[List[Dict[str, Any]]] = None
 
         # Compute or load global stats
         self.stats_path = self.data_dir / 'dataset_stats.npz'
@@ -562,9 +1136,59 @@ class GambitDataset:
             self.stats = DatasetStats.load(str(self.stats_path))
         else:
             print("Computing dataset statistics...")
-            self.stats = compute_dataset_stats(self.data_dir)
-            self.stats.save(str(self.stats_path))
-            print(f"Saved stats to {self.stats_path}")
+            self.refresh_stats()
+
+    def refresh_stats(self) -> DatasetStats:
+        """
+        Recompute normalization statistics from cached per-session stats.
+
+        Only sessions that are new or modified since their stats were cached
+        are loaded. Writes dataset_stats.npz and, when magnet sessions exist,
+        dataset_stats_magnetic.npz.
+
+        Returns:
+            The updated stats for all sessions
+        """
+        grouped = compute_grouped_dataset_stats(self.data_dir)
+        self.stats = grouped['all']
+        self.stats.save(str(self.stats_path))
+        print(f"Saved stats to {self.stats_path}")
+        if 'magnetic' in grouped:
+            magnetic_path = self.data_dir / 'dataset_stats_magnetic.npz'
+            grouped['magnetic'].save(str(magnetic_path))
+            print(f"Saved magnetic stats to {magnetic_path}")
+        return self.stats
+
+    def scan_sessions(self) -> List[Tuple[Path, Optional[SessionInfo], Optional[SessionMetadata]]]:
+        """
+        Scan the data directory once, memoized for the lifetime of the dataset.
+
+        Answers from the persistent session index (see ml.session_index);
+        only sessions added or modified since the last refresh are read
+        (in parallel when max_workers > 1).
+
+        Returns:
+            Sorted list of (json_path, header, metadata); header is None if the
+            file could not be read, metadata is None if the session has none
+        """
+        if self._sessions is None:
+            paths = find_session_files(self.data_dir)
+            self._index_rows = SessionIndex(self.data_dir).refresh(
+                paths, _index_row,
+                lambda fn, stale: _map_sessions(fn, stale, self.max_workers)
+            )
+            self._sessions = [(p, *_session_from_row(row))
+                              for p, row in zip(paths, self._index_rows)]
+        return self._sessions
+
+    def rescan(self):
+        """Forget the memoized directory scan (e.g. after new recordings)."""
+        self._sessions = None
+        self._index_rows = None
+
+    def load_sessions(self, json_paths: List[Path]) -> List[np.ndarray]:
+        """Load feature arrays for sessions, in order (see load_sessions_parallel)."""
+        return load_sessions_parallel(json_paths, self.max_workers)
 
     def load_labeled_sessions(self, split: Optional[str] = None
                               ) -> Tuple[np.ndarray, np.ndarray]:
@@ -582,30 +1206,27 @@ class GambitDataset:
         all_windows = []
         all_labels = []
 
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-
-            meta = load_session_metadata(json_path)
+        selected = []
+        for json_path, _, meta in self.scan_sessions():
             if meta is None:
                 continue
 
             # Check for V1 or V2 labels
-            has_v1_labels = bool(meta.labels)
-            has_v2_labels = bool(meta.labels_v2)
-
-            if not has_v1_labels and not has_v2_labels:
+            if not meta.labels and not meta.labels_v2:
                 continue  # Skip unlabeled sessions
 
             if split is not None and meta.split != split:
                 continue
 
-            # Load and normalize data
-            data = load_session_data(json_path)
+            selected.append((json_path, meta))
+
+        datasets = self.load_sessions([json_path for json_path, _ in selected])
+        for (json_path, meta), data in zip(selected, datasets):
+            # Normalize data
             data = normalize_data(data, self.stats, self.normalize_method)
 
             # Create per-sample labels (prefer V2, fall back to V1)
-            if has_v2_labels:
+            if meta.labels_v2:
                 # Convert V2 to V1-style pose labels
                 segments = meta.get_all_labels_v2()
                 labels = self._v2_to_pose_labels(len(data), segments)
@@ -662,11 +1283,8 @@ class GambitDataset:
         all_windows = []
         all_labels = []
 
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-
-            meta = load_session_metadata(json_path)
+        selected = []
+        for json_path, _, meta in self.scan_sessions():
             if meta is None:
                 continue
 
@@ -677,8 +1295,11 @@ class GambitDataset:
             if split is not None and meta.split != split:
                 continue
 
-            # Load and normalize data
-            data = load_session_data(json_path)
+            selected.append((json_path, segments))
+
+        datasets = self.load_sessions([json_path for json_path, _ in selected])
+        for (json_path, segments), data in zip(selected, datasets):
+            # Normalize data
             data = normalize_data(data, self.stats, self.normalize_method)
 
             # Create per-sample label matrix
@@ -748,11 +1369,7 @@ class GambitDataset:
         """Get all unique custom labels used across all sessions."""
         custom_labels = set()
 
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-
-            meta = load_session_metadata(json_path)
+        for _, _, meta in self.scan_sessions():
             if meta is None:
                 continue
 
@@ -768,24 +1385,15 @@ class GambitDataset:
     def get_available_firmware_versions(self) -> Set[str]:
         """Get all unique firmware versions in the dataset."""
         versions = set()
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-            try:
-                session_info = load_session_raw(json_path)
-                if session_info.firmware_version:
-                    versions.add(session_info.firmware_version)
-            except Exception:
-                pass
+        for _, session_info, _ in self.scan_sessions():
+            if session_info is not None and session_info.firmware_version:
+                versions.add(session_info.firmware_version)
         return versions
 
     def get_available_session_types(self) -> Set[str]:
         """Get all unique session types in the dataset."""
         types = set()
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-            meta = load_session_metadata(json_path)
+        for _, _, meta in self.scan_sessions():
             if meta:
                 types.add(meta.session_type)
         return types
@@ -793,10 +1401,7 @@ class GambitDataset:
     def get_calibration_labels(self) -> Set[str]:
         """Get all unique calibration labels in the dataset."""
         cal_labels = set()
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if json_path.name.endswith('.meta.json'):
-                continue
-            meta = load_session_metadata(json_path)
+        for _, _, meta in self.scan_sessions():
             if meta:
                 for seg in meta.labels_v2:
                     if seg.labels.calibration.value != 'none':
@@ -826,14 +1431,13 @@ class GambitDataset:
         """
         sessions = []
 
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            if (json_path.name.endswith('.meta.json') or
-                json_path.name.endswith('.full.json')):
+        for json_path, session_info, meta in self.scan_sessions():
+            if json_path.name.endswith('.full.json'):
                 continue
 
             try:
-                session_info = load_session_raw(json_path)
-                meta = load_session_metadata(json_path)
+                if session_info is None:
+                    session_info = load_session_header(json_path)  # Re-raise the read error
 
                 # Apply filters
                 if firmware_version is not None:
@@ -871,7 +1475,7 @@ class GambitDataset:
                     'version': session_info.version,
                     'timestamp': session_info.timestamp,
                     'firmware_version': session_info.firmware_version,
-                    'sample_count': len(session_info.samples),
+                    'sample_count': session_info.num_samples,
                     'has_embedded_metadata': session_info.has_embedded_metadata,
                 }
 
@@ -916,25 +1520,22 @@ class GambitDataset:
         session_types = {}  # Count sessions per type
         calibration_types = {}  # Count sessions per calibration type
 
-        for json_path in sorted(self.data_dir.glob('*.json')):
-            # Skip non-session files
-            if (json_path.name.endswith('.meta.json') or
-                json_path.name.endswith('.full.json') or
-                'calibration' in json_path.name.lower()):
-                continue
+        # Skip non-session files
+        selected = [
+            (json_path, session_info, meta)
+            for json_path, session_info, meta in self.scan_sessions()
+            if not (json_path.name.endswith('.full.json') or
+                    'calibration' in json_path.name.lower())
+        ]
+        datasets = self.load_sessions([json_path for json_path, _, _ in selected])
 
-            data = load_session_data(json_path)
+        for (json_path, session_info, meta), data in zip(selected, datasets):
             total_samples += len(data)
 
-            # Load session info for firmware version
-            try:
-                session_info = load_session_raw(json_path)
-                fw_ver = session_info.firmware_version or 'unknown'
-                firmware_versions[fw_ver] = firmware_versions.get(fw_ver, 0) + 1
-            except Exception:
-                firmware_versions['unknown'] = firmware_versions.get('unknown', 0) + 1
+            # Session info for firmware version
+            fw_ver = (session_info.firmware_version if session_info else None) or 'unknown'
+            firmware_versions[fw_ver] = firmware_versions.get(fw_ver, 0) + 1
 
-            meta = load_session_metadata(json_path)
             if meta:
                 has_labels = bool(meta.labels) or bool(meta.labels_v2)
                 if has_labels:
@@ -4,13 +4,41 @@ Advanced Filtering for Magnetic Finger Tracking
 Provides:
 - KalmanFilter3D: Multi-dimensional Kalman filter for 3D position/velocity tracking
 - ParticleFilter: Multi-hypothesis particle filter for finger pose estimation
-- magneticLikelihood: Dipole-based likelihood function
+- magnetic_likelihood / magnetic_likelihood_batch: Dipole-based likelihood functions
 
 Python equivalent of filters.js for ML pipeline consistency.
 """
 
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+
+
+def _linear_scan(A: np.ndarray, u: np.ndarray, eps: float = 1e-15) -> np.ndarray:
+    """
+    Evaluate the recursion x[k] = A @ x[k-1] + u[k] (x[-1] = 0) for all k.
+
+    Vectorized parallel prefix scan (Hillis-Steele): after round j each x[k]
+    holds sum_{i < 2^(j+1)} A^i u[k-i]. Stops early once A^(2^j) has decayed
+    below eps, which for a stable filter happens after a handful of rounds.
+
+    Args:
+        A: Constant transition matrix, shape (d, d)
+        u: Inputs, shape (N, d)
+
+    Returns:
+        States, shape (N, d)
+    """
+    x = np.array(u, dtype=np.float64, copy=True)
+    n = len(x)
+    power = A.copy()
+    shift = 1
+    while shift < n:
+        if np.max(np.abs(power)) < eps:
+            break
+        x[shift:] = x[shift:] + x[:-shift] @ power.T
+        power = power @ power
+        shift *= 2
+    return x
 
 
 class KalmanFilter3D:
@@ -150,6 +178,108 @@ class KalmanFilter3D:
             'z': float(self.state[2])
         }
 
+    def filter_batch(self, measurements: np.ndarray, smooth: bool = False,
+                     tol: float = 1e-10) -> np.ndarray:
+        """
+        Filter a whole (N, 3) measurement sequence at once (offline mode).
+
+        Produces the same estimates as calling update() per sample. With a
+        constant dt the covariance P (and therefore the gain K) does not
+        depend on the data and converges to a steady state within a few dozen
+        samples. Until then the exact time-varying recursion runs per step;
+        after convergence the fixed-gain recursion
+            x[k] = (I - K H) F x[k-1] + K z[k]
+        is evaluated as a vectorized linear scan instead of a Python loop.
+
+        Args:
+            measurements: Position measurements, shape (N, 3)
+            smooth: Also run a Rauch-Tung-Striebel backward pass and return
+                    smoothed (non-causal) estimates
+            tol: Relative change in P below which the gain is treated as converged
+
+        Returns:
+            Filtered (or smoothed) positions, shape (N, 3). The filter is left in
+            the state after the last (filtered) sample, so streaming can continue.
+        """
+        z = np.asarray(measurements, dtype=np.float64).reshape(-1, 3)
+        n = len(z)
+        if n == 0:
+            return np.zeros((0, 3))
+
+        F = self._get_F(self.dt)
+        H = self._get_H()
+        I = np.eye(self.state_dim)
+
+        states = np.empty((n, self.state_dim))
+        # Per-step covariances for the RTS pass (transient region only)
+        P_filt = []
+        P_pred = []
+
+        start = 0
+        if not self.initialized:
+            self.state[:3] = z[0]
+            self.state[3:] = 0
+            self.initialized = True
+            states[0] = self.state
+            P_filt.append(self.P.copy())
+            P_pred.append(self.P.copy())
+            start = 1
+
+        # Transient: exact time-varying recursion until P converges
+        k = start
+        K = None
+        converged = False
+        while k < n:
+            P_prior = F @ self.P @ F.T + self.Q
+            S = H @ P_prior @ H.T + self.R
+            K = P_prior @ H.T @ np.linalg.inv(S)
+            P_post = (I - K @ H) @ P_prior
+
+            predicted = F @ self.state
+            self.state = predicted + K @ (z[k] - H @ predicted)
+            states[k] = self.state
+
+            change = np.max(np.abs(P_post - self.P))
+            self.P = P_post
+            P_filt.append(P_post)
+            P_pred.append(P_prior)
+            k += 1
+
+            if change <= tol * max(np.max(np.abs(P_post)), 1.0):
+                converged = True
+                break
+
+        # Steady state: fixed-gain recursion as a vectorized scan
+        steady_start = k
+        if converged and k < n:
+            A = (I - K @ H) @ F
+            u = z[k:] @ K.T
+            u[0] += A @ self.state
+            states[k:] = _linear_scan(A, u)
+            self.state = states[-1].copy()
+
+        if not smooth:
+            return states[:, :3].copy()
+
+        # Rauch-Tung-Striebel smoother
+        smoothed = states.copy()
+        if steady_start < n:
+            P_f = self.P
+            P_p = F @ P_f @ F.T + self.Q
+            G = P_f @ F.T @ np.linalg.inv(P_p)
+            # Backward recursion s[k] = G s[k+1] + (I - G F) x[k], run reversed
+            u = states[steady_start:][::-1] @ (I - G @ F).T
+            u[0] = states[-1]
+            smoothed[steady_start:] = _linear_scan(G, u)[::-1]
+
+            P_pred.append(P_p)
+
+        for k in range(min(steady_start, n - 1) - 1, -1, -1):
+            G = P_filt[k] @ F.T @ np.linalg.inv(P_pred[k + 1])
+            smoothed[k] = states[k] + G @ (smoothed[k + 1] - F @ states[k])
+
+        return smoothed[:, :3]
+
     def get_position(self) -> Dict[str, float]:
         """Get current position estimate."""
         return {
@@ -173,17 +303,38 @@ class KalmanFilter3D:
         self.initialized = False
 
 
+FINGERS = ['thumb', 'index', 'middle', 'ring', 'pinky']
+
+# Default magnet configuration for magnetic_likelihood (moments in A·m²)
+DEFAULT_LIKELIHOOD_MAGNET_CONFIG = {
+    finger: {'moment': {'x': 0, 'y': 0, 'z': 0.01}} for finger in FINGERS
+}
+
+
 class ParticleFilter:
     """
     Particle filter for multi-hypothesis finger pose tracking.
 
     Handles ambiguous/multimodal magnetic field distributions.
+
+    Particles are stored as one contiguous array of shape
+    (num_particles, num_fingers, 3) (positions in mm, fingers ordered as
+    self.fingers), so prediction, likelihood evaluation, resampling and
+    estimation are all array operations.
+
+    API note: self.particles used to be a list of {finger: {x, y, z}} dicts
+    and is now that array. update()'s likelihood_fn keeps its per-particle
+    signature Function(particle_dict, measurement) -> likelihood (e.g.
+    magnetic_likelihood) but is called once per particle; pass
+    batch_likelihood_fn, taking the particle array, for the vectorized path.
     """
 
     def __init__(self,
                  num_particles: int = 500,
                  position_noise: float = 5.0,
-                 velocity_noise: float = 2.0):
+                 velocity_noise: float = 2.0,
+                 magnet_config: Optional[Dict] = None,
+                 rng: Optional[np.random.Generator] = None):
         """
         Initialize particle filter.
 
@@ -191,34 +342,40 @@ class ParticleFilter:
             num_particles: Number of particles
             position_noise: Position noise for motion model (mm)
             velocity_noise: Velocity noise for motion model (mm/s)
+            magnet_config: Magnet configuration for the default likelihood
+                           (see magnetic_likelihood)
+            rng: Random generator (default: new unseeded generator)
         """
         self.num_particles = num_particles
         self.position_noise = position_noise
         self.velocity_noise = velocity_noise
+        self.magnet_config = magnet_config
+        self.rng = rng if rng is not None else np.random.default_rng()
 
-        self.particles = []
+        self.fingers = list(FINGERS)
+        self.particles = np.zeros((0, len(self.fingers), 3))
         self.weights = np.ones(num_particles) / num_particles
         self.initialized = False
 
-    def initialize(self, initial_pose: Dict[str, Dict[str, float]]):
+    def initialize(self, initial_pose: Union[Dict[str, Dict[str, float]], np.ndarray]):
         """
         Initialize particles around initial pose.
 
         Args:
-            initial_pose: {thumb: {x, y, z}, index: {x, y, z}, ...}
+            initial_pose: {thumb: {x, y, z}, index: {x, y, z}, ...}, or an
+                          array of shape (5, 3) ordered as FINGERS
         """
-        self.particles = []
-
-        for _ in range(self.num_particles):
-            particle = {}
-            for finger, pos in initial_pose.items():
-                # Add noise around initial position
-                particle[finger] = {
-                    'x': pos['x'] + np.random.randn() * self.position_noise,
-                    'y': pos['y'] + np.random.randn() * self.position_noise,
-                    'z': pos['z'] + np.random.randn() * self.position_noise
-                }
-            self.particles.append(particle)
+        if isinstance(initial_pose, dict):
+            self.fingers = list(initial_pose.keys())
+            center = np.array([[initial_pose[f]['x'], initial_pose[f]['y'], initial_pose[f]['z']]
+                               for f in self.fingers], dtype=np.float64)
+        else:
+            self.fingers = list(FINGERS)
+            center = np.asarray(initial_pose, dtype=np.float64).reshape(len(self.fingers), 3)
+
+        # Add noise around initial position
+        noise = self.rng.standard_normal((self.num_particles, len(self.fingers), 3))
+        self.particles = center + noise * self.position_noise
 
         self.weights = np.ones(self.num_particles) / self.num_particles
         self.initialized = True
@@ -234,31 +391,51 @@ class ParticleFilter:
             return
 
         # Simple random walk motion model
-        for particle in self.particles:
-            for finger in particle:
-                particle[finger]['x'] += np.random.randn() * self.position_noise * np.sqrt(dt)
-                particle[finger]['y'] += np.random.randn() * self.position_noise * np.sqrt(dt)
-                particle[finger]['z'] += np.random.randn() * self.position_noise * np.sqrt(dt)
+        noise = self.rng.standard_normal(self.particles.shape)
+        self.particles += noise * (self.position_noise * np.sqrt(dt))
 
-    def update(self, measurement: Dict[str, float], likelihood_fn):
+    def update(self, measurement: Union[Dict[str, float], np.ndarray],
+               likelihood_fn=None, batch_likelihood_fn=None):
         """
         Update step: reweight particles based on measurement.
 
         Args:
-            measurement: {x, y, z} magnetic field measurement
-            likelihood_fn: Function(particle, measurement) -> likelihood
+            measurement: {x, y, z} or [x, y, z] magnetic field measurement
+            likelihood_fn: Function(particle, measurement) -> likelihood, called
+                           per particle with a {finger: {x, y, z}} dict
+            batch_likelihood_fn: Function(particles, measurement) -> likelihoods,
+                                 taking the (P, F, 3) particle array and
+                                 returning shape (P,)
+
+            With neither given, uses magnetic_likelihood_batch with
+            self.magnet_config.
         """
         if not self.initialized:
             return
 
-        # Compute likelihood for each particle
-        for i, particle in enumerate(self.particles):
-            self.weights[i] = likelihood_fn(particle, measurement)
+        if likelihood_fn is not None and batch_likelihood_fn is not None:
+            raise ValueError("Pass likelihood_fn or batch_likelihood_fn, not both")
+
+        if batch_likelihood_fn is not None:
+            self.weights = np.asarray(batch_likelihood_fn(self.particles, measurement),
+                                      dtype=np.float64)
+        elif likelihood_fn is not None:
+            # Per-particle callable: hand it each particle as a dict
+            self.weights = np.array([
+                likelihood_fn({finger: {'x': float(p[i, 0]), 'y': float(p[i, 1]), 'z': float(p[i, 2])}
+                               for i, finger in enumerate(self.fingers)}, measurement)
+                for p in self.particles
+            ], dtype=np.float64)
+        else:
+            # Default: likelihood for every particle at once
+            self.weights = magnetic_likelihood_batch(
+                self.particles, measurement, self.magnet_config, self.fingers
+            )
 
         # Normalize weights
         weight_sum = np.sum(self.weights)
         if weight_sum > 0:
-            self.weights /= weight_sum
+            self.weights = self.weights / weight_sum
         else:
             # All weights zero - reset to uniform
             self.weights = np.ones(self.num_particles) / self.num_particles
@@ -273,20 +450,18 @@ class ParticleFilter:
         # Cumulative sum of weights
         cumsum = np.cumsum(self.weights)
 
-        # Systematic resampling
-        new_particles = []
+        # Systematic resampling: one uniform offset, evenly spaced thresholds
         step = 1.0 / self.num_particles
-        u = np.random.uniform(0, step)
+        thresholds = self.rng.uniform(0, step) + np.arange(self.num_particles) * step
+        idx = np.minimum(np.searchsorted(cumsum, thresholds), self.num_particles - 1)
 
-        for i in range(self.num_particles):
-            threshold = u + i * step
-            idx = np.searchsorted(cumsum, threshold)
-            idx = min(idx, len(self.particles) - 1)
-            new_particles.append(self.particles[idx].copy())
-
-        self.particles = new_particles
+        self.particles = self.particles[idx]
         self.weights = np.ones(self.num_particles) / self.num_particles
 
+    def estimate_array(self) -> np.ndarray:
+        """Weighted mean pose as an array of shape (num_fingers, 3)."""
+        return np.tensordot(self.weights, self.particles, axes=1)
+
     def estimate(self) -> Dict[str, Dict[str, float]]:
         """
         Get weighted mean estimate of hand pose.
@@ -297,21 +472,15 @@ class ParticleFilter:
         if not self.initialized or len(self.particles) == 0:
             return {}
 
-        # Get finger names from first particle
-        fingers = list(self.particles[0].keys())
-
-        estimate = {}
-        for finger in fingers:
-            x = sum(p[finger]['x'] * w for p, w in zip(self.particles, self.weights))
-            y = sum(p[finger]['y'] * w for p, w in zip(self.particles, self.weights))
-            z = sum(p[finger]['z'] * w for p, w in zip(self.particles, self.weights))
-            estimate[finger] = {'x': x, 'y': y, 'z': z}
-
-        return estimate
+        mean = self.estimate_array()
+        return {
+            finger: {'x': float(mean[i, 0]), 'y': float(mean[i, 1]), 'z': float(mean[i, 2])}
+            for i, finger in enumerate(self.fingers)
+        }
 
     def reset(self):
         """Reset filter."""
-        self.particles = []
+        self.particles = np.zeros((0, len(self.fingers), 3))
         self.weights = np.ones(self.num_particles) / self.num_particles
         self.initialized = False
 
@@ -335,37 +504,95 @@ def magnetic_dipole_field(magnet_pos: Dict[str, float],
     if sensor_pos is None:
         sensor_pos = {'x': 0, 'y': 0, 'z': 0}
 
-    # Position vector from magnet to sensor (mm to m)
-    rx = (sensor_pos['x'] - magnet_pos['x']) * 0.001
-    ry = (sensor_pos['y'] - magnet_pos['y']) * 0.001
-    rz = (sensor_pos['z'] - magnet_pos['z']) * 0.001
+    field = magnetic_dipole_field_batch(
+        np.array([magnet_pos['x'], magnet_pos['y'], magnet_pos['z']], dtype=np.float64),
+        np.array([magnet_moment['x'], magnet_moment['y'], magnet_moment['z']], dtype=np.float64),
+        np.array([sensor_pos['x'], sensor_pos['y'], sensor_pos['z']], dtype=np.float64)
+    )
+    return {'x': float(field[0]), 'y': float(field[1]), 'z': float(field[2])}
 
-    # Distance
-    r = np.sqrt(rx**2 + ry**2 + rz**2)
 
-    # Avoid singularity at r=0
-    if r < 0.001:  # 1mm threshold
-        return {'x': 0.0, 'y': 0.0, 'z': 0.0}
+def magnetic_dipole_field_batch(magnet_pos: np.ndarray,
+                                magnet_moment: np.ndarray,
+                                sensor_pos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Vectorized magnetic_dipole_field over any number of magnets.
 
-    # Unit vector r̂
-    rx_hat = rx / r
-    ry_hat = ry / r
-    rz_hat = rz / r
+    Args:
+        magnet_pos: Magnet positions in mm, shape (..., 3)
+        magnet_moment: Moments in A·m², broadcastable to magnet_pos
+        sensor_pos: Sensor position in mm, shape (3,) (default origin)
+
+    Returns:
+        Field per magnet in the same arbitrary units, shape (..., 3);
+        zero for magnets within 1mm of the sensor
+    """
+    # One dipole per position: add a magnet axis of length 1
+    magnet_pos = np.asarray(magnet_pos, dtype=np.float64)[..., None, :]
+    magnet_moment = np.asarray(magnet_moment, dtype=np.float64)[..., None, :]
+    return _summed_dipole_field(magnet_pos, magnet_moment, sensor_pos)
+
+
+def _summed_dipole_field(magnet_pos: np.ndarray, magnet_moment: np.ndarray,
+                         sensor_pos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Sum of dipole fields over the magnet axis, shape (..., M, 3) -> (..., 3).
+
+    Positions in mm; k = 1 instead of μ₀/4π (absorbed into calibration).
+    """
+    # Imported here: the simulation package pulls in optional heavy backends
+    from .simulation.dipole import MU_0_OVER_4PI, dipole_field_batch
+
+    if sensor_pos is None:
+        sensor_pos = np.zeros(3)
+    field = dipole_field_batch(np.asarray(magnet_pos) * 0.001, magnet_moment,
+                               np.asarray(sensor_pos, dtype=np.float64) * 0.001,
+                               min_distance=0.001)  # Avoid singularity (1mm threshold)
+    return field / MU_0_OVER_4PI
+
+
+def _moment_array(magnet_config: Dict, fingers: List[str]) -> np.ndarray:
+    """Moments from a magnet_config dict as (F, 3); zero for unconfigured fingers."""
+    moments = np.zeros((len(fingers), 3))
+    for i, finger in enumerate(fingers):
+        if finger in FINGERS and finger in magnet_config:
+            m = magnet_config[finger]['moment']
+            moments[i] = [m['x'], m['y'], m['z']]
+    return moments
+
+
+def magnetic_likelihood_batch(particles: np.ndarray,
+                              measurement: Union[Dict[str, float], np.ndarray],
+                              magnet_config: Optional[Dict] = None,
+                              fingers: Optional[List[str]] = None,
+                              sigma: float = 10.0) -> np.ndarray:
+    """
+    Likelihood of a measurement for every particle in one call.
 
-    # Dot product m·r̂
-    m_dot_r = (magnet_moment['x'] * rx_hat +
-               magnet_moment['y'] * ry_hat +
-               magnet_moment['z'] * rz_hat)
+    Args:
+        particles: Finger positions in mm, shape (P, F, 3)
+        measurement: Measured magnetic field {x, y, z} or [x, y, z]
+        magnet_config: Magnet configuration (see magnetic_likelihood)
+        fingers: Finger name for each of the F particle columns (default FINGERS)
+        sigma: Gaussian likelihood width
 
-    # Dipole field: B = k * (3(m·r̂)r̂ - m) / r³
-    k = 1.0  # Simplified constant (units absorbed into calibration)
-    r3 = r ** 3
+    Returns:
+        Likelihoods, shape (P,)
+    """
+    if magnet_config is None:
+        magnet_config = DEFAULT_LIKELIHOOD_MAGNET_CONFIG
+    if fingers is None:
+        fingers = FINGERS
+    if isinstance(measurement, dict):
+        measurement = [measurement['x'], measurement['y'], measurement['z']]
 
-    Bx = k * (3 * m_dot_r * rx_hat - magnet_moment['x']) / r3
-    By = k * (3 * m_dot_r * ry_hat - magnet_moment['y']) / r3
-    Bz = k * (3 * m_dot_r * rz_hat - magnet_moment['z']) / r3
+    # Expected field: sum of all dipole contributions, per particle
+    moments = _moment_array(magnet_config, fingers)
+    expected = _summed_dipole_field(particles, moments)
 
-    return {'x': Bx, 'y': By, 'z': Bz}
+    # Gaussian likelihood of the residual
+    residual_sq = np.sum((np.asarray(measurement, dtype=np.float64) - expected) ** 2, axis=-1)
+    return np.exp(-residual_sq / (2 * sigma**2))
 
 
 def magnetic_likelihood(particle: Dict[str, Dict[str, float]],
@@ -374,6 +601,8 @@ def magnetic_likelihood(particle: Dict[str, Dict[str, float]],
     """
     Compute likelihood of measurement given particle pose using dipole model.
 
+    Single-particle convenience wrapper around magnetic_likelihood_batch.
+
     Args:
         particle: Finger positions {thumb: {x,y,z}, index: {x,y,z}, ...}
         measurement: Measured magnetic field {x, y, z}
@@ -382,78 +611,53 @@ def magnetic_likelihood(particle: Dict[str, Dict[str, float]],
     Returns:
         Likelihood probability (0 to 1)
     """
-    # Default magnet configuration
-    if magnet_config is None:
-        magnet_config = {
-            'thumb': {'moment': {'x': 0, 'y': 0, 'z': 0.01}},
-            'index': {'moment': {'x': 0, 'y': 0, 'z': 0.01}},
-            'middle': {'moment': {'x': 0, 'y': 0, 'z': 0.01}},
-            'ring': {'moment': {'x': 0, 'y': 0, 'z': 0.01}},
-            'pinky': {'moment': {'x': 0, 'y': 0, 'z': 0.01}}
-        }
-
-    sensor_pos = {'x': 0, 'y': 0, 'z': 0}
-
-    # Calculate expected field as sum of all dipole contributions
-    expected = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-
-    for finger in ['thumb', 'index', 'middle', 'ring', 'pinky']:
-        if finger in particle and finger in magnet_config:
-            field = magnetic_dipole_field(
-                particle[finger],
-                magnet_config[finger]['moment'],
-                sensor_pos
-            )
-            expected['x'] += field['x']
-            expected['y'] += field['y']
-            expected['z'] += field['z']
-
-    # Compute residual
-    dx = measurement['x'] - expected['x']
-    dy = measurement['y'] - expected['y']
-    dz = measurement['z'] - expected['z']
-
-    residual = np.sqrt(dx**2 + dy**2 + dz**2)
-
-    # Gaussian likelihood
-    sigma = 10.0  # Tunable parameter
-    likelihood = np.exp(-(residual**2) / (2 * sigma**2))
-
-    return likelihood
+    fingers = list(particle.keys())
+    positions = np.array([[particle[f]['x'], particle[f]['y'], particle[f]['z']]
+                          for f in fingers], dtype=np.float64).reshape(1, -1, 3)
+    return float(magnetic_likelihood_batch(positions, measurement, magnet_config, fingers)[0])
 
 
 def decorate_telemetry_with_filtering(telemetry_data: List[Dict],
-                                     filter_instance: KalmanFilter3D) -> List[Dict]:
+                                     filter_instance: KalmanFilter3D,
+                                     smooth: bool = False) -> List[Dict]:
     """
     Decorate telemetry data with Kalman-filtered magnetometer fields.
 
     IMPORTANT: Preserves raw data, only adds filtered_ fields.
 
+    The whole session is filtered in one call to KalmanFilter3D.filter_batch.
+
     Args:
         telemetry_data: List of telemetry dictionaries
         filter_instance: KalmanFilter3D instance
+        smooth: Apply an RTS smoothing pass (offline, non-causal)
 
     Returns:
         List with added filtered_mx, filtered_my, filtered_mz fields
     """
+    # Use calibrated fields if available, otherwise raw
+    measurements = np.array([
+        [sample.get('calibrated_mx', sample.get('mx', 0)),
+         sample.get('calibrated_my', sample.get('my', 0)),
+         sample.get('calibrated_mz', sample.get('mz', 0))]
+        for sample in telemetry_data
+    ], dtype=np.float64).reshape(-1, 3)
+
+    try:
+        filtered = filter_instance.filter_batch(measurements, smooth=smooth)
+    except Exception as e:
+        # Filtering failed, skip decoration
+        filtered = None
+
     decorated = []
 
-    for sample in telemetry_data:
+    for i, sample in enumerate(telemetry_data):
         decorated_sample = sample.copy()
 
-        # Use calibrated fields if available, otherwise raw
-        mx = sample.get('calibrated_mx', sample.get('mx', 0))
-        my = sample.get('calibrated_my', sample.get('my', 0))
-        mz = sample.get('calibrated_mz', sample.get('mz', 0))
-
-        try:
-            filtered = filter_instance.update({'x': mx, 'y': my, 'z': mz})
-            decorated_sample['filtered_mx'] = filtered['x']
-            decorated_sample['filtered_my'] = filtered['y']
-            decorated_sample['filtered_mz'] = filtered['z']
-        except Exception as e:
-            # Filtering failed, skip decoration
-            pass
+        if filtered is not None:
+            decorated_sample['filtered_mx'] = float(filtered[i, 0])
+            decorated_sample['filtered_my'] = float(filtered[i, 1])
+            decorated_sample['filtered_mz'] = float(filtered[i, 2])
 
         decorated.append(decorated_sample)
 
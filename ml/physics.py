@@ -0,0 +1,1007 @@
+"""
+SIMCAP Physics Fitting Engine
+
+Shared dipole-model fitting for the physics analysis scripts. A fit is
+described declaratively by a ParameterSpec (named parameter blocks with
+initial values, bounds and an optional fixed flag) and a DipoleFitProblem
+(finger states of each observed combo, observed fields and weights).
+
+All combos are evaluated in one batched forward pass, and the Jacobian of
+the residuals is computed analytically from the dipole equation, so
+L-BFGS-B and least-squares solvers get exact gradients instead of ~50 extra
+objective calls per step for finite differences.
+
+Model (sensor at the origin, positions in meters, moments in A·m²):
+
+    p_kf = pos_extended_f + s_kf · (pos_flexed_f − pos_extended_f)
+    B_k  = Σ_f dipole(p_kf, polarity_f · moment_f) · 1e6 + baseline     (μT)
+
+where s_kf ∈ [0, 1] is the flexion of finger f in combo k (see combo_states).
+
+For Magpylib cylinder models, cylinder_fields evaluates the field of every
+finger in every state with one functional getB call, and combo_fields sums
+those into any number of combos (including the baseline) without further
+Magpylib calls.
+
+MultiStartOptimizer runs many L-BFGS-B fits from Sobol / Latin-hypercube
+starts over a process pool, with a leaderboard, early termination of
+stagnant starts and resumable checkpoints.
+
+Usage:
+    from ml.physics import dipole_hand_spec, DipoleFitProblem, combo_states
+
+    spec = dipole_hand_spec(pos_extended=ext0, pos_flexed=flex0, moment=m0,
+                            baseline=np.zeros(3))
+    problem = DipoleFitProblem(spec, combo_states(combos), observed_means)
+    result = problem.fit(method='least_squares')
+    result.params['moment']     # (5, 3)
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.optimize import least_squares, minimize
+from scipy.stats import qmc
+
+from .simulation.dipole import MU_0_OVER_4PI, dipole_field_batch
+
+try:
+    import magpylib as magpy
+    HAS_MAGPYLIB = True
+except ImportError:
+    HAS_MAGPYLIB = False
+
+FINGERS = ['thumb', 'index', 'middle', 'ring', 'pinky']
+
+# Flexion fraction of each combo character: binary 'e'/'f' combos and
+# ternary '0'/'1'/'2' state codes
+COMBO_FLEXION = {'e': 0.0, 'f': 1.0, 'p': 0.5, '0': 0.0, '1': 0.5, '2': 1.0}
+
+# Tesla -> μT, folded into the dipole constant
+FIELD_SCALE = MU_0_OVER_4PI * 1e6
+
+Bound = Union[float, np.ndarray, Sequence[float]]
+
+
+# Finger state index (0 extended, 1 partial, 2 flexed) per combo character byte
+_CHAR_STATE = np.full(256, -1, dtype=np.int8)
+for _char, _flexion in COMBO_FLEXION.items():
+    _CHAR_STATE[ord(_char)] = int(_flexion * 2)
+
+
+def state_table(base: int, num_fingers: int = len(FINGERS)) -> np.ndarray:
+    """
+    Finger states of every integer combo code.
+
+    Codes are base-`base` numbers with the thumb most significant, as in the
+    'fingers_binary' labels (see ml.session_arrays.states_to_code).
+
+    Args:
+        base: 2 (extended/flexed) or 3 (extended/partial/flexed)
+        num_fingers: Number of digits
+
+    Returns:
+        int8 array of shape (base ** num_fingers, num_fingers); row c holds the
+        digits of code c (for base 2: 0 = extended, 1 = flexed)
+    """
+    codes = np.arange(base ** num_fingers)
+    powers = base ** np.arange(num_fingers - 1, -1, -1)
+    return ((codes[:, None] // powers) % base).astype(np.int8)
+
+
+# Precomputed state tables: BINARY_STATES[code] / TERNARY_STATES[code] -> (5,) digits
+BINARY_STATES = state_table(2)
+TERNARY_STATES = state_table(3)
+
+
+def combo_state_indices(combos: Sequence[str]) -> np.ndarray:
+    """
+    Combo strings -> finger state indices, without per-character Python loops.
+
+    Args:
+        combos: Equal-length strings such as 'eefff' (extended/flexed/'p'artial)
+                or '00122' (state codes)
+
+    Returns:
+        int8 array of shape (K, F) with 0 = extended, 1 = partial, 2 = flexed
+    """
+    combos = list(combos)
+    if not combos:
+        return np.zeros((0, len(FINGERS)), dtype=np.int8)
+    width = len(combos[0])
+    if any(len(combo) != width for combo in combos):
+        raise ValueError("Combos must all have the same number of fingers")
+    chars = np.frombuffer(''.join(combos).encode('latin-1', errors='replace'), dtype=np.uint8)
+    states = _CHAR_STATE[chars].reshape(len(combos), width)
+    if np.any(states < 0):
+        bad = chars[(states < 0).ravel()][0]
+        raise ValueError(f"Unknown finger state {chr(bad)!r} in combo")
+    return states
+
+
+def combo_codes(combos: Sequence[str], base: int = 3) -> np.ndarray:
+    """
+    Combo strings -> integer codes (thumb most significant).
+
+    Args:
+        combos: Strings as for combo_state_indices
+        base: 3 (any states) or 2 (extended/flexed only)
+
+    Returns:
+        int64 array of shape (K,); index into state_table(base)
+    """
+    states = combo_state_indices(combos).astype(np.int64)
+    if base == 2:
+        if np.any(states == 1):
+            raise ValueError("Partial finger states have no base-2 code")
+        states //= 2
+    elif base != 3:
+        raise ValueError(f"Unsupported base {base} (expected 2 or 3)")
+    return states @ (base ** np.arange(states.shape[1] - 1, -1, -1))
+
+
+def combo_states(combos: Sequence[str]) -> np.ndarray:
+    """
+    Combo strings -> flexion fractions.
+
+    Args:
+        combos: Strings such as 'eefff' (extended/flexed) or '00122' (state codes)
+
+    Returns:
+        Array of shape (K, F) with 0 = extended, 0.5 = partial, 1 = flexed
+    """
+    return combo_state_indices(combos) / 2.0
+
+
+# ============================================================================
+# Dipole field with analytic derivatives
+# ============================================================================
+
+def dipole_fields_and_jacobians(positions: np.ndarray, moments: np.ndarray,
+                                min_distance: float = 1e-6
+                                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-magnet dipole field at a sensor at the origin, with its derivatives.
+
+    Args:
+        positions: Magnet positions (meters), shape (..., 3)
+        moments: Dipole moments (A·m²), broadcastable to positions
+        min_distance: Magnets closer than this contribute zero (and zero gradient)
+
+    Returns:
+        Tuple of (B (..., 3) μT,
+                  dB/dposition (..., 3, 3) μT/m,
+                  dB/dmoment (..., 3, 3) μT/(A·m²)),
+        with J[..., i, j] = dB_i / dx_j
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    moments = np.broadcast_to(np.asarray(moments, dtype=np.float64), positions.shape)
+
+    # r: vector from dipole to sensor
+    r = -positions
+    r_sq = np.sum(r * r, axis=-1)
+    valid = r_sq >= min_distance ** 2
+    inv_r = 1.0 / np.sqrt(np.where(valid, r_sq, 1.0))
+    inv_r3 = np.where(valid, inv_r ** 3, 0.0)[..., None, None]
+    inv_r5 = inv_r3 * (inv_r ** 2)[..., None, None]
+    inv_r7 = inv_r5 * (inv_r ** 2)[..., None, None]
+
+    m_dot_r = np.sum(moments * r, axis=-1)[..., None, None]
+    rr = r[..., :, None] * r[..., None, :]
+    eye = np.eye(3)
+
+    # B = G · m with the dipole tensor G = 3 r rᵀ / R⁵ − I / R³
+    G = FIELD_SCALE * (3 * rr * inv_r5 - eye * inv_r3)
+    B = np.einsum('...ij,...j->...i', G, moments)
+
+    # dB_i/dr_j = 3 (r_i m_j + m_i r_j + (m·r) δ_ij) / R⁵ − 15 (m·r) r_i r_j / R⁷
+    rm = r[..., :, None] * moments[..., None, :]
+    dB_dr = FIELD_SCALE * (3 * (rm + np.swapaxes(rm, -1, -2) + m_dot_r * eye) * inv_r5
+                           - 15 * m_dot_r * rr * inv_r7)
+
+    # r = −position
+    return B, -dB_dr, G
+
+
+# ============================================================================
+# Declarative parameter specification
+# ============================================================================
+
+@dataclass
+class ParamBlock:
+    """
+    One named parameter array.
+
+    Args:
+        name: Block name (e.g. 'pos_extended')
+        init: Initial value; its shape is the block shape
+        lower, upper: Bounds, scalars or arrays broadcastable to the block shape
+        fixed: Keep the block at init (not part of the optimization vector)
+    """
+    name: str
+    init: np.ndarray
+    lower: Bound = -np.inf
+    upper: Bound = np.inf
+    fixed: bool = False
+
+    def __post_init__(self):
+        self.init = np.array(self.init, dtype=np.float64)
+        self.lower = np.broadcast_to(np.asarray(self.lower, dtype=np.float64), self.init.shape)
+        self.upper = np.broadcast_to(np.asarray(self.upper, dtype=np.float64), self.init.shape)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.init.shape
+
+
+class ParameterSpec:
+    """
+    Mapping between named parameter blocks and a flat optimization vector.
+
+    Args:
+        blocks: Parameter blocks, in vector order
+        layout: 'block' (each free block flattened in turn) or 'finger'
+                (per finger, the rows of every block whose leading dimension
+                is num_fingers, followed by the remaining blocks)
+        num_fingers: Leading dimension of per-finger blocks (layout='finger')
+    """
+
+    def __init__(self, blocks: List[ParamBlock], layout: str = 'block',
+                 num_fingers: int = len(FINGERS)):
+        if layout not in ('block', 'finger'):
+            raise ValueError(f"Unknown layout {layout!r} (expected 'block' or 'finger')")
+        self.blocks = {block.name: block for block in blocks}
+        self.layout = layout
+
+        # Vector index of every element of every free block
+        self.index: Dict[str, np.ndarray] = {}
+        free = [block for block in blocks if not block.fixed]
+        offset = 0
+        if layout == 'finger':
+            per_finger = [b for b in free if b.init.ndim >= 1 and b.shape[0] == num_fingers]
+            row_sizes = [int(np.prod(b.shape[1:])) for b in per_finger]
+            stride = sum(row_sizes)
+            for b, row_size in zip(per_finger, row_sizes):
+                rows = np.arange(num_fingers)[:, None] * stride + offset + np.arange(row_size)
+                self.index[b.name] = rows.reshape(b.shape)
+                offset += row_size
+            offset = stride * num_fingers
+            free = [b for b in free if b not in per_finger]
+        for b in free:
+            self.index[b.name] = offset + np.arange(b.init.size).reshape(b.shape)
+            offset += b.init.size
+        self.size = offset
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.blocks
+
+    def is_free(self, name: str) -> bool:
+        return name in self.index
+
+    def pack(self, values: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Flat vector from block values (missing blocks take their init)."""
+        values = values or {}
+        x = np.empty(self.size)
+        for name, idx in self.index.items():
+            x[idx] = np.asarray(values.get(name, self.blocks[name].init), dtype=np.float64)
+        return x
+
+    def unpack(self, x: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Block values from a flat vector (fixed blocks return their init).
+
+        x may carry leading dimensions, e.g. (S, size) for a population;
+        free blocks then have shape (S, *block shape).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        return {name: x[..., self.index[name]] if name in self.index else block.init
+                for name, block in self.blocks.items()}
+
+    def initial(self) -> np.ndarray:
+        return self.pack()
+
+    def bounds(self) -> List[Tuple[float, float]]:
+        """Per-element (lower, upper) bounds, as scipy.optimize expects."""
+        lower, upper = self.bound_arrays()
+        return list(zip(lower.tolist(), upper.tolist()))
+
+    def bound_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        lower = np.full(self.size, -np.inf)
+        upper = np.full(self.size, np.inf)
+        for name, idx in self.index.items():
+            lower[idx] = self.blocks[name].lower
+            upper[idx] = self.blocks[name].upper
+        return lower, upper
+
+    def columns(self, name: str, block_jacobian: np.ndarray, out: np.ndarray):
+        """Scatter a block Jacobian (rows, *block shape) into the vector Jacobian columns."""
+        if name in self.index:
+            out[:, self.index[name].ravel()] += block_jacobian.reshape(len(out), -1)
+
+
+def dipole_hand_spec(pos_extended: np.ndarray,
+                     pos_flexed: np.ndarray,
+                     moment: np.ndarray,
+                     baseline: Optional[np.ndarray] = None,
+                     extended_bounds: Tuple[Bound, Bound] = (-0.15, 0.15),
+                     flexed_bounds: Tuple[Bound, Bound] = (-0.08, 0.08),
+                     moment_bounds: Tuple[Bound, Bound] = (-1.0, 1.0),
+                     baseline_bounds: Tuple[Bound, Bound] = (-100.0, 100.0),
+                     fit_baseline: bool = True,
+                     layout: str = 'block') -> ParameterSpec:
+    """
+    Standard per-finger dipole spec: extended/flexed positions, moments, baseline.
+
+    Args:
+        pos_extended, pos_flexed: Initial positions (meters), shape (F, 3)
+        moment: Initial dipole moments (A·m²), shape (F, 3)
+        baseline: Initial baseline field (μT), shape (3,); None = no baseline
+        *_bounds: (lower, upper) per block, scalars or arrays of the block shape
+        fit_baseline: Optimize the baseline (False keeps it fixed)
+        layout: Vector layout (see ParameterSpec)
+
+    Returns:
+        ParameterSpec with blocks pos_extended, pos_flexed, moment[, baseline]
+    """
+    blocks = [
+        ParamBlock('pos_extended', pos_extended, *extended_bounds),
+        ParamBlock('pos_flexed', pos_flexed, *flexed_bounds),
+        ParamBlock('moment', moment, *moment_bounds),
+    ]
+    if baseline is not None:
+        blocks.append(ParamBlock('baseline', baseline, *baseline_bounds, fixed=not fit_baseline))
+    return ParameterSpec(blocks, layout=layout, num_fingers=len(np.asarray(moment)))
+
+
+# ============================================================================
+# Fitting problem
+# ============================================================================
+
+@dataclass
+class FitResult:
+    """Outcome of DipoleFitProblem.fit."""
+    x: np.ndarray
+    params: Dict[str, np.ndarray]
+    cost: float                     # objective value at x
+    success: bool
+    message: str
+    nfev: int
+    elapsed: float
+    method: str
+    extra: Dict = field(default_factory=dict)
+
+
+class DipoleFitProblem:
+    """
+    Weighted least-squares fit of the dipole hand model to observed combo fields.
+
+    The objective is ||r(x)||² over the stacked residual vector
+
+        sqrt(w_k) · (B_k(x) − observed_k)             data, 3 rows per combo
+        sqrt(regularization) · x                      optional ridge term
+        sqrt(penalty_weight) · max(0, |flex_f| − |ext_f|)       flexed closer than extended
+        sqrt(penalty_weight) · max(0, |flex_f − ext_f| − max_travel)
+
+    so objective, gradient and the least-squares Jacobian describe the same problem.
+
+    Args:
+        spec: Parameter spec with pos_extended, pos_flexed, moment (and optionally baseline)
+        states: Flexion fraction per combo and finger, shape (K, F) (see combo_states)
+        observed: Observed fields (μT), shape (K, 3)
+        weights: Per-combo weights, shape (K,) (default 1)
+        polarity: Fixed per-finger moment sign/scale, shape (F,) (default 1)
+        regularization: Ridge weight on the optimization vector
+        penalty_weight: Weight of the physical-plausibility penalties (0 = off)
+        max_travel: Travel (meters) beyond which the penalty applies (None = no travel penalty)
+        min_distance: Dipole singularity cutoff (meters)
+    """
+
+    def __init__(self, spec: ParameterSpec, states: np.ndarray, observed: np.ndarray,
+                 weights: Optional[np.ndarray] = None,
+                 polarity: Optional[np.ndarray] = None,
+                 regularization: float = 0.0,
+                 penalty_weight: float = 0.0,
+                 max_travel: Optional[float] = None,
+                 min_distance: float = 1e-6):
+        for name in ('pos_extended', 'pos_flexed', 'moment'):
+            if name not in spec:
+                raise ValueError(f"ParameterSpec is missing the {name!r} block")
+        self.spec = spec
+        self.states = np.asarray(states, dtype=np.float64)
+        self.observed = np.asarray(observed, dtype=np.float64).reshape(-1, 3)
+        num_combos, num_fingers = self.states.shape
+        if len(self.observed) != num_combos:
+            raise ValueError(f"{num_combos} combos but {len(self.observed)} observations")
+        self.weights = np.ones(num_combos) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.sqrt_w = np.sqrt(self.weights)
+        self.polarity = np.ones(num_fingers) if polarity is None else np.asarray(polarity, dtype=np.float64)
+        self.regularization = regularization
+        self.penalty_weight = penalty_weight
+        self.max_travel = max_travel
+        self.min_distance = min_distance
+        self.nfev = 0
+
+    # ------------------------------------------------------------------
+    # Forward model
+    # ------------------------------------------------------------------
+
+    def positions(self, params: Dict[str, np.ndarray],
+                  states: Optional[np.ndarray] = None) -> np.ndarray:
+        """Magnet positions per combo, shape (..., K, F, 3) (leading dims from params)."""
+        s = self.states if states is None else np.asarray(states, dtype=np.float64)
+        ext, flex = params['pos_extended'], params['pos_flexed']
+        return ext[..., None, :, :] + s[:, :, None] * (flex - ext)[..., None, :, :]
+
+    def predict(self, x: np.ndarray, states: Optional[np.ndarray] = None) -> np.ndarray:
+        """Predicted fields (μT), shape (K, 3), for the fitted combos or other states."""
+        params = self.spec.unpack(x)
+        s = self.states if states is None else np.asarray(states, dtype=np.float64)
+        moments = self.polarity[:, None] * params['moment']
+        B = dipole_field_batch(self.positions(params, s), moments, min_distance=self.min_distance)
+        return B * 1e6 + params.get('baseline', np.zeros(3))
+
+    def _penalty_terms(self, params: Dict[str, np.ndarray]):
+        """Penalty residuals (P,) and their derivatives w.r.t. ext and flex, (P, F, 3) each."""
+        ext, flex = params['pos_extended'], params['pos_flexed']
+        num_fingers = len(ext)
+        rows, d_ext, d_flex = [], [], []
+        scale = np.sqrt(self.penalty_weight)
+
+        def unit(v):
+            n = np.linalg.norm(v, axis=-1, keepdims=True)
+            return v / np.maximum(n, 1e-12), n[..., 0]
+
+        u_ext, n_ext = unit(ext)
+        u_flex, n_flex = unit(flex)
+        excess = n_flex - n_ext
+        active = excess > 0
+        rows.append(scale * np.where(active, excess, 0.0))
+        eye = np.eye(num_fingers)[:, :, None]
+        d_ext.append(-scale * eye * (active[:, None] * u_ext)[None])
+        d_flex.append(scale * eye * (active[:, None] * u_flex)[None])
+
+        if self.max_travel is not None:
+            u_travel, travel = unit(flex - ext)
+            excess = travel - self.max_travel
+            active = excess > 0
+            rows.append(scale * np.where(active, excess, 0.0))
+            d = scale * eye * (active[:, None] * u_travel)[None]
+            d_ext.append(-d)
+            d_flex.append(d)
+
+        return np.concatenate(rows), np.concatenate(d_ext), np.concatenate(d_flex)
+
+    def _evaluate(self, x: np.ndarray, jacobian: bool):
+        self.nfev += 1
+        x = np.asarray(x, dtype=np.float64)
+        params = self.spec.unpack(x)
+        positions = self.positions(params)
+        moments = self.polarity[:, None] * params['moment']
+        if jacobian:
+            B, dB_dp, dB_dm = dipole_fields_and_jacobians(positions, moments, self.min_distance)
+            B = B.sum(axis=1)
+        else:
+            B = dipole_field_batch(positions, moments, min_distance=self.min_distance) * 1e6
+
+        baseline = params.get('baseline', np.zeros(3))
+        data = self.sqrt_w[:, None] * (B + baseline - self.observed)
+        parts = [data.ravel()]
+        if self.regularization > 0:
+            parts.append(np.sqrt(self.regularization) * x)
+        if self.penalty_weight > 0:
+            penalty, p_ext, p_flex = self._penalty_terms(params)
+            parts.append(penalty)
+        residuals = np.concatenate(parts)
+        if not jacobian:
+            return residuals, None
+
+        num_combos = len(self.states)
+        J = np.zeros((len(residuals), self.spec.size))
+        J_data = J[:3 * num_combos]
+
+        # d data_k / d block, shape (K, 3, F, 3): only magnet f depends on finger f's parameters
+        w = self.sqrt_w[:, None, None, None]
+        s = self.states[:, None, :, None]
+        dp = np.swapaxes(dB_dp, 1, 2)                      # (K, 3, F, 3)
+        self.spec.columns('pos_extended', w * (1 - s) * dp, J_data)
+        self.spec.columns('pos_flexed', w * s * dp, J_data)
+        dm = np.swapaxes(dB_dm, 1, 2) * self.polarity[None, None, :, None]
+        self.spec.columns('moment', w * dm, J_data)
+        if 'baseline' in self.spec:
+            self.spec.columns('baseline', self.sqrt_w[:, None, None] * np.eye(3)[None], J_data)
+
+        row = 3 * num_combos
+        if self.regularization > 0:
+            J[row:row + self.spec.size] = np.sqrt(self.regularization) * np.eye(self.spec.size)
+            row += self.spec.size
+        if self.penalty_weight > 0:
+            J_penalty = J[row:row + len(penalty)]
+            self.spec.columns('pos_extended', p_ext, J_penalty)
+            self.spec.columns('pos_flexed', p_flex, J_penalty)
+        return residuals, J
+
+    # ------------------------------------------------------------------
+    # Objective interfaces
+    # ------------------------------------------------------------------
+
+    def residuals(self, x: np.ndarray) -> np.ndarray:
+        """Stacked residual vector r(x)."""
+        return self._evaluate(x, jacobian=False)[0]
+
+    def jacobian(self, x: np.ndarray) -> np.ndarray:
+        """Analytic Jacobian dr/dx, shape (len(r), spec.size)."""
+        return self._evaluate(x, jacobian=True)[1]
+
+    def objective(self, x: np.ndarray) -> float:
+        """||r(x)||²."""
+        r = self.residuals(x)
+        return float(r @ r)
+
+    def population_objective(self, population: np.ndarray) -> np.ndarray:
+        """
+        Objective of many candidate vectors in one batched evaluation.
+
+        Matches objective() for every candidate, with all candidates, combos
+        and fingers evaluated as one (S, K, F, 3) dipole computation. Pass it
+        to scipy.optimize.differential_evolution with vectorized=True.
+
+        Args:
+            population: Candidate vectors, shape (size, S) (SciPy's vectorized layout)
+
+        Returns:
+            Objective values, shape (S,)
+        """
+        X = np.asarray(population, dtype=np.float64).reshape(self.spec.size, -1).T   # (S, size)
+        self.nfev += len(X)
+        params = self.spec.unpack(X)
+        moments = self.polarity[:, None] * params['moment']
+        B = dipole_field_batch(self.positions(params), moments[..., None, :, :],
+                               min_distance=self.min_distance) * 1e6                # (S, K, 3)
+
+        baseline = np.asarray(params.get('baseline', np.zeros(3)))[..., None, :]
+        cost = np.sum(self.weights[:, None] * (B + baseline - self.observed) ** 2, axis=(-2, -1))
+        if self.regularization > 0:
+            cost = cost + self.regularization * np.sum(X ** 2, axis=-1)
+        if self.penalty_weight > 0:
+            ext, flex = params['pos_extended'], params['pos_flexed']
+            excess = np.linalg.norm(flex, axis=-1) - np.linalg.norm(ext, axis=-1)
+            cost = cost + self.penalty_weight * np.sum(np.maximum(excess, 0.0) ** 2, axis=-1)
+            if self.max_travel is not None:
+                excess = np.linalg.norm(flex - ext, axis=-1) - self.max_travel
+                cost = cost + self.penalty_weight * np.sum(np.maximum(excess, 0.0) ** 2, axis=-1)
+        return cost
+
+    def gradient(self, x: np.ndarray) -> np.ndarray:
+        return self.value_and_grad(x)[1]
+
+    def value_and_grad(self, x: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Objective and its exact gradient 2 Jᵀr (for minimize(..., jac=True))."""
+        r, J = self._evaluate(x, jacobian=True)
+        return float(r @ r), 2.0 * (J.T @ r)
+
+    def check_gradient(self, x: np.ndarray, step: float = 1e-7) -> float:
+        """Max relative difference between the analytic and a central-difference gradient."""
+        x = np.asarray(x, dtype=np.float64)
+        analytic = self.gradient(x)
+        numeric = np.empty_like(x)
+        for i in range(len(x)):
+            h = step * max(1.0, abs(x[i]))
+            xp, xm = x.copy(), x.copy()
+            xp[i] += h
+            xm[i] -= h
+            numeric[i] = (self.objective(xp) - self.objective(xm)) / (2 * h)
+        scale = np.maximum(np.abs(numeric), np.abs(analytic)).max()
+        return float(np.abs(analytic - numeric).max() / max(scale, 1e-30))
+
+    # ------------------------------------------------------------------
+    # Solvers
+    # ------------------------------------------------------------------
+
+    def fit(self, x0: Optional[np.ndarray] = None, method: str = 'L-BFGS-B',
+            maxiter: int = 1000, tol: float = 1e-10, verbose: bool = False) -> FitResult:
+        """
+        Local fit with exact gradients.
+
+        Args:
+            x0: Starting vector (default: spec initial values), clipped into bounds
+            method: 'L-BFGS-B' (scipy.optimize.minimize) or 'least_squares'
+                    (scipy.optimize.least_squares, trust-region reflective)
+            maxiter: Iteration limit (function-evaluation limit for least_squares)
+            tol: Convergence tolerance (ftol)
+            verbose: Print solver progress
+
+        Returns:
+            FitResult
+        """
+        lower, upper = self.spec.bound_arrays()
+        x0 = self.spec.initial() if x0 is None else np.asarray(x0, dtype=np.float64)
+        x0 = np.clip(x0, lower, upper)
+        self.nfev = 0
+        t0 = time.time()
+
+        if method == 'L-BFGS-B':
+            result = minimize(self.value_and_grad, x0, jac=True, method='L-BFGS-B',
+                              bounds=self.spec.bounds(),
+                              options={'maxiter': maxiter, 'ftol': tol, 'disp': verbose})
+            x, success, message = result.x, bool(result.success), str(result.message)
+            extra = {'nit': int(result.nit)}
+        elif method == 'least_squares':
+            # trf needs a strictly feasible start
+            span = np.where(np.isfinite(upper - lower), upper - lower, 1.0)
+            x0 = np.clip(x0, lower + 1e-9 * span, upper - 1e-9 * span)
+            result = least_squares(self.residuals, x0, jac=self.jacobian,
+                                   bounds=(lower, upper), method='trf',
+                                   ftol=tol, xtol=tol, gtol=tol,
+                                   max_nfev=maxiter, verbose=2 if verbose else 0)
+            x, success, message = result.x, bool(result.success), str(result.message)
+            extra = {'njev': int(result.njev) if result.njev is not None else None}
+        else:
+            raise ValueError(f"Unknown method {method!r} (expected 'L-BFGS-B' or 'least_squares')")
+
+        return FitResult(
+            x=x,
+            params=self.spec.unpack(x),
+            cost=self.objective(x),
+            success=success,
+            message=message,
+            nfev=self.nfev,
+            elapsed=time.time() - t0,
+            method=method,
+            extra=extra,
+        )
+
+
+# ============================================================================
+# Magpylib cylinder magnets
+# ============================================================================
+
+def cylinder_fields(positions: np.ndarray, polarizations: np.ndarray,
+                    dimension: Bound = (6.0, 3.0)) -> np.ndarray:
+    """
+    Field of many independent cylinder magnets at a sensor at the origin.
+
+    All magnets are evaluated in one call of Magpylib's functional interface
+    (magpy.func), without building magnet objects.
+
+    Args:
+        positions: Magnet positions (mm), shape (..., 3)
+        polarizations: Magnet polarizations (mT), shape (..., 3)
+        dimension: (diameter, height) in mm, broadcastable to (..., 2)
+
+    Returns:
+        Field of each magnet (μT), shape (..., 3)
+    """
+    if not HAS_MAGPYLIB:
+        raise ImportError("Magpylib not installed. Run: pip install magpylib")
+    positions = np.asarray(positions, dtype=np.float64)
+    shape = positions.shape
+    n = int(np.prod(shape[:-1]))
+    kwargs = {
+        'observers': np.zeros((n, 3)),
+        'positions': positions.reshape(n, 3),
+        'polarizations': np.broadcast_to(polarizations, shape).reshape(n, 3),
+        'dimensions': np.broadcast_to(np.asarray(dimension, dtype=np.float64),
+                                      shape[:-1] + (2,)).reshape(n, 2),
+    }
+    if hasattr(magpy, 'func'):
+        B = magpy.func.cylinder_field('B', squeeze=False, **kwargs)
+    else:
+        # Magpylib < 5.1: string-source functional interface of getB
+        B = magpy.getB('Cylinder', observers=kwargs['observers'], position=kwargs['positions'],
+                       polarization=kwargs['polarizations'], dimension=kwargs['dimensions'])
+    return np.asarray(B).reshape(shape) * 1000.0  # mT -> μT
+
+
+def combo_fields(state_fields: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """
+    Total field of finger combos from per-finger, per-state fields.
+
+    Magnets superpose, so with the field of every finger in every discrete
+    state known, each combo is a sum of F table entries.
+
+    Args:
+        state_fields: Field of finger f in state s, shape (..., F, S, 3);
+                      leading dimensions (e.g. a population) are kept
+        states: State index per combo and finger, shape (K, F)
+
+    Returns:
+        Combo fields, shape (..., K, 3)
+    """
+    states = np.asarray(states, dtype=np.intp)
+    fingers = np.arange(state_fields.shape[-3])
+    return state_fields[..., fingers, states, :].sum(axis=-2)
+
+
+# ============================================================================
+# Multi-start global optimization
+# ============================================================================
+
+# Status of a start in MultiStartOptimizer
+ACTIVE, CONVERGED, STAGNANT, PRUNED = 0, 1, 2, 3
+STATUS_NAMES = {ACTIVE: 'active', CONVERGED: 'converged', STAGNANT: 'stagnant', PRUNED: 'pruned'}
+
+# Problem of the current pool worker, built once by _init_worker
+_WORKER: Dict = {}
+
+
+def _problem_recipe(problem: DipoleFitProblem, shm) -> Dict:
+    """Everything but the data arrays needed to rebuild a problem in a worker."""
+    return {
+        'spec': problem.spec,
+        'shm_name': shm.name,
+        'shapes': [problem.states.shape, problem.observed.shape, problem.weights.shape],
+        'kwargs': {
+            'polarity': problem.polarity,
+            'regularization': problem.regularization,
+            'penalty_weight': problem.penalty_weight,
+            'max_travel': problem.max_travel,
+            'min_distance': problem.min_distance,
+        },
+    }
+
+
+def _init_worker(recipe: Dict):
+    """Pool initializer: attach to the shared observations and build the problem once."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=recipe['shm_name'])
+    arrays, offset = [], 0
+    for shape in recipe['shapes']:
+        size = int(np.prod(shape))
+        arrays.append(np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset * 8))
+        offset += size
+    states, observed, weights = arrays
+    _WORKER['shm'] = shm
+    _WORKER['problem'] = DipoleFitProblem(recipe['spec'], states, observed, weights,
+                                          **recipe['kwargs'])
+
+
+def _run_start(task: Tuple[int, np.ndarray, int]) -> Tuple[int, np.ndarray, float, bool, int]:
+    """Advance one start by up to maxiter L-BFGS-B iterations."""
+    index, x0, maxiter = task
+    problem = _WORKER['problem']
+    result = minimize(problem.value_and_grad, x0, jac=True, method='L-BFGS-B',
+                      bounds=problem.spec.bounds(), options={'maxiter': maxiter})
+    # status 0: converged; 1: iteration limit reached
+    return index, result.x, float(result.fun), result.status == 0, int(result.nfev)
+
+
+@dataclass
+class MultiStartResult:
+    """Outcome of MultiStartOptimizer.run."""
+    x: np.ndarray                   # best vector
+    params: Dict[str, np.ndarray]
+    cost: float
+    leaderboard: List[Tuple[int, float]]     # (start index, cost), best first
+    starts: np.ndarray              # (N, P) final vector of every start
+    costs: np.ndarray               # (N,)
+    status: np.ndarray              # (N,) see STATUS_NAMES
+    rounds: int
+    nfev: int
+    elapsed: float
+
+
+class MultiStartOptimizer:
+    """
+    Multi-start L-BFGS-B over a process pool.
+
+    Starts are drawn from a scrambled Sobol sequence or a Latin hypercube
+    over the parameter bounds, and advanced in rounds of round_iters
+    iterations. After each round the leaderboard is updated, starts whose
+    relative improvement fell below stagnation_tol, or whose cost is more
+    than prune_ratio times the best, are terminated, and the state is
+    checkpointed so an interrupted run resumes where it stopped.
+
+    Worker processes build the problem once, from observations placed in
+    shared memory; per round only (start index, vector) pairs are sent.
+
+    Args:
+        problem: Fitting problem (its spec bounds must be finite)
+        n_starts: Number of starts (the spec initial vector is start 0)
+        sampler: 'sobol' or 'lhs'
+        seed: Sampler seed
+        workers: Pool size (-1 = all CPUs, 1 = run in-process)
+        round_iters: L-BFGS-B iterations per start and round
+        max_rounds: Maximum number of rounds
+        stagnation_tol: Minimum relative cost improvement per round
+        prune_ratio: Terminate starts worse than this multiple of the best cost (None = never)
+        prune_after: Rounds before prune_ratio applies
+        leaderboard_size: Number of best starts to keep
+        checkpoint: .npz file to save after every round and resume from (None = off)
+    """
+
+    def __init__(self, problem: DipoleFitProblem, n_starts: int = 32,
+                 sampler: str = 'sobol', seed: Optional[int] = 0,
+                 workers: int = -1, round_iters: int = 50, max_rounds: int = 20,
+                 stagnation_tol: float = 1e-4, prune_ratio: Optional[float] = 10.0,
+                 prune_after: int = 2,
+                 leaderboard_size: int = 10,
+                 checkpoint: Optional[Union[str, Path]] = None):
+        if sampler not in ('sobol', 'lhs'):
+            raise ValueError(f"Unknown sampler {sampler!r} (expected 'sobol' or 'lhs')")
+        self.problem = problem
+        self.n_starts = n_starts
+        self.sampler = sampler
+        self.seed = seed
+        self.workers = (os.cpu_count() or 1) if workers == -1 else workers
+        self.round_iters = round_iters
+        self.max_rounds = max_rounds
+        self.stagnation_tol = stagnation_tol
+        self.prune_ratio = prune_ratio
+        self.prune_after = prune_after
+        self.leaderboard_size = leaderboard_size
+        self.checkpoint = Path(checkpoint) if checkpoint is not None else None
+
+    def initial_starts(self) -> np.ndarray:
+        """Start vectors, shape (n_starts, P): the spec initial vector, then sampler points."""
+        lower, upper = self.problem.spec.bound_arrays()
+        if not (np.all(np.isfinite(lower)) and np.all(np.isfinite(upper))):
+            raise ValueError("Multi-start sampling needs finite bounds on every free parameter")
+        d = len(lower)
+        if self.sampler == 'sobol':
+            engine = qmc.Sobol(d, scramble=True, seed=self.seed)
+        else:
+            engine = qmc.LatinHypercube(d, seed=self.seed)
+        n = max(self.n_starts - 1, 1)
+        if self.sampler == 'sobol':
+            # Sobol balance properties need a power-of-two draw
+            unit = engine.random_base2(int(np.ceil(np.log2(n))))[:n]
+        else:
+            unit = engine.random(n)
+        samples = qmc.scale(unit, lower, upper)
+        starts = np.vstack([self.problem.spec.initial()[None], samples])[:self.n_starts]
+        return np.clip(starts, lower, upper)
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> Optional[Dict[str, np.ndarray]]:
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return None
+        try:
+            with np.load(self.checkpoint) as data:
+                state = {name: data[name] for name in data.files}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint {self.checkpoint}: {e}")
+            return None
+        if (str(state.get('fingerprint')) != self.fingerprint()
+                or state['starts'].shape != (self.n_starts, self.problem.spec.size)):
+            print(f"Warning: Checkpoint {self.checkpoint} is for a different problem, starting over")
+            return None
+        return state
+
+    def fingerprint(self) -> str:
+        """Key of the problem data, parameter layout, bounds and starts that a checkpoint must match."""
+        problem = self.problem
+        spec = problem.spec
+        h = hashlib.sha1()
+        h.update(repr((problem.states.shape, spec.size, spec.layout,
+                       [(name, block.shape, block.fixed) for name, block in spec.blocks.items()])).encode())
+        for a in (problem.states, problem.observed, problem.weights, problem.polarity,
+                  *problem.spec.bound_arrays(), problem.spec.initial()):
+            h.update(np.ascontiguousarray(a, dtype=np.float64).tobytes())
+        h.update(repr((problem.regularization, problem.penalty_weight, problem.max_travel,
+                       problem.min_distance, self.n_starts, self.sampler, self.seed)).encode())
+        return h.hexdigest()[:16]
+
+    def _save_checkpoint(self, state: Dict[str, np.ndarray]):
+        if self.checkpoint is None:
+            return
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint.with_name(self.checkpoint.name + f'.tmp{os.getpid()}')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **state)
+        os.replace(tmp, self.checkpoint)
+
+    # ------------------------------------------------------------------
+    # Driver
+    # ------------------------------------------------------------------
+
+    def _leaderboard(self, costs: np.ndarray) -> List[Tuple[int, float]]:
+        order = np.argsort(costs)[:self.leaderboard_size]
+        return [(int(i), float(costs[i])) for i in order if np.isfinite(costs[i])]
+
+    def _advance(self, pool, state: Dict[str, np.ndarray]):
+        """Run one round for every active start and update status in place."""
+        active = np.flatnonzero(state['status'] == ACTIVE)
+        tasks = [(int(i), state['starts'][i], self.round_iters) for i in active]
+        results = pool.imap_unordered(_run_start, tasks) if pool is not None else map(_run_start, tasks)
+
+        previous = state['costs'].copy()
+        for index, x, cost, converged, nfev in results:
+            state['starts'][index] = x
+            state['costs'][index] = cost
+            state['nfev'][index] += nfev
+            if converged:
+                state['status'][index] = CONVERGED
+            elif np.isfinite(previous[index]) and \
+                    previous[index] - cost <= self.stagnation_tol * abs(previous[index]):
+                state['status'][index] = STAGNANT
+
+        state['round'] += 1
+        if self.prune_ratio is not None and state['round'] >= self.prune_after:
+            best = np.min(state['costs'])
+            behind = state['costs'] > self.prune_ratio * max(best, 1e-12)
+            state['status'][(state['status'] == ACTIVE) & behind] = PRUNED
+
+    def run(self, verbose: bool = True) -> MultiStartResult:
+        """
+        Run (or resume) the multi-start optimization.
+
+        Returns:
+            MultiStartResult with the best solution and the leaderboard
+        """
+        t0 = time.time()
+        state = self._load_checkpoint()
+        if state is not None:
+            if verbose:
+                print(f"Resuming from {self.checkpoint} (round {int(state['round'])})")
+                if state['round'] >= self.max_rounds or not np.any(state['status'] == ACTIVE):
+                    print("Checkpoint run is already complete; returning its result")
+        else:
+            state = {
+                'starts': self.initial_starts(),
+                'costs': np.full(self.n_starts, np.inf),
+                'status': np.full(self.n_starts, ACTIVE, dtype=np.int8),
+                'nfev': np.zeros(self.n_starts, dtype=np.int64),
+                'round': np.array(0),
+                'fingerprint': np.array(self.fingerprint()),
+            }
+
+        problem = self.problem
+        pool = shm = None
+        if self.workers > 1:
+            import multiprocessing as mp
+            from multiprocessing import shared_memory
+
+            data = [problem.states, problem.observed, problem.weights]
+            shm = shared_memory.SharedMemory(create=True, size=max(sum(a.nbytes for a in data), 1))
+            offset = 0
+            for a in data:
+                np.ndarray(a.shape, dtype=np.float64, buffer=shm.buf, offset=offset)[...] = a
+                offset += a.nbytes
+            pool = mp.Pool(self.workers, initializer=_init_worker,
+                           initargs=(_problem_recipe(problem, shm),))
+        else:
+            _WORKER['problem'] = problem
+
+        try:
+            while state['round'] < self.max_rounds and np.any(state['status'] == ACTIVE):
+                self._advance(pool, state)
+                self._save_checkpoint(state)
+                if verbose:
+                    counts = {name: int(np.sum(state['status'] == code))
+                              for code, name in STATUS_NAMES.items()}
+                    best = self._leaderboard(state['costs'])[0]
+                    print(f"Round {int(state['round'])}: best {best[1]:.6g} (start {best[0]}), "
+                          + ", ".join(f"{n} {c}" for n, c in counts.items()))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            _WORKER.clear()
+
+        leaderboard = self._leaderboard(state['costs'])
+        best_index = leaderboard[0][0]
+        x = state['starts'][best_index].copy()
+        return MultiStartResult(
+            x=x,
+            params=problem.spec.unpack(x),
+            cost=leaderboard[0][1],
+            leaderboard=leaderboard,
+            starts=state['starts'],
+            costs=state['costs'],
+            status=state['status'],
+            rounds=int(state['round']),
+            nfev=int(state['nfev'].sum()),
+            elapsed=time.time() - t0,
+        )
@@ -0,0 +1,331 @@
+"""
+SIMCAP Session Arrays
+
+Typed, unit-normalized sensor arrays for recorded sessions, shared by the
+physics validation and analysis scripts so they spend their time on physics
+rather than on JSON parsing and unit fallbacks.
+
+Every session is exposed as one SessionArrays record:
+
+    mag_ut        (N, 3) float64  magnetometer, µT (mx_ut..., else mx... LSB converted)
+    accel_g       (N, 3) float64  accelerometer, g (ax_g..., else ax... LSB converted)
+    gyro_dps      (N, 3) float64  gyroscope, deg/s (gx_dps..., else gx... LSB converted)
+    orientation   (N, 4) float64  quaternion [w, x, y, z]
+    label_codes   (N,)   int16    finger-state code per sample (see states_to_code)
+
+Values missing from a sample are NaN (unlabeled samples have code -1). The
+arrays are derived once per session file and stored next to its columns in
+the session cache (see ml.session_cache), so warm loads are memory-mapped and
+only the pages that are actually touched are read.
+
+Usage:
+    from ml.session_arrays import iter_session_arrays, load_session_arrays, combo_residuals
+
+    for session in iter_session_arrays('data/GAMBIT'):
+        print(session.filename, session.mag_ut.shape)
+    residuals = combo_residuals(load_session_arrays(path))   # {'eefff': (mean, std)}
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .data_loader import find_session_files, load_session_columns
+from .sensor_units import ACCEL_SPEC, GYRO_SPEC, MAG_SCALE_LSB_TO_UT
+from .session_cache import SessionCache
+
+ARRAYS_VERSION = 1
+ARRAYS_NAME = f'session-arrays-v{ARRAYS_VERSION}'
+LABEL_CODES_NAME = f'label-codes-v{ARRAYS_VERSION}'
+
+FINGERS = ['thumb', 'index', 'middle', 'ring', 'pinky']
+FINGER_STATE_VALUES = {'extended': 0, 'partial': 1, 'flexed': 2}
+UNLABELED = -1
+
+# (converted fields, raw LSB fields, LSB -> unit factor) per sensor block,
+# in the column order of the cached array
+_UNIT_BLOCKS = [
+    (['mx_ut', 'my_ut', 'mz_ut'], ['mx', 'my', 'mz'], MAG_SCALE_LSB_TO_UT),
+    (['ax_g', 'ay_g', 'az_g'], ['ax', 'ay', 'az'], ACCEL_SPEC['conversion_factor']),
+    (['gx_dps', 'gy_dps', 'gz_dps'], ['gx', 'gy', 'gz'], GYRO_SPEC['conversion_factor']),
+    (['orientation_w', 'orientation_x', 'orientation_y', 'orientation_z'], None, None),
+]
+
+
+# ----------------------------------------------------------------------
+# Finger-state codes
+# ----------------------------------------------------------------------
+
+def finger_states(fingers: Dict[str, Any]) -> Tuple[int, ...]:
+    """Finger state dict -> per-finger values (0 extended, 1 partial, 2 flexed, -1 unknown)."""
+    return tuple(FINGER_STATE_VALUES.get(fingers.get(f), UNLABELED) for f in FINGERS)
+
+
+def states_to_code(states: Sequence[int]) -> int:
+    """
+    Per-finger states -> base-3 code (thumb most significant, 0..242).
+
+    Same encoding as the 'fingers_binary' label column of the data loader;
+    -1 if any finger is unknown.
+    """
+    if any(s < 0 for s in states):
+        return UNLABELED
+    code = 0
+    for s in states:
+        code = code * 3 + int(s)
+    return code
+
+
+def code_to_states(code: int) -> Tuple[int, ...]:
+    """Base-3 code -> per-finger states (all -1 for an unlabeled code)."""
+    if code < 0:
+        return (UNLABELED,) * len(FINGERS)
+    states = []
+    for _ in FINGERS:
+        code, s = divmod(int(code), 3)
+        states.append(s)
+    return tuple(reversed(states))
+
+
+def combo_string(states: Sequence[int], symbols: str = 'e?f', unknown: str = '?') -> str:
+    """
+    Per-finger states -> combo string such as 'eefff'.
+
+    Args:
+        states: Per-finger values from finger_states / code_to_states
+        symbols: Characters for extended, partial and flexed
+        unknown: Character for unknown fingers
+    """
+    return ''.join(symbols[s] if 0 <= s < len(symbols) else unknown for s in states)
+
+
+def label_segment(label: Dict[str, Any]) -> Tuple[int, int, Dict[str, Any]]:
+    """
+    (start, end, fingers) of a session label in either label format.
+
+    V2.1 labels nest fingers under 'labels' with start_sample/end_sample;
+    older labels carry 'fingers' with startIndex/endIndex.
+    """
+    if isinstance(label.get('labels'), dict):
+        return (label.get('start_sample', 0), label.get('end_sample', 0),
+                label['labels'].get('fingers') or {})
+    return (label.get('startIndex', 0), label.get('endIndex', 0),
+            label.get('fingers') or {})
+
+
+def label_codes(num_samples: int, labels: Optional[List[Dict]]) -> np.ndarray:
+    """Per-sample finger-state codes from session labels (later labels win), int16."""
+    codes = np.full(num_samples, UNLABELED, dtype=np.int16)
+    for label in labels or []:
+        start, end, fingers = label_segment(label)
+        codes[start:end] = states_to_code(finger_states(fingers))
+    return codes
+
+
+# ----------------------------------------------------------------------
+# Unit-normalized arrays
+# ----------------------------------------------------------------------
+
+def _field_block(names: List[str], columns: np.ndarray, keys: List[str]) -> np.ndarray:
+    block = np.full((len(columns), len(keys)), np.nan)
+    for k, key in enumerate(keys):
+        if key in names:
+            block[:, k] = columns[:, names.index(key)]
+    return block
+
+
+def unit_arrays(names: List[str], columns: np.ndarray) -> np.ndarray:
+    """
+    Unit-normalized sensor block from columnar session data.
+
+    Converted fields (mx_ut, ax_g, gx_dps) are used where present; otherwise
+    the raw LSB fields are converted with the sensor_units factors.
+
+    Args:
+        names, columns: Columnar session data (see session_cache.samples_to_columns)
+
+    Returns:
+        float64 array of shape (N, 13), Fortran order: mag µT (3), accel g (3),
+        gyro deg/s (3), orientation quaternion w, x, y, z (4)
+    """
+    out = np.empty((len(columns), 13), dtype=np.float64, order='F')
+    col = 0
+    for converted, raw, factor in _UNIT_BLOCKS:
+        block = _field_block(names, columns, converted)
+        if raw is not None:
+            block = np.where(np.isnan(block), _field_block(names, columns, raw) * factor, block)
+        out[:, col:col + block.shape[1]] = block
+        col += block.shape[1]
+    return out
+
+
+@dataclass
+class SessionArrays:
+    """Unit-normalized sensor arrays and labels of one session."""
+    path: Path
+    mag_ut: np.ndarray            # (N, 3) µT
+    accel_g: np.ndarray           # (N, 3) g
+    gyro_dps: np.ndarray          # (N, 3) deg/s
+    orientation: np.ndarray       # (N, 4) quaternion [w, x, y, z]
+    label_codes: np.ndarray       # (N,) int16, -1 = unlabeled
+    version: str = '1.0'
+    timestamp: Optional[str] = None
+    labels: Optional[List[Dict]] = None
+    metadata: Optional[Dict] = None
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.mag_ut)
+
+    @property
+    def mag_valid(self) -> np.ndarray:
+        """Samples with a magnetometer reading."""
+        return ~np.isnan(self.mag_ut).any(axis=1)
+
+    @property
+    def magnitudes(self) -> np.ndarray:
+        return np.linalg.norm(self.mag_ut, axis=1)
+
+    def segments(self) -> List[Tuple[int, int, Tuple[int, ...]]]:
+        """Labeled segments as (start, end, per-finger states), clipped to the session."""
+        n = self.n_samples
+        result = []
+        for label in self.labels or []:
+            start, end, fingers = label_segment(label)
+            result.append((min(start, n), min(end, n), finger_states(fingers)))
+        return result
+
+
+def load_session_arrays(path: Union[str, Path], use_cache: bool = True,
+                        mmap: bool = True) -> SessionArrays:
+    """
+    Load one session as unit-normalized arrays.
+
+    Args:
+        path: Session file (.json or .session.npz)
+        use_cache: Read/write the derived arrays in the session cache
+        mmap: Memory-map cached arrays instead of reading them into memory
+
+    Returns:
+        SessionArrays for the session
+    """
+    path = Path(path)
+    cache = SessionCache.for_data_dir(path.parent) if use_cache else None
+
+    header = cache.load_header(path) if cache is not None else None
+    arrays = codes = None
+    if header is not None:
+        arrays = cache.load_array(path, ARRAYS_NAME, mmap=mmap)
+        codes = cache.load_array(path, LABEL_CODES_NAME, mmap=mmap)
+
+    if arrays is None or codes is None:
+        info, names, columns = load_session_columns(path, cache)
+        header = {'version': info.version, 'timestamp': info.timestamp,
+                  'labels': info.labels, 'metadata': info.metadata}
+        arrays = unit_arrays(names, columns)
+        codes = label_codes(len(arrays), info.labels)
+        if cache is not None:
+            try:
+                cache.store_array(path, ARRAYS_NAME, arrays)
+                cache.store_array(path, LABEL_CODES_NAME, codes)
+            except OSError as e:
+                print(f"Warning: Failed to write session cache: {e}")
+
+    return SessionArrays(
+        path=path,
+        mag_ut=arrays[:, 0:3],
+        accel_g=arrays[:, 3:6],
+        gyro_dps=arrays[:, 6:9],
+        orientation=arrays[:, 9:13],
+        label_codes=codes,
+        version=header.get('version') or '1.0',
+        timestamp=header.get('timestamp') or path.stem,
+        labels=header.get('labels'),
+        metadata=header.get('metadata'),
+    )
+
+
+def iter_session_arrays(data_dir: Union[str, Path] = 'data/GAMBIT',
+                        min_samples: int = 0, use_cache: bool = True,
+                        mmap: bool = True) -> Iterator[SessionArrays]:
+    """
+    Lazily load every session in a directory (see data_loader.find_session_files).
+
+    Sessions that fail to load are reported and skipped.
+
+    Args:
+        data_dir: Session directory
+        min_samples: Skip sessions with fewer magnetometer samples than this
+        use_cache, mmap: As for load_session_arrays
+
+    Yields:
+        SessionArrays, in filename order
+    """
+    for path in find_session_files(Path(data_dir)):
+        try:
+            session = load_session_arrays(path, use_cache=use_cache, mmap=mmap)
+        except Exception as e:
+            print(f"Error loading {path.name}: {e}")
+            continue
+        if min_samples and np.count_nonzero(session.mag_valid) < min_samples:
+            continue
+        yield session
+
+
+def combo_samples(session: SessionArrays, min_segment: int = 0,
+                  symbols: str = 'e?f') -> Dict[str, np.ndarray]:
+    """
+    Magnetometer samples grouped by the finger combo of their label segment.
+
+    Segments shorter than min_segment samples or with all fingers unknown
+    are skipped, as are samples without a magnetometer reading.
+
+    Args:
+        session: Session to group
+        min_segment: Minimum segment length in samples
+        symbols: Combo characters for extended, partial and flexed (see combo_string)
+
+    Returns:
+        Dict mapping combo string (e.g. 'eefff') to samples (M, 3) in µT
+    """
+    mag = np.asarray(session.mag_ut)
+    combos: Dict[str, List[np.ndarray]] = {}
+    for start, end, states in session.segments():
+        if all(s == UNLABELED for s in states) or end - start < min_segment:
+            continue
+        segment = mag[start:end]
+        combos.setdefault(combo_string(states, symbols), []).append(
+            segment[~np.isnan(segment).any(axis=1)])
+    return {combo: np.concatenate(parts) for combo, parts in combos.items()}
+
+
+def combo_residuals(session: SessionArrays, baseline: str = 'eeeee',
+                    min_segment: int = 5, symbols: str = 'e?f'
+                    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Mean and std of the magnetometer residual (vs. the baseline combo) per finger combo.
+
+    Args:
+        session: Session to summarize
+        baseline: Combo whose mean field is subtracted
+        min_segment, symbols: As for combo_samples
+
+    Returns:
+        Dict mapping combo string to (mean (3,), std (3,)) in µT
+
+    Raises:
+        ValueError: If the session has no baseline segment with magnetometer samples
+    """
+    samples = combo_samples(session, min_segment, symbols)
+    if baseline not in samples or len(samples[baseline]) == 0:
+        raise ValueError(f"{session.filename}: no '{baseline}' baseline segment "
+                         f"(of at least {min_segment} samples with magnetometer data)")
+    reference = samples[baseline].mean(axis=0)
+    return {combo: ((mags - reference).mean(axis=0), (mags - reference).std(axis=0))
+            for combo, mags in samples.items()}
@@ -0,0 +1,319 @@
+"""
+SIMCAP Session Cache
+
+Persistent columnar cache for parsed session files, so repeat loads
+memory-map NumPy arrays instead of re-parsing session JSON.
+
+Each session gets one entry directory under ``<data_dir>/.cache/sessions/``:
+
+    <stem>-<source_key>/
+        header.json           # version, timestamp, labels, metadata, columns
+        columns.npy           # (N, C) float64, Fortran order (one column per field;
+                              #   omitted for compact .session.npz sources)
+        features-<key>.npy    # (N, 9) float32 processed IMU features
+        stats-<key>.npz       # per-feature count/mean/M2/min/max of those features
+        <name>.npy            # other derived per-session arrays (see load_array),
+                              #   e.g. the unit-normalized ml.session_arrays
+
+The source key is derived from the resolved file path, mtime and size, so an
+edited or replaced session file invalidates its entry automatically. Processed
+feature arrays are additionally keyed by calibration file hash and
+calibration/filter settings (see ``processing_key``).
+
+Cached arrays are memory-mapped copy-on-write (``mmap_mode='c'``): like a
+freshly parsed array they can be modified in place, and the changes never
+reach the cache files.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+CACHE_VERSION = 1
+CACHE_DIRNAME = '.cache'
+
+
+def file_sha1(path: Path) -> str:
+    """SHA-1 hex digest of a file's contents."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_key(json_path: Path) -> str:
+    """Cache key for a session file: resolved path, mtime and size."""
+    st = json_path.stat()
+    ident = f"{json_path.resolve()}|{st.st_mtime_ns}|{st.st_size}|v{CACHE_VERSION}"
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]
+
+
+def processing_key(calibration_path: Optional[Path],
+                   apply_calibration: bool,
+                   apply_filtering: bool,
+                   filter_params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key for processed features.
+
+    Args:
+        calibration_path: Calibration file actually applied (None if none found)
+        apply_calibration: Whether calibration was requested
+        apply_filtering: Whether Kalman filtering was requested
+        filter_params: Filter settings (noise, dt, ...) that affect the output
+
+    Returns:
+        Short hex key
+    """
+    ident = {
+        'calibration': file_sha1(calibration_path) if calibration_path else None,
+        'apply_calibration': bool(apply_calibration),
+        'apply_filtering': bool(apply_filtering),
+        'filter_params': filter_params or {},
+    }
+    blob = json.dumps(ident, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(blob).hexdigest()[:16]
+
+
+def samples_to_columns(samples: List[Dict]) -> Tuple[List[str], np.ndarray]:
+    """
+    Convert a list of sample dicts to a columnar float64 array.
+
+    Every numeric (non-bool) top-level field becomes a column. Samples missing
+    a field get NaN in that column.
+
+    Returns:
+        Tuple of (column_names, array of shape (N, C) in Fortran order)
+    """
+    names: List[str] = []
+    seen = set()
+    for sample in samples:
+        for key, value in sample.items():
+            if key in seen:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                seen.add(key)
+                names.append(key)
+
+    columns = np.full((len(samples), len(names)), np.nan, dtype=np.float64, order='F')
+    for j, name in enumerate(names):
+        col = columns[:, j]
+        for i, sample in enumerate(samples):
+            value = sample.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                col[i] = value
+    return names, columns
+
+
+def _save_npy_atomic(path: Path, array: np.ndarray):
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _save_json_atomic(path: Path, data: Dict):
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class SessionCache:
+    """
+    On-disk columnar cache of session files.
+
+    Usage:
+        cache = SessionCache.for_data_dir(Path('data/GAMBIT'))
+        header = cache.load_header(json_path)       # None on miss
+        names, cols = cache.load_columns(json_path)  # memory-mapped
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @classmethod
+    def for_data_dir(cls, data_dir: Path) -> 'SessionCache':
+        """Default cache location for a data directory."""
+        return cls(Path(data_dir) / CACHE_DIRNAME / 'sessions')
+
+    def entry_dir(self, json_path: Path) -> Path:
+        """Entry directory for the current version of a session file."""
+        return self.cache_dir / f"{json_path.stem}-{source_key(json_path)}"
+
+    def _valid_entry(self, json_path: Path) -> Optional[Path]:
+        try:
+            entry = self.entry_dir(json_path)
+        except OSError:
+            return None
+        if (entry / 'header.json').exists():
+            return entry
+        return None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load_header(self, json_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Load cached header fields without touching sample data.
+
+        Returns:
+            Dict with version, timestamp, labels, metadata, sample_count and
+            columns, or None on cache miss
+        """
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return None
+        try:
+            with open(entry / 'header.json', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_columns(self, json_path: Path,
+                     mmap: bool = True) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Load the cached numeric sample columns.
+
+        Returns:
+            Tuple of (column_names, array of shape (N, C)), or None on miss
+        """
+        header = self.load_header(json_path)
+        if header is None:
+            return None
+        path = self.entry_dir(json_path) / 'columns.npy'
+        if not path.exists():
+            return None
+        try:
+            array = np.load(path, mmap_mode='c' if mmap else None)
+        except (OSError, ValueError):
+            return None
+        return header['columns'], array
+
+    def load_features(self, json_path: Path, key: str,
+                      mmap: bool = True) -> Optional[np.ndarray]:
+        """Load cached processed features for a processing key, or None."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return None
+        path = entry / f'features-{key}.npy'
+        if not path.exists():
+            return None
+        try:
+            return np.load(path, mmap_mode='c' if mmap else None)
+        except (OSError, ValueError):
+            return None
+
+    def load_array(self, json_path: Path, name: str,
+                   mmap: bool = True) -> Optional[np.ndarray]:
+        """Load a derived array stored with store_array, or None."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return None
+        path = entry / f'{name}.npy'
+        if not path.exists():
+            return None
+        try:
+            return np.load(path, mmap_mode='c' if mmap else None)
+        except (OSError, ValueError):
+            return None
+
+    def load_stats(self, json_path: Path, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load cached per-session feature statistics for a processing key, or None."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return None
+        path = entry / f'stats-{key}.npz'
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def store(self, json_path: Path, names: List[str], columns: np.ndarray,
+              version: str, timestamp: Optional[str] = None,
+              labels: Optional[List[Dict]] = None,
+              metadata: Optional[Dict] = None,
+              write_columns: bool = True) -> Path:
+        """
+        Write header and columns for a session, replacing stale entries.
+
+        Args:
+            json_path: Source session file
+            names, columns: Output of samples_to_columns
+            version, timestamp, labels, metadata: Session header fields
+            write_columns: Also write columns.npy (False for sources that are
+                           already columnar, such as compact .session.npz files)
+
+        Returns:
+            Path of the entry directory
+        """
+        entry = self.entry_dir(json_path)
+        entry.mkdir(parents=True, exist_ok=True)
+        self._remove_stale(json_path, keep=entry)
+
+        if write_columns:
+            _save_npy_atomic(entry / 'columns.npy', columns)
+        _save_json_atomic(entry / 'header.json', {
+            'cache_version': CACHE_VERSION,
+            'source': str(json_path.resolve()),
+            'version': version,
+            'timestamp': timestamp,
+            'labels': labels,
+            'metadata': metadata,
+            'sample_count': len(columns),
+            'columns': names,
+        })
+        return entry
+
+    def store_features(self, json_path: Path, key: str, features: np.ndarray):
+        """Write processed features for an existing entry."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return
+        _save_npy_atomic(entry / f'features-{key}.npy',
+                         np.ascontiguousarray(features, dtype=np.float32))
+
+    def store_array(self, json_path: Path, name: str, array: np.ndarray):
+        """Write a derived array (kept as-is, including memory order) for an existing entry."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return
+        _save_npy_atomic(entry / f'{name}.npy', array)
+
+    def store_stats(self, json_path: Path, key: str, stats: Dict[str, np.ndarray]):
+        """Write per-session feature statistics for an existing entry."""
+        entry = self._valid_entry(json_path)
+        if entry is None:
+            return
+        path = entry / f'stats-{key}.npz'
+        tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **stats)
+        os.replace(tmp, path)
+
+    def _remove_stale(self, json_path: Path, keep: Path):
+        """Remove entries left behind by earlier versions of the same file."""
+        prefix = f"{json_path.stem}-"
+        for candidate in self.cache_dir.glob(f"{json_path.stem}-*"):
+            suffix = candidate.name[len(prefix):]
+            is_key = len(suffix) == 16 and all(c in '0123456789abcdef' for c in suffix)
+            if candidate == keep or not candidate.is_dir() or not is_key:
+                continue
+            shutil.rmtree(candidate, ignore_errors=True)
+
+    def clear(self):
+        """Remove the entire cache directory."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,122 @@
+"""
+SIMCAP Session Index
+
+Persistent per-directory index of session metadata, so dataset queries
+(firmware versions, session types, custom labels, splits, ...) are answered
+without opening session files.
+
+The index lives at ``<data_dir>/.cache/session_index.json`` and holds one row
+per session file:
+
+    {
+      "index_version": 1,
+      "sessions": {
+        "<filename>": {
+          "signature": {"mtime_ns": ..., "size": ..., "meta_mtime_ns": ...},
+          ...row fields built by the caller...
+        }
+      }
+    }
+
+Rows are rebuilt only for files whose signature (session file mtime/size and
+the mtime of a sibling .meta.json) changed since the last refresh; rows of
+deleted files are dropped.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .session_cache import CACHE_DIRNAME
+
+INDEX_VERSION = 1
+INDEX_FILENAME = 'session_index.json'
+
+
+def file_signature(json_path: Path) -> Dict[str, Optional[int]]:
+    """Change signature of a session file and its legacy .meta.json sidecar."""
+    st = json_path.stat()
+    meta_path = json_path.with_suffix('.meta.json')
+    meta_mtime = meta_path.stat().st_mtime_ns if meta_path.exists() else None
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'meta_mtime_ns': meta_mtime}
+
+
+class SessionIndex:
+    """
+    JSON index of session metadata, refreshed incrementally by mtime.
+
+    Usage:
+        index = SessionIndex(Path('data/GAMBIT'))
+        rows = index.refresh(paths, build_row)   # one dict per path, in order
+    """
+
+    def __init__(self, data_dir: Path, index_path: Optional[Path] = None):
+        self.data_dir = Path(data_dir)
+        self.index_path = Path(index_path) if index_path else self.data_dir / CACHE_DIRNAME / INDEX_FILENAME
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Rows keyed by filename ({} if the index is missing or outdated)."""
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('index_version') != INDEX_VERSION:
+            return {}
+        return data.get('sessions', {})
+
+    def save(self, rows: Dict[str, Dict[str, Any]]):
+        """Write the index atomically."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + f'.tmp{os.getpid()}')
+        with open(tmp, 'w') as f:
+            json.dump({'index_version': INDEX_VERSION, 'sessions': rows}, f)
+        os.replace(tmp, self.index_path)
+
+    def refresh(self, json_paths: List[Path],
+                build_row: Callable[[Path], Dict[str, Any]],
+                map_fn: Optional[Callable[[Callable, List[Path]], List[Dict[str, Any]]]] = None
+                ) -> List[Dict[str, Any]]:
+        """
+        Bring the index up to date for a set of session files.
+
+        Args:
+            json_paths: Session files currently in the directory
+            build_row: Builds the row for one file (must be JSON-serializable)
+            map_fn: Optional ``map_fn(build_row, paths)`` used to build stale
+                    rows, e.g. in a process pool. Must preserve order.
+
+        Returns:
+            Rows in the same order as json_paths
+        """
+        json_paths = [Path(p) for p in json_paths]
+        rows = self.load()
+
+        signatures = {p.name: file_signature(p) for p in json_paths}
+        stale = [p for p in json_paths
+                 if rows.get(p.name, {}).get('signature') != signatures[p.name]]
+        removed = set(rows) - set(signatures)
+
+        if stale:
+            built = map_fn(build_row, stale) if map_fn else [build_row(p) for p in stale]
+            for json_path, row in zip(stale, built):
+                row['signature'] = signatures[json_path.name]
+                rows[json_path.name] = row
+        for name in removed:
+            del rows[name]
+
+        if stale or removed:
+            try:
+                self.save(rows)
+            except OSError as e:
+                print(f"Warning: Failed to write session index: {e}")
+
+        return [rows[p.name] for p in json_paths]
+
+    def clear(self):
+        """Delete the index file."""
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,320 @@
+"""
+SIMCAP Compact Session Format
+
+Columnar alternative to session JSON for large (mostly synthetic) corpora:
+one ``.session.npz`` file per session, holding one array per sample field and
+a small JSON header with the version, timestamp, labels and metadata.
+
+    <name>.session.npz
+        __header__                    # uint8 JSON: version, labels, metadata, field layout
+        ax, ay, ..., mx_ut, ...       # (N,) one array per numeric/bool field
+        _ground_truth.finger_states.* # string fields as integer codes (values in header)
+        _ground_truth.true_field      # (N, 3) nested fields flattened with '.'
+
+Fields that hold the same value in every sample (``dt``, ``mag_cal_*``) are
+stored once in the header, and fields identical to an earlier field (e.g.
+``filtered_mx`` == ``mx_ut`` in simulation) are stored as aliases, so the file
+is close to the size of the numeric payload. The data loaders read these
+files transparently alongside JSON (see data_loader.find_session_files).
+
+Usage:
+    from ml.session_npz import write_compact_session, read_compact_columns
+
+    write_compact_session(Path('synthetic_0000.session.npz'), session)
+    header, names, columns = read_compact_columns(path)   # as samples_to_columns
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+COMPACT_SUFFIX = '.session.npz'
+FORMAT_VERSION = 1
+HEADER_KEY = '__header__'
+
+_MISSING = object()
+
+
+def is_compact_session(path: Union[str, Path]) -> bool:
+    """True if path names a compact (.session.npz) session file."""
+    return str(path).endswith(COMPACT_SUFFIX)
+
+
+def sample_count(samples: Union[List[Dict], Dict[str, Any]]) -> int:
+    """Number of samples in a list of sample dicts or a dict of per-field arrays."""
+    if isinstance(samples, dict):
+        return max((len(v) for v in samples.values()
+                    if isinstance(v, (list, np.ndarray)) and np.ndim(v) > 0), default=0)
+    return len(samples)
+
+
+# ----------------------------------------------------------------------
+# Samples <-> fields
+# ----------------------------------------------------------------------
+
+def _flatten(sample: Dict, prefix: str, out: Dict[str, Any]):
+    for key, value in sample.items():
+        name = prefix + key
+        if isinstance(value, dict) and value:
+            _flatten(value, name + '.', out)
+        else:
+            out[name] = value
+
+
+def samples_to_fields(samples: List[Dict]) -> Dict[str, Any]:
+    """
+    Convert sample dicts to one value list per (flattened) field.
+
+    Nested dicts become dotted field names; field order is first-seen order.
+    Samples without a field get a placeholder that write_compact_session
+    stores as NaN (numeric fields) and read_compact_samples omits again;
+    None in an otherwise numeric field is treated the same way.
+    """
+    flat = []
+    names: Dict[str, None] = {}
+    for sample in samples:
+        row: Dict[str, Any] = {}
+        _flatten(sample, '', row)
+        flat.append(row)
+        for name in row:
+            names.setdefault(name)
+    return {name: [row.get(name, _MISSING) for row in flat] for name in names}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _downcast(array: np.ndarray) -> np.ndarray:
+    """Smallest integer dtype that holds an integer array exactly."""
+    if array.dtype.kind not in 'iu' or not array.size:
+        return array
+    return array.astype(np.result_type(np.min_scalar_type(array.min()),
+                                       np.min_scalar_type(array.max())))
+
+
+def _encode_field(values: Any, num_samples: int) -> Tuple[str, Any]:
+    """
+    Pick the storage for one field.
+
+    Returns:
+        ('constant', value), ('array', ndarray), ('sparse', float ndarray with
+        NaN for missing values) or ('json', list) for irregular fields
+    """
+    if not isinstance(values, (list, np.ndarray)) or (
+            isinstance(values, np.ndarray) and values.ndim == 0):
+        return 'constant', values.item() if isinstance(values, np.ndarray) else values
+
+    if isinstance(values, np.ndarray):
+        if values.ndim == 1 and len(values) and values.dtype != object and (values == values[0]).all():
+            return 'constant', values[0].item()
+        return 'array', _downcast(values)
+
+    if not values:
+        return 'array', np.array([])
+    first = values[0]
+    if first is not _MISSING and not isinstance(first, list):
+        if all(v is first or (type(v) is type(first) and v == first) for v in values):
+            return 'constant', first
+
+    if all(_is_number(v) for v in values):
+        return 'array', _downcast(np.array(values))
+    if all(isinstance(v, bool) for v in values):
+        return 'array', np.array(values, dtype=bool)
+    if all(isinstance(v, str) for v in values):
+        return 'array', np.array(values)
+    if all(_is_number(v) or v is None or v is _MISSING for v in values):
+        return 'sparse', np.array([v if _is_number(v) else np.nan for v in values],
+                                  dtype=np.float64)
+    if all(isinstance(v, list) for v in values):
+        try:
+            array = np.array(values)
+            if array.dtype.kind in 'biuf' and array.shape[0] == num_samples:
+                return 'array', array
+        except ValueError:
+            pass
+    return 'json', [None if v is _MISSING else v for v in values]
+
+
+def write_compact_session(path: Union[str, Path], session: Dict):
+    """
+    Write a session in the compact format (atomically).
+
+    Args:
+        path: Output path, normally ending in '.session.npz'
+        session: v2.x session dict. 'samples' is either a list of sample dicts
+                 or a dict of per-field arrays/constants (dotted names for
+                 nested fields), e.g. MagneticFieldSimulator.session_fields()
+    """
+    path = Path(path)
+    samples = session.get('samples', [])
+    fields = samples if isinstance(samples, dict) else samples_to_fields(samples)
+    num_samples = sample_count(samples)
+
+    header: Dict[str, Any] = {
+        'format_version': FORMAT_VERSION,
+        'version': session.get('version', '2.1'),
+        'timestamp': session.get('timestamp'),
+        'labels': session.get('labels'),
+        'metadata': session.get('metadata'),
+        'sample_count': num_samples,
+        'fields': list(fields),
+        'constants': {},
+        'aliases': {},
+        'sparse': [],
+        'categories': {},
+        'json_fields': {},
+        'json_missing': {},
+    }
+
+    arrays: Dict[str, np.ndarray] = {}
+    originals: Dict[str, np.ndarray] = {}  # Before categorical encoding, for alias checks
+    for name, values in fields.items():
+        kind, value = _encode_field(values, num_samples)
+        if kind == 'constant':
+            header['constants'][name] = value
+        elif kind == 'json':
+            header['json_fields'][name] = value
+            missing = [i for i, v in enumerate(values) if v is _MISSING] if isinstance(values, list) else []
+            if missing:
+                header['json_missing'][name] = missing
+        else:
+            alias = next((other for other, array in originals.items()
+                          if array.dtype == value.dtype and np.array_equal(array, value)), None)
+            if alias is not None:
+                header['aliases'][name] = alias
+                continue
+            originals[name] = value
+            if kind == 'sparse':
+                header['sparse'].append(name)
+            if value.dtype.kind == 'U':
+                # Categorical: store small integer codes, values in the header
+                categories, codes = np.unique(value, return_inverse=True)
+                header['categories'][name] = categories.tolist()
+                value = _downcast(codes.reshape(value.shape))
+            arrays[name] = value
+
+    blob = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    with open(tmp, 'wb') as f:
+        np.savez(f, **{HEADER_KEY: blob}, **arrays)
+    os.replace(tmp, path)
+
+
+# ----------------------------------------------------------------------
+# Reads
+# ----------------------------------------------------------------------
+
+def read_compact_header(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read only the JSON header (version, timestamp, labels, metadata, sample_count, layout)."""
+    with np.load(path) as data:
+        return json.loads(data[HEADER_KEY].tobytes().decode('utf-8'))
+
+
+def read_compact_fields(path: Union[str, Path]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Read header and fields.
+
+    Returns:
+        Tuple of (header, fields) where fields maps every field name, in the
+        original order, to an (N, ...) array, or to a scalar for constants
+        and a list for irregular fields
+    """
+    with np.load(path) as data:
+        header = json.loads(data[HEADER_KEY].tobytes().decode('utf-8'))
+        arrays = {name: data[name] for name in data.files if name != HEADER_KEY}
+    for name, categories in header.get('categories', {}).items():
+        arrays[name] = np.asarray(categories)[arrays[name]]
+
+    fields: Dict[str, Any] = {}
+    for name in header['fields']:
+        if name in header['constants']:
+            fields[name] = header['constants'][name]
+        elif name in header['json_fields']:
+            fields[name] = header['json_fields'][name]
+        elif name in header['aliases']:
+            fields[name] = arrays[header['aliases'][name]]
+        else:
+            fields[name] = arrays[name]
+    return header, fields
+
+
+def read_compact_columns(path: Union[str, Path]) -> Tuple[Dict[str, Any], List[str], np.ndarray]:
+    """
+    Read the numeric top-level fields as a columnar array.
+
+    Same layout as session_cache.samples_to_columns on the equivalent JSON:
+    every numeric (non-bool) top-level field is a float64 column, missing
+    values are NaN.
+
+    Returns:
+        Tuple of (header, column_names, array of shape (N, C) in Fortran order)
+    """
+    header, fields = read_compact_fields(path)
+    num_samples = header['sample_count']
+
+    names = []
+    columns = []
+    for name, value in fields.items():
+        if '.' in name:
+            continue
+        if isinstance(value, np.ndarray):
+            if value.ndim != 1 or value.dtype.kind not in 'iuf':
+                continue
+            column = value
+        elif isinstance(value, list):
+            if not any(_is_number(v) for v in value):
+                continue
+            column = [v if _is_number(v) else np.nan for v in value]
+        elif _is_number(value):
+            column = np.full(num_samples, value)
+        else:
+            continue
+        names.append(name)
+        columns.append(np.asarray(column, dtype=np.float64))
+
+    array = np.empty((num_samples, len(names)), dtype=np.float64, order='F')
+    for j, column in enumerate(columns):
+        array[:, j] = column
+    return header, names, array
+
+
+def read_compact_samples(path: Union[str, Path]) -> Tuple[Dict[str, Any], List[Dict]]:
+    """
+    Rebuild the sample dicts (same keys, order and nesting as the JSON export).
+
+    Returns:
+        Tuple of (header, samples)
+    """
+    header, fields = read_compact_fields(path)
+    num_samples = header['sample_count']
+    sparse = set(header['sparse'])
+    json_missing = {name: set(indices) for name, indices in header.get('json_missing', {}).items()}
+
+    columns = []
+    for name, value in fields.items():
+        path_parts = name.split('.')
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif not isinstance(value, list):
+            value = [value] * num_samples
+        columns.append((path_parts, value, name in sparse, json_missing.get(name, ())))
+
+    samples = []
+    for i in range(num_samples):
+        sample: Dict[str, Any] = {}
+        for parts, values, is_sparse, missing in columns:
+            value = values[i]
+            if is_sparse and value != value:  # NaN marks a missing value
+                continue
+            if i in missing:
+                continue
+            target = sample
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        samples.append(sample)
+    return header, samples
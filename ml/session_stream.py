@@ -0,0 +1,252 @@
+"""
+SIMCAP Streaming Session Reader
+
+Incremental parser for session JSON files that never holds the whole document
+(or the whole samples array) in memory. Understands the same layouts as
+data_loader.load_session_raw:
+
+- V1 (legacy): Array of samples directly: [{sample1}, {sample2}, ...]
+- V2.0: Wrapper object: {version: "2.0", timestamp: "...", samples: [...]}
+- V2.1: Wrapper with embedded metadata: {version: "2.1", samples: [...], labels: [...], metadata: {...}}
+
+Usage:
+    reader = SessionStreamReader(Path('data/GAMBIT/session.json'))
+    header = reader.header()              # version, labels, metadata, sample_count
+    for batch in reader.iter_batches(4096):
+        batch['mx']                       # structured NumPy array per chunk
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_decoder = json.JSONDecoder()
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters read per refill
+
+
+@dataclass
+class SessionHeader:
+    """Session header fields, read without materializing samples."""
+    version: str  # '1.0', '2.0', '2.1'
+    timestamp: Optional[str]  # None if the file has no timestamp field (always for V1)
+    sample_count: int
+    labels: Optional[List[Dict]] = None
+    metadata: Optional[Dict] = None
+
+    @property
+    def firmware_version(self) -> Optional[str]:
+        return self.metadata.get('firmware_version') if self.metadata else None
+
+
+class _JsonTokenStream:
+    """Buffered reader that decodes one JSON value at a time from a text file."""
+
+    def __init__(self, f, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Drop consumed text before growing the buffer
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(self.chunk_size)
+        if data:
+            self.buf += data
+        else:
+            self.eof = True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file), not consumed."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self._fill()
+
+    def take(self, expected: str):
+        """Consume one structural character."""
+        c = self.peek()
+        if c != expected:
+            raise ValueError(f"Expected {expected!r} at offset {self.pos}, got {c!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # A value ending exactly at the buffer edge may be a truncated number
+            if end >= len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.take('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            c = self.peek()
+            self.pos += 1
+            if c == ']':
+                return
+            if c != ',':
+                raise ValueError(f"Expected ',' or ']' in array, got {c!r}")
+
+
+class SessionStreamReader:
+    """
+    Streaming reader for a single session file.
+
+    Each iteration re-opens the file, so a reader can be iterated repeatedly.
+    Memory use is bounded by the chunk size and the batch size, independent of
+    the session length.
+    """
+
+    def __init__(self, json_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.json_path = Path(json_path)
+        self.chunk_size = chunk_size
+        self._header: Optional[SessionHeader] = None
+
+    def _events(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Walk the document, yielding ('format', 'v1'|'v2'), ('sample', dict)
+        and ('field', (key, value)) events for top-level wrapper fields.
+        """
+        with open(self.json_path, 'r') as f:
+            stream = _JsonTokenStream(f, self.chunk_size)
+            c = stream.peek()
+            if c == '[':
+                yield 'format', 'v1'
+                for sample in stream.iter_array():
+                    yield 'sample', sample
+                return
+
+            if c != '{':
+                raise ValueError(f"Unknown JSON format in {self.json_path}: expected array or object with 'samples' key")
+
+            yield 'format', 'v2'
+            stream.take('{')
+            has_samples = False
+            while stream.peek() != '}':
+                key = stream.value()
+                stream.take(':')
+                if key == 'samples':
+                    has_samples = True
+                    for sample in stream.iter_array():
+                        yield 'sample', sample
+                else:
+                    yield 'field', (key, stream.value())
+                if stream.peek() == ',':
+                    stream.take(',')
+            if not has_samples:
+                raise ValueError(f"Unknown JSON format in {self.json_path}: expected array or object with 'samples' key")
+
+    def header(self) -> SessionHeader:
+        """
+        Read header fields and count samples in one streaming pass.
+
+        Samples are decoded one at a time and discarded.
+        """
+        if self._header is not None:
+            return self._header
+
+        fmt = 'v1'
+        fields: Dict[str, Any] = {}
+        count = 0
+        for kind, payload in self._events():
+            if kind == 'sample':
+                count += 1
+            elif kind == 'field':
+                fields[payload[0]] = payload[1]
+            else:
+                fmt = payload
+
+        if fmt == 'v1':
+            self._header = SessionHeader(
+                version='1.0',
+                timestamp=None,
+                sample_count=count
+            )
+        else:
+            self._header = SessionHeader(
+                version=fields.get('version', '2.0'),
+                timestamp=fields.get('timestamp'),
+                sample_count=count,
+                labels=fields.get('labels'),
+                metadata=fields.get('metadata', {})
+            )
+        return self._header
+
+    def iter_samples(self) -> Iterator[Dict]:
+        """Yield sample dicts one at a time."""
+        for kind, payload in self._events():
+            if kind == 'sample':
+                yield payload
+
+    def iter_batches(self, batch_size: int = 4096,
+                     fields: Optional[List[str]] = None) -> Iterator[np.ndarray]:
+        """
+        Yield samples in fixed-size chunks as NumPy record batches.
+
+        Args:
+            batch_size: Samples per batch (the last batch may be shorter)
+            fields: Field names to extract (default: numeric fields of the first sample)
+
+        Yields:
+            Structured arrays with one float64 field per name; missing or
+            non-numeric values are NaN
+        """
+        dtype = None
+        pending: List[Dict] = []
+
+        for sample in self.iter_samples():
+            if dtype is None:
+                if fields is None:
+                    fields = [k for k, v in sample.items()
+                              if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                dtype = np.dtype([(name, np.float64) for name in fields])
+            pending.append(sample)
+            if len(pending) == batch_size:
+                yield _to_records(pending, fields, dtype)
+                pending = []
+
+        if pending:
+            yield _to_records(pending, fields, dtype)
+
+
+def _to_records(samples: List[Dict], fields: List[str], dtype: np.dtype) -> np.ndarray:
+    batch = np.full(len(samples), np.nan, dtype=dtype)
+    for name in fields:
+        column = batch[name]
+        for i, sample in enumerate(samples):
+            value = sample.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                column[i] = value
+    return batch
+
+
+def read_session_header(json_path: Path) -> SessionHeader:
+    """Convenience wrapper: stream a session file and return its header."""
+    return SessionStreamReader(json_path).header()
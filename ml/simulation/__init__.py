@@ -18,7 +18,7 @@ Usage:
     )
 """
 
-from .dipole import magnetic_dipole_field, compute_total_field
+from .dipole import magnetic_dipole_field, dipole_field_batch, compute_total_field
 from .hand_model import HandPoseGenerator, FingerState, HandPose
 from .sensor_model import MMC5603Simulator
 from .generator import MagneticFieldSimulator, generate_synthetic_session
@@ -10,14 +10,40 @@ This approach:
 2. Adds Gaussian noise matching observed variance
 3. Interpolates between states for partial positions
 4. Generates unlimited training data grounded in reality
+
+Per-configuration means and noise levels are tabulated once
+(configuration_stats), so datasets over all 2^5 binary or 3^5 ternary
+configurations are drawn as whole arrays, or streamed in chunks
+(iter_configurations / save_configurations) when they don't fit in memory.
 """
 
 import json
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 from dataclasses import dataclass
 
+FINGER_ORDER = ['thumb', 'index', 'middle', 'ring', 'pinky']
+
+# Rows per chunk when streaming datasets (~56 MB of float64 X + int64 y)
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def configuration_states(ternary: bool = False) -> np.ndarray:
+    """
+    Finger states of every configuration, thumb first.
+
+    Args:
+        ternary: All 3^5 = 243 configurations (0=extended, 1=partial, 2=flexed)
+                 instead of the 2^5 = 32 extended/flexed ones
+
+    Returns:
+        States, shape (C, 5), in code order ('00000', '00002', ... or '00001', ...)
+    """
+    if ternary:
+        return np.arange(243)[:, None] // 3 ** np.arange(4, -1, -1) % 3
+    return (np.arange(32)[:, None] >> np.arange(4, -1, -1) & 1) * 2
+
 
 @dataclass
 class MeasuredSignature:
@@ -50,6 +76,7 @@ class AlignedGenerator:
         mx = np.array([s.get('mx', 0) for s in samples])
         my = np.array([s.get('my', 0) for s in samples])
         mz = np.array([s.get('mz', 0) for s in samples])
+        mag = np.stack([mx, my, mz], axis=1).reshape(-1, 3)
 
         # Group samples by finger configuration
         config_vectors: Dict[str, List[np.ndarray]] = {}
@@ -70,8 +97,7 @@ class AlignedGenerator:
             if code not in config_vectors:
                 config_vectors[code] = []
 
-            for i in range(start, min(end, len(mx))):
-                config_vectors[code].append(np.array([mx[i], my[i], mz[i]]))
+            config_vectors[code].extend(mag[start:min(end, len(mag))])
 
         # Extract baseline (all extended)
         if '00000' in config_vectors:
@@ -108,66 +134,72 @@ class AlignedGenerator:
                 code += '?'
         return code
 
-    def generate_sample(
-        self,
-        finger_states: Dict[str, int],
-        noise_scale: float = 1.0
-    ) -> np.ndarray:
+    def configuration_stats(self, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate a synthetic sample for given finger states.
+        Field mean and noise level for each finger configuration.
+
+        Configurations with a measured signature use it directly; others are
+        interpolated from the single-finger signatures (partial = 50% of
+        flexed, variances add) with the non-additivity correction.
 
         Args:
-            finger_states: Dict mapping finger name to state (0=extended, 1=partial, 2=flexed)
-            noise_scale: Multiplier for noise (1.0 = measured noise level)
+            states: Finger states, shape (C, 5) (0=extended, 1=partial, 2=flexed)
 
         Returns:
-            Magnetic field vector (3,)
+            Tuple of (mean field (C, 3), per-axis std (C, 3))
         """
-        # Build code
-        code = ''
-        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']:
-            code += str(finger_states.get(f, 0))
+        states = np.asarray(states).reshape(-1, 5)
 
-        # If we have this exact signature, sample from it
-        if code in self.signatures:
-            sig = self.signatures[code]
-            noise = np.random.randn(3) * sig.std * noise_scale
-            return self.baseline + sig.mean + noise
+        # Single-finger signatures, zero where not measured
+        single_mean = np.zeros((5, 3))
+        single_std = np.zeros((5, 3))
+        for i in range(5):
+            single_code = '0' * i + '2' + '0' * (4 - i)
+            if single_code in self.signatures:
+                single_mean[i] = self.signatures[single_code].mean
+                single_std[i] = self.signatures[single_code].std
 
-        # Otherwise, interpolate from single-finger signatures
-        delta = np.zeros(3)
-        noise = np.zeros(3)
+        # Fully flexed = signature, partial = 50% of flexed, extended = no contribution
+        weights = np.where(states == 2, 1.0, np.where(states == 1, 0.5, 0.0))
+        delta = weights @ single_mean
+        variance = weights ** 2 @ single_std ** 2  # Variance adds
 
-        finger_order = ['thumb', 'index', 'middle', 'ring', 'pinky']
-        for i, finger in enumerate(finger_order):
-            state = finger_states.get(finger, 0)
+        # Apply non-additivity correction (measured ~50% cancellation on average)
+        n_flexed = (states > 0).sum(axis=1)
+        cancellation = np.where(n_flexed > 1, 0.3 * (n_flexed - 1) / 4, 0.0)  # Up to 30% for 5 fingers
+        delta *= (1 - cancellation)[:, None]
 
-            if state == 0:
-                continue  # Extended = no contribution
+        mean = self.baseline + delta
+        std = np.sqrt(variance)
 
-            # Get single-finger signature
-            single_code = '0' * i + '2' + '0' * (4 - i)
-            if single_code in self.signatures:
-                sig = self.signatures[single_code]
+        # Exact signatures where we have them
+        for c, row in enumerate(states):
+            code = ''.join(str(int(state)) for state in row)
+            if code in self.signatures:
+                sig = self.signatures[code]
+                mean[c] = self.baseline + sig.mean
+                std[c] = sig.std
 
-                if state == 2:  # Fully flexed
-                    delta += sig.mean
-                    noise += sig.std ** 2  # Variance adds
-                elif state == 1:  # Partial = 50% of flexed
-                    delta += 0.5 * sig.mean
-                    noise += (0.5 * sig.std) ** 2
+        return mean, std
 
-        # Apply non-additivity correction (measured ~50% cancellation on average)
-        n_flexed = sum(1 for s in finger_states.values() if s > 0)
-        if n_flexed > 1:
-            # Reduce magnitude based on number of fingers
-            cancellation = 0.3 * (n_flexed - 1) / 4  # Up to 30% reduction for 5 fingers
-            delta *= (1 - cancellation)
+    def generate_sample(
+        self,
+        finger_states: Dict[str, int],
+        noise_scale: float = 1.0
+    ) -> np.ndarray:
+        """
+        Generate a synthetic sample for given finger states.
 
-        noise = np.sqrt(noise)  # Convert variance back to std
-        sample_noise = np.random.randn(3) * noise * noise_scale
+        Args:
+            finger_states: Dict mapping finger name to state (0=extended, 1=partial, 2=flexed)
+            noise_scale: Multiplier for noise (1.0 = measured noise level)
 
-        return self.baseline + delta + sample_noise
+        Returns:
+            Magnetic field vector (3,)
+        """
+        states = np.array([[finger_states.get(f, 0) for f in FINGER_ORDER]])
+        mean, std = self.configuration_stats(states)
+        return mean[0] + np.random.randn(3) * std[0] * noise_scale
 
     def generate_batch(
         self,
@@ -189,57 +221,100 @@ class AlignedGenerator:
         if states is None:
             states = [0, 2]  # Default: just extended and flexed
 
-        X = []
-        y = []
+        # Random finger states, looked up in the ternary configuration table
+        y = np.random.choice(states, size=(n_samples, 5))
+        mean, std = self.configuration_stats(configuration_states(ternary=True))
+        index = y @ 3 ** np.arange(4, -1, -1)
 
-        finger_order = ['thumb', 'index', 'middle', 'ring', 'pinky']
+        X = mean[index] + np.random.randn(n_samples, 3) * std[index] * noise_scale
+        return X, y
 
-        for _ in range(n_samples):
-            # Random finger states
-            finger_states = {}
-            label = []
-            for finger in finger_order:
-                state = np.random.choice(states)
-                finger_states[finger] = state
-                label.append(state)
+    def iter_configurations(
+        self,
+        samples_per_config: int = 100,
+        noise_scale: float = 1.0,
+        ternary: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream generate_all_configurations output in chunks of rows.
 
-            sample = self.generate_sample(finger_states, noise_scale)
-            X.append(sample)
-            y.append(label)
+        Rows are in configuration order (samples_per_config consecutive rows
+        per configuration), exactly as generate_all_configurations returns
+        them, but at most chunk_size rows are in memory at a time.
 
-        return np.array(X), np.array(y)
+        Yields:
+            (X, y) chunks, X (n, 3) features and y (n, 5) labels; nothing
+            when samples_per_config is 0
+        """
+        if samples_per_config < 0:
+            raise ValueError(f"samples_per_config must be >= 0, got {samples_per_config}")
+        config_states = configuration_states(ternary)
+        mean, std = self.configuration_stats(config_states)
+        labels = config_states if ternary else config_states // 2  # Binary labels are 0/1
+
+        total = len(config_states) * samples_per_config
+        for start in range(0, total, chunk_size):
+            index = np.arange(start, min(start + chunk_size, total)) // samples_per_config
+            X = mean[index] + np.random.randn(len(index), 3) * std[index] * noise_scale
+            yield X, labels[index]
 
     def generate_all_configurations(
         self,
         samples_per_config: int = 100,
-        noise_scale: float = 1.0
+        noise_scale: float = 1.0,
+        ternary: bool = False
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate samples for all 32 binary configurations (extended/flexed only).
+        Generate samples for all 32 binary configurations (extended/flexed only),
+        or all 243 ternary configurations (extended/partial/flexed).
+
+        Returns:
+            (X, y) where X is features, y is 5-digit codes (0/1 per finger for
+            binary, 0/1/2 for ternary); shapes (0, 3) and (0, 5) when
+            samples_per_config is 0
+        """
+        total = len(configuration_states(ternary)) * samples_per_config
+        chunks = list(self.iter_configurations(samples_per_config, noise_scale, ternary,
+                                               chunk_size=max(total, 1)))
+        if not chunks:
+            return np.empty((0, 3)), np.empty((0, 5), dtype=np.int64)
+        return chunks[0]
+
+    def save_configurations(
+        self,
+        output_dir: Path,
+        samples_per_config: int = 100,
+        noise_scale: float = 1.0,
+        ternary: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Tuple[Path, Path]:
+        """
+        Write generate_all_configurations output to X.npy / y.npy, chunk by chunk.
+
+        For datasets larger than memory; load with np.load(path, mmap_mode='r').
 
         Returns:
-            (X, y) where X is features, y is 5-digit codes
+            (X path, y path)
         """
-        X = []
-        y = []
-
-        finger_order = ['thumb', 'index', 'middle', 'ring', 'pinky']
-
-        # Generate all 2^5 = 32 configurations
-        for config in range(32):
-            finger_states = {}
-            label = []
-            for i, finger in enumerate(finger_order):
-                state = 2 if (config >> (4 - i)) & 1 else 0
-                finger_states[finger] = state
-                label.append(state // 2)  # 0 or 1
-
-            for _ in range(samples_per_config):
-                sample = self.generate_sample(finger_states, noise_scale)
-                X.append(sample)
-                y.append(label)
-
-        return np.array(X), np.array(y)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        total = len(configuration_states(ternary)) * samples_per_config
+
+        x_path, y_path = output_dir / 'X.npy', output_dir / 'y.npy'
+        X_out = np.lib.format.open_memmap(x_path, mode='w+', dtype=np.float64, shape=(total, 3))
+        y_out = np.lib.format.open_memmap(y_path, mode='w+', dtype=np.int64, shape=(total, 5))
+
+        row = 0
+        for X, y in self.iter_configurations(samples_per_config, noise_scale, ternary, chunk_size):
+            X_out[row:row + len(X)] = X
+            y_out[row:row + len(y)] = y
+            row += len(X)
+
+        X_out.flush()
+        y_out.flush()
+        del X_out, y_out
+        return x_path, y_path
 
 
 def main():
@@ -16,7 +16,14 @@ Where:
 """
 
 import numpy as np
-from typing import Dict, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Optional JIT backend for dipole_field_batch
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 # Physical constants
 MU_0 = 4 * np.pi * 1e-7  # Permeability of free space (H/m)
@@ -118,6 +125,111 @@ def magnetic_dipole_field_vectorized(
     return B
 
 
+def dipole_field_batch(
+    magnet_positions: np.ndarray,
+    dipole_moments: np.ndarray,
+    sensor_positions: Optional[np.ndarray] = None,
+    min_distance: float = 1e-6,
+    xp: Any = None,
+    jit: bool = False
+) -> np.ndarray:
+    """
+    Summed field of M dipoles at S sensor points, for a batch of configurations.
+
+    This is the shared kernel behind compute_total_field, the particle filter
+    likelihood (ml.filters) and the physics fitting models.
+
+    Args:
+        magnet_positions: Dipole positions (meters), shape (..., M, 3)
+        dipole_moments: Moment vectors (A·m²), broadcastable to magnet_positions
+            (e.g. (M, 3) shared by the whole batch)
+        sensor_positions: Observation points (meters), shape (S, 3) or (3,).
+            Default: a single sensor at the origin.
+        min_distance: Dipoles closer than this to a sensor contribute zero
+        xp: Array module (default numpy; jax.numpy works unchanged, which
+            makes the kernel traceable by jax.jit)
+        jit: Use the compiled Numba kernel when Numba is installed (NumPy
+            inputs only); otherwise this flag is ignored
+
+    Returns:
+        Field in Tesla, shape (..., S, 3), or (..., 3) when sensor_positions
+        is None or a single point
+    """
+    if xp is None:
+        xp = np
+
+    positions = xp.asarray(magnet_positions, dtype=xp.float64)
+    moments = xp.asarray(dipole_moments, dtype=xp.float64)
+    single_sensor = sensor_positions is None or np.ndim(sensor_positions) == 1
+    if sensor_positions is None:
+        sensors = xp.zeros((1, 3))
+    else:
+        sensors = xp.reshape(xp.asarray(sensor_positions, dtype=xp.float64), (-1, 3))
+
+    if jit and HAS_NUMBA and xp is np:
+        positions, moments = np.broadcast_arrays(positions, moments)
+        batch_shape = positions.shape[:-2]
+        num_magnets = positions.shape[-2]
+        B = _dipole_field_numba(
+            np.ascontiguousarray(positions.reshape(-1, num_magnets, 3)),
+            np.ascontiguousarray(moments.reshape(-1, num_magnets, 3)),
+            np.ascontiguousarray(sensors),
+            min_distance
+        ).reshape(batch_shape + (len(sensors), 3))
+        return B[..., 0, :] if single_sensor else B
+
+    # r: vector from each dipole to each sensor, shape (..., S, M, 3)
+    r_vec = sensors[:, None, :] - positions[..., None, :, :]
+    r_sq = xp.sum(r_vec * r_vec, axis=-1)
+
+    # Avoid singularity at dipole location
+    valid = r_sq >= min_distance ** 2
+    inv_r = 1.0 / xp.sqrt(xp.where(valid, r_sq, 1.0))
+    r_hat = r_vec * inv_r[..., None]
+
+    # Dipole field equation: B = (μ₀/4π) × [3(m·r̂)r̂ - m] / r³
+    m = moments[..., None, :, :]
+    m_dot_r = xp.sum(m * r_hat, axis=-1, keepdims=True)
+    B = MU_0_OVER_4PI * (3 * m_dot_r * r_hat - m) * (inv_r ** 3)[..., None]
+    B = xp.sum(xp.where(valid[..., None], B, 0.0), axis=-2)
+
+    return B[..., 0, :] if single_sensor else B
+
+
+if HAS_NUMBA:
+    @numba.njit(parallel=True, cache=True, fastmath=False)
+    def _dipole_field_numba(positions, moments, sensors, min_distance):
+        n_batch, n_magnets, _ = positions.shape
+        n_sensors = sensors.shape[0]
+        out = np.zeros((n_batch, n_sensors, 3))
+        min_sq = min_distance * min_distance
+        for b in numba.prange(n_batch):
+            for s in range(n_sensors):
+                bx = 0.0
+                by = 0.0
+                bz = 0.0
+                for j in range(n_magnets):
+                    rx = sensors[s, 0] - positions[b, j, 0]
+                    ry = sensors[s, 1] - positions[b, j, 1]
+                    rz = sensors[s, 2] - positions[b, j, 2]
+                    r_sq = rx * rx + ry * ry + rz * rz
+                    if r_sq < min_sq:
+                        continue
+                    inv_r = 1.0 / np.sqrt(r_sq)
+                    inv_r3 = inv_r * inv_r * inv_r
+                    mx = moments[b, j, 0]
+                    my = moments[b, j, 1]
+                    mz = moments[b, j, 2]
+                    m_dot_r = (mx * rx + my * ry + mz * rz) * inv_r
+                    bx += (3 * m_dot_r * rx * inv_r - mx) * inv_r3
+                    by += (3 * m_dot_r * ry * inv_r - my) * inv_r3
+                    bz += (3 * m_dot_r * rz * inv_r - mz) * inv_r3
+                out[b, s, 0] = MU_0_OVER_4PI * bx
+                out[b, s, 1] = MU_0_OVER_4PI * by
+                out[b, s, 2] = MU_0_OVER_4PI * bz
+        return out
+
+
 def compute_total_field(
     sensor_position: np.ndarray,
     finger_positions: Dict[str, np.ndarray],
@@ -155,29 +267,22 @@ def compute_total_field(
         earth_field = EARTH_FIELD_EDINBURGH
 
     # Start with Earth's field (or zero if not including)
-    total_field = earth_field.copy() if include_earth else np.zeros(3)
-
-    # Convert sensor position from mm to meters
-    sensor_m = sensor_position / 1000.0
-
-    for finger, position in finger_positions.items():
-        if finger not in magnet_config:
-            continue
-
-        config = magnet_config[finger]
-        moment = np.array(config['moment'])
-        offset = np.array(config.get('offset', [0, 0, 0]))
-
-        # Magnet position is fingertip + attachment offset, in meters
-        magnet_pos_m = (position + offset) / 1000.0
-
-        # Compute dipole field contribution (in Tesla)
-        B_dipole = magnetic_dipole_field(sensor_m, magnet_pos_m, moment)
-
-        # Add to total (convert Tesla to μT)
-        total_field += B_dipole * 1e6
-
-    return total_field
+    total_field = np.array(earth_field, dtype=np.float64) if include_earth else np.zeros(3)
+
+    fingers = [finger for finger in finger_positions if finger in magnet_config]
+    if not fingers:
+        return total_field
+
+    # Magnet position is fingertip + attachment offset, in meters
+    positions = np.array([
+        np.asarray(finger_positions[f], dtype=np.float64) + np.asarray(magnet_config[f].get('offset', [0, 0, 0]))
+        for f in fingers
+    ]) / 1000.0
+    moments = np.array([magnet_config[f]['moment'] for f in fingers], dtype=np.float64)
+
+    # Sum of dipole contributions (Tesla), converted to μT
+    B_dipoles = dipole_field_batch(positions, moments, np.asarray(sensor_position) / 1000.0)
+    return total_field + B_dipoles * 1e6
 
 
 def estimate_dipole_moment(
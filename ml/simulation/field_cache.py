@@ -0,0 +1,270 @@
+"""
+Linearized Field Cache for Hand-Pose Simulation
+
+Static-pose samples differ from their nominal (noise-free) pose only by a
+millimetre or two of position noise. Instead of evaluating every magnet at
+every sample, the cache evaluates each finger's field once at its nominal
+fingertip position together with the local Jacobian dB/dp, and produces
+noisy samples with a first-order correction:
+
+    B(p) ≈ B(p0) + J(p0) · (p - p0)
+
+Entries are keyed by finger, magnet spec and the nominal fingertip position.
+The nominal position is a function of the finger state and the hand geometry
+(including close-range pose adjustments), so it stands in for a
+(state, geometry hash) key and stays valid across sessions that reuse the
+same hand. Jacobians are taken by central differences, so any field model
+works (Magpylib cylinders or point dipoles).
+
+The linearization error grows with the square of the position offset. Use
+accuracy() or linearization_error_table() to choose max_offset_mm: samples
+with any finger farther than that from its nominal position are evaluated
+exactly.
+
+Usage:
+    cache = FieldCache(simulator.magpylib_sim.compute_finger_field, spec_key)
+    B = cache.fields(fingers, anchors, positions)    # (N, 3) μT, no Earth field
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .dipole import dipole_field_batch
+
+# Central-difference step for Jacobians (mm); well inside float64 precision
+# at finger distances and far below position noise
+DEFAULT_STEP_MM = 0.01
+
+FingerField = Callable[[str, np.ndarray], np.ndarray]
+
+
+def spec_key(spec: Any) -> str:
+    """Short stable hash of a magnet specification (anything JSON-serializable via repr)."""
+    blob = json.dumps(spec, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha1(blob).hexdigest()[:16]
+
+
+def dipole_finger_field(magnet_config: Dict[str, Dict]) -> FingerField:
+    """
+    Single-finger field function for point-dipole magnets.
+
+    Args:
+        magnet_config: Dict mapping finger names to 'moment' (A·m²) and optional 'offset' (mm)
+
+    Returns:
+        finger_field(finger, positions_mm (K, 3)) -> field at the origin sensor in μT, (K, 3)
+    """
+    def finger_field(finger: str, positions_mm: np.ndarray) -> np.ndarray:
+        positions_mm = np.asarray(positions_mm, dtype=np.float64).reshape(-1, 3)
+        cfg = magnet_config.get(finger)
+        if cfg is None:
+            return np.zeros((len(positions_mm), 3))
+        offset = np.asarray(cfg.get('offset', [0, 0, 0]), dtype=np.float64)
+        moment = np.asarray(cfg['moment'], dtype=np.float64)
+        magnet_pos = (positions_mm + offset)[:, None, :] / 1000.0
+        return dipole_field_batch(magnet_pos, moment[None]) * 1e6
+
+    return finger_field
+
+
+class FieldCache:
+    """
+    Per-finger nominal fields and position Jacobians for fast noisy samples.
+
+    Args:
+        finger_field: finger_field(finger, positions_mm (K, 3)) -> μT (K, 3)
+        spec: Magnet spec identifier (hashed into the key, see spec_key)
+        step_mm: Central-difference step for the Jacobian
+        max_offset_mm: Samples with any finger farther than this from its
+                       nominal position are computed exactly (None = always linearize)
+    """
+
+    def __init__(self, finger_field: FingerField, spec: Any = None,
+                 step_mm: float = DEFAULT_STEP_MM,
+                 max_offset_mm: Optional[float] = None):
+        self.finger_field = finger_field
+        self.spec_key = spec_key(spec)
+        self.step_mm = step_mm
+        self.max_offset_mm = max_offset_mm
+        self._entries: Dict[Tuple[str, str, bytes], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _key(self, finger: str, anchor: np.ndarray) -> Tuple[str, str, bytes]:
+        return finger, self.spec_key, np.round(anchor, 6).tobytes()
+
+    def entries(self, finger: str, anchors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nominal field and Jacobian for one finger at A nominal positions.
+
+        Missing entries are computed in a single finger_field call
+        (anchor plus ±step along each axis).
+
+        Returns:
+            Tuple of (B0 (A, 3) μT, J (A, 3, 3) μT/mm with J[a, i, k] = dB_i/dp_k)
+        """
+        anchors = np.asarray(anchors, dtype=np.float64).reshape(-1, 3)
+        keys = [self._key(finger, a) for a in anchors]
+        missing = [key for key in dict.fromkeys(keys) if key not in self._entries]
+
+        if missing:
+            position_of = {key: i for i, key in enumerate(keys)}
+            points = anchors[[position_of[key] for key in missing]]
+
+            # Anchor followed by +h / -h along x, y, z
+            h = self.step_mm
+            offsets = np.concatenate([np.zeros((1, 3)), h * np.eye(3), -h * np.eye(3)])
+            probes = (points[:, None, :] + offsets[None]).reshape(-1, 3)
+            B = self.finger_field(finger, probes).reshape(len(points), 7, 3)
+
+            B0 = B[:, 0]
+            J = (B[:, 1:4] - B[:, 4:7]).transpose(0, 2, 1) / (2 * h)
+            for key, b0, jac in zip(missing, B0, J):
+                self._entries[key] = (b0, jac)
+
+        B0 = np.array([self._entries[key][0] for key in keys]).reshape(-1, 3)
+        J = np.array([self._entries[key][1] for key in keys]).reshape(-1, 3, 3)
+        return B0, J
+
+    def fields(self, fingers: List[str], anchors: np.ndarray,
+               positions: np.ndarray) -> np.ndarray:
+        """
+        Summed magnet field for N poses using the first-order correction.
+
+        Args:
+            fingers: Finger name for each of the F columns
+            anchors: Nominal (noise-free) positions, shape (N, F, 3) in mm
+            positions: Actual positions, shape (N, F, 3) in mm
+
+        Returns:
+            Magnet field at sensor in μT, shape (N, 3) (no Earth field)
+        """
+        anchors = np.asarray(anchors, dtype=np.float64)
+        positions = np.asarray(positions, dtype=np.float64)
+        total = np.zeros((len(positions), 3))
+        if len(positions) == 0:
+            return total
+
+        delta = positions - anchors
+        exact = np.zeros(len(positions), dtype=bool)
+        if self.max_offset_mm is not None:
+            exact = (np.linalg.norm(delta, axis=-1) > self.max_offset_mm).any(axis=1)
+        approx = ~exact
+
+        for j, finger in enumerate(fingers):
+            if approx.all() and (anchors[:, j] == anchors[0, j]).all():
+                # Common case (static segment): one nominal position per finger
+                B0, J = self.entries(finger, anchors[0, j])
+                total += B0 + delta[:, j] @ J[0].T
+                continue
+            if approx.any():
+                unique, inverse = np.unique(anchors[approx, j], axis=0, return_inverse=True)
+                B0, J = self.entries(finger, unique)
+                inverse = inverse.reshape(-1)
+                total[approx] += B0[inverse] + np.einsum('nik,nk->ni', J[inverse], delta[approx, j])
+            if exact.any():
+                total[exact] += self.finger_field(finger, positions[exact, j])
+        return total
+
+    def exact_fields(self, fingers: List[str], positions: np.ndarray) -> np.ndarray:
+        """Summed magnet field without linearization (reference path), shape (N, 3) μT."""
+        positions = np.asarray(positions, dtype=np.float64)
+        total = np.zeros((len(positions), 3))
+        for j, finger in enumerate(fingers):
+            total += self.finger_field(finger, positions[:, j])
+        return total
+
+    def accuracy(self, fingers: List[str], anchors: np.ndarray,
+                 positions: np.ndarray) -> Dict[str, float]:
+        """
+        Compare the cached path against exact evaluation.
+
+        Returns:
+            Dict with max/p99/rms absolute error (μT), max relative error
+            (fraction of the exact magnet field magnitude), the fraction of
+            samples that fell back to the exact path, and the sample count
+        """
+        approx = self.fields(fingers, anchors, positions)
+        exact = self.exact_fields(fingers, positions)
+        err = np.linalg.norm(approx - exact, axis=1)
+        rel = err / np.maximum(np.linalg.norm(exact, axis=1), 1e-12)
+        offsets = np.linalg.norm(np.asarray(positions) - np.asarray(anchors), axis=-1)
+        fallback = (offsets > self.max_offset_mm).any(axis=1) if self.max_offset_mm is not None \
+            else np.zeros(len(err), dtype=bool)
+        return {
+            'max_error_ut': float(err.max()) if len(err) else 0.0,
+            'p99_error_ut': float(np.percentile(err, 99)) if len(err) else 0.0,
+            'rms_error_ut': float(np.sqrt(np.mean(err ** 2))) if len(err) else 0.0,
+            'max_relative_error': float(rel.max()) if len(rel) else 0.0,
+            'exact_fraction': float(fallback.mean()) if len(err) else 0.0,
+            'n_samples': int(len(err)),
+        }
+
+
+def linearization_error_table(
+    cache: FieldCache,
+    fingers: List[str],
+    anchors: np.ndarray,
+    noise_levels_mm: List[float] = (0.5, 1.0, 2.0, 5.0, 10.0),
+    samples_per_level: int = 1000
+) -> List[Dict[str, float]]:
+    """
+    Linearization error vs. position noise, for choosing max_offset_mm.
+
+    Args:
+        cache: FieldCache to evaluate (its max_offset_mm is ignored here)
+        fingers: Finger names for the F columns
+        anchors: Nominal poses to perturb, shape (P, F, 3) in mm
+        noise_levels_mm: Gaussian position noise levels (σ per axis)
+        samples_per_level: Perturbed samples per level
+
+    Returns:
+        One accuracy() dict per noise level, with 'noise_mm' added
+    """
+    anchors = np.asarray(anchors, dtype=np.float64).reshape(-1, len(fingers), 3)
+    max_offset, cache.max_offset_mm = cache.max_offset_mm, None
+    try:
+        rows = []
+        for noise in noise_levels_mm:
+            base = anchors[np.random.randint(0, len(anchors), size=samples_per_level)]
+            positions = base + np.random.normal(0, noise, size=base.shape)
+            rows.append({'noise_mm': float(noise), **cache.accuracy(fingers, base, positions)})
+        return rows
+    finally:
+        cache.max_offset_mm = max_offset
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from . import DEFAULT_MAGNET_CONFIG
+    from .generator import MagneticFieldSimulator
+    from .hand_model import POSE_TEMPLATES
+
+    parser = argparse.ArgumentParser(description='Field cache linearization accuracy')
+    parser.add_argument('--dipole', action='store_true',
+                        help='Use the dipole model instead of Magpylib')
+    parser.add_argument('--samples', '-n', type=int, default=2000,
+                        help='Samples per noise level')
+    args = parser.parse_args()
+
+    sim = MagneticFieldSimulator(DEFAULT_MAGNET_CONFIG, use_magpylib=not args.dipole,
+                                 use_field_cache=True)
+    hand = sim.hand_generator
+    anchors = np.concatenate([
+        hand.static_pose_batch(pose, 1, return_anchors=True)[2] for pose in POSE_TEMPLATES
+    ])
+
+    print(f"Physics: {'magpylib' if sim.use_magpylib else 'dipole'}, {len(anchors)} nominal poses")
+    print(f"{'noise (mm)':>10s} {'max (μT)':>10s} {'p99 (μT)':>10s} {'rms (μT)':>10s} {'max rel':>10s}")
+    for row in linearization_error_table(sim.field_cache, hand.fingers, anchors,
+                                         samples_per_level=args.samples):
+        print(f"{row['noise_mm']:10.1f} {row['max_error_ut']:10.3f} {row['p99_error_ut']:10.3f} "
+              f"{row['rms_error_ut']:10.3f} {row['max_relative_error']:10.2e}")
@@ -0,0 +1,355 @@
+"""
+Precomputed Magnet Field Grids
+
+Magpylib's exact cylinder solution costs tens of microseconds per evaluation.
+A FieldGrid tabulates one magnet's field once on a regular grid of relative
+sensor positions (sensor - magnet centre), stores it on disk, and answers
+arbitrary batches of positions by (bi)linear or (bi)cubic Catmull-Rom
+interpolation: a table lookup instead of a Magpylib call.
+
+An axially magnetized cylinder's field is rotationally symmetric about its
+axis and mirror-symmetric in z, so the 3D field is fully described by
+(B_rho, B_z) on a half-plane (rho >= 0, z >= 0). The table is that 2D slice:
+for the same memory it can be a few hundred times finer than a 3D lattice,
+which is what keeps the interpolation error well below sensor noise.
+
+Grids are keyed by magnet dimensions and remanence (grade) plus grid layout.
+Polarity only flips the sign of the field, so both polarities share one
+table (see FieldGrid.for_spec).
+
+Positions outside the grid, or closer to the magnet centre than
+min_distance_mm (inside or at the surface of the magnet, where the field has
+edge singularities), are evaluated exactly with Magpylib. Use accuracy() to
+check the interpolation error for a layout.
+
+Usage:
+    grid = FieldGrid.for_spec(MagnetSpec(diameter_mm=6, height_mm=3))
+    B = grid.evaluate(sensor_positions - magnet_position)   # (..., 3) μT
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import magpylib as magpy
+    HAS_MAGPYLIB = True
+except ImportError:
+    HAS_MAGPYLIB = False
+    magpy = None
+
+GRID_VERSION = 1
+DEFAULT_GRID_DIR = Path.home() / '.cache' / 'simcap' / 'field_grids'
+
+# Default layout: rho, |z| in [0, 150] mm at 0.25 mm spacing (601² points, ~3 MB)
+DEFAULT_EXTENT_MM = 150.0
+DEFAULT_SPACING_MM = 0.25
+DEFAULT_MIN_DISTANCE_MM = 8.0
+
+
+def _catmull_rom_weights(t: np.ndarray) -> np.ndarray:
+    """Cubic convolution weights for offsets -1, 0, 1, 2; shape (..., 4)."""
+    t2 = t * t
+    t3 = t2 * t
+    return np.stack([
+        -0.5 * t3 + t2 - 0.5 * t,
+        1.5 * t3 - 2.5 * t2 + 1.0,
+        -1.5 * t3 + 2.0 * t2 + 0.5 * t,
+        0.5 * t3 - 0.5 * t2,
+    ], axis=-1)
+
+
+class FieldGrid:
+    """
+    Tabulated field of one axially magnetized (+Z) cylinder magnet.
+
+    Args:
+        diameter_mm, height_mm: Magnet dimensions
+        Br_mT: Remanence (polarization magnitude)
+        extent_mm: Grid covers rho and |z| in [0, extent]
+        spacing_mm: Grid spacing
+        min_distance_mm: Positions closer to the magnet centre are computed exactly
+        method: 'linear' or 'cubic' (Catmull-Rom)
+        sign: +1 for north_up, -1 for north_down
+        grid_dir: On-disk cache directory (None = don't cache on disk)
+    """
+
+    def __init__(
+        self,
+        diameter_mm: float = 6.0,
+        height_mm: float = 3.0,
+        Br_mT: float = 1400.0,
+        extent_mm: float = DEFAULT_EXTENT_MM,
+        spacing_mm: float = DEFAULT_SPACING_MM,
+        min_distance_mm: float = DEFAULT_MIN_DISTANCE_MM,
+        method: str = 'cubic',
+        sign: float = 1.0,
+        grid_dir: Optional[Path] = DEFAULT_GRID_DIR
+    ):
+        if method not in ('linear', 'cubic'):
+            raise ValueError(f"Unknown interpolation method: {method}")
+        self.diameter_mm = float(diameter_mm)
+        self.height_mm = float(height_mm)
+        self.Br_mT = float(Br_mT)
+        self.extent_mm = float(extent_mm)
+        self.spacing_mm = float(spacing_mm)
+        self.min_distance_mm = float(min_distance_mm)
+        self.method = method
+        self.sign = float(sign)
+        self.grid_dir = Path(grid_dir) if grid_dir is not None else None
+        self.num_points = int(round(self.extent_mm / self.spacing_mm)) + 1
+        self._table: Optional[np.ndarray] = None
+        self._padded_table: Optional[np.ndarray] = None
+        self._magnet = None
+
+    @classmethod
+    def for_spec(cls, spec, **kwargs) -> 'FieldGrid':
+        """
+        Grid for a magpylib_sim.MagnetSpec (dimensions, grade and polarity).
+
+        Grids with the same dimensions, remanence and layout share one table
+        in memory (per process) and on disk; polarity is applied as a sign.
+        """
+        sign = 1.0 if spec.polarity == 'north_up' else -1.0
+        grid = cls(spec.diameter_mm, spec.height_mm, spec.Br_mT, sign=sign, **kwargs)
+        shared = _SHARED_TABLES.get(grid.key)
+        if shared is not None:
+            grid._table = shared
+        return grid
+
+    @property
+    def key(self) -> str:
+        """Cache key: magnet dimensions, remanence and grid layout."""
+        ident = {
+            'diameter_mm': self.diameter_mm,
+            'height_mm': self.height_mm,
+            'Br_mT': self.Br_mT,
+            'extent_mm': self.extent_mm,
+            'spacing_mm': self.spacing_mm,
+            'version': GRID_VERSION,
+        }
+        digest = hashlib.sha1(json.dumps(ident, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        return f"cyl-d{self.diameter_mm:g}-h{self.height_mm:g}-br{self.Br_mT:g}-{digest}"
+
+    @property
+    def magnet(self):
+        """Magpylib cylinder at the origin (north_up), for exact evaluation."""
+        if self._magnet is None:
+            if not HAS_MAGPYLIB:
+                raise ImportError("Magpylib not installed. Run: pip install magpylib")
+            self._magnet = magpy.magnet.Cylinder(
+                polarization=(0, 0, self.Br_mT),
+                dimension=(self.diameter_mm, self.height_mm)
+            )
+        return self._magnet
+
+    @property
+    def table(self) -> np.ndarray:
+        """(B_rho, B_z) table, shape (n_rho, n_z, 2) in μT (north_up); loaded or built on first use."""
+        if self._table is None:
+            table = self._load() if self.grid_dir is not None else None
+            if table is None:
+                table = self.build()
+                if self.grid_dir is not None:
+                    try:
+                        self._save(table)
+                    except OSError as e:
+                        print(f"Warning: Failed to write field grid: {e}")
+            self._table = table
+            _SHARED_TABLES[self.key] = table
+        return self._table
+
+    def build(self) -> np.ndarray:
+        """Evaluate the magnet on every grid point (x = rho, y = 0, z) with Magpylib."""
+        axis = np.linspace(0.0, self.extent_mm, self.num_points)
+        rho, z = np.meshgrid(axis, axis, indexing='ij')
+        points = np.stack([rho.ravel(), np.zeros(rho.size), z.ravel()], axis=1)
+        B = np.asarray(magpy.getB(self.magnet, points)) * 1000.0  # mT -> μT
+        return B[:, [0, 2]].reshape(self.num_points, self.num_points, 2)
+
+    def _path(self) -> Path:
+        return self.grid_dir / f"{self.key}.npy"
+
+    def _load(self) -> Optional[np.ndarray]:
+        path = self._path()
+        if not path.exists():
+            return None
+        try:
+            table = np.load(path)
+        except (OSError, ValueError):
+            return None
+        if table.shape != (self.num_points, self.num_points, 2):
+            return None
+        return table
+
+    def _save(self, table: np.ndarray):
+        self.grid_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path()
+        tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+        with open(tmp, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp, path)
+
+    def exact(self, rel_positions_mm: np.ndarray) -> np.ndarray:
+        """Exact Magpylib field at relative positions, shape (..., 3) μT."""
+        rel = np.asarray(rel_positions_mm, dtype=np.float64)
+        flat = rel.reshape(-1, 3)
+        if len(flat) == 0:
+            return np.zeros(rel.shape)
+        B = np.asarray(magpy.getB(self.magnet, flat)).reshape(-1, 3) * 1000.0
+        return (self.sign * B).reshape(rel.shape)
+
+    def evaluate(self, rel_positions_mm: np.ndarray) -> np.ndarray:
+        """
+        Field at sensor positions relative to the magnet centre.
+
+        Args:
+            rel_positions_mm: sensor - magnet position, shape (..., 3) in mm
+
+        Returns:
+            Field in μT, shape (..., 3)
+        """
+        rel = np.asarray(rel_positions_mm, dtype=np.float64)
+        flat = rel.reshape(-1, 3)
+        rho = np.hypot(flat[:, 0], flat[:, 1])
+        z = np.abs(flat[:, 2])
+
+        limit = self.extent_mm - (self.spacing_mm if self.method == 'cubic' else 0.0)
+        inside = (rho <= limit) & (z <= limit)
+        inside &= rho * rho + z * z >= self.min_distance_mm ** 2
+
+        B = np.empty((len(flat), 3))
+        if inside.any():
+            interpolate = self._cubic if self.method == 'cubic' else self._linear
+            B_rho, B_z = interpolate(rho[inside], z[inside])
+            # B_rho is odd in z; project it back onto x/y (B_rho = 0 on the axis)
+            B_rho = B_rho * np.sign(flat[inside, 2])
+            safe_rho = np.where(rho[inside] > 0, rho[inside], 1.0)
+            B[inside, 0] = B_rho * flat[inside, 0] / safe_rho
+            B[inside, 1] = B_rho * flat[inside, 1] / safe_rho
+            B[inside, 2] = B_z
+            B[inside] *= self.sign
+        if not inside.all():
+            B[~inside] = self.exact(flat[~inside])
+        return B.reshape(rel.shape)
+
+    @property
+    def _padded(self) -> np.ndarray:
+        """B_rho and B_z tables with a mirrored row/column at -spacing, flattened (2, (n+1)²)."""
+        if self._padded_table is None:
+            table = self.table
+            n = self.num_points
+            padded = np.empty((n + 1, n + 1, 2))
+            padded[1:, 1:] = table
+            # B_rho is odd in rho and in z, B_z is even in both
+            padded[0, 1:] = table[1] * [-1.0, 1.0]
+            padded[1:, 0] = table[:, 1] * [-1.0, 1.0]
+            padded[0, 0] = table[1, 1]
+            self._padded_table = np.ascontiguousarray(padded.reshape(-1, 2).T)
+        return self._padded_table
+
+    def _cell(self, coord: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        u = coord / self.spacing_mm
+        i0 = np.clip(np.floor(u).astype(np.intp), 0, self.num_points - 2)
+        return i0, u - i0
+
+    def _linear(self, rho: np.ndarray, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        table = self.table
+        i, ti = self._cell(rho)
+        j, tj = self._cell(z)
+        ti = ti[:, None]
+        tj = tj[:, None]
+        out = ((1 - ti) * (1 - tj) * table[i, j] + ti * (1 - tj) * table[i + 1, j]
+               + (1 - ti) * tj * table[i, j + 1] + ti * tj * table[i + 1, j + 1])
+        return out[:, 0], out[:, 1]
+
+    def _cubic(self, rho: np.ndarray, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        i, ti = self._cell(rho)
+        j, tj = self._cell(z)
+        # 4x4 neighbourhood from the padded tables, one gather each: (P, 16)
+        stride = self.num_points + 1
+        offsets = (np.arange(4)[:, None] * stride + np.arange(4)[None, :]).ravel()
+        index = (i * stride + j)[:, None] + offsets[None, :]
+        weights = (_catmull_rom_weights(ti)[:, :, None]
+                   * _catmull_rom_weights(tj)[:, None, :]).reshape(-1, 16)
+        B_rho_table, B_z_table = self._padded
+        return (np.einsum('pk,pk->p', weights, np.take(B_rho_table, index)),
+                np.einsum('pk,pk->p', weights, np.take(B_z_table, index)))
+
+    def accuracy(self, num_samples: int = 5000,
+                 radius_range_mm: Tuple[float, float] = (10.0, 120.0)) -> Dict[str, float]:
+        """
+        Interpolation error against exact Magpylib at random positions.
+
+        Args:
+            num_samples: Random relative positions to test
+            radius_range_mm: Distance range of the test positions
+
+        Returns:
+            Dict with max/p99/rms absolute error (μT) and max relative error
+        """
+        direction = np.random.randn(num_samples, 3)
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        radius = np.random.uniform(*radius_range_mm, size=num_samples)
+        points = direction * radius[:, None]
+
+        approx = self.evaluate(points)
+        exact = self.exact(points)
+        err = np.linalg.norm(approx - exact, axis=1)
+        rel = err / np.maximum(np.linalg.norm(exact, axis=1), 1e-12)
+        return {
+            'max_error_ut': float(err.max()),
+            'p99_error_ut': float(np.percentile(err, 99)),
+            'rms_error_ut': float(np.sqrt(np.mean(err ** 2))),
+            'max_relative_error': float(rel.max()),
+        }
+
+
+# Tables by key, shared by every grid of the same magnet in this process
+_SHARED_TABLES: Dict[str, np.ndarray] = {}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from .magpylib_sim import MagnetSpec
+
+    parser = argparse.ArgumentParser(description='Field grid interpolation accuracy')
+    parser.add_argument('--diameter', type=float, default=6.0, help='Magnet diameter (mm)')
+    parser.add_argument('--height', type=float, default=3.0, help='Magnet height (mm)')
+    parser.add_argument('--br', type=float, default=1400.0, help='Remanence (mT)')
+    parser.add_argument('--spacing', type=float, default=DEFAULT_SPACING_MM, help='Grid spacing (mm)')
+    parser.add_argument('--samples', '-n', type=int, default=20000, help='Test positions')
+    args = parser.parse_args()
+
+    spec = MagnetSpec(diameter_mm=args.diameter, height_mm=args.height, Br_mT=args.br)
+    start = time.perf_counter()
+    FieldGrid.for_spec(spec, spacing_mm=args.spacing).table
+    print(f"Grid {args.diameter:g}x{args.height:g} mm, Br {args.br:g} mT, "
+          f"{args.spacing:g} mm spacing: ready in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'method':>8s} {'range (mm)':>12s} {'max (μT)':>10s} {'p99 (μT)':>10s} "
+          f"{'rms (μT)':>10s} {'max rel':>10s}")
+    for method in ('linear', 'cubic'):
+        grid = FieldGrid.for_spec(spec, spacing_mm=args.spacing, method=method)
+        for radius_range in ((10.0, 20.0), (20.0, 50.0), (50.0, 120.0)):
+            row = grid.accuracy(args.samples, radius_range)
+            print(f"{method:>8s} {radius_range[0]:5.0f}-{radius_range[1]:<6.0f} "
+                  f"{row['max_error_ut']:10.4f} {row['p99_error_ut']:10.4f} "
+                  f"{row['rms_error_ut']:10.4f} {row['max_relative_error']:10.2e}")
+
+    points = np.random.uniform(-100, 100, size=(args.samples, 3))
+    grid = FieldGrid.for_spec(spec, spacing_mm=args.spacing)
+    start = time.perf_counter()
+    grid.evaluate(points)
+    interpolated = time.perf_counter() - start
+    start = time.perf_counter()
+    grid.exact(points)
+    exact = time.perf_counter() - start
+    print(f"{args.samples} positions: interpolated {interpolated * 1000:.1f} ms, "
+          f"exact {exact * 1000:.1f} ms")
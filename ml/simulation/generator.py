@@ -27,14 +27,15 @@ import numpy as np
 import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Union
-from pathlib import Path
 
-from .dipole import compute_total_field, EARTH_FIELD_EDINBURGH
+from .dipole import compute_total_field, dipole_field_batch, EARTH_FIELD_EDINBURGH
 from .hand_model import (
     HandPoseGenerator, HandPose, FingerState,
     POSE_TEMPLATES, pose_template_to_states
 )
 from .sensor_model import MMC5603Simulator, IMUSimulator
+from .field_cache import FieldCache, dipole_finger_field
+from ..session_npz import is_compact_session, sample_count, write_compact_session
 
 # Try to import Magpylib for high-fidelity simulation
 try:
@@ -45,6 +46,29 @@ except ImportError:
     MagpylibSimulator = None
 
 
+def random_rotation_matrices(num_samples: int, max_angle_deg: float = 30.0) -> np.ndarray:
+    """
+    Random device-orientation rotations (random axis, uniform angle).
+
+    Returns:
+        Rotation matrices, shape (N, 3, 3)
+    """
+    # Random rotation axes
+    axis = np.random.randn(num_samples, 3)
+    axis = axis / np.linalg.norm(axis, axis=1, keepdims=True)
+
+    # Random rotation angles
+    angle = np.random.uniform(-max_angle_deg, max_angle_deg, size=num_samples) * np.pi / 180.0
+
+    # Rodrigues rotation formula
+    K = np.zeros((num_samples, 3, 3))
+    K[:, 0, 1], K[:, 0, 2] = -axis[:, 2], axis[:, 1]
+    K[:, 1, 0], K[:, 1, 2] = axis[:, 2], -axis[:, 0]
+    K[:, 2, 0], K[:, 2, 1] = -axis[:, 1], axis[:, 0]
+    return (np.eye(3) + np.sin(angle)[:, None, None] * K +
+            (1 - np.cos(angle))[:, None, None] * (K @ K))
+
+
 class MagneticFieldSimulator:
     """
     Complete magnetic field simulation pipeline for training data generation.
@@ -63,7 +87,10 @@ class MagneticFieldSimulator:
         sample_rate: float = 26.0,
         randomize_geometry: bool = False,
         randomize_sensor: bool = False,
-        use_magpylib: bool = True
+        use_magpylib: bool = True,
+        use_field_cache: bool = False,
+        field_cache_max_offset_mm: Optional[float] = None,
+        use_field_grid: bool = False
     ):
         """
         Initialize the magnetic field simulator.
@@ -77,6 +104,12 @@ class MagneticFieldSimulator:
             randomize_sensor: Apply random variation to sensor characteristics
             use_magpylib: Use Magpylib for accurate cylinder magnet simulation
                          (falls back to dipole approximation if not available)
+            use_field_cache: Compute static-pose batches from cached per-finger
+                             fields and Jacobians (first-order, see field_cache)
+            field_cache_max_offset_mm: Fingertip offset beyond which cached
+                                       samples fall back to exact evaluation
+            use_field_grid: Interpolate Magpylib fields from precomputed
+                            per-magnet grids (see field_grid)
         """
         self.magnet_config = magnet_config
         self.earth_field = earth_field if earth_field is not None else EARTH_FIELD_EDINBURGH
@@ -91,7 +124,18 @@ class MagneticFieldSimulator:
         # Initialize Magpylib simulator if available and requested
         self.magpylib_sim = None
         if self.use_magpylib:
-            self.magpylib_sim = MagpylibSimulator()
+            self.magpylib_sim = MagpylibSimulator(use_field_grid=use_field_grid)
+
+        self.field_cache = None
+        if use_field_cache:
+            if self.magpylib_sim is not None:
+                self.field_cache = FieldCache(self.magpylib_sim.compute_finger_field,
+                                              spec=self.magpylib_sim.magnet_specs,
+                                              max_offset_mm=field_cache_max_offset_mm)
+            else:
+                self.field_cache = FieldCache(dipole_finger_field(self.magnet_config),
+                                              spec=self.magnet_config,
+                                              max_offset_mm=field_cache_max_offset_mm)
 
         if randomize_sensor:
             self.mag_sensor.randomize_parameters()
@@ -155,6 +199,200 @@ class MagneticFieldSimulator:
         R = np.eye(3) + np.sin(angle) * K + (1 - np.cos(angle)) * (K @ K)
         return R
 
+    def random_rotation_matrices(self, num_samples: int,
+                                 max_angle_deg: float = 30.0) -> np.ndarray:
+        """Vectorized random_rotation_matrix: shape (N, 3, 3)."""
+        return random_rotation_matrices(num_samples, max_angle_deg)
+
+    def compute_fields_batch(
+        self,
+        positions: np.ndarray,
+        fingers: List[str],
+        include_earth: bool = True,
+        device_orientations: Optional[np.ndarray] = None,
+        anchors: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized compute_field_for_pose for N poses.
+
+        Args:
+            positions: Fingertip positions, shape (N, F, 3) in mm
+            fingers: Finger name for each of the F columns
+            include_earth: Include Earth's magnetic field
+            device_orientations: Optional rotation matrices, shape (N, 3, 3)
+            anchors: Noise-free positions (N, F, 3); with the field cache
+                     enabled, fields are linearized around them. Rows with
+                     NaN anchors (transition frames) are computed exactly.
+
+        Returns:
+            Magnetic field vectors at sensor, shape (N, 3) in μT
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+
+        # Get Earth field (optionally rotated by device orientation)
+        if device_orientations is not None and include_earth:
+            earth = np.einsum('nij,j->ni', device_orientations, self.earth_field)
+        else:
+            earth = np.asarray(self.earth_field, dtype=np.float64)
+
+        # Cached nominal fields plus first-order correction
+        if self.field_cache is not None and anchors is not None:
+            anchors = np.asarray(anchors, dtype=np.float64)
+            free = np.isnan(anchors).any(axis=(1, 2))
+            B = np.empty((len(positions), 3))
+            B[~free] = self.field_cache.fields(fingers, anchors[~free], positions[~free])
+            if free.any():
+                B[free] = self.compute_fields_batch(positions[free], fingers, include_earth=False)
+            return B + earth if include_earth else B
+
+        # Use Magpylib if available for more accurate field calculation
+        if self.use_magpylib and self.magpylib_sim is not None:
+            return self.magpylib_sim.compute_field_batch(
+                positions, fingers, include_earth=include_earth, earth_field_ut=earth
+            )
+
+        # Fall back to dipole approximation (one kernel call for all samples)
+        columns = [j for j, finger in enumerate(fingers) if finger in self.magnet_config]
+        offsets = np.array([self.magnet_config[fingers[j]].get('offset', [0, 0, 0]) for j in columns],
+                           dtype=np.float64).reshape(-1, 3)
+        moments = np.array([self.magnet_config[fingers[j]]['moment'] for j in columns],
+                           dtype=np.float64).reshape(-1, 3)
+        B = dipole_field_batch((positions[:, columns] + offsets) / 1000.0, moments) * 1e6
+        return B + earth if include_earth else B
+
+    def generate_samples_batch(
+        self,
+        positions: np.ndarray,
+        state_indices: np.ndarray,
+        start_index: int = 0,
+        add_orientation_variation: bool = True,
+        anchors: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Array version of generate_sample for N poses.
+
+        Args:
+            positions: Fingertip positions, shape (N, F, 3) in mm, columns in
+                       hand_generator.fingers order
+            state_indices: Finger states as indices into list(FingerState), (N, F)
+            start_index: Sample index of the first row (for timing)
+            add_orientation_variation: Random device orientation per sample
+            anchors: Noise-free positions for the field cache (see compute_fields_batch)
+
+        Returns:
+            Columnar samples: one array per numeric sample field, plus
+            'true_field' (N, 3) and 'finger_states' (N, F). Convert with
+            samples_from_columns() when exporting JSON.
+        """
+        num_samples = len(positions)
+        fingers = self.hand_generator.fingers
+
+        # Random device orientation (simulates wrist movement)
+        orientations = (self.random_rotation_matrices(num_samples, max_angle_deg=25.0)
+                        if add_orientation_variation else None)
+
+        # Compute magnetic field with orientation effects
+        true_field = self.compute_fields_batch(positions, fingers, device_orientations=orientations,
+                                               anchors=anchors)
+
+        # Simulate sensor readings for the whole batch
+        mag_reading = self.mag_sensor.measure_batch(true_field)
+        imu_reading = self.imu_sensor.measure_static_batch(num_samples)
+
+        dt = 1.0 / self.sample_rate
+        columns = dict(imu_reading)
+        columns.update({k: v for k, v in mag_reading.items() if not k.startswith('_')})
+        columns['t'] = (start_index + np.arange(num_samples)) * dt * 1000  # milliseconds
+        columns['true_field'] = true_field
+        columns['finger_states'] = np.asarray(state_indices)
+        return columns
+
+    def session_fields(self, columns: Dict[str, np.ndarray]) -> Dict[str, object]:
+        """
+        Per-field arrays for the compact session format (see ml.session_npz).
+
+        Same fields, in the same order, as the sample dicts built by
+        samples_from_columns, with nested ground truth under dotted names and
+        per-session constants as scalars.
+        """
+        fingers = self.hand_generator.fingers
+        state_values = np.array([state.value for state in FingerState])
+
+        fields: Dict[str, object] = {
+            k: columns[k] for k in ['ax', 'ay', 'az', 'gx', 'gy', 'gz',
+                                    'ax_g', 'ay_g', 'az_g', 'gx_dps', 'gy_dps', 'gz_dps',
+                                    'isMoving', 'accelStd', 'gyroStd',
+                                    'mx', 'my', 'mz', 'mx_ut', 'my_ut', 'mz_ut']
+        }
+        fields.update({
+            'dt': 1.0 / self.sample_rate,
+            't': columns['t'],
+            'gyroBiasCalibrated': False,
+            'mag_cal_ready': False,
+            'mag_cal_confidence': 0.0,
+            'mag_cal_mean_residual': None,
+            'mag_cal_earth_magnitude': float(np.linalg.norm(self.earth_field)),
+            'mag_cal_hard_iron': False,
+            'mag_cal_soft_iron': False,
+            'filtered_mx': columns['mx_ut'],
+            'filtered_my': columns['my_ut'],
+            'filtered_mz': columns['mz_ut'],
+        })
+        for j, finger in enumerate(fingers):
+            fields[f'_ground_truth.finger_states.{finger}'] = state_values[columns['finger_states'][:, j]]
+        fields['_ground_truth.true_field'] = columns['true_field']
+        return fields
+
+    def samples_from_columns(self, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """
+        Build SIMCAP v2.1 sample dicts (as generate_sample) from batch columns.
+
+        Only needed at JSON export time.
+        """
+        fingers = self.hand_generator.fingers
+        state_values = np.array([state.value for state in FingerState])
+        dt = 1.0 / self.sample_rate
+        earth_magnitude = float(np.linalg.norm(self.earth_field))
+
+        imu_keys = ['ax', 'ay', 'az', 'gx', 'gy', 'gz',
+                    'ax_g', 'ay_g', 'az_g', 'gx_dps', 'gy_dps', 'gz_dps',
+                    'isMoving', 'accelStd', 'gyroStd']
+        mag_keys = ['mx', 'my', 'mz', 'mx_ut', 'my_ut', 'mz_ut']
+        lists = {k: columns[k].tolist() for k in imu_keys + mag_keys + ['t']}
+        true_fields = columns['true_field'].tolist()
+        finger_states = state_values[columns['finger_states']].tolist()
+
+        samples = []
+        for i in range(len(lists['t'])):
+            sample = {k: lists[k][i] for k in imu_keys + mag_keys}
+            sample.update({
+                # Timing
+                'dt': dt,
+                't': lists['t'][i],
+
+                # Additional fields matching GAMBIT format
+                'gyroBiasCalibrated': False,
+                'mag_cal_ready': False,
+                'mag_cal_confidence': 0.0,
+                'mag_cal_mean_residual': None,
+                'mag_cal_earth_magnitude': earth_magnitude,
+                'mag_cal_hard_iron': False,
+                'mag_cal_soft_iron': False,
+
+                # Filtered values (in simulation, same as raw)
+                'filtered_mx': lists['mx_ut'][i],
+                'filtered_my': lists['my_ut'][i],
+                'filtered_mz': lists['mz_ut'][i],
+
+                # Ground truth (for validation, can be removed in production)
+                '_ground_truth': {
+                    'finger_states': dict(zip(fingers, finger_states[i])),
+                    'true_field': true_fields[i]
+                }
+            })
+            samples.append(sample)
+        return samples
+
     def generate_sample(
         self,
         pose: HandPose,
@@ -240,11 +478,33 @@ class MagneticFieldSimulator:
             sample = self.generate_sample(pose, start_index + i)
             samples.append(sample)
 
-        # Create label for this segment
+        return samples, self._static_label(pose_name, num_samples, start_index)
+
+    def generate_static_batch(
+        self,
+        pose_name: str,
+        num_samples: int,
+        position_noise_mm: float = 1.0,
+        start_index: int = 0
+    ) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """
+        Batch version of generate_static_samples.
+
+        Returns:
+            Tuple of (columns as from generate_samples_batch, label dict)
+        """
+        positions, states, anchors = self.hand_generator.static_pose_batch(
+            pose_name, num_samples, position_noise_mm, return_anchors=True
+        )
+        columns = self.generate_samples_batch(positions, states, start_index, anchors=anchors)
+        return columns, self._static_label(pose_name, num_samples, start_index)
+
+    def _static_label(self, pose_name: str, num_samples: int, start_index: int) -> Dict:
+        """Label for a static pose segment."""
         pose_template = POSE_TEMPLATES.get(pose_name, {})
         finger_states = pose_template_to_states(pose_template) if pose_template else {}
 
-        label = {
+        return {
             'start_sample': start_index,
             'end_sample': start_index + num_samples,
             'labels': {
@@ -255,19 +515,22 @@ class MagneticFieldSimulator:
             }
         }
 
-        return samples, label
-
     def generate_transition_samples(
         self,
         start_pose: str,
         end_pose: str,
         num_samples: int,
         position_noise_mm: float = 1.0,
-        start_index: int = 0
+        start_index: int = 0,
+        easing: str = 'linear',
+        timing_jitter: float = 0.0
     ) -> Tuple[List[Dict], List[Dict]]:
         """
         Generate samples for a transition between poses.
 
+        Args:
+            easing, timing_jitter: Transition shape (see HandPoseGenerator.transition_batch)
+
         Returns:
             Tuple of (samples list, labels list)
         """
@@ -276,7 +539,7 @@ class MagneticFieldSimulator:
 
         # Generate pose sequence
         poses = self.hand_generator.generate_transition(
-            start_states, end_states, num_samples, position_noise_mm
+            start_states, end_states, num_samples, position_noise_mm, easing, timing_jitter
         )
 
         samples = []
@@ -284,6 +547,52 @@ class MagneticFieldSimulator:
             sample = self.generate_sample(pose, start_index + i)
             samples.append(sample)
 
+        return samples, self._transition_labels(start_pose, end_pose, num_samples, start_index)
+
+    def generate_transition_batch(
+        self,
+        start_pose: str,
+        end_pose: str,
+        num_samples: int,
+        position_noise_mm: float = 1.0,
+        start_index: int = 0,
+        easing: str = 'linear',
+        timing_jitter: float = 0.0
+    ) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
+        """
+        Batch version of generate_transition_samples.
+
+        Returns:
+            Tuple of (columns as from generate_samples_batch, labels list)
+        """
+        positions, states = self._transition_positions(
+            start_pose, end_pose, num_samples, position_noise_mm, easing, timing_jitter
+        )
+        columns = self.generate_samples_batch(positions, states, start_index)
+        return columns, self._transition_labels(start_pose, end_pose, num_samples, start_index)
+
+    def _transition_positions(
+        self,
+        start_pose: str,
+        end_pose: str,
+        num_samples: int,
+        position_noise_mm: float,
+        easing: str,
+        timing_jitter: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Fingertip positions (N, F, 3) and state indices (N, F) of a pose transition."""
+        start_states = pose_template_to_states(POSE_TEMPLATES[start_pose])
+        end_states = pose_template_to_states(POSE_TEMPLATES[end_pose])
+        return self.hand_generator.transition_batch(
+            start_states, end_states, num_samples, position_noise_mm, easing, timing_jitter
+        )
+
+    def _transition_labels(self, start_pose: str, end_pose: str,
+                           num_samples: int, start_index: int) -> List[Dict]:
+        """Labels for a transition segment: start, transition, end."""
+        start_states = pose_template_to_states(POSE_TEMPLATES[start_pose])
+        end_states = pose_template_to_states(POSE_TEMPLATES[end_pose])
+
         # Labels: start, transition, end
         labels = [
             {
@@ -318,7 +627,7 @@ class MagneticFieldSimulator:
             }
         ]
 
-        return samples, labels
+        return labels
 
     def generate_session(
         self,
@@ -326,7 +635,11 @@ class MagneticFieldSimulator:
         samples_per_pose: int = 500,
         include_transitions: bool = True,
         transition_samples: int = 50,
-        position_noise_mm: float = 1.0
+        position_noise_mm: float = 1.0,
+        batch: bool = True,
+        columnar: bool = False,
+        transition_easing: str = 'linear',
+        transition_timing_jitter: float = 0.0
     ) -> Dict:
         """
         Generate a complete synthetic session with multiple poses.
@@ -337,32 +650,52 @@ class MagneticFieldSimulator:
             include_transitions: Generate transition samples between poses
             transition_samples: Number of samples per transition
             position_noise_mm: Fingertip position noise (mm)
+            batch: Generate each segment as arrays (generate_session_columns);
+                   False uses the original per-sample path
+            columnar: Return 'samples' as per-field arrays (session_fields)
+                      instead of sample dicts, for write_compact_session.
+                      Requires batch=True.
+            transition_easing: Easing curve for transitions (see hand_model.EASING_FUNCTIONS)
+            transition_timing_jitter: Per-finger onset/finish randomization
+                                      (fraction of the transition, < 0.5)
 
         Returns:
             Complete session dict in SIMCAP v2.1 format
         """
-        all_samples = []
-        all_labels = []
-        current_index = 0
-
-        for i, pose in enumerate(poses):
-            # Generate static samples for this pose
-            samples, label = self.generate_static_samples(
-                pose, samples_per_pose, position_noise_mm, current_index
+        if columnar and not batch:
+            raise ValueError("columnar=True requires batch=True")
+
+        if batch:
+            columns, all_labels = self.generate_session_columns(
+                poses, samples_per_pose, include_transitions,
+                transition_samples, position_noise_mm,
+                transition_easing, transition_timing_jitter
             )
-            all_samples.extend(samples)
-            all_labels.append(label)
-            current_index += samples_per_pose
-
-            # Generate transition to next pose
-            if include_transitions and i < len(poses) - 1:
-                next_pose = poses[i + 1]
-                trans_samples, trans_labels = self.generate_transition_samples(
-                    pose, next_pose, transition_samples, position_noise_mm, current_index
+            all_samples = self.session_fields(columns) if columnar else self.samples_from_columns(columns)
+        else:
+            all_samples = []
+            all_labels = []
+            current_index = 0
+
+            for i, pose in enumerate(poses):
+                # Generate static samples for this pose
+                samples, label = self.generate_static_samples(
+                    pose, samples_per_pose, position_noise_mm, current_index
                 )
-                all_samples.extend(trans_samples)
-                all_labels.extend(trans_labels)
-                current_index += transition_samples
+                all_samples.extend(samples)
+                all_labels.append(label)
+                current_index += samples_per_pose
+
+                # Generate transition to next pose
+                if include_transitions and i < len(poses) - 1:
+                    next_pose = poses[i + 1]
+                    trans_samples, trans_labels = self.generate_transition_samples(
+                        pose, next_pose, transition_samples, position_noise_mm, current_index,
+                        transition_easing, transition_timing_jitter
+                    )
+                    all_samples.extend(trans_samples)
+                    all_labels.extend(trans_labels)
+                    current_index += transition_samples
 
         # Create session metadata
         session = {
@@ -370,29 +703,97 @@ class MagneticFieldSimulator:
             'timestamp': f'synthetic_{datetime.now().isoformat()}',
             'samples': all_samples,
             'labels': all_labels,
-            'metadata': {
-                'synthetic': True,
-                'generator_version': '1.1',
-                'physics_engine': 'magpylib' if self.use_magpylib else 'dipole_approximation',
-                'sample_rate': self.sample_rate,
-                'magnet_config': {
-                    k: {
-                        'moment': list(v['moment']),
-                        'offset': list(v.get('offset', [0, 0, 0]))
-                    }
-                    for k, v in self.magnet_config.items()
-                },
-                'earth_field': self.earth_field.tolist(),
-                'poses_included': poses,
-                'samples_per_pose': samples_per_pose,
-                'include_transitions': include_transitions,
-                'position_noise_mm': position_noise_mm,
-                'sensor_calibration': self.mag_sensor.get_calibration_info()
-            }
+            'metadata': self.session_metadata(
+                poses, samples_per_pose, include_transitions, position_noise_mm
+            )
         }
 
         return session
 
+    def generate_session_columns(
+        self,
+        poses: List[str],
+        samples_per_pose: int = 500,
+        include_transitions: bool = True,
+        transition_samples: int = 50,
+        position_noise_mm: float = 1.0,
+        transition_easing: str = 'linear',
+        transition_timing_jitter: float = 0.0
+    ) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
+        """
+        Generate a session's samples as columnar arrays (see generate_session).
+
+        Fingertip positions of every segment are assembled first, so fields
+        and sensor readings for the whole session come from one
+        generate_samples_batch call.
+
+        Returns:
+            Tuple of (columns as from generate_samples_batch, labels list)
+        """
+        positions = []
+        states = []
+        anchors = []
+        all_labels = []
+        current_index = 0
+
+        for i, pose in enumerate(poses):
+            # Static samples for this pose
+            pose_positions, pose_states, pose_anchors = self.hand_generator.static_pose_batch(
+                pose, samples_per_pose, position_noise_mm, return_anchors=True
+            )
+            positions.append(pose_positions)
+            states.append(pose_states)
+            anchors.append(pose_anchors)
+            all_labels.append(self._static_label(pose, samples_per_pose, current_index))
+            current_index += samples_per_pose
+
+            # Transition to next pose (NaN anchors: never linearized)
+            if include_transitions and i < len(poses) - 1:
+                trans_positions, trans_states = self._transition_positions(
+                    pose, poses[i + 1], transition_samples, position_noise_mm,
+                    transition_easing, transition_timing_jitter
+                )
+                positions.append(trans_positions)
+                states.append(trans_states)
+                anchors.append(np.full_like(trans_positions, np.nan))
+                all_labels.extend(self._transition_labels(pose, poses[i + 1],
+                                                          transition_samples, current_index))
+                current_index += transition_samples
+
+        columns = self.generate_samples_batch(
+            np.concatenate(positions), np.concatenate(states),
+            anchors=np.concatenate(anchors) if self.field_cache is not None else None
+        )
+        return columns, all_labels
+
+    def session_metadata(
+        self,
+        poses: List[str],
+        samples_per_pose: int,
+        include_transitions: bool,
+        position_noise_mm: float
+    ) -> Dict:
+        """Session metadata block for generate_session."""
+        return {
+            'synthetic': True,
+            'generator_version': '1.1',
+            'physics_engine': 'magpylib' if self.use_magpylib else 'dipole_approximation',
+            'sample_rate': self.sample_rate,
+            'magnet_config': {
+                k: {
+                    'moment': list(v['moment']),
+                    'offset': list(v.get('offset', [0, 0, 0]))
+                }
+                for k, v in self.magnet_config.items()
+            },
+            'earth_field': self.earth_field.tolist(),
+            'poses_included': poses,
+            'samples_per_pose': samples_per_pose,
+            'include_transitions': include_transitions,
+            'position_noise_mm': position_noise_mm,
+            'sensor_calibration': self.mag_sensor.get_calibration_info()
+        }
+
 
 def generate_synthetic_session(
     output_path: Optional[str] = None,
@@ -405,7 +806,9 @@ def generate_synthetic_session(
     Convenience function to generate a synthetic session.
 
     Args:
-        output_path: Path to save JSON file (optional)
+        output_path: Path to save JSON file (optional). A '.session.npz'
+                     path writes the compact columnar format instead; the
+                     returned session then holds per-field arrays in 'samples'
         poses: List of poses to include. Default: common poses
         samples_per_pose: Samples per pose
         magnet_config: Magnet configuration. Default: alternating polarity
@@ -429,15 +832,20 @@ def generate_synthetic_session(
         randomize_sensor=randomize
     )
 
-    # Generate session
+    # Generate session (columnar when writing the compact format)
+    compact = bool(output_path) and is_compact_session(output_path)
     session = sim.generate_session(
         poses=poses,
         samples_per_pose=samples_per_pose,
-        include_transitions=True
+        include_transitions=True,
+        columnar=compact
     )
 
     # Save if path provided
-    if output_path:
+    if compact:
+        write_compact_session(output_path, session)
+        print(f"Saved synthetic session to {output_path}")
+    elif output_path:
         with open(output_path, 'w') as f:
             json.dump(session, f, indent=2)
         print(f"Saved synthetic session to {output_path}")
@@ -445,63 +853,78 @@ def generate_synthetic_session(
     return session
 
 
+def _dataset_session_task(index: int, params: Dict) -> Dict:
+    """generate_shards task: one randomized session for generate_dataset."""
+    from . import DEFAULT_MAGNET_CONFIG
+
+    # Randomly select poses for this session
+    all_poses = list(POSE_TEMPLATES.keys())
+    poses = [str(p) for p in np.random.choice(all_poses, size=params['poses_per_session'], replace=False)]
+
+    # Generate with randomization
+    sim = MagneticFieldSimulator(
+        magnet_config=DEFAULT_MAGNET_CONFIG,
+        randomize_geometry=True,
+        randomize_sensor=True
+    )
+
+    return sim.generate_session(
+        poses=poses,
+        samples_per_pose=params['samples_per_pose'],
+        include_transitions=True,
+        columnar=params.get('output_format') == 'npz'
+    )
+
+
 def generate_dataset(
     output_dir: str,
     num_sessions: int = 100,
     poses_per_session: int = 5,
-    samples_per_pose: int = 500
+    samples_per_pose: int = 500,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = 1,
+    resume: bool = True,
+    output_format: str = 'json',
+    overwrite: bool = False
 ) -> List[str]:
     """
     Generate multiple synthetic sessions for training.
 
+    Sessions are generated by sharding.generate_shards (in parallel with
+    max_workers > 1). Each session has its own RNG stream derived from the master seed, so the
+    output does not depend on max_workers, and rerunning into the same
+    directory skips sessions that already exist.
+
     Args:
         output_dir: Directory to save sessions
         num_sessions: Number of sessions to generate
         poses_per_session: Poses per session
         samples_per_pose: Samples per pose
+        seed: Master seed (default: reuse the directory's manifest, else random)
+        max_workers: Worker processes (default 1 = serial; None = all cores)
+        resume: Skip sessions already present in output_dir
+        output_format: 'json' (SIMCAP v2.1) or 'npz' (compact .session.npz,
+                       see ml.session_npz)
+        overwrite: Regenerate everything if output_dir was generated with a
+                   different seed or parameters (otherwise ValueError)
 
     Returns:
         List of generated file paths
     """
-    from . import DEFAULT_MAGNET_CONFIG
-
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    all_poses = list(POSE_TEMPLATES.keys())
-    generated = []
-
-    for i in range(num_sessions):
-        # Randomly select poses for this session
-        poses = list(np.random.choice(all_poses, size=poses_per_session, replace=False))
-
-        # Generate with randomization
-        sim = MagneticFieldSimulator(
-            magnet_config=DEFAULT_MAGNET_CONFIG,
-            randomize_geometry=True,
-            randomize_sensor=True
-        )
-
-        session = sim.generate_session(
-            poses=poses,
-            samples_per_pose=samples_per_pose,
-            include_transitions=True
-        )
-
-        # Save
-        filename = f"synthetic_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i:04d}.json"
-        filepath = output_path / filename
-
-        with open(filepath, 'w') as f:
-            json.dump(session, f)
-
-        generated.append(str(filepath))
-
-        if (i + 1) % 10 == 0:
-            print(f"Generated {i + 1}/{num_sessions} sessions")
-
-    print(f"Generated {len(generated)} sessions in {output_dir}")
-    return generated
+    from .sharding import generate_shards, shard_filename_pattern
+
+    return generate_shards(
+        output_dir,
+        _dataset_session_task,
+        num_sessions,
+        params={'poses_per_session': poses_per_session, 'samples_per_pose': samples_per_pose,
+                'output_format': output_format},
+        filename_pattern=shard_filename_pattern('synthetic_{index:04d}', output_format),
+        seed=seed,
+        max_workers=max_workers,
+        resume=resume,
+        overwrite=overwrite
+    )
 
 
 if __name__ == '__main__':
@@ -509,23 +932,52 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(description='Generate synthetic training data')
     parser.add_argument('--output', '-o', type=str, default='synthetic_session.json',
-                        help='Output file path')
+                        help='Output file path (.json, or .session.npz for the compact format)')
     parser.add_argument('--poses', '-p', nargs='+', default=['open_palm', 'fist', 'pointing'],
                         help='Poses to include')
     parser.add_argument('--samples', '-n', type=int, default=500,
                         help='Samples per pose')
     parser.add_argument('--no-randomize', action='store_true',
                         help='Disable domain randomization')
+    parser.add_argument('--dataset-dir', type=str, default=None,
+                        help='Generate a randomized multi-session dataset into this directory')
+    parser.add_argument('--num-sessions', type=int, default=100,
+                        help='Sessions to generate with --dataset-dir')
+    parser.add_argument('--poses-per-session', type=int, default=5,
+                        help='Poses per session with --dataset-dir')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Master seed for --dataset-dir (default: resume seed or random)')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                        help='Worker processes for --dataset-dir (default: 1, serial)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Regenerate sessions that already exist in --dataset-dir')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Regenerate --dataset-dir if it was made with another seed/params')
+    parser.add_argument('--format', choices=['json', 'npz'], default='json',
+                        help='Session file format for --dataset-dir (npz = compact columnar)')
 
     args = parser.parse_args()
 
-    print(f"Generating synthetic session with poses: {args.poses}")
-    session = generate_synthetic_session(
-        output_path=args.output,
-        poses=args.poses,
-        samples_per_pose=args.samples,
-        randomize=not args.no_randomize
-    )
+    if args.dataset_dir:
+        generate_dataset(
+            args.dataset_dir,
+            num_sessions=args.num_sessions,
+            poses_per_session=args.poses_per_session,
+            samples_per_pose=args.samples,
+            seed=args.seed,
+            max_workers=args.workers,
+            resume=not args.no_resume,
+            overwrite=args.overwrite,
+            output_format=args.format
+        )
+    else:
+        print(f"Generating synthetic session with poses: {args.poses}")
+        session = generate_synthetic_session(
+            output_path=args.output,
+            poses=args.poses,
+            samples_per_pose=args.samples,
+            randomize=not args.no_randomize
+        )
 
-    print(f"Generated {len(session['samples'])} samples")
-    print(f"Labels: {len(session['labels'])}")
+        print(f"Generated {sample_count(session['samples'])} samples")
+        print(f"Labels: {len(session['labels'])}")
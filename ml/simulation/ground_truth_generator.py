@@ -13,15 +13,47 @@ The approach:
 - For each finger configuration, sample from measured distribution
 - Add realistic noise matching observed variance
 - Optionally interpolate between configurations for data augmentation
+
+Signatures are stacked into arrays indexed by code id, and whole sessions
+(every segment and transition) are generated as arrays in one pass and
+only turned into sample dicts at JSON export time.
 """
 
 import json
+import sys
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from datetime import datetime
-import random
+
+# Allow running as a script from the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from ml.simulation.sharding import write_session
+
+FINGERS = ['thumb', 'index', 'middle', 'ring', 'pinky']
+STATE_CODES = {'extended': '0', 'partial': '1', 'flexed': '2'}
+
+# Columns of a generated session, in sample dict order
+SAMPLE_FIELDS = ['mx', 'my', 'mz', 'ax', 'ay', 'az', 'timestamp']
+
+
+def fingers_to_code(fingers: Dict[str, str]) -> str:
+    """Finger state dict -> code string ('0' extended, '1' partial, '2' flexed, '?' unknown)."""
+    return ''.join(STATE_CODES.get(fingers.get(f, 'unknown'), '?') for f in FINGERS)
+
+
+def code_to_fingers(code: str) -> Dict[str, str]:
+    """Code string -> finger state dict (any digit other than 0/1 is 'flexed')."""
+    return {f: 'extended' if c == '0' else ('partial' if c == '1' else 'flexed')
+            for f, c in zip(FINGERS, code)}
+
+
+def samples_from_columns(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Per-sample dicts (mx, my, mz, ax, ay, az, timestamp) from session columns."""
+    lists = [columns[k].tolist() for k in SAMPLE_FIELDS]
+    return [dict(zip(SAMPLE_FIELDS, row)) for row in zip(*lists)]
 
 
 @dataclass
@@ -38,10 +70,17 @@ class FingerSignature:
 
 @dataclass
 class SignatureDatabase:
-    """Database of ground truth finger signatures."""
+    """
+    Database of ground truth finger signatures.
+
+    Signatures are kept per code in ``signatures`` and stacked into arrays
+    indexed by code id (see stacked()) for vectorized sampling; the
+    stacked view is rebuilt whenever the set of signatures changes.
+    """
     signatures: Dict[str, FingerSignature] = field(default_factory=dict)
     baseline_code: str = "00000"
     source_session: Optional[str] = None
+    _stacked: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def add_signature(self, code: str, mean: np.ndarray, std: np.ndarray,
                       n_samples: int, samples: Optional[np.ndarray] = None):
@@ -51,6 +90,40 @@ class SignatureDatabase:
             n_samples=n_samples, samples=samples
         )
 
+    def stacked(self) -> Dict[str, Any]:
+        """
+        Signatures as arrays indexed by code id.
+
+        Returns:
+            Dict with 'codes' (list of K codes), 'code_index' (code -> id),
+            'mean' and 'std' (K, 3), 'n_samples' (K,), 'pool' (M, 3) with all
+            measured samples, and 'pool_start'/'pool_count' (K,) locating each
+            code's samples in the pool (count 0 = sample from the Gaussian)
+        """
+        key = tuple((code, id(sig)) for code, sig in self.signatures.items())
+        if self._stacked is None or self._stacked['key'] != key:
+            sigs = list(self.signatures.values())
+            pooled = [sig.samples if sig.samples is not None and len(sig.samples) > 10
+                      else np.zeros((0, 3)) for sig in sigs]
+            counts = np.array([len(p) for p in pooled], dtype=np.intp)
+            self._stacked = {
+                'key': key,
+                'codes': [sig.code for sig in sigs],
+                'code_index': {code: i for i, code in enumerate(self.signatures)},
+                'mean': np.array([sig.mean for sig in sigs], dtype=np.float64).reshape(-1, 3),
+                'std': np.array([sig.std for sig in sigs], dtype=np.float64).reshape(-1, 3),
+                'n_samples': np.array([sig.n_samples for sig in sigs], dtype=np.intp),
+                'pool': np.concatenate(pooled).astype(np.float64) if sigs else np.zeros((0, 3)),
+                'pool_start': np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp),
+                'pool_count': counts,
+            }
+        return self._stacked
+
+    def code_ids(self, codes: List[str]) -> np.ndarray:
+        """Code ids for a list of codes (-1 for unknown codes)."""
+        index = self.stacked()['code_index']
+        return np.array([index.get(code, -1) for code in codes], dtype=np.intp)
+
     def get_baseline(self) -> np.ndarray:
         """Get baseline field (all fingers extended)."""
         if self.baseline_code in self.signatures:
@@ -65,20 +138,43 @@ class SignatureDatabase:
 
     def sample(self, code: str, n: int = 1) -> np.ndarray:
         """Sample from signature distribution."""
-        if code not in self.signatures:
-            # Unknown configuration - return baseline with extra noise
-            baseline = self.get_baseline()
-            return baseline + np.random.randn(n, 3) * 100  # Higher uncertainty
+        return self.sample_ids(np.full(n, self.code_ids([code])[0]))
 
-        sig = self.signatures[code]
+    def sample_ids(self, code_ids: np.ndarray) -> np.ndarray:
+        """
+        Vectorized sample(): one draw per entry of code_ids.
 
-        if sig.samples is not None and len(sig.samples) > 10:
-            # Sample from actual measurements with replacement
-            indices = np.random.randint(0, len(sig.samples), size=n)
-            return sig.samples[indices]
-        else:
-            # Sample from Gaussian with measured mean/std
-            return np.random.randn(n, 3) * sig.std + sig.mean
+        Codes with more than 10 measured samples are resampled from the
+        measurements (with replacement), others drawn from a Gaussian with
+        the measured mean/std. Unknown codes (id -1) get the baseline with
+        extra noise.
+
+        Args:
+            code_ids: Code ids, shape (N,)
+
+        Returns:
+            Fields, shape (N, 3)
+        """
+        code_ids = np.asarray(code_ids, dtype=np.intp).reshape(-1)
+        arrays = self.stacked()
+        n = len(code_ids)
+
+        # Unknown configuration - baseline with higher uncertainty
+        known = code_ids >= 0
+        mean = np.broadcast_to(self.get_baseline(), (n, 3)).astype(np.float64)
+        std = np.full((n, 3), 100.0)
+        mean[known] = arrays['mean'][code_ids[known]]
+        std[known] = arrays['std'][code_ids[known]]
+        out = np.random.randn(n, 3) * std + mean
+
+        # Sample from actual measurements with replacement
+        counts = np.zeros(n, dtype=np.intp)
+        counts[known] = arrays['pool_count'][code_ids[known]]
+        pooled = counts > 0
+        if pooled.any():
+            offset = (np.random.random_sample(pooled.sum()) * counts[pooled]).astype(np.intp)
+            out[pooled] = arrays['pool'][arrays['pool_start'][code_ids[pooled]] + offset]
+        return out
 
 
 def load_signatures_from_session(session_path: Path) -> SignatureDatabase:
@@ -101,6 +197,7 @@ def load_signatures_from_session(session_path: Path) -> SignatureDatabase:
     mx = np.array([s.get('mx', 0) for s in samples])
     my = np.array([s.get('my', 0) for s in samples])
     mz = np.array([s.get('mz', 0) for s in samples])
+    mag = np.stack([mx, my, mz], axis=1).reshape(-1, 3)
 
     # Build signature database
     db = SignatureDatabase(source_session=session_path.name)
@@ -116,28 +213,19 @@ def load_signatures_from_session(session_path: Path) -> SignatureDatabase:
         fingers = content.get('fingers', {})
 
         # Convert to code
-        code = ''
-        for f in ['thumb', 'index', 'middle', 'ring', 'pinky']:
-            state = fingers.get(f, 'unknown')
-            if state == 'extended':
-                code += '0'
-            elif state == 'partial':
-                code += '1'
-            elif state == 'flexed':
-                code += '2'
-            else:
-                code += '?'
+        code = fingers_to_code(fingers)
 
         if '?' in code or end <= start:
             continue
 
         # Collect samples for this code
-        for i in range(start, min(end, len(mx))):
-            code_samples[code].append([mx[i], my[i], mz[i]])
+        code_samples[code].append(mag[start:min(end, len(mag))])
 
     # Compute statistics for each code
-    for code, samps in code_samples.items():
-        samps = np.array(samps)
+    for code, segments in code_samples.items():
+        samps = np.concatenate(segments)
+        if len(samps) == 0:
+            continue
         db.add_signature(
             code=code,
             mean=np.mean(samps, axis=0),
@@ -213,6 +301,75 @@ class GroundTruthGenerator:
         self.available_codes = list(signature_db.signatures.keys())
         print(f"Generator initialized with {len(self.available_codes)} configurations")
 
+    def _segment_arrays(
+        self,
+        code_ids: np.ndarray,
+        n_samples: int,
+        add_drift: bool = True,
+        add_motion_noise: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Magnetometer and accelerometer arrays for S static segments at once.
+
+        Returns:
+            Tuple of (mag (S, n, 3), accel (S, n, 3))
+        """
+        num_segments = len(code_ids)
+
+        # Sample from signature distribution
+        mag = self.db.sample_ids(np.repeat(code_ids, n_samples)).reshape(num_segments, n_samples, 3)
+
+        # Add temporal correlation (low-pass filter the noise)
+        if add_drift and n_samples:
+            drift = np.cumsum(np.random.randn(num_segments, n_samples, 3) * 0.1, axis=1)
+            drift = drift - drift.mean(axis=1, keepdims=True)  # Zero-mean drift
+            mag = mag + drift * self.noise_scale
+
+        # Add motion-correlated noise
+        if add_motion_noise:
+            # Simulate IMU motion
+            motion_scale = np.random.uniform(0.5, 2.0, size=(num_segments, 1, 1))
+            motion = np.sin(np.linspace(0, 4 * np.pi, n_samples)[None, :, None] +
+                            np.random.randn(num_segments, 1, 3))
+            mag = mag + motion * 50 * motion_scale * self.noise_scale
+
+        # Generate synthetic accelerometer (gravity + small motion)
+        accel = np.random.randn(num_segments, n_samples, 3) * 50 + [0, 0, 8192]  # Gravity
+        return mag, accel
+
+    def _transition_arrays(
+        self,
+        from_ids: np.ndarray,
+        to_ids: np.ndarray,
+        n_samples: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Magnetometer and accelerometer arrays for T transitions at once.
+
+        Returns:
+            Tuple of (mag (T, n, 3), accel (T, n, 3), interpolation weights (n,))
+        """
+        num_transitions = len(from_ids)
+
+        # Sigmoid interpolation for smooth transition
+        t = np.linspace(-3, 3, n_samples)
+        weights = 1 / (1 + np.exp(-t))
+
+        # Sample from both distributions
+        shape = (num_transitions, n_samples, 3)
+        samples_from = self.db.sample_ids(np.repeat(from_ids, n_samples)).reshape(shape)
+        samples_to = self.db.sample_ids(np.repeat(to_ids, n_samples)).reshape(shape)
+
+        # Interpolate
+        w = weights[None, :, None]
+        mag = samples_from * (1 - w) + samples_to * w
+
+        # Add transition noise
+        mag = mag + np.random.randn(*shape) * 200 * np.sin(np.pi * w)
+
+        accel = np.random.randn(*shape) * 100 + [0, 0, 8192]  # More motion during transition
+        return mag, accel, weights
+
     def generate_segment(
         self,
         code: str,
@@ -233,36 +390,15 @@ class GroundTruthGenerator:
             Dict with 'mx', 'my', 'mz', 'ax', 'ay', 'az' arrays
         """
         n_samples = int(duration_sec * self.sample_rate)
-
-        # Sample from signature distribution
-        mag_samples = self.db.sample(code, n_samples)
-
-        # Add temporal correlation (low-pass filter the noise)
-        if add_drift:
-            drift = np.cumsum(np.random.randn(n_samples, 3) * 0.1, axis=0)
-            drift = drift - drift.mean(axis=0)  # Zero-mean drift
-            mag_samples = mag_samples + drift * self.noise_scale
-
-        # Add motion-correlated noise
-        if add_motion_noise:
-            # Simulate IMU motion
-            motion_scale = np.random.uniform(0.5, 2.0)
-            motion = np.sin(np.linspace(0, 4 * np.pi, n_samples)[:, np.newaxis] +
-                          np.random.randn(3))
-            mag_samples = mag_samples + motion * 50 * motion_scale * self.noise_scale
-
-        # Generate synthetic accelerometer (gravity + small motion)
-        ax = np.random.randn(n_samples) * 50 + 0
-        ay = np.random.randn(n_samples) * 50 + 0
-        az = np.random.randn(n_samples) * 50 + 8192  # Gravity
-
+        mag, accel = self._segment_arrays(self.db.code_ids([code]), n_samples,
+                                          add_drift, add_motion_noise)
         return {
-            'mx': mag_samples[:, 0],
-            'my': mag_samples[:, 1],
-            'mz': mag_samples[:, 2],
-            'ax': ax,
-            'ay': ay,
-            'az': az
+            'mx': mag[0, :, 0],
+            'my': mag[0, :, 1],
+            'mz': mag[0, :, 2],
+            'ax': accel[0, :, 0],
+            'ay': accel[0, :, 1],
+            'az': accel[0, :, 2]
         }
 
     def generate_transition(
@@ -278,130 +414,89 @@ class GroundTruthGenerator:
             Tuple of (samples dict, interpolation weights)
         """
         n_samples = int(duration_sec * self.sample_rate)
-
-        # Sigmoid interpolation for smooth transition
-        t = np.linspace(-3, 3, n_samples)
-        weights = 1 / (1 + np.exp(-t))
-
-        # Sample from both distributions
-        samples_from = self.db.sample(code_from, n_samples)
-        samples_to = self.db.sample(code_to, n_samples)
-
-        # Interpolate
-        mag_samples = samples_from * (1 - weights[:, np.newaxis]) + \
-                      samples_to * weights[:, np.newaxis]
-
-        # Add transition noise
-        transition_noise = np.random.randn(n_samples, 3) * 200 * np.sin(np.pi * weights)[:, np.newaxis]
-        mag_samples = mag_samples + transition_noise
-
-        ax = np.random.randn(n_samples) * 100  # More motion during transition
-        ay = np.random.randn(n_samples) * 100
-        az = np.random.randn(n_samples) * 100 + 8192
-
+        mag, accel, weights = self._transition_arrays(
+            self.db.code_ids([code_from]), self.db.code_ids([code_to]), n_samples
+        )
         return {
-            'mx': mag_samples[:, 0],
-            'my': mag_samples[:, 1],
-            'mz': mag_samples[:, 2],
-            'ax': ax,
-            'ay': ay,
-            'az': az
+            'mx': mag[0, :, 0],
+            'my': mag[0, :, 1],
+            'mz': mag[0, :, 2],
+            'ax': accel[0, :, 0],
+            'ay': accel[0, :, 1],
+            'az': accel[0, :, 2]
         }, weights
 
-    def generate_session(
+    def generate_session_columns(
         self,
-        n_segments: int = 20,
+        codes: List[str],
         segment_duration: float = 2.0,
         include_transitions: bool = True,
-        codes: Optional[List[str]] = None
-    ) -> Dict:
+        transition_duration: float = 0.3
+    ) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
         """
-        Generate a complete synthetic session.
+        Generate a session's samples as columns, all segments in one pass.
 
         Args:
-            n_segments: Number of pose segments
+            codes: Finger configuration code per segment
             segment_duration: Duration per segment in seconds
-            include_transitions: Add transitions between poses
-            codes: List of codes to use (random if None)
+            include_transitions: Add transitions between consecutive segments
+            transition_duration: Duration per transition in seconds
 
         Returns:
-            Session dict in SIMCAP format
+            Tuple of (columns: one (N,) array per SAMPLE_FIELDS entry, labels)
         """
-        if codes is None:
-            codes = [random.choice(self.available_codes) for _ in range(n_segments)]
+        num_segments = len(codes)
+        n = int(segment_duration * self.sample_rate)
+        n_trans = int(transition_duration * self.sample_rate) if include_transitions else 0
+        num_transitions = max(num_segments - 1, 0) if n_trans else 0
+
+        code_ids = self.db.code_ids(codes)
+        mag, accel = self._segment_arrays(code_ids, n)
+
+        # Segment i occupies rows [i * block, i * block + n), its transition the next n_trans
+        block = n + n_trans
+        total = num_segments * n + num_transitions * n_trans
+        data = np.empty((total, 6))
+        static_rows = (np.arange(num_segments)[:, None] * block + np.arange(n)).reshape(-1)
+        data[static_rows, :3] = mag.reshape(-1, 3)
+        data[static_rows, 3:] = accel.reshape(-1, 3)
+        if num_transitions:
+            trans_mag, trans_accel, _ = self._transition_arrays(code_ids[:-1], code_ids[1:], n_trans)
+            trans_rows = (np.arange(num_transitions)[:, None] * block + n
+                          + np.arange(n_trans)).reshape(-1)
+            data[trans_rows, :3] = trans_mag.reshape(-1, 3)
+            data[trans_rows, 3:] = trans_accel.reshape(-1, 3)
+
+        columns = {k: data[:, j] for j, k in enumerate(SAMPLE_FIELDS[:6])}
+        columns['timestamp'] = np.arange(total)
 
-        samples = []
         labels = []
-        current_sample = 0
-
         for i, code in enumerate(codes):
-            # Generate segment
-            segment = self.generate_segment(code, segment_duration)
-            n = len(segment['mx'])
-
-            # Create sample dicts
-            for j in range(n):
-                samples.append({
-                    'mx': float(segment['mx'][j]),
-                    'my': float(segment['my'][j]),
-                    'mz': float(segment['mz'][j]),
-                    'ax': float(segment['ax'][j]),
-                    'ay': float(segment['ay'][j]),
-                    'az': float(segment['az'][j]),
-                    'timestamp': current_sample + j
-                })
-
-            # Create label
-            fingers = {
-                'thumb': 'extended' if code[0] == '0' else ('partial' if code[0] == '1' else 'flexed'),
-                'index': 'extended' if code[1] == '0' else ('partial' if code[1] == '1' else 'flexed'),
-                'middle': 'extended' if code[2] == '0' else ('partial' if code[2] == '1' else 'flexed'),
-                'ring': 'extended' if code[3] == '0' else ('partial' if code[3] == '1' else 'flexed'),
-                'pinky': 'extended' if code[4] == '0' else ('partial' if code[4] == '1' else 'flexed'),
-            }
-
+            start = i * block
             labels.append({
-                'start_sample': current_sample,
-                'end_sample': current_sample + n,
+                'start_sample': start,
+                'end_sample': start + n,
                 'labels': {
-                    'fingers': fingers,
+                    'fingers': code_to_fingers(code),
                     'calibration': 'none',
                     'motion': 'static'
                 }
             })
-
-            current_sample += n
-
-            # Add transition to next pose
-            if include_transitions and i < len(codes) - 1:
-                next_code = codes[i + 1]
-                trans, _ = self.generate_transition(code, next_code, 0.3)
-                n_trans = len(trans['mx'])
-
-                for j in range(n_trans):
-                    samples.append({
-                        'mx': float(trans['mx'][j]),
-                        'my': float(trans['my'][j]),
-                        'mz': float(trans['mz'][j]),
-                        'ax': float(trans['ax'][j]),
-                        'ay': float(trans['ay'][j]),
-                        'az': float(trans['az'][j]),
-                        'timestamp': current_sample + j
-                    })
-
+            if i < num_transitions:
                 # Transition label (mark as unlabeled or motion)
                 labels.append({
-                    'start_sample': current_sample,
-                    'end_sample': current_sample + n_trans,
+                    'start_sample': start + n,
+                    'end_sample': start + block,
                     'labels': {
                         'fingers': {},
                         'calibration': 'none',
                         'motion': 'moving'
                     }
                 })
+        return columns, labels
 
-                current_sample += n_trans
-
+    def _session(self, samples: Any, labels: List[Dict], **metadata) -> Dict:
+        """Session dict in SIMCAP format around samples (dicts or columns)."""
         return {
             'version': '2.1',
             'metadata': {
@@ -411,16 +506,69 @@ class GroundTruthGenerator:
                 'generator': 'ground_truth_signature',
                 'source_signatures': self.db.source_session,
                 'generated_at': datetime.now().isoformat(),
-                'n_configurations': len(self.available_codes)
+                'n_configurations': len(self.available_codes),
+                **metadata
             },
             'samples': samples,
             'labels': labels
         }
 
-    def generate_balanced_dataset(
+    def generate_session(
+        self,
+        n_segments: int = 20,
+        segment_duration: float = 2.0,
+        include_transitions: bool = True,
+        codes: Optional[List[str]] = None,
+        columnar: bool = False
+    ) -> Dict:
+        """
+        Generate a complete synthetic session.
+
+        Args:
+            n_segments: Number of pose segments
+            segment_duration: Duration per segment in seconds
+            include_transitions: Add transitions between poses
+            codes: List of codes to use (random if None)
+            columnar: Return 'samples' as per-field arrays (for
+                      write_compact_session) instead of sample dicts
+
+        Returns:
+            Session dict in SIMCAP format
+        """
+        if codes is None:
+            codes = [self.available_codes[i]
+                     for i in np.random.randint(0, len(self.available_codes), size=n_segments)]
+
+        columns, labels = self.generate_session_columns(codes, segment_duration, include_transitions)
+        return self._session(columns if columnar else samples_from_columns(columns), labels)
+
+    def generate_balanced_columns(
         self,
         samples_per_class: int = 500,
         segment_duration: float = 2.0
+    ) -> Tuple[Dict[str, np.ndarray], List[Dict], int]:
+        """
+        Generate every class of a balanced dataset in one pass.
+
+        Classes follow available_codes order, each as segments_per_class
+        consecutive segments without transitions.
+
+        Returns:
+            Tuple of (columns, labels, segments_per_class)
+        """
+        samples_per_segment = int(segment_duration * self.sample_rate)
+        segments_per_class = max(1, samples_per_class // samples_per_segment)
+
+        codes = [code for code in self.available_codes for _ in range(segments_per_class)]
+        columns, labels = self.generate_session_columns(codes, segment_duration,
+                                                        include_transitions=False)
+        return columns, labels, segments_per_class
+
+    def generate_balanced_dataset(
+        self,
+        samples_per_class: int = 500,
+        segment_duration: float = 2.0,
+        columnar: bool = False
     ) -> List[Dict]:
         """
         Generate a balanced dataset with equal samples per configuration.
@@ -428,24 +576,28 @@ class GroundTruthGenerator:
         Args:
             samples_per_class: Target samples per finger configuration
             segment_duration: Duration per segment
+            columnar: Return 'samples' as per-field arrays (see generate_session)
 
         Returns:
-            List of session dicts
+            List of session dicts, one per configuration
         """
-        sessions = []
-
-        samples_per_segment = int(segment_duration * self.sample_rate)
-        segments_per_class = max(1, samples_per_class // samples_per_segment)
+        columns, labels, segments_per_class = self.generate_balanced_columns(
+            samples_per_class, segment_duration
+        )
+        rows = segments_per_class * int(segment_duration * self.sample_rate)
 
-        for code in self.available_codes:
-            session = self.generate_session(
-                n_segments=segments_per_class,
-                segment_duration=segment_duration,
-                include_transitions=False,
-                codes=[code] * segments_per_class
-            )
-            session['metadata']['target_class'] = code
-            sessions.append(session)
+        sessions = []
+        for i, code in enumerate(self.available_codes):
+            start = i * rows
+            class_columns = {k: v[start:start + rows] for k, v in columns.items()}
+            class_columns['timestamp'] = class_columns['timestamp'] - start
+            class_labels = [
+                {**label, 'start_sample': label['start_sample'] - start,
+                 'end_sample': label['end_sample'] - start}
+                for label in labels[i * segments_per_class:(i + 1) * segments_per_class]
+            ]
+            samples = class_columns if columnar else samples_from_columns(class_columns)
+            sessions.append(self._session(samples, class_labels, target_class=code))
 
         print(f"Generated {len(sessions)} sessions with ~{samples_per_class} samples per class")
         return sessions
@@ -453,6 +605,12 @@ class GroundTruthGenerator:
 
 def main():
     """Generate synthetic training data from ground truth signatures."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ground truth signature-based synthetic data')
+    parser.add_argument('--format', choices=['json', 'npz'], default='json',
+                        help='Balanced dataset format: session JSON or compact .session.npz')
+    args = parser.parse_args()
 
     print("=" * 80)
     print("GROUND TRUTH SIGNATURE-BASED SYNTHETIC DATA GENERATOR")
@@ -500,24 +658,8 @@ def main():
     print("GENERATING BALANCED DATASET")
     print("=" * 80)
 
-    sessions = generator.generate_balanced_dataset(samples_per_class=500)
-
-    # Combine into single dataset
-    all_samples = []
-    all_labels = []
-    sample_offset = 0
-
-    for sess in sessions:
-        for sample in sess['samples']:
-            sample['timestamp'] += sample_offset
-            all_samples.append(sample)
-
-        for label in sess['labels']:
-            label['start_sample'] += sample_offset
-            label['end_sample'] += sample_offset
-            all_labels.append(label)
-
-        sample_offset = len(all_samples)
+    columns, all_labels, _ = generator.generate_balanced_columns(samples_per_class=500)
+    total_samples = len(columns['timestamp'])
 
     combined = {
         'version': '2.1',
@@ -530,15 +672,14 @@ def main():
             'samples_per_class': 500,
             'generated_at': datetime.now().isoformat()
         },
-        'samples': all_samples,
+        'samples': columns if args.format == 'npz' else samples_from_columns(columns),
         'labels': all_labels
     }
 
-    output_path = Path('ml/synthetic_balanced_dataset.json')
-    with open(output_path, 'w') as f:
-        json.dump(combined, f)
+    output_path = Path('ml/synthetic_balanced_dataset' + ('.session.npz' if args.format == 'npz' else '.json'))
+    write_session(combined, output_path)
     print(f"\nSaved balanced dataset to: {output_path}")
-    print(f"  Total samples: {len(all_samples)}")
+    print(f"  Total samples: {total_samples}")
     print(f"  Total labels: {len(all_labels)}")
 
     # Summary statistics
@@ -552,18 +693,7 @@ def main():
     for label in all_labels:
         fingers = label['labels'].get('fingers', {})
         if fingers:
-            code = ''
-            for f in ['thumb', 'index', 'middle', 'ring', 'pinky']:
-                state = fingers.get(f, 'unknown')
-                if state == 'extended':
-                    code += '0'
-                elif state == 'partial':
-                    code += '1'
-                elif state == 'flexed':
-                    code += '2'
-                else:
-                    code += '?'
-
+            code = fingers_to_code(fingers)
             n_samples = label['end_sample'] - label['start_sample']
             code_counts[code] += n_samples
 
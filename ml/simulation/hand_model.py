@@ -12,6 +12,7 @@ Coordinate system (right hand, palm down):
 Sensor is assumed to be on the back of the wrist at origin [0, 0, 0].
 """
 
+import copy
 import numpy as np
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
@@ -116,6 +117,22 @@ class HandPose:
         )
 
 
+# Transition easing curves: progress in [0, 1] -> eased progress in [0, 1]
+EASING_FUNCTIONS = {
+    'linear': lambda t: t,
+    'smoothstep': lambda t: t * t * (3 - 2 * t),
+    'cosine': lambda t: 0.5 - 0.5 * np.cos(np.pi * t),
+    'minimum_jerk': lambda t: t ** 3 * (10 - 15 * t + 6 * t * t),
+}
+
+
+def ease(t: np.ndarray, easing: str = 'linear') -> np.ndarray:
+    """Apply a named easing curve (see EASING_FUNCTIONS) to progress values in [0, 1]."""
+    if easing not in EASING_FUNCTIONS:
+        raise ValueError(f"Unknown easing: {easing}. Available: {list(EASING_FUNCTIONS)}")
+    return EASING_FUNCTIONS[easing](t)
+
+
 class HandPoseGenerator:
     """
     Generate kinematically valid hand poses for simulation.
@@ -138,7 +155,8 @@ class HandPoseGenerator:
             sensor_position: Position of wrist sensor. Defaults to origin.
             randomize_geometry: Apply random variation to geometry (±10%)
         """
-        self.geometry = geometry or DEFAULT_FINGER_GEOMETRY.copy()
+        # Deep copy: _randomize_geometry mutates the FingerGeometry objects in place
+        self.geometry = copy.deepcopy(geometry or DEFAULT_FINGER_GEOMETRY)
         self.sensor_position = sensor_position if sensor_position is not None else np.zeros(3)
 
         if randomize_geometry:
@@ -266,59 +284,227 @@ class HandPoseGenerator:
         Returns:
             HandPose for the specified pose
         """
+        states = self._named_pose_states(pose_name)
+        if states is None:
+            # Generate a random pose if unknown
+            states = {f: np.random.choice([FingerState.EXTENDED, FingerState.PARTIAL, FingerState.FLEXED])
+                      for f in self.geometry}
+
+        pose = self.generate_pose(states, noise_mm)
+
+        # Apply close-range modification for high-magnitude poses
+        if pose_name in CLOSE_RANGE_POSES:
+            pose = self._apply_close_range_offset(pose, pose_name)
+
+        return pose
+
+    def _named_pose_states(self, pose_name: str) -> Optional[Dict[str, FingerState]]:
+        """Finger states for a named pose, or None if the name is unknown."""
         all_extended = {f: FingerState.EXTENDED for f in self.geometry}
         all_flexed = {f: FingerState.FLEXED for f in self.geometry}
         all_partial = {f: FingerState.PARTIAL for f in self.geometry}
 
         # Check if pose is in POSE_TEMPLATES
         if pose_name in POSE_TEMPLATES:
-            states = pose_template_to_states(POSE_TEMPLATES[pose_name])
+            return pose_template_to_states(POSE_TEMPLATES[pose_name])
 
         elif pose_name in ('open_palm', 'all_extended'):
-            states = all_extended
+            return all_extended
 
         elif pose_name in ('fist', 'all_flexed'):
-            states = all_flexed
+            return all_flexed
 
         elif pose_name == 'pointing':
             states = all_flexed.copy()
             states['index'] = FingerState.EXTENDED
+            return states
 
         elif pose_name == 'thumbs_up':
             states = all_flexed.copy()
             states['thumb'] = FingerState.EXTENDED
+            return states
 
         elif pose_name == 'peace':
             states = all_flexed.copy()
             states['index'] = FingerState.EXTENDED
             states['middle'] = FingerState.EXTENDED
+            return states
 
         elif pose_name == 'three_fingers':
             states = all_flexed.copy()
             states['index'] = FingerState.EXTENDED
             states['middle'] = FingerState.EXTENDED
             states['ring'] = FingerState.EXTENDED
+            return states
 
         elif pose_name == 'pinch':
             states = all_extended.copy()
             states['thumb'] = FingerState.PARTIAL
             states['index'] = FingerState.PARTIAL
+            return states
 
         elif pose_name == 'rest':
-            states = all_partial
+            return all_partial
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Batch (array) generation
+    # ------------------------------------------------------------------
+
+    @property
+    def fingers(self) -> List[str]:
+        """Finger order used by the batch methods."""
+        return list(self.geometry)
+
+    def fingertip_table(self) -> np.ndarray:
+        """
+        Noise-free fingertip positions for every finger and state.
+
+        Returns:
+            Array of shape (F, len(FingerState), 3), indexed by finger (in
+            self.fingers order) and list(FingerState).index(state)
+        """
+        return np.array([
+            [self.compute_fingertip_position(finger, state, noise_mm=0) for state in FingerState]
+            for finger in self.fingers
+        ])
+
+    def positions_for_states(self, state_indices: np.ndarray,
+                             noise_mm: float = 0.0) -> np.ndarray:
+        """
+        Fingertip positions for many poses at once.
+
+        Args:
+            state_indices: Indices into list(FingerState), shape (N, F)
+            noise_mm: Position noise to add (mm)
+
+        Returns:
+            Positions in mm, shape (N, F, 3)
+        """
+        table = self.fingertip_table()
+        positions = table[np.arange(table.shape[0]), state_indices]
+        if noise_mm > 0:
+            positions = positions + np.random.normal(0, noise_mm, size=positions.shape)
+        return positions
+
+    def static_pose_batch(
+        self,
+        pose_name: str,
+        num_samples: int,
+        noise_mm: float = 0.0,
+        return_anchors: bool = False
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Array version of generate_static_pose for num_samples poses.
+
+        Args:
+            pose_name: Pose name (see POSE_TEMPLATES); unknown names give random poses
+            num_samples: Number of poses
+            noise_mm: Position noise to add (mm)
+            return_anchors: Also return the noise-free positions (for FieldCache)
 
+        Returns:
+            Tuple of (positions (N, F, 3) in mm, state indices (N, F) into
+            list(FingerState)), plus noise-free anchors (N, F, 3) if requested
+        """
+        state_list = list(FingerState)
+        states = self._named_pose_states(pose_name)
+        if states is None:
+            # Random pose per sample if unknown
+            choices = np.array([state_list.index(s) for s in
+                                (FingerState.EXTENDED, FingerState.PARTIAL, FingerState.FLEXED)])
+            state_indices = choices[np.random.randint(0, 3, size=(num_samples, len(self.fingers)))]
         else:
-            # Generate a random pose if unknown
-            states = {f: np.random.choice([FingerState.EXTENDED, FingerState.PARTIAL, FingerState.FLEXED])
-                      for f in self.geometry}
+            row = [state_list.index(states.get(f, FingerState.EXTENDED)) for f in self.fingers]
+            state_indices = np.tile(row, (num_samples, 1))
 
-        pose = self.generate_pose(states, noise_mm)
+        anchors = self.positions_for_states(state_indices)
+        positions = anchors
+        if noise_mm > 0:
+            positions = anchors + np.random.normal(0, noise_mm, size=anchors.shape)
 
         # Apply close-range modification for high-magnitude poses
         if pose_name in CLOSE_RANGE_POSES:
-            pose = self._apply_close_range_offset(pose, pose_name)
+            offset_scale = 0.75 if pose_name == 'fist_tight' else 0.80
+            positions = self._close_range_positions(positions, offset_scale)
+            anchors = self._close_range_positions(anchors, offset_scale)
+
+        if return_anchors:
+            return positions, state_indices, anchors
+        return positions, state_indices
+
+    @staticmethod
+    def _close_range_positions(positions: np.ndarray, offset_scale: float) -> np.ndarray:
+        """Array version of _apply_close_range_offset."""
+        positions = positions * offset_scale
+        positions[..., 2] = positions[..., 2] * 0.9 - 3
+        return positions
+
+    def transition_batch(
+        self,
+        start_states: Dict[str, FingerState],
+        end_states: Dict[str, FingerState],
+        num_frames: int = 10,
+        noise_mm: float = 0.0,
+        easing: str = 'linear',
+        timing_jitter: float = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Array version of generate_transition.
 
-        return pose
+        Each finger moves from its start to its end fingertip position along
+        an easing curve. With timing_jitter, every finger starts up to that
+        fraction of the transition late and finishes up to that fraction
+        early (drawn per finger), so fingers don't move in lockstep.
+
+        Args:
+            start_states: Initial finger states
+            end_states: Final finger states
+            num_frames: Number of frames
+            noise_mm: Position noise (mm)
+            easing: Progress curve, see EASING_FUNCTIONS
+            timing_jitter: Max per-finger onset delay / early finish, in [0, 0.5)
+
+        Returns:
+            Tuple of (positions (N, F, 3) in mm, state indices (N, F) into
+            list(FingerState))
+        """
+        if not 0.0 <= timing_jitter < 0.5:
+            raise ValueError(f"timing_jitter must be in [0, 0.5), got {timing_jitter}")
+
+        state_list = list(FingerState)
+        table = self.fingertip_table()
+        num_fingers = len(self.fingers)
+        finger_idx = np.arange(num_fingers)
+        start_idx = np.array([state_list.index(start_states[f]) for f in self.fingers])
+        end_idx = np.array([state_list.index(end_states[f]) for f in self.fingers])
+        start_pos = table[finger_idx, start_idx]
+        end_pos = table[finger_idx, end_idx]
+
+        t = np.arange(num_frames) / (num_frames - 1) if num_frames > 1 else np.zeros(num_frames)
+
+        # Per-finger progress through the transition, shape (N, F)
+        if timing_jitter > 0:
+            onset = np.random.uniform(0, timing_jitter, size=num_fingers)
+            finish = 1 - np.random.uniform(0, timing_jitter, size=num_fingers)
+            progress = np.clip((t[:, None] - onset) / (finish - onset), 0.0, 1.0)
+        else:
+            progress = np.repeat(t[:, None], num_fingers, axis=1)
+        progress = ease(progress, easing)
+
+        # Interpolate positions
+        positions = start_pos[None] + progress[:, :, None] * (end_pos - start_pos)[None]
+        if noise_mm > 0:
+            positions = positions + np.random.normal(0, noise_mm, size=positions.shape)
+
+        # Determine state at each frame
+        state_indices = np.where(
+            progress < 0.33, start_idx[None],
+            np.where(progress > 0.67, end_idx[None], state_list.index(FingerState.PARTIAL))
+        )
+
+        return positions, state_indices
 
     def _apply_close_range_offset(self, pose: HandPose, pose_name: str) -> HandPose:
         """
@@ -350,54 +536,38 @@ class HandPoseGenerator:
         start_states: Dict[str, FingerState],
         end_states: Dict[str, FingerState],
         num_frames: int = 10,
-        noise_mm: float = 0.0
+        noise_mm: float = 0.0,
+        easing: str = 'linear',
+        timing_jitter: float = 0.0
     ) -> List[HandPose]:
         """
         Generate smooth transition between two poses.
 
-        Uses linear interpolation of fingertip positions.
+        Interpolates fingertip positions (linearly by default); see
+        transition_batch, which returns the same transition as arrays.
 
         Args:
             start_states: Initial finger states
             end_states: Final finger states
             num_frames: Number of intermediate frames
             noise_mm: Position noise (mm)
+            easing: Progress curve, see EASING_FUNCTIONS
+            timing_jitter: Max per-finger onset delay / early finish, in [0, 0.5)
 
         Returns:
             List of HandPose objects for the transition
         """
-        start_pose = self.generate_pose(start_states, noise_mm=0)
-        end_pose = self.generate_pose(end_states, noise_mm=0)
+        positions, state_indices = self.transition_batch(
+            start_states, end_states, num_frames, noise_mm, easing, timing_jitter
+        )
 
+        state_list = list(FingerState)
         poses = []
         for i in range(num_frames):
-            t = i / (num_frames - 1) if num_frames > 1 else 0
-
-            # Interpolate positions
-            positions = {}
-            for finger in self.geometry:
-                start_pos = start_pose.fingertip_positions[finger]
-                end_pos = end_pose.fingertip_positions[finger]
-                positions[finger] = start_pos + t * (end_pos - start_pos)
-
-                # Add noise
-                if noise_mm > 0:
-                    positions[finger] += np.random.normal(0, noise_mm, size=3)
-
-            # Determine state at this frame
-            states = {}
-            for finger in self.geometry:
-                if t < 0.33:
-                    states[finger] = start_states[finger]
-                elif t > 0.67:
-                    states[finger] = end_states[finger]
-                else:
-                    states[finger] = FingerState.PARTIAL
-
             poses.append(HandPose(
-                finger_states=states,
-                fingertip_positions=positions,
-                timestamp=t
+                finger_states={f: state_list[k] for f, k in zip(self.fingers, state_indices[i])},
+                fingertip_positions=dict(zip(self.fingers, positions[i])),
+                timestamp=i / (num_frames - 1) if num_frames > 1 else 0
             ))
 
         return poses
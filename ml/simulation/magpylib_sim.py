@@ -8,6 +8,9 @@ Magpylib provides:
 - Exact solutions for common magnet shapes
 - Fast vectorized numpy operations
 - Support for arbitrary magnet positions and orientations
+
+With use_field_grid=True, fields are interpolated from precomputed per-magnet
+grids (see field_grid) instead of evaluated exactly.
 """
 
 import numpy as np
@@ -21,6 +24,8 @@ except ImportError:
     HAS_MAGPYLIB = False
     magpy = None
 
+from .field_grid import FieldGrid
+
 
 @dataclass
 class MagnetSpec:
@@ -52,7 +57,9 @@ class MagpylibSimulator:
     def __init__(
         self,
         magnet_specs: Optional[Dict[str, MagnetSpec]] = None,
-        sensor_position_mm: Tuple[float, float, float] = (0, 0, 0)
+        sensor_position_mm: Tuple[float, float, float] = (0, 0, 0),
+        use_field_grid: bool = False,
+        field_grid_options: Optional[Dict] = None
     ):
         """
         Initialize the Magpylib simulator.
@@ -60,6 +67,10 @@ class MagpylibSimulator:
         Args:
             magnet_specs: Dict mapping finger names to MagnetSpec objects
             sensor_position_mm: Position of the magnetometer sensor (mm)
+            use_field_grid: Interpolate fields from precomputed per-magnet grids
+                            (built once and cached on disk, see field_grid)
+            field_grid_options: Extra FieldGrid arguments (method, spacing_mm,
+                                extent_mm, min_distance_mm, grid_dir)
         """
         if not HAS_MAGPYLIB:
             raise ImportError("Magpylib not installed. Run: pip install magpylib")
@@ -73,6 +84,17 @@ class MagpylibSimulator:
         # Create magnet objects (will be positioned later)
         self.magnets = self._create_magnets()
 
+        self.field_grids = None
+        if use_field_grid:
+            self.field_grids = {
+                finger: FieldGrid.for_spec(spec, **(field_grid_options or {}))
+                for finger, spec in self.magnet_specs.items()
+            }
+
+    def _grid_field(self, finger: str, positions_mm: np.ndarray) -> np.ndarray:
+        """Interpolated field of one finger's magnet at positions (..., 3) mm, in μT."""
+        return self.field_grids[finger].evaluate(self.sensor_position_mm - positions_mm)
+
     def _create_magnets(self) -> Dict[str, 'magpy.magnet.Cylinder']:
         """Create Magpylib cylinder magnets for each finger."""
         magnets = {}
@@ -117,13 +139,77 @@ class MagpylibSimulator:
             if finger in self.magnets:
                 self.magnets[finger].position = position
 
-        # Compute field from all magnets (sum individually to avoid collection parent issues)
-        B_mT = np.zeros(3)
-        for magnet in self.magnets.values():
-            B_mT = B_mT + self.sensor.getB(magnet)
+        if self.field_grids is not None:
+            B_ut = np.zeros(3)
+            for finger, magnet in self.magnets.items():
+                B_ut = B_ut + self._grid_field(finger, np.asarray(magnet.position, dtype=np.float64))
+        else:
+            # Compute field from all magnets (sum individually to avoid collection parent issues)
+            B_mT = np.zeros(3)
+            for magnet in self.magnets.values():
+                B_mT = B_mT + self.sensor.getB(magnet)
+
+            # Convert mT to μT
+            B_ut = B_mT * 1000.0
+
+        # Add Earth field if requested
+        if include_earth:
+            B_ut = B_ut + earth_field_ut
+
+        return B_ut
+
+    def compute_field_batch(
+        self,
+        positions_mm: np.ndarray,
+        fingers: List[str],
+        include_earth: bool = True,
+        earth_field_ut: np.ndarray = np.array([16.0, 0.0, 47.8])
+    ) -> np.ndarray:
+        """
+        Vectorized compute_field for N hand poses in one Magpylib call.
+
+        Each magnet is given an N-step path and the field is evaluated with a
+        single path-based getB.
+
+        Args:
+            positions_mm: Magnet positions, shape (N, F, 3) in mm
+            fingers: Finger name for each of the F columns
+            include_earth: Include Earth's magnetic field
+            earth_field_ut: Earth field in μT, shape (3,) or (N, 3)
+
+        Returns:
+            Total magnetic field at sensor in μT, shape (N, 3)
+        """
+        positions_mm = np.asarray(positions_mm, dtype=np.float64)
+        num_samples = len(positions_mm)
+        if num_samples == 0:
+            return np.zeros((0, 3))
+
+        if self.field_grids is not None:
+            B_ut = np.zeros((num_samples, 3))
+            for j, finger in enumerate(fingers):
+                if finger in self.magnets:
+                    B_ut += self._grid_field(finger, positions_mm[:, j])
+                    self.magnets[finger].position = positions_mm[-1, j]
+            if include_earth:
+                B_ut = B_ut + earth_field_ut
+            return B_ut
+
+        placed = []
+        for j, finger in enumerate(fingers):
+            if finger in self.magnets:
+                self.magnets[finger].position = positions_mm[:, j]
+                placed.append((finger, j))
+
+        try:
+            B_mT = magpy.getB(list(self.magnets.values()), self.sensor, sumup=True)
+        finally:
+            # Collapse paths so single-pose compute_field keeps working
+            for finger, j in placed:
+                self.magnets[finger].position = positions_mm[-1, j]
 
         # Convert mT to μT
-        B_ut = B_mT * 1000.0
+        B_ut = np.asarray(B_mT).reshape(num_samples, 3) * 1000.0
 
         # Add Earth field if requested
         if include_earth:
@@ -131,6 +217,32 @@ class MagpylibSimulator:
 
         return B_ut
 
+    def compute_finger_field(self, finger: str, positions_mm: np.ndarray) -> np.ndarray:
+        """
+        Field of a single finger's magnet at K positions (one path-based getB).
+
+        Args:
+            finger: Finger name
+            positions_mm: Magnet positions, shape (K, 3) in mm
+
+        Returns:
+            Magnet field at sensor in μT, shape (K, 3) (no Earth field)
+        """
+        positions_mm = np.asarray(positions_mm, dtype=np.float64).reshape(-1, 3)
+        if finger not in self.magnets or len(positions_mm) == 0:
+            return np.zeros((len(positions_mm), 3))
+        if self.field_grids is not None:
+            return self._grid_field(finger, positions_mm)
+
+        magnet = self.magnets[finger]
+        magnet.position = positions_mm
+        try:
+            B_mT = magpy.getB(magnet, self.sensor)
+        finally:
+            magnet.position = positions_mm[-1]
+
+        return np.asarray(B_mT).reshape(len(positions_mm), 3) * 1000.0
+
     def compute_field_grid(
         self,
         finger_positions_mm: Dict[str, np.ndarray],
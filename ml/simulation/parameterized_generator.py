@@ -27,11 +27,9 @@ Author: Physics Simulation Data Generation Task
 Date: 2025-01-01
 """
 
-import json
 import numpy as np
 from datetime import datetime
-from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from typing import Dict, List, Optional, Tuple, Union
 from enum import Enum
 
@@ -45,6 +43,8 @@ from .hand_model import (
     POSE_TEMPLATES, pose_template_to_states
 )
 from .sensor_model import MMC5603Simulator, IMUSimulator, SensorCharacteristics
+from .field_cache import FieldCache, dipole_finger_field
+from .generator import random_rotation_matrices
 
 
 # ============================================================================
@@ -202,6 +202,21 @@ class HandMagnetSetup:
             for finger in ['thumb', 'index', 'middle', 'ring', 'pinky']
         }
 
+    def to_dict(self) -> Dict:
+        """Serializable form (see from_dict)."""
+        fingers = ['thumb', 'index', 'middle', 'ring', 'pinky']
+        return {
+            'magnets': {f: asdict(self.get_config(f)) for f in fingers},
+            'attachment_offsets': {f: np.asarray(v).tolist() for f, v in self.attachment_offsets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HandMagnetSetup':
+        """Create from to_dict() output."""
+        magnets = {f: MagnetConfig(**cfg) for f, cfg in data['magnets'].items()}
+        offsets = {f: np.array(v, dtype=float) for f, v in data['attachment_offsets'].items()}
+        return cls(attachment_offsets=offsets, **magnets)
+
     def summary(self) -> str:
         cfg = self.thumb  # Assume uniform
         total_moment = sum(
@@ -237,6 +252,8 @@ class ParameterizedGenerator:
         randomize_geometry: bool = True,
         randomize_sensor: bool = True,
         sensor_noise_ut: float = None,
+        use_field_cache: bool = False,
+        field_cache_max_offset_mm: Optional[float] = None,
     ):
         """
         Initialize parameterized generator.
@@ -248,6 +265,10 @@ class ParameterizedGenerator:
             randomize_geometry: Apply random hand geometry variation
             randomize_sensor: Apply random sensor characteristics
             sensor_noise_ut: Override sensor noise level (μT RMS)
+            use_field_cache: Linearize static-pose batches around cached
+                             per-finger fields (see field_cache)
+            field_cache_max_offset_mm: Fingertip offset beyond which cached
+                                       samples fall back to exact evaluation
         """
         self.magnet_setup = magnet_setup
         self.earth_field = earth_field if earth_field is not None else EARTH_FIELD_EDINBURGH
@@ -268,6 +289,12 @@ class ParameterizedGenerator:
         # Legacy format for existing dipole functions
         self._legacy_config = magnet_setup.to_legacy_format()
 
+        self._finger_field = dipole_finger_field(self._legacy_config)
+        self.field_cache = None
+        if use_field_cache:
+            self.field_cache = FieldCache(self._finger_field, spec=self._legacy_config,
+                                          max_offset_mm=field_cache_max_offset_mm)
+
     @classmethod
     def current_setup(cls, **kwargs) -> 'ParameterizedGenerator':
         """Create generator with current production magnet setup."""
@@ -366,14 +393,30 @@ class ParameterizedGenerator:
         pose_name: str,
         num_samples: int,
         position_noise_mm: float = 1.0,
-        start_index: int = 0
+        start_index: int = 0,
+        batch: bool = True
     ) -> Tuple[List[Dict], Dict]:
-        """Generate samples for a static pose."""
-        samples = []
-        for i in range(num_samples):
-            pose = self.hand_generator.generate_static_pose(pose_name, position_noise_mm)
-            sample = self.generate_sample(pose, start_index + i)
-            samples.append(sample)
+        """
+        Generate samples for a static pose.
+
+        Args:
+            pose_name: Pose template name
+            num_samples: Number of samples
+            position_noise_mm: Fingertip position noise (mm)
+            start_index: Sample index of the first sample (for timing)
+            batch: Simulate the segment in one vectorized pass
+                   (generate_static_batch); False uses generate_sample per sample
+        """
+        if batch:
+            columns = self.generate_static_batch(pose_name, num_samples, position_noise_mm,
+                                                 start_index=start_index, include_imu=True)
+            samples = self.samples_from_columns(columns)
+        else:
+            samples = []
+            for i in range(num_samples):
+                pose = self.hand_generator.generate_static_pose(pose_name, position_noise_mm)
+                sample = self.generate_sample(pose, start_index + i)
+                samples.append(sample)
 
         pose_template = POSE_TEMPLATES.get(pose_name, {})
         finger_states = pose_template_to_states(pose_template) if pose_template else {}
@@ -390,12 +433,97 @@ class ParameterizedGenerator:
         }
         return samples, label
 
+    def generate_static_batch(
+        self,
+        pose_name: str,
+        num_samples: int,
+        position_noise_mm: float = 1.0,
+        add_orientation_variation: bool = True,
+        start_index: int = 0,
+        include_imu: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Array version of generate_static_samples.
+
+        Args:
+            pose_name: Pose template name
+            num_samples: Number of samples
+            position_noise_mm: Fingertip position noise (mm)
+            add_orientation_variation: Random device orientation per sample
+            start_index: Sample index of the first row (for 't', with include_imu)
+            include_imu: Also simulate IMU columns and timing, as needed for
+                         full samples (samples_from_columns)
+
+        Returns:
+            Dict of magnetometer columns (mx, ..., mz_ut, as MMC5603Simulator.measure_batch)
+            plus 'true_field' (N, 3) μT and 'finger_states' (N, F) indices into list(FingerState).
+            With include_imu, also the IMU columns (IMUSimulator.measure_static_batch) and 't'.
+        """
+        fingers = self.hand_generator.fingers
+        positions, states, anchors = self.hand_generator.static_pose_batch(
+            pose_name, num_samples, position_noise_mm, return_anchors=True
+        )
+
+        if add_orientation_variation:
+            earth = np.einsum('nij,j->ni', random_rotation_matrices(num_samples), self.earth_field)
+        else:
+            earth = np.asarray(self.earth_field, dtype=np.float64)
+
+        if self.field_cache is not None:
+            B = self.field_cache.fields(fingers, anchors, positions)
+        else:
+            B = sum(self._finger_field(f, positions[:, j]) for j, f in enumerate(fingers))
+        true_field = B + earth
+
+        columns = {}
+        if include_imu:
+            columns.update(self.imu_sensor.measure_static_batch(num_samples))
+        columns.update({k: v for k, v in self.mag_sensor.measure_batch(true_field).items()
+                        if not k.startswith('_')})
+        if include_imu:
+            columns['t'] = (start_index + np.arange(num_samples)) * (1.0 / self.sample_rate) * 1000
+        columns['true_field'] = true_field
+        columns['finger_states'] = states
+        return columns
+
+    def samples_from_columns(self, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Build sample dicts (as generate_sample) from generate_static_batch(include_imu=True) columns."""
+        fingers = self.hand_generator.fingers
+        state_values = np.array([state.value for state in FingerState])
+        dt = 1.0 / self.sample_rate
+
+        keys = ['ax', 'ay', 'az', 'gx', 'gy', 'gz',
+                'ax_g', 'ay_g', 'az_g', 'gx_dps', 'gy_dps', 'gz_dps',
+                'isMoving', 'accelStd', 'gyroStd',
+                'mx', 'my', 'mz', 'mx_ut', 'my_ut', 'mz_ut']
+        lists = {k: columns[k].tolist() for k in keys + ['t']}
+        true_fields = columns['true_field'].tolist()
+        finger_states = state_values[columns['finger_states']].tolist()
+
+        samples = []
+        for i in range(len(lists['t'])):
+            sample = {k: lists[k][i] for k in keys}
+            sample.update({
+                'dt': dt,
+                't': lists['t'][i],
+                'filtered_mx': lists['mx_ut'][i],
+                'filtered_my': lists['my_ut'][i],
+                'filtered_mz': lists['mz_ut'][i],
+                '_ground_truth': {
+                    'finger_states': dict(zip(fingers, finger_states[i])),
+                    'true_field': true_fields[i]
+                }
+            })
+            samples.append(sample)
+        return samples
+
     def generate_session(
         self,
         poses: List[str] = None,
         samples_per_pose: int = 500,
         include_transitions: bool = True,
-        position_noise_mm: float = 1.0
+        position_noise_mm: float = 1.0,
+        batch: bool = True
     ) -> Dict:
         """
         Generate a complete synthetic session.
@@ -405,6 +533,8 @@ class ParameterizedGenerator:
             samples_per_pose: Samples per static pose
             include_transitions: Include transition samples between poses
             position_noise_mm: Fingertip position noise (mm)
+            batch: Simulate each pose segment in one vectorized pass
+                   (see generate_static_samples)
 
         Returns:
             Session dict in SIMCAP v2.1 format
@@ -418,7 +548,7 @@ class ParameterizedGenerator:
 
         for pose in poses:
             samples, label = self.generate_static_samples(
-                pose, samples_per_pose, position_noise_mm, current_index
+                pose, samples_per_pose, position_noise_mm, current_index, batch=batch
             )
             all_samples.extend(samples)
             all_labels.append(label)
@@ -480,7 +610,8 @@ class ParameterizedGenerator:
 
 def compare_magnet_setups(
     setups: List[Tuple[str, HandMagnetSetup]],
-    num_samples: int = 500
+    num_samples: int = 500,
+    use_field_cache: bool = False
 ) -> Dict:
     """
     Compare field distributions from different magnet setups.
@@ -488,6 +619,8 @@ def compare_magnet_setups(
     Args:
         setups: List of (name, HandMagnetSetup) tuples
         num_samples: Samples to generate per setup
+        use_field_cache: Linearize around cached nominal fields (see field_cache);
+                         faster, but the fields are a first-order approximation
 
     Returns:
         Comparison results
@@ -495,17 +628,16 @@ def compare_magnet_setups(
     results = []
 
     for name, setup in setups:
-        gen = ParameterizedGenerator(setup, randomize_geometry=True, randomize_sensor=False)
+        gen = ParameterizedGenerator(setup, randomize_geometry=True, randomize_sensor=False,
+                                     use_field_cache=use_field_cache)
 
         # Generate samples across poses
         magnitudes = []
         for pose_name in ['open_palm', 'fist', 'pointing']:
-            samples, _ = gen.generate_static_samples(pose_name, num_samples // 3)
-            for s in samples:
-                mag = np.sqrt(s['mx_ut']**2 + s['my_ut']**2 + s['mz_ut']**2)
-                magnitudes.append(mag)
+            columns = gen.generate_static_batch(pose_name, num_samples // 3)
+            magnitudes.append(np.sqrt(columns['mx_ut']**2 + columns['my_ut']**2 + columns['mz_ut']**2))
 
-        mags = np.array(magnitudes)
+        mags = np.concatenate(magnitudes)
         expected = gen.expected_field_range()
 
         results.append({
@@ -523,63 +655,87 @@ def compare_magnet_setups(
     return {'comparison': results}
 
 
+def _training_session_task(index: int, params: Dict) -> Dict:
+    """generate_shards task: one randomized session for generate_training_dataset."""
+    magnet_setup = HandMagnetSetup.from_dict(params['magnet_setup'])
+
+    # Random pose selection
+    all_poses = list(POSE_TEMPLATES.keys())
+    poses = [str(p) for p in np.random.choice(all_poses, size=params['poses_per_session'], replace=False)]
+
+    # New generator with randomization for each session
+    gen = ParameterizedGenerator(
+        magnet_setup,
+        randomize_geometry=True,
+        randomize_sensor=True
+    )
+
+    return gen.generate_session(
+        poses=poses,
+        samples_per_pose=params['samples_per_pose']
+    )
+
+
 def generate_training_dataset(
     output_dir: str,
     magnet_setup: HandMagnetSetup = None,
     num_sessions: int = 100,
     poses_per_session: int = 6,
-    samples_per_pose: int = 400
+    samples_per_pose: int = 400,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = 1,
+    resume: bool = True,
+    output_format: str = 'json',
+    overwrite: bool = False
 ) -> List[str]:
     """
     Generate a complete training dataset.
 
+    Sessions are sharded (across a process pool with max_workers > 1) with
+    per-session RNG streams derived from the master seed (see sharding.generate_shards): the output is
+    the same for any worker count, and interrupted runs resume by skipping
+    sessions already written.
+
     Args:
         output_dir: Output directory
         magnet_setup: Magnet configuration (default: current setup)
         num_sessions: Number of sessions to generate
         poses_per_session: Poses per session
         samples_per_pose: Samples per pose
+        seed: Master seed (default: reuse the directory's manifest, else random)
+        max_workers: Worker processes (default 1 = serial; None = all cores)
+        resume: Skip sessions already present in output_dir
+        output_format: 'json' (SIMCAP v2.1) or 'npz' (compact .session.npz,
+                       see ml.session_npz)
+        overwrite: Regenerate everything if output_dir was generated with a
+                   different seed or parameters (otherwise ValueError)
 
     Returns:
         List of generated file paths
     """
+    from .sharding import generate_shards, shard_filename_pattern
+
     if magnet_setup is None:
         magnet_setup = HandMagnetSetup.current_setup()
 
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    all_poses = list(POSE_TEMPLATES.keys())
-    generated = []
-
-    for i in range(num_sessions):
-        # Random pose selection
-        poses = list(np.random.choice(all_poses, size=poses_per_session, replace=False))
-
-        # New generator with randomization for each session
-        gen = ParameterizedGenerator(
-            magnet_setup,
-            randomize_geometry=True,
-            randomize_sensor=True
-        )
-
-        session = gen.generate_session(
-            poses=poses,
-            samples_per_pose=samples_per_pose
-        )
-
-        filename = f"synthetic_{magnet_setup.thumb.grade}_{i:04d}.json"
-        filepath = output_path / filename
-
-        with open(filepath, 'w') as f:
-            json.dump(session, f)
-
-        generated.append(str(filepath))
-
-        if (i + 1) % 10 == 0:
-            print(f"Generated {i + 1}/{num_sessions} sessions")
+    generated = generate_shards(
+        output_dir,
+        _training_session_task,
+        num_sessions,
+        params={
+            'magnet_setup': magnet_setup.to_dict(),
+            'poses_per_session': poses_per_session,
+            'samples_per_pose': samples_per_pose
+        },
+        filename_pattern=shard_filename_pattern(
+            f"synthetic_{magnet_setup.thumb.grade}_{{index:04d}}", output_format
+        ),
+        seed=seed,
+        max_workers=max_workers,
+        resume=resume,
+        overwrite=overwrite
+    )
 
-    print(f"Generated {len(generated)} sessions in {output_dir}")
     print(f"Magnet setup: {magnet_setup.summary()}")
     return generated
 
@@ -606,6 +762,18 @@ def main():
                         help='Magnet grade (N35-N52)')
     parser.add_argument('--num-sessions', '-n', type=int, default=100,
                         help='Number of sessions to generate')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Master seed (default: resume seed or random)')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                        help='Worker processes (default: 1, serial)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Regenerate sessions that already exist in the output directory')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Regenerate the output directory if it was made with another seed/params')
+    parser.add_argument('--format', choices=['json', 'npz'], default='json',
+                        help='Session file format (npz = compact columnar)')
+    parser.add_argument('--field-cache', action='store_true',
+                        help='Use the linearized field cache for --compare (faster, approximate)')
 
     args = parser.parse_args()
 
@@ -622,7 +790,8 @@ def main():
         ]
 
         print("\nGenerating samples for each configuration...")
-        results = compare_magnet_setups(setups, num_samples=600)
+        results = compare_magnet_setups(setups, num_samples=600,
+                                        use_field_cache=args.field_cache)
 
         print("\nResults:")
         print(f"{'Name':20s} {'P50 (μT)':10s} {'P95 (μT)':10s} {'SNR':8s}")
@@ -641,7 +810,12 @@ def main():
         generate_training_dataset(
             args.output_dir,
             magnet_setup=setup,
-            num_sessions=args.num_sessions
+            num_sessions=args.num_sessions,
+            seed=args.seed,
+            max_workers=args.workers,
+            resume=not args.no_resume,
+            overwrite=args.overwrite,
+            output_format=args.format
         )
 
 
@@ -29,6 +29,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import glob
 
+from ..session_arrays import iter_session_arrays
+
 
 # ============================================================================
 # PHYSICAL CONSTANTS AND MAGNET SPECIFICATIONS
@@ -207,12 +209,16 @@ def compute_snr(
 # REAL DATA LOADING AND ANALYSIS
 # ============================================================================
 
-def load_real_sessions(data_dir: str = 'data/GAMBIT') -> List[Dict]:
+def load_real_sessions(data_dir: str = 'data/GAMBIT', use_cache: bool = True) -> List[Dict]:
     """
     Load real sensor data sessions from disk.
 
+    Sessions are read through ml.session_arrays, so repeat runs memory-map
+    cached µT arrays instead of re-parsing the session JSON.
+
     Args:
         data_dir: Path to GAMBIT session directory
+        use_cache: Read/write the on-disk session cache
 
     Returns:
         List of session data dicts with parsed magnetometer values
@@ -223,46 +229,17 @@ def load_real_sessions(data_dir: str = 'data/GAMBIT') -> List[Dict]:
         # Try relative to script location
         data_path = Path(__file__).parent.parent.parent / data_dir
 
-    session_files = list(data_path.glob('*.json'))
     sessions = []
-
-    for f in sorted(session_files):
-        try:
-            with open(f, 'r') as file:
-                data = json.load(file)
-
-            if 'samples' not in data or len(data['samples']) < 50:
-                continue
-
-            samples = data['samples']
-            mag_vectors = []
-
-            for s in samples:
-                if 'mx_ut' in s:
-                    mx, my, mz = s.get('mx_ut', 0), s.get('my_ut', 0), s.get('mz_ut', 0)
-                elif 'mx' in s:
-                    # Convert from LSB: 1024 LSB/Gauss = 10.24 LSB/μT
-                    mx = s.get('mx', 0) / 10.24
-                    my = s.get('my', 0) / 10.24
-                    mz = s.get('mz', 0) / 10.24
-                else:
-                    continue
-
-                mag_vectors.append([mx, my, mz])
-
-            if len(mag_vectors) > 50:
-                mag_array = np.array(mag_vectors)
-                sessions.append({
-                    'filename': f.name,
-                    'n_samples': len(mag_vectors),
-                    'mag_vectors': mag_array,
-                    'magnitudes': np.linalg.norm(mag_array, axis=1),
-                    'labels': data.get('labels', []),
-                    'metadata': data.get('metadata', {})
-                })
-        except Exception as e:
-            print(f"Error loading {f.name}: {e}")
-            continue
+    for session in iter_session_arrays(data_path, min_samples=51, use_cache=use_cache):
+        mag_array = np.asarray(session.mag_ut)[session.mag_valid]
+        sessions.append({
+            'filename': session.filename,
+            'n_samples': len(mag_array),
+            'mag_vectors': mag_array,
+            'magnitudes': np.linalg.norm(mag_array, axis=1),
+            'labels': session.labels or [],
+            'metadata': session.metadata or {}
+        })
 
     return sessions
 
@@ -51,7 +51,7 @@ class MMC5603Simulator:
     Simulate MMC5603NJ magnetometer readings.
 
     This class adds realistic sensor effects to ideal magnetic field values:
-    1. Hard iron bias (constant offset)
+    1. Hard iron bias (constant offset, optionally drifting over time)
     2. Soft iron distortion (axis scaling/rotation)
     3. Gaussian noise
     4. Quantization
@@ -83,8 +83,9 @@ class MMC5603Simulator:
         self._bias_ut = bias_ut if bias_ut is not None else self.chars.bias_ut.copy()
         self._soft_iron = soft_iron if soft_iron is not None else self.chars.soft_iron_matrix.copy()
 
-        # Time tracking for drift
+        # Time tracking for drift: bias random walk state carried across calls
         self._elapsed_time = 0.0
+        self._drift_ut = np.zeros(3)
 
     def randomize_parameters(
         self,
@@ -209,34 +210,144 @@ class MMC5603Simulator:
             '_quantized': quantize
         }
 
+    def measure_batch(
+        self,
+        true_fields_ut: np.ndarray,
+        add_noise: bool = True,
+        add_bias: bool = True,
+        add_soft_iron: bool = True,
+        quantize: bool = True,
+        drift_ut: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized measure() for many field vectors at once.
+
+        Args:
+            true_fields_ut: True magnetic field vectors, shape (N, 3) in μT
+            add_noise, add_bias, add_soft_iron, quantize: As for measure()
+            drift_ut: Optional per-sample bias drift, shape (N, 3) in μT
+                      (see drift_walk), added with the hard iron bias
+
+        Returns:
+            Dict of column arrays with the same keys as measure(), each of
+            shape (N,) (metadata entries stay scalar)
+        """
+        true_fields_ut = np.asarray(true_fields_ut, dtype=np.float64).reshape(-1, 3)
+        field = true_fields_ut
+
+        # Apply soft iron distortion (measured field is distorted)
+        if add_soft_iron:
+            field = field @ self._soft_iron.T
+
+        # Add hard iron bias (constant offset from nearby metal)
+        if add_bias:
+            field = field + self._bias_ut
+            if drift_ut is not None:
+                field = field + drift_ut
+
+        # Add Gaussian noise
+        if add_noise:
+            field = field + np.random.normal(0, self._noise_ut, size=field.shape)
+
+        # Convert to raw LSB values
+        if quantize:
+            raw_lsb = np.round(field * self.chars.lsb_per_ut).astype(int)
+
+            # Clamp to sensor range
+            max_lsb = int(self.chars.range_ut * self.chars.lsb_per_ut)
+            raw_lsb = np.clip(raw_lsb, -max_lsb, max_lsb)
+
+            # Convert back to μT with quantization effects
+            field_quantized = raw_lsb / self.chars.lsb_per_ut
+        else:
+            # Use ideal values (floating point)
+            raw_lsb = (field * self.chars.lsb_per_ut).astype(int)
+            field_quantized = field
+
+        return {
+            'mx': raw_lsb[:, 0],
+            'my': raw_lsb[:, 1],
+            'mz': raw_lsb[:, 2],
+            'mx_ut': field_quantized[:, 0],
+            'my_ut': field_quantized[:, 1],
+            'mz_ut': field_quantized[:, 2],
+            '_true_mx_ut': true_fields_ut[:, 0],
+            '_true_my_ut': true_fields_ut[:, 1],
+            '_true_mz_ut': true_fields_ut[:, 2],
+            '_noise_added': float(self._noise_ut) if add_noise else 0,
+            '_bias_applied': add_bias,
+            '_quantized': quantize
+        }
+
+    def drift_walk(self, num_samples: int, dt: float) -> np.ndarray:
+        """
+        Bias drift for the next num_samples readings (Gaussian random walk).
+
+        The walk's standard deviation grows as bias_drift_ut_per_hour per
+        sqrt(hour). It is computed with a cumulative sum and continues from
+        the drift reached by the previous call, so consecutive segments form
+        one continuous sequence.
+
+        Args:
+            num_samples: Number of readings
+            dt: Sample interval (s)
+
+        Returns:
+            Drift in μT, shape (num_samples, 3)
+        """
+        step_ut = self.chars.bias_drift_ut_per_hour * np.sqrt(dt / 3600.0)
+        steps = np.random.normal(0, step_ut, size=(num_samples, 3))
+        drift = self._drift_ut + np.cumsum(steps, axis=0)
+        if num_samples:
+            self._drift_ut = drift[-1].copy()
+        self._elapsed_time += num_samples * dt
+        return drift
+
+    def reset_drift(self):
+        """Restart the drift walk (e.g. for a new session)."""
+        self._drift_ut = np.zeros(3)
+        self._elapsed_time = 0.0
+
     def measure_sequence(
         self,
         fields: np.ndarray,
-        sample_rate: Optional[float] = None
-    ) -> list:
+        sample_rate: Optional[float] = None,
+        add_drift: bool = True,
+        columnar: bool = False
+    ):
         """
         Simulate multiple sequential measurements.
 
-        Useful for generating a full session of data.
+        Useful for generating a full session of data. All readings are drawn
+        in one vectorized pass (measure_batch), with a temporally correlated
+        bias drift (drift_walk) when add_drift is set.
 
         Args:
             fields: Array of shape (N, 3) with true field vectors in μT
             sample_rate: Sample rate (Hz). Used for timing. Default from characteristics.
+            add_drift: Add bias drift continuing from earlier sequences
+            columnar: Return the measure_batch column dict (plus 'dt' and 't')
+                      instead of a list of measurement dicts
 
         Returns:
-            List of measurement dicts
+            List of measurement dicts (same keys as measure(), plus 'dt' and 't'),
+            or a dict of column arrays if columnar
         """
         sample_rate = sample_rate or self.chars.sample_rate_hz
         dt = 1.0 / sample_rate
 
-        measurements = []
-        for i, field in enumerate(fields):
-            measurement = self.measure(field)
-            measurement['dt'] = dt
-            measurement['t'] = i * dt * 1000  # milliseconds
-            measurements.append(measurement)
+        fields = np.asarray(fields, dtype=np.float64).reshape(-1, 3)
+        num_samples = len(fields)
+        drift = self.drift_walk(num_samples, dt) if add_drift else None
+        columns = self.measure_batch(fields, drift_ut=drift)
+        columns['dt'] = dt
+        columns['t'] = np.arange(num_samples) * dt * 1000  # milliseconds
+        if columnar:
+            return columns
 
-        return measurements
+        lists = {k: v.tolist() if isinstance(v, np.ndarray) else [v] * num_samples
+                 for k, v in columns.items()}
+        return [dict(zip(lists, values)) for values in zip(*lists.values())]
 
     def get_calibration_info(self) -> Dict:
         """
@@ -336,6 +447,53 @@ class IMUSimulator:
         }
 
 
+    def measure_static_batch(
+        self,
+        num_samples: int,
+        orientations: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized measure_static() for num_samples readings.
+
+        Args:
+            num_samples: Number of readings
+            orientations: Optional rotation matrices, shape (N, 3, 3)
+
+        Returns:
+            Dict of column arrays with the same keys as measure_static()
+        """
+        # Gravity in sensor frame
+        gravity_g = np.broadcast_to(np.asarray(self.gravity, dtype=np.float64), (num_samples, 3))
+        if orientations is not None:
+            gravity_g = np.einsum('nij,j->ni', orientations, self.gravity)
+
+        # Add noise
+        accel_g = gravity_g + np.random.normal(0, self.accel_noise_g, size=(num_samples, 3))
+        gyro_dps = np.random.normal(0, self.gyro_noise_dps, size=(num_samples, 3))
+
+        # Convert to LSB
+        accel_lsb = (accel_g * self.accel_lsb_per_g).astype(int)
+        gyro_lsb = (gyro_dps * self.gyro_lsb_per_dps).astype(int)
+
+        return {
+            'ax': accel_lsb[:, 0],
+            'ay': accel_lsb[:, 1],
+            'az': accel_lsb[:, 2],
+            'gx': gyro_lsb[:, 0],
+            'gy': gyro_lsb[:, 1],
+            'gz': gyro_lsb[:, 2],
+            'ax_g': accel_g[:, 0],
+            'ay_g': accel_g[:, 1],
+            'az_g': accel_g[:, 2],
+            'gx_dps': gyro_dps[:, 0],
+            'gy_dps': gyro_dps[:, 1],
+            'gz_dps': gyro_dps[:, 2],
+            'isMoving': np.zeros(num_samples, dtype=bool),
+            'accelStd': np.zeros(num_samples, dtype=int),
+            'gyroStd': np.zeros(num_samples, dtype=int)
+        }
+
+
 if __name__ == '__main__':
     print("Sensor Simulation Test")
     print("=" * 50)
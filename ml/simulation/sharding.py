@@ -0,0 +1,181 @@
+"""
+Sharded, Parallel Synthetic Dataset Generation
+
+Runs one generation task per session ("shard"), serially or, with
+max_workers > 1, in a process pool. Each shard gets its own RNG stream spawned from a master seed with numpy's SeedSequence,
+so a shard's content depends only on (master seed, shard index) and the
+dataset is identical for any number of workers.
+
+Shards are written atomically under deterministic filenames, and a
+``generation.meta.json`` manifest records the master seed and generation
+parameters. Rerunning the same command resumes an interrupted run: shards
+already on disk are skipped and the seed is taken from the manifest. A run
+whose seed or parameters disagree with the manifest is refused unless it
+regenerates every shard (overwrite=True or resume=False).
+
+Usage:
+    from ml.simulation.sharding import generate_shards
+
+    paths = generate_shards(
+        'synthetic_data', my_task, num_shards=1000,
+        params={'samples_per_pose': 400}, seed=42, max_workers=4
+    )
+
+The task is called as ``task(index, params)`` after the global numpy RNG has
+been seeded for that shard (the caller's RNG state is restored afterwards),
+and must return a session dict. Tasks must be top-level functions so they
+can be pickled.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..session_npz import COMPACT_SUFFIX, is_compact_session, write_compact_session
+
+# '.meta.json' suffix: skipped by the session loaders like other sidecar files
+MANIFEST_FILENAME = 'generation.meta.json'
+
+
+def shard_seeds(master_seed: int, num_shards: int) -> List[np.ndarray]:
+    """Independent per-shard seeds (uint32 arrays) spawned from a master seed."""
+    children = np.random.SeedSequence(master_seed).spawn(num_shards)
+    return [child.generate_state(4) for child in children]
+
+
+def shard_filename_pattern(stem_pattern: str, output_format: str = 'json') -> str:
+    """Shard filename pattern for an output format ('json' or 'npz')."""
+    if output_format == 'json':
+        return stem_pattern + '.json'
+    if output_format == 'npz':
+        return stem_pattern + COMPACT_SUFFIX
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def write_session(session: Dict, filepath: Path):
+    """
+    Write a session atomically (a partial file never has the final name).
+
+    '.session.npz' paths use the compact columnar format (see ml.session_npz),
+    anything else is written as JSON.
+    """
+    if is_compact_session(filepath):
+        write_compact_session(filepath, session)
+        return
+    tmp = filepath.with_name(filepath.name + f'.tmp{os.getpid()}')
+    with open(tmp, 'w') as f:
+        json.dump(session, f)
+    os.replace(tmp, filepath)
+
+
+def _run_shard(task: Callable[[int, Dict], Dict], index: int, seed: np.ndarray,
+               params: Dict, filepath: Path, master_seed: int) -> str:
+    """Seed the RNG, generate one session and write it."""
+    # Generators draw from the global numpy RNG; reseed it for this shard and
+    # restore the previous state, which is the caller's own in the serial path
+    state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        session = task(index, params)
+    finally:
+        np.random.set_state(state)
+    session.setdefault('metadata', {})['generation'] = {
+        'master_seed': master_seed,
+        'shard_index': index
+    }
+    write_session(session, filepath)
+    return str(filepath)
+
+
+def _load_manifest(output_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(output_path / MANIFEST_FILENAME, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_shards(
+    output_dir: str,
+    task: Callable[[int, Dict], Dict],
+    num_shards: int,
+    params: Optional[Dict] = None,
+    filename_pattern: str = 'synthetic_{index:04d}.json',
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = 1,
+    resume: bool = True,
+    overwrite: bool = False
+) -> List[str]:
+    """
+    Generate num_shards sessions, one file per shard.
+
+    Args:
+        output_dir: Output directory
+        task: Top-level function ``task(index, params) -> session dict``
+        num_shards: Number of sessions to generate
+        params: JSON-serializable generation parameters passed to every task
+        filename_pattern: Shard filename, formatted with ``index``
+        seed: Master seed. Default: the manifest's seed when resuming, else fresh entropy
+        max_workers: Worker processes (default 1 = serial in this process;
+                     None = os.cpu_count())
+        resume: Skip shards whose file already exists
+        overwrite: If the manifest's seed or params differ, regenerate every
+                   shard and replace the manifest instead of raising
+
+    Returns:
+        List of all shard file paths, in shard order
+
+    Raises:
+        ValueError: If resuming into a directory generated with a different
+                    seed or params (pass overwrite=True or resume=False)
+    """
+    params = params or {}
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    manifest = _load_manifest(output_path) if resume else None
+    if seed is None:
+        seed = manifest['master_seed'] if manifest else int(np.random.SeedSequence().entropy % 2**63)
+    if manifest and (manifest['master_seed'] != seed or manifest.get('params') != params):
+        if not overwrite:
+            raise ValueError(
+                f"{output_dir} was generated with seed {manifest['master_seed']} and params "
+                f"{manifest.get('params')}, not seed {seed} and params {params}; pass "
+                f"overwrite=True (or resume=False) to regenerate every shard")
+        print(f"Overwriting {output_dir}: seed/params differ from {MANIFEST_FILENAME}")
+        resume = False
+
+    with open(output_path / MANIFEST_FILENAME, 'w') as f:
+        json.dump({'master_seed': seed, 'num_shards': num_shards, 'params': params}, f, indent=2)
+
+    seeds = shard_seeds(seed, num_shards)
+    filepaths = [output_path / filename_pattern.format(index=i) for i in range(num_shards)]
+    pending = [i for i in range(num_shards) if not (resume and filepaths[i].exists())]
+
+    skipped = num_shards - len(pending)
+    print(f"Master seed {seed}: {len(pending)} shards to generate"
+          + (f", {skipped} already present" if skipped else ""))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    workers = min(max_workers, len(pending))
+    if workers <= 1:
+        for done, i in enumerate(pending, 1):
+            _run_shard(task, i, seeds[i], params, filepaths[i], seed)
+            if done % 10 == 0:
+                print(f"Generated {done}/{len(pending)} sessions")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_shard, task, i, seeds[i], params, filepaths[i], seed)
+                       for i in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if done % 10 == 0:
+                    print(f"Generated {done}/{len(pending)} sessions")
+
+    print(f"Generated {len(pending)} sessions in {output_dir} ({workers} workers)")
+    return [str(p) for p in filepaths]
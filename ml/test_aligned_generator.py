@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test table-based dataset generation in ml.simulation.aligned_generator.
+
+configuration_stats must reproduce the per-sample signature interpolation
+for every ternary configuration, generate_all_configurations must equal a
+per-sample loop for the same seed, and iter_configurations /
+save_configurations must give the same rows for any chunk size, including
+the zero-row case.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ml.simulation.aligned_generator import (
+    FINGER_ORDER, AlignedGenerator, MeasuredSignature, configuration_states
+)
+
+
+def make_generator():
+    """Generator with single-finger signatures (pinky unmeasured) and two exact combos."""
+    rng = np.random.default_rng(0)
+    generator = AlignedGenerator()
+    generator.baseline = np.array([40.0, -20.0, 10.0])
+    codes = ['20000', '02000', '00200', '00020', '22000', '10000']
+    for code in codes:
+        generator.signatures[code] = MeasuredSignature(
+            code=code, mean=rng.normal(0, 300, 3), std=rng.uniform(5, 50, 3), n_samples=100)
+    return generator
+
+
+def reference_sample(generator, finger_states, noise_scale=1.0):
+    """Per-sample signature lookup/interpolation, one configuration at a time."""
+    code = ''.join(str(finger_states[f]) for f in FINGER_ORDER)
+    if code in generator.signatures:
+        sig = generator.signatures[code]
+        return generator.baseline + sig.mean + np.random.randn(3) * sig.std * noise_scale
+
+    delta, variance = np.zeros(3), np.zeros(3)
+    for i, finger in enumerate(FINGER_ORDER):
+        state = finger_states[finger]
+        single_code = '0' * i + '2' + '0' * (4 - i)
+        if state and single_code in generator.signatures:
+            weight = 1.0 if state == 2 else 0.5
+            delta += weight * generator.signatures[single_code].mean
+            variance += (weight * generator.signatures[single_code].std) ** 2
+    n_flexed = sum(1 for s in finger_states.values() if s > 0)
+    if n_flexed > 1:
+        delta *= 1 - 0.3 * (n_flexed - 1) / 4
+    return generator.baseline + delta + np.random.randn(3) * np.sqrt(variance) * noise_scale
+
+
+def reference_all(generator, samples_per_config, noise_scale, ternary):
+    X, y = [], []
+    for row in configuration_states(ternary):
+        finger_states = dict(zip(FINGER_ORDER, row.tolist()))
+        for _ in range(samples_per_config):
+            X.append(reference_sample(generator, finger_states, noise_scale))
+            y.append(row if ternary else row // 2)
+    return np.array(X), np.array(y)
+
+
+def test_configuration_table():
+    """Table-based generation equals the per-sample path (binary and ternary)."""
+    print("\n" + "=" * 70)
+    print("TEST 1: configuration_stats / generate_all_configurations vs per-sample")
+    print("=" * 70)
+
+    generator = make_generator()
+    states = configuration_states(ternary=True)
+    assert states.shape == (243, 5) and len({tuple(r) for r in states}) == 243
+    assert np.array_equal(configuration_states()[:, 4], np.tile([0, 2], 16))
+    print("✅ 243 ternary and 32 binary configurations in code order")
+
+    for ternary in (False, True):
+        np.random.seed(0)
+        X, y = generator.generate_all_configurations(samples_per_config=4, noise_scale=0.5,
+                                                     ternary=ternary)
+        np.random.seed(0)
+        X_ref, y_ref = reference_all(generator, 4, 0.5, ternary)
+        assert np.array_equal(y, y_ref), "Labels differ from the per-sample loop"
+        assert np.allclose(X, X_ref, rtol=0, atol=1e-9), "Samples differ from the per-sample loop"
+        print(f"✅ {'Ternary' if ternary else 'Binary'}: {len(X)} rows equal the per-sample loop "
+              "for the same seed")
+
+    np.random.seed(1)
+    single = generator.generate_sample({'thumb': 1, 'index': 2, 'pinky': 2})
+    np.random.seed(1)
+    expected = reference_sample(generator, {'thumb': 1, 'index': 2, 'middle': 0, 'ring': 0, 'pinky': 2})
+    assert np.allclose(single, expected)
+    print("✅ generate_sample matches (missing fingers default to extended)")
+
+
+def test_chunked_rows():
+    """Any chunk size streams the same rows; save_configurations writes them."""
+    print("\n" + "=" * 70)
+    print("TEST 2: iter_configurations / save_configurations chunk boundaries")
+    print("=" * 70)
+
+    generator = make_generator()
+    np.random.seed(2)
+    X, y = generator.generate_all_configurations(samples_per_config=3, ternary=True)
+    for chunk_size in (1, 7, 3 * 243 - 1, 3 * 243, 10_000):
+        np.random.seed(2)
+        chunks = list(generator.iter_configurations(samples_per_config=3, ternary=True,
+                                                    chunk_size=chunk_size))
+        assert all(len(cx) <= chunk_size for cx, _ in chunks)
+        assert np.array_equal(np.concatenate([cx for cx, _ in chunks]), X)
+        assert np.array_equal(np.concatenate([cy for _, cy in chunks]), y)
+    print("✅ Chunk sizes 1, 7, total-1, total and > total give identical rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.random.seed(2)
+        x_path, y_path = generator.save_configurations(Path(tmp) / 'ternary', samples_per_config=3,
+                                                       ternary=True, chunk_size=100)
+        assert np.array_equal(np.load(x_path), X) and np.array_equal(np.load(y_path), y)
+        print("✅ save_configurations writes the generate_all_configurations rows")
+
+        X0, y0 = generator.generate_all_configurations(samples_per_config=0, ternary=True)
+        assert X0.shape == (0, 3) and y0.shape == (0, 5)
+        assert list(generator.iter_configurations(samples_per_config=0)) == []
+        x_path, y_path = generator.save_configurations(Path(tmp) / 'empty', samples_per_config=0)
+        assert np.load(x_path).shape == (0, 3) and np.load(y_path).shape == (0, 5)
+        try:
+            next(generator.iter_configurations(samples_per_config=-1))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Negative samples_per_config did not raise")
+        print("✅ Zero rows give empty arrays and files; negative counts raise ValueError")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Configuration table", test_configuration_table),
+        ("Chunked rows", test_chunked_rows),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
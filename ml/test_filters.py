@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed filters in ml.filters.
+
+KalmanFilter3D.filter_batch is checked against per-sample update() calls
+(and a plain Rauch-Tung-Striebel pass for smooth=True). ParticleFilter
+stores its particles as one (P, F, 3) array; these tests check that the
+per-particle likelihood API (e.g. magnetic_likelihood) and the batch
+likelihood give the same weights as the default path.
+"""
+
+import sys
+
+import numpy as np
+
+from ml.filters import (
+    FINGERS, KalmanFilter3D, ParticleFilter, magnetic_likelihood, magnetic_likelihood_batch
+)
+
+INITIAL_POSE = {finger: {'x': 10.0 * i, 'y': 20.0, 'z': 30.0} for i, finger in enumerate(FINGERS)}
+MEASUREMENT = {'x': 1.0, 'y': 2.0, 'z': 3.0}
+
+
+def make_trajectory(n: int = 2000, seed: int = 0) -> np.ndarray:
+    """Noisy smooth 3D positions, shape (n, 3)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 0.02
+    clean = np.stack([30 * np.sin(t), 20 * np.cos(0.7 * t), 5 * t], axis=1)
+    return clean + rng.normal(0, 2.0, (n, 3))
+
+
+def sequential_filter(kf: KalmanFilter3D, z: np.ndarray):
+    """Reference: update() per sample; returns positions, states and covariances."""
+    positions, states, covariances = [], [], []
+    for point in z:
+        est = kf.update({'x': point[0], 'y': point[1], 'z': point[2]})
+        positions.append([est['x'], est['y'], est['z']])
+        states.append(kf.state.copy())
+        covariances.append(kf.P.copy())
+    return np.array(positions), np.array(states), np.array(covariances)
+
+
+def test_kalman_filter_batch():
+    """filter_batch matches sequential update(), including continued streaming."""
+    print("\n" + "=" * 70)
+    print("TEST 1: KalmanFilter3D.filter_batch vs sequential update")
+    print("=" * 70)
+
+    z = make_trajectory()
+    kwargs = dict(process_noise=0.5, measurement_noise=4.0)
+
+    expected, _, _ = sequential_filter(KalmanFilter3D(**kwargs), z)
+    batch_kf = KalmanFilter3D(**kwargs)
+    batch = batch_kf.filter_batch(z)
+    assert batch.shape == z.shape
+    assert np.allclose(batch, expected, atol=1e-8), \
+        f"Max difference {np.abs(batch - expected).max():.2e}"
+    print(f"✅ {len(z)} samples match per-sample update (max diff {np.abs(batch - expected).max():.1e})")
+
+    # Batch over the first half, then stream the rest
+    seq_kf = KalmanFilter3D(**kwargs)
+    sequential_filter(seq_kf, z[:1000])
+    half_kf = KalmanFilter3D(**kwargs)
+    half_kf.filter_batch(z[:1000])
+    assert np.allclose(half_kf.state, seq_kf.state, atol=1e-8)
+    assert np.allclose(half_kf.P, seq_kf.P, atol=1e-8)
+    rest_batch = half_kf.filter_batch(z[1000:])
+    assert np.allclose(rest_batch, expected[1000:], atol=1e-8)
+    print("✅ State and covariance after a batch allow streaming to continue")
+
+    assert KalmanFilter3D().filter_batch(np.zeros((0, 3))).shape == (0, 3)
+    print("✅ Empty input returns shape (0, 3)")
+
+
+def test_kalman_smoother():
+    """smooth=True matches a plain Rauch-Tung-Striebel backward pass."""
+    print("\n" + "=" * 70)
+    print("TEST 2: KalmanFilter3D.filter_batch(smooth=True)")
+    print("=" * 70)
+
+    z = make_trajectory(500, seed=1)
+    kf = KalmanFilter3D(process_noise=0.5, measurement_noise=4.0)
+    P0 = kf.P.copy()
+    _, states, covariances = sequential_filter(kf, z)
+    covariances[0] = P0   # first sample only initializes the state
+
+    F = kf._get_F(kf.dt)
+    smoothed = states.copy()
+    for k in range(len(z) - 2, -1, -1):
+        P_pred = F @ covariances[k] @ F.T + kf.Q
+        C = covariances[k] @ F.T @ np.linalg.inv(P_pred)
+        smoothed[k] = states[k] + C @ (smoothed[k + 1] - F @ states[k])
+
+    result = KalmanFilter3D(process_noise=0.5, measurement_noise=4.0).filter_batch(z, smooth=True)
+    assert not np.allclose(result, states[:, :3]), "Smoothing left the filtered estimates unchanged"
+    assert np.allclose(result, smoothed[:, :3], atol=1e-6), \
+        f"Max difference {np.abs(result - smoothed[:, :3]).max():.2e}"
+    print(f"✅ Smoothed positions match the reference RTS pass "
+          f"(max diff {np.abs(result - smoothed[:, :3]).max():.1e})")
+
+
+def particle_weights(**update_kwargs) -> np.ndarray:
+    """Weights after one update from a seeded filter."""
+    pf = ParticleFilter(num_particles=200, rng=np.random.default_rng(0))
+    pf.initialize(INITIAL_POSE)
+    pf.update(MEASUREMENT, **update_kwargs)
+    return pf.weights
+
+
+def test_particle_likelihood_api():
+    """Per-particle likelihood_fn, batch_likelihood_fn and the default agree."""
+    print("\n" + "=" * 70)
+    print("TEST 3: ParticleFilter likelihood functions")
+    print("=" * 70)
+
+    default = particle_weights()
+
+    per_particle = particle_weights(likelihood_fn=magnetic_likelihood)
+    assert np.allclose(per_particle, default), "Per-particle likelihood_fn weights differ"
+    print("✅ likelihood_fn=magnetic_likelihood (dict per particle) matches default")
+
+    batch = particle_weights(batch_likelihood_fn=magnetic_likelihood_batch)
+    assert np.allclose(batch, default), "batch_likelihood_fn weights differ"
+    print("✅ batch_likelihood_fn=magnetic_likelihood_batch matches default")
+
+    seen = []
+
+    def record(particle, measurement):
+        seen.append(particle)
+        return 1.0
+
+    particle_weights(likelihood_fn=record)
+    assert len(seen) == 200 and set(seen[0]) == set(FINGERS), "likelihood_fn not called per particle"
+    assert set(seen[0]['thumb']) == {'x', 'y', 'z'}
+    print("✅ likelihood_fn receives one {finger: {x, y, z}} dict per particle")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("KalmanFilter3D batch filter", test_kalman_filter_batch),
+        ("KalmanFilter3D smoother", test_kalman_smoother),
+        ("ParticleFilter likelihood API", test_particle_likelihood_api),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
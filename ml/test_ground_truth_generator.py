@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test array-based session assembly in ml.simulation.ground_truth_generator.
+
+generate_session_columns must lay out segments, transitions and labels as
+the per-segment generate_segment/generate_transition path would, with the
+same field statistics per segment, be reproducible for a seed, handle empty
+and zero-length sessions, and generate_balanced_dataset must slice the
+one-pass balanced columns at class boundaries.
+"""
+
+import sys
+
+import numpy as np
+
+from ml.simulation.ground_truth_generator import (
+    SAMPLE_FIELDS, GroundTruthGenerator, SignatureDatabase, code_to_fingers, samples_from_columns
+)
+
+CODES = ['00000', '22222', '20000', '22222']
+
+
+def make_generator():
+    """Generator with one resampled and two Gaussian signatures."""
+    rng = np.random.default_rng(0)
+    db = SignatureDatabase()
+    db.add_signature('00000', np.array([10.0, 20.0, 30.0]), np.ones(3), 40,
+                     samples=rng.normal([10.0, 20.0, 30.0], 1.0, (40, 3)))
+    db.add_signature('22222', np.array([500.0, -300.0, 900.0]), np.full(3, 5.0), 20)
+    db.add_signature('20000', np.array([100.0, 0.0, 50.0]), np.full(3, 2.0), 5)
+    return GroundTruthGenerator(db)
+
+
+def expected_labels(codes, n, n_trans):
+    """Labels as the per-segment loop builds them."""
+    labels, start = [], 0
+    for i, code in enumerate(codes):
+        labels.append({'start_sample': start, 'end_sample': start + n,
+                       'labels': {'fingers': code_to_fingers(code), 'calibration': 'none',
+                                  'motion': 'static'}})
+        start += n
+        if n_trans and i < len(codes) - 1:
+            labels.append({'start_sample': start, 'end_sample': start + n_trans,
+                           'labels': {'fingers': {}, 'calibration': 'none', 'motion': 'moving'}})
+            start += n_trans
+    return labels
+
+
+def test_session_columns():
+    """Layout, labels and per-segment stats match the per-segment path."""
+    print("\n" + "=" * 70)
+    print("TEST 1: generate_session_columns vs per-segment generation")
+    print("=" * 70)
+
+    generator = make_generator()
+    np.random.seed(0)
+    columns, labels = generator.generate_session_columns(CODES, segment_duration=4.0)
+    n = int(4.0 * generator.sample_rate)
+    n_trans = int(0.3 * generator.sample_rate)
+    assert labels == expected_labels(CODES, n, n_trans)
+    total = labels[-1]['end_sample']
+    assert set(columns) == set(SAMPLE_FIELDS) and all(len(v) == total for v in columns.values())
+    assert np.array_equal(columns['timestamp'], np.arange(total))
+    print(f"✅ {len(labels)} labels and {total} rows laid out as segment/transition blocks")
+
+    for label, code in zip(labels[::2], CODES):
+        rows = slice(label['start_sample'], label['end_sample'])
+        mag = np.column_stack([columns[k][rows] for k in ('mx', 'my', 'mz')])
+        assert np.allclose(mag.mean(axis=0), generator.db.signatures[code].mean, atol=60.0), code
+    print("✅ Segment means match the signature means")
+
+    # Per-segment motion scales vary, so compare spreads over many segments
+    np.random.seed(1)
+    batched, _ = generator.generate_session_columns(['22222'] * 30, include_transitions=False)
+    singles = [generator.generate_segment('22222') for _ in range(30)]
+    for k in SAMPLE_FIELDS[:6]:
+        single = np.concatenate([segment[k] for segment in singles])
+        assert len(batched[k]) == len(single)
+        assert abs(batched[k].mean() - single.mean()) < 0.25 * single.std(), k
+        assert 0.8 < batched[k].std() / single.std() < 1.25, k
+    print("✅ 30 batched segments match 30 generate_segment calls in mean and spread")
+
+    for label, (a, b) in zip(labels[1::2], zip(CODES, CODES[1:])):
+        rows = slice(label['start_sample'], label['end_sample'])
+        trans, weights = generator.generate_transition(a, b, 0.3)
+        assert len(trans['mx']) == len(weights) == rows.stop - rows.start
+        assert np.all(np.abs(columns['az'][rows] - 8192) < 1000)
+    print("✅ Transition blocks have generate_transition's length")
+
+    samples = samples_from_columns(columns)
+    assert len(samples) == total and list(samples[0]) == SAMPLE_FIELDS
+    assert samples[5]['mx'] == float(columns['mx'][5]) and samples[5]['timestamp'] == 5
+    print("✅ samples_from_columns yields the sample dict layout")
+
+
+def test_reproducible_and_empty():
+    """Same seed gives the same session; empty and zero-length sessions."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Reproducibility and empty sessions")
+    print("=" * 70)
+
+    generator = make_generator()
+    runs = []
+    for _ in range(2):
+        np.random.seed(7)
+        runs.append(generator.generate_session(n_segments=5, columnar=True))
+    assert runs[0]['labels'] == runs[1]['labels']
+    assert all(np.array_equal(runs[0]['samples'][k], runs[1]['samples'][k]) for k in SAMPLE_FIELDS)
+    print("✅ Same seed produces the same codes, labels and samples")
+
+    columns, labels = generator.generate_session_columns([])
+    assert labels == [] and all(len(v) == 0 for v in columns.values())
+    columns, labels = generator.generate_session_columns(['00000'])
+    assert len(labels) == 1 and len(columns['mx']) == labels[0]['end_sample']
+    columns, labels = generator.generate_session_columns(['00000', '22222'], segment_duration=0)
+    assert labels == expected_labels(['00000', '22222'], 0, int(0.3 * generator.sample_rate))
+    assert len(columns['mx']) == labels[-1]['end_sample'] and np.isfinite(columns['mx']).all()
+    print("✅ No codes, a single code and zero-length segments")
+
+
+def test_balanced_slices():
+    """Balanced sessions are the one-pass columns cut at class boundaries."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Balanced dataset class boundaries")
+    print("=" * 70)
+
+    generator = make_generator()
+    np.random.seed(3)
+    columns, labels, per_class = generator.generate_balanced_columns(samples_per_class=120)
+    np.random.seed(3)
+    sessions = generator.generate_balanced_dataset(samples_per_class=120, columnar=True)
+    rows = per_class * int(2.0 * generator.sample_rate)
+
+    assert len(sessions) == len(generator.available_codes) and per_class == 2
+    for i, (session, code) in enumerate(zip(sessions, generator.available_codes)):
+        assert session['metadata']['target_class'] == code
+        for k in SAMPLE_FIELDS[:6]:
+            assert np.array_equal(session['samples'][k], columns[k][i * rows:(i + 1) * rows])
+        assert np.array_equal(session['samples']['timestamp'], np.arange(rows))
+        assert [l['start_sample'] for l in session['labels']] == [0, rows // 2]
+        assert all(l['labels']['fingers'] == code_to_fingers(code) for l in session['labels'])
+    print(f"✅ {len(sessions)} class sessions match their {rows}-row slices, labels rebased")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Session columns", test_session_columns),
+        ("Reproducibility and empty sessions", test_reproducible_and_empty),
+        ("Balanced slices", test_balanced_slices),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
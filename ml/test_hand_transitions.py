@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test array-based pose transitions (HandPoseGenerator.transition_batch).
+
+transition_batch must match a frame-by-frame, finger-by-finger
+interpolation for every easing curve with and without timing jitter (same
+seed, same noise draws), reduce to the original linear transition with the
+default arguments, and handle 0-, 1- and 2-frame transitions.
+"""
+
+import sys
+
+import numpy as np
+
+from ml.simulation.hand_model import EASING_FUNCTIONS, FingerState, HandPoseGenerator
+
+START = {'thumb': FingerState.EXTENDED, 'index': FingerState.EXTENDED, 'middle': FingerState.FLEXED,
+         'ring': FingerState.PARTIAL, 'pinky': FingerState.EXTENDED}
+END = {'thumb': FingerState.FLEXED, 'index': FingerState.FLEXED, 'middle': FingerState.EXTENDED,
+       'ring': FingerState.FLEXED, 'pinky': FingerState.EXTENDED}
+
+# Scalar easing curves, written out independently of EASING_FUNCTIONS
+REFERENCE_EASING = {
+    'linear': lambda p: p,
+    'smoothstep': lambda p: 3 * p ** 2 - 2 * p ** 3,
+    'cosine': lambda p: (1 - np.cos(np.pi * p)) / 2,
+    'minimum_jerk': lambda p: 10 * p ** 3 - 15 * p ** 4 + 6 * p ** 5,
+}
+
+
+def reference_transition(generator, num_frames, noise_mm=0.0, easing='linear', timing_jitter=0.0):
+    """Frame-by-frame, finger-by-finger transition; draws noise in the same order."""
+    fingers = generator.fingers
+    start = generator.generate_pose(START, noise_mm=0).fingertip_positions
+    end = generator.generate_pose(END, noise_mm=0).fingertip_positions
+    onset, finish = np.zeros(len(fingers)), np.ones(len(fingers))
+    if timing_jitter > 0:
+        onset = np.random.uniform(0, timing_jitter, size=len(fingers))
+        finish = 1 - np.random.uniform(0, timing_jitter, size=len(fingers))
+
+    positions, states = [], []
+    for i in range(num_frames):
+        t = i / (num_frames - 1) if num_frames > 1 else 0
+        frame_positions, frame_states = [], []
+        for j, finger in enumerate(fingers):
+            p = min(max((t - onset[j]) / (finish[j] - onset[j]), 0.0), 1.0)
+            p = REFERENCE_EASING[easing](p)
+            position = start[finger] + p * (end[finger] - start[finger])
+            if noise_mm > 0:
+                position = position + np.random.normal(0, noise_mm, size=3)
+            frame_positions.append(position)
+            state = START[finger] if p < 0.33 else (END[finger] if p > 0.67 else FingerState.PARTIAL)
+            frame_states.append(list(FingerState).index(state))
+        positions.append(frame_positions)
+        states.append(frame_states)
+    shape = (num_frames, len(fingers))
+    return np.array(positions).reshape(*shape, 3), np.array(states).reshape(shape)
+
+
+def test_matches_per_frame():
+    """transition_batch equals the per-frame reference for every easing and jitter."""
+    print("\n" + "=" * 70)
+    print("TEST 1: transition_batch vs per-frame interpolation")
+    print("=" * 70)
+
+    generator = HandPoseGenerator(randomize_geometry=False)
+    assert set(REFERENCE_EASING) == set(EASING_FUNCTIONS)
+    for easing in EASING_FUNCTIONS:
+        for timing_jitter in (0.0, 0.3):
+            np.random.seed(4)
+            positions, states = generator.transition_batch(START, END, 25, noise_mm=0.5, easing=easing,
+                                                           timing_jitter=timing_jitter)
+            np.random.seed(4)
+            ref_positions, ref_states = reference_transition(generator, 25, 0.5, easing, timing_jitter)
+            assert positions.shape == (25, 5, 3) and states.shape == (25, 5)
+            assert np.allclose(positions, ref_positions), f"{easing}/{timing_jitter}: positions differ"
+            assert np.array_equal(states, ref_states), f"{easing}/{timing_jitter}: states differ"
+        print(f"✅ {easing}: identical positions and states with and without jitter")
+
+    np.random.seed(4)
+    poses = generator.generate_transition(START, END, 25, noise_mm=0.5, easing='cosine', timing_jitter=0.2)
+    np.random.seed(4)
+    positions, _ = generator.transition_batch(START, END, 25, noise_mm=0.5, easing='cosine', timing_jitter=0.2)
+    assert all(np.array_equal(pose.fingertip_positions[f], positions[i, j])
+               for i, pose in enumerate(poses) for j, f in enumerate(generator.fingers))
+    print("✅ generate_transition wraps transition_batch")
+
+
+def test_jitter_and_edges():
+    """Endpoints, jittered hold at start/end, short transitions, bad arguments."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Jitter, endpoints and short transitions")
+    print("=" * 70)
+
+    generator = HandPoseGenerator(randomize_geometry=False)
+    table = generator.fingertip_table()
+    index = np.arange(5)
+    start = table[index, [list(FingerState).index(START[f]) for f in generator.fingers]]
+    end = table[index, [list(FingerState).index(END[f]) for f in generator.fingers]]
+
+    np.random.seed(0)
+    positions, _ = generator.transition_batch(START, END, 41, easing='minimum_jerk', timing_jitter=0.4)
+    assert np.allclose(positions[0], start) and np.allclose(positions[-1], end)
+    moving = ~np.isclose(start, end).all(axis=1)
+    distance = np.linalg.norm(positions - start, axis=2)[:, moving]
+    assert (np.diff(distance, axis=0) >= -1e-9).all(), "Fingers move backwards"
+    assert (distance[1] < distance[-1]).all() and np.allclose(positions[-2:, moving], end[moving], atol=1.0)
+    print("✅ Jittered, eased fingers go monotonically from start to end positions")
+
+    for num_frames in (0, 1, 2):
+        positions, states = generator.transition_batch(START, END, num_frames, timing_jitter=0.1)
+        ref_positions, ref_states = reference_transition(generator, num_frames)
+        assert positions.shape == (num_frames, 5, 3) and states.shape == (num_frames, 5)
+        if num_frames:
+            assert np.allclose(positions[0], start)
+        if num_frames == 2:
+            assert np.allclose(positions[1], end) and np.array_equal(states, ref_states)
+        assert len(generator.generate_transition(START, END, num_frames)) == num_frames
+    print("✅ 0-, 1- and 2-frame transitions")
+
+    for kwargs in ({'easing': 'bounce'}, {'timing_jitter': 0.5}, {'timing_jitter': -0.1}):
+        try:
+            generator.transition_batch(START, END, 10, **kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{kwargs} did not raise")
+    print("✅ Unknown easing and out-of-range jitter raise ValueError")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Per-frame equivalence", test_matches_per_frame),
+        ("Jitter and edge cases", test_jitter_and_edges),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
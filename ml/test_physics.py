@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test the dipole fitting engine in ml.physics.
+
+DipoleFitProblem's analytic Jacobian is checked against central
+differences in both ParameterSpec layouts, with weights, polarity,
+regularization and the travel penalties active, the batched
+population_objective is checked against objective() per candidate, and the
+array combo encodings are checked against per-character conversion.
+"""
+
+import sys
+
+import numpy as np
+
+from ml.physics import (
+    BINARY_STATES, COMBO_FLEXION, TERNARY_STATES, DipoleFitProblem,
+    combo_codes, combo_state_indices, combo_states, dipole_hand_spec
+)
+from ml.session_arrays import states_to_code
+
+# Binary and partial combos (0.5 flexion for 'p')
+COMBOS = ['eeeee', 'fffff', 'effff', 'fefef', 'eeeef', 'ppfee', 'epepe', 'fpppp']
+
+POS_EXTENDED = np.array([[0.03, -0.03, 0.01], [0.07, -0.01, 0.0], [0.075, 0.01, 0.0],
+                         [0.07, 0.03, 0.0], [0.06, 0.05, 0.0]])
+POS_FLEXED = POS_EXTENDED * 0.5
+MOMENT = np.tile([0.0, 0.0, 0.01], (5, 1))
+
+
+def make_problem(layout: str = 'block', fit_baseline: bool = True, seed: int = 0) -> DipoleFitProblem:
+    """Problem with every objective term active."""
+    rng = np.random.default_rng(seed)
+    spec = dipole_hand_spec(POS_EXTENDED, POS_FLEXED, MOMENT, baseline=np.array([5.0, -3.0, 2.0]),
+                            fit_baseline=fit_baseline, layout=layout)
+    return DipoleFitProblem(
+        spec, combo_states(COMBOS), rng.normal(0, 200, (len(COMBOS), 3)),
+        weights=rng.uniform(0.5, 2.0, len(COMBOS)),
+        polarity=np.array([1, -1, 1, -1, 1]),
+        regularization=1e-3,
+        penalty_weight=1e4,
+        max_travel=0.02
+    )
+
+
+def perturbed_params(problem: DipoleFitProblem, seed: int = 1) -> dict:
+    """Initial parameters moved so some travel/ordering penalties are violated."""
+    rng = np.random.default_rng(seed)
+    params = problem.spec.unpack(problem.spec.initial())
+    params['pos_extended'] = params['pos_extended'] + rng.normal(0, 0.005, (5, 3))
+    params['pos_flexed'] = params['pos_flexed'] + rng.normal(0, 0.005, (5, 3))
+    params['pos_flexed'][0] = params['pos_extended'][0] * 1.2   # flexed farther than extended
+    params['moment'] = params['moment'] + rng.normal(0, 0.002, (5, 3))
+    return params
+
+
+def test_gradient_layouts():
+    """Analytic gradient matches central differences in 'block' and 'finger' layouts."""
+    print("\n" + "=" * 70)
+    print("TEST 1: DipoleFitProblem analytic gradient")
+    print("=" * 70)
+
+    objectives = {}
+    for layout in ('block', 'finger'):
+        for fit_baseline in (True, False):
+            problem = make_problem(layout, fit_baseline)
+            x = problem.spec.pack(perturbed_params(problem))
+            error = problem.check_gradient(x)
+            assert error < 1e-5, f"layout={layout}, fit_baseline={fit_baseline}: gradient error {error:.2e}"
+
+            value, grad = problem.value_and_grad(x)
+            assert np.isclose(value, problem.objective(x), rtol=1e-12)
+            assert grad.shape == (problem.spec.size,)
+            objectives[(layout, fit_baseline)] = value
+            print(f"✅ layout={layout:6s} fit_baseline={fit_baseline!s:5s}: "
+                  f"size={problem.spec.size}, max rel error {error:.1e}")
+
+    # Same parameters, different vector order: same objective
+    for fit_baseline in (True, False):
+        assert np.isclose(objectives[('block', fit_baseline)], objectives[('finger', fit_baseline)],
+                          rtol=1e-12), "Layouts disagree on the objective"
+    print("✅ Both layouts give the same objective for the same parameters")
+
+
+def test_population_objective():
+    """population_objective matches objective() for every candidate."""
+    print("\n" + "=" * 70)
+    print("TEST 2: DipoleFitProblem population objective")
+    print("=" * 70)
+
+    rng = np.random.default_rng(2)
+    for layout in ('block', 'finger'):
+        problem = make_problem(layout)
+        lower, upper = problem.spec.bound_arrays()
+        population = rng.uniform(lower, upper, (32, problem.spec.size))
+        population[0] = problem.spec.pack(perturbed_params(problem))
+
+        # SciPy's vectorized layout: (size, S)
+        batched = problem.population_objective(population.T)
+        expected = np.array([problem.objective(x) for x in population])
+        assert batched.shape == (32,)
+        assert np.allclose(batched, expected, rtol=1e-10), \
+            f"layout={layout}: max diff {np.abs(batched - expected).max():.2e}"
+        print(f"✅ layout={layout:6s}: 32 candidates match objective()")
+
+    # A single candidate passed as a flat vector
+    x = population[0]
+    assert np.allclose(problem.population_objective(x), [problem.objective(x)], rtol=1e-10)
+    print("✅ Single flat candidate matches objective()")
+
+
+def test_combo_encodings():
+    """combo_state_indices / combo_codes match per-character conversion."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Combo encodings")
+    print("=" * 70)
+
+    rng = np.random.default_rng(3)
+    combos = [''.join(rng.choice(list(symbols), 5)) for symbols in ('efp', '012') for _ in range(200)]
+    expected = np.array([[int(COMBO_FLEXION[c] * 2) for c in combo] for combo in combos])
+    states = combo_state_indices(combos)
+    assert states.dtype == np.int8 and np.array_equal(states, expected)
+    assert np.array_equal(combo_states(combos), expected / 2.0)
+    print(f"✅ {len(combos)} letter and digit combos match per-character lookup")
+
+    codes = combo_codes(combos)
+    assert codes.tolist() == [states_to_code(row) for row in expected]
+    assert np.array_equal(TERNARY_STATES[codes], states)
+    binary = [combo for combo in combos if 'p' not in combo and '1' not in combo]
+    binary_codes = combo_codes(binary, base=2)
+    assert binary_codes.tolist() == [int(''.join('1' if c in 'f2' else '0' for c in combo), 2)
+                                     for combo in binary]
+    assert np.array_equal(BINARY_STATES[binary_codes] * 2, combo_state_indices(binary))
+    print("✅ Base-3 codes equal states_to_code; base-2 codes equal the binary digits; "
+          "state tables invert both")
+
+    assert combo_state_indices([]).shape == (0, 5) and combo_codes([]).shape == (0,)
+    assert combo_codes(['eeeee', '22222']).tolist() == [0, 242]
+    print("✅ Empty input and extreme codes")
+
+    bad_inputs = [(['eeeee', 'eeee'], {}), (['eee?e'], {}), (['eeexe'], {}), (['eeé€e'], {}),
+                  (['eepee'], {'base': 2}), (['eeeee'], {'base': 4})]
+    for bad, kwargs in bad_inputs:
+        try:
+            combo_codes(bad, **kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad} {kwargs} did not raise")
+    print("✅ Ragged combos, unknown characters, partial base-2 and bad base raise ValueError")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Analytic gradient", test_gradient_layouts),
+        ("Population objective", test_population_objective),
+        ("Combo encodings", test_combo_encodings),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized sensor simulation paths (ml.simulation.sensor_model).
+
+measure_sequence must draw the same readings as a loop over measure() for
+the same seed, its bias drift must continue across calls as if drawn in one
+sequence, and ParameterizedGenerator's batched static segments must produce
+the same sample keys, timing and labels as the per-sample path with
+matching field statistics.
+"""
+
+import sys
+
+import numpy as np
+
+from ml.simulation.parameterized_generator import ParameterizedGenerator
+from ml.simulation.sensor_model import MMC5603Simulator
+
+
+def make_sensor(seed: int = 3):
+    np.random.seed(seed)
+    sensor = MMC5603Simulator()
+    sensor.randomize_parameters(realistic_mode=True)
+    return sensor
+
+
+def test_measure_sequence():
+    """measure_sequence matches per-sample measure(); zero rows; columnar agrees."""
+    print("\n" + "=" * 70)
+    print("TEST 1: measure_sequence vs measure()")
+    print("=" * 70)
+
+    sensor = make_sensor()
+    fields = np.random.default_rng(0).normal(0, 50, (50, 3))
+
+    np.random.seed(0)
+    sequence = sensor.measure_sequence(fields, add_drift=False)
+    np.random.seed(0)
+    loop = [sensor.measure(field) for field in fields]
+    assert len(sequence) == len(loop)
+    for i, (batched, single) in enumerate(zip(sequence, loop)):
+        assert set(batched) == set(single) | {'dt', 't'}, "measure_sequence keys differ from measure()"
+        assert all(batched[k] == single[k] for k in single), f"Reading {i} differs from measure()"
+        assert batched['t'] == i * batched['dt'] * 1000
+    print(f"✅ {len(sequence)} readings identical to a measure() loop with the same seed")
+
+    np.random.seed(0)
+    columns = sensor.measure_sequence(fields, add_drift=False, columnar=True)
+    assert columns['mx'].tolist() == [s['mx'] for s in sequence]
+    assert columns['mz_ut'].tolist() == [s['mz_ut'] for s in sequence]
+    print("✅ columnar=True returns the same values as columns")
+
+    assert sensor.measure_sequence(np.zeros((0, 3))) == []
+    assert sensor.measure_sequence(np.zeros((0, 3)), columnar=True)['mx'].shape == (0,)
+    print("✅ Zero-row sequences return no readings")
+
+
+def test_drift_continuity():
+    """Drift split across calls equals one walk; reset_drift restarts it."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Bias drift across calls")
+    print("=" * 70)
+
+    sensor = make_sensor()
+    dt = 1.0 / 26.0
+    np.random.seed(5)
+    whole = sensor.drift_walk(40, dt)
+    sensor.reset_drift()
+    np.random.seed(5)
+    parts = np.concatenate([sensor.drift_walk(n, dt) for n in (15, 0, 1, 24)])
+    assert np.allclose(parts, whole), "Drift changes at call boundaries"
+    print("✅ Drift drawn in chunks (including an empty one) equals one 40-sample walk")
+
+    sensor.reset_drift()
+    np.random.seed(5)
+    assert np.array_equal(sensor.drift_walk(40, dt), whole)
+    print("✅ reset_drift restarts the walk")
+
+
+def test_static_samples_batch():
+    """generate_static_samples(batch=True) matches the per-sample path."""
+    print("\n" + "=" * 70)
+    print("TEST 3: generate_static_samples batch vs per-sample")
+    print("=" * 70)
+
+    np.random.seed(1)
+    generator = ParameterizedGenerator.current_setup()
+    np.random.seed(0)
+    batched, batched_label = generator.generate_static_samples('fist', 400, start_index=10, batch=True)
+    np.random.seed(0)
+    single, single_label = generator.generate_static_samples('fist', 400, start_index=10, batch=False)
+
+    assert batched_label == single_label
+    assert all(set(b) == set(s) and set(b['_ground_truth']) == set(s['_ground_truth'])
+               for b, s in zip(batched, single)), "Sample keys differ"
+    assert all(type(batched[0][k]) is type(single[0][k]) for k in single[0])
+    assert [s['t'] for s in batched] == [s['t'] for s in single]
+    assert all(b['_ground_truth']['finger_states'] == s['_ground_truth']['finger_states']
+               for b, s in zip(batched, single))
+    print("✅ Same keys, value types, timing, finger states and label")
+
+    for key in ('mx_ut', 'my_ut', 'mz_ut', 'ax_g', 'gz_dps'):
+        x = np.array([s[key] for s in batched])
+        y = np.array([s[key] for s in single])
+        assert abs(x.mean() - y.mean()) < 0.3 * y.std(), f"{key} mean differs"
+        assert 0.8 < x.std() / y.std() < 1.25, f"{key} spread differs"
+    print("✅ Field and IMU means/stds agree")
+
+    assert generator.generate_static_samples('fist', 0)[0] == []
+    print("✅ Zero-sample segment is empty")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("measure_sequence", test_measure_sequence),
+        ("Drift continuity", test_drift_continuity),
+        ("Static samples batch", test_static_samples_batch),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test unit-normalized session arrays (ml.session_arrays).
+
+Covers both label formats, the µT/g/deg/s fallbacks from raw LSB fields,
+NaN rows for samples without a magnetometer reading, the combo grouping
+with its min_segment cutoff, and combo_residuals with and without a
+usable baseline segment.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ml.sensor_units import ACCEL_SPEC, MAG_SCALE_LSB_TO_UT
+from ml.session_arrays import (
+    UNLABELED, combo_residuals, combo_samples, load_session_arrays, states_to_code
+)
+
+EXTENDED = {f: 'extended' for f in ['thumb', 'index', 'middle', 'ring', 'pinky']}
+FIST = {f: 'flexed' for f in EXTENDED}
+MIXED = dict(EXTENDED, ring='flexed', pinky='partial')
+
+
+def make_samples(n: int = 60, seed: int = 0):
+    """Samples with converted µT fields, except raw-only and missing-mag rows."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(n):
+        mag = rng.normal([20.0, -10.0, 40.0], 1.0) + (30.0 if i >= 20 else 0.0)
+        sample = {'ax': 8192, 'ay': 0, 'az': 0, 'gx': 0, 'gy': 0, 'gz': 0}
+        if i % 10 == 3:
+            # Raw LSB only: converted on load
+            sample.update(mx=mag[0] / MAG_SCALE_LSB_TO_UT, my=mag[1] / MAG_SCALE_LSB_TO_UT,
+                          mz=mag[2] / MAG_SCALE_LSB_TO_UT)
+        elif i % 10 != 7:
+            sample.update(mx_ut=mag[0], my_ut=mag[1], mz_ut=mag[2])
+        # i % 10 == 7: no magnetometer reading
+        samples.append(sample)
+    return samples
+
+
+def v21_label(start, end, fingers):
+    return {'start_sample': start, 'end_sample': end, 'labels': {'fingers': fingers}}
+
+
+def legacy_label(start, end, fingers):
+    return {'startIndex': start, 'endIndex': end, 'fingers': fingers}
+
+
+def write_session(path: Path, labels, samples=None):
+    with open(path, 'w') as f:
+        json.dump({'version': '2.1', 'samples': samples or make_samples(), 'labels': labels}, f)
+    return path
+
+
+def test_load_session_arrays():
+    """Units, NaN rows, label codes for both label formats, cache round-trip."""
+    print("\n" + "=" * 70)
+    print("TEST 1: load_session_arrays")
+    print("=" * 70)
+
+    samples = make_samples()
+    with tempfile.TemporaryDirectory() as tmp:
+        for make_label in (v21_label, legacy_label):
+            path = write_session(Path(tmp) / f'{make_label.__name__}.json',
+                                 [make_label(0, 20, EXTENDED), make_label(20, 40, FIST),
+                                  make_label(40, 60, MIXED)], samples)
+            session = load_session_arrays(path, use_cache=False)
+            assert session.n_samples == 60 and session.mag_ut.shape == (60, 3)
+
+            expected_codes = np.repeat([states_to_code((0,) * 5), states_to_code((2,) * 5),
+                                        states_to_code((0, 0, 0, 2, 1))], 20)
+            assert np.array_equal(session.label_codes, expected_codes)
+
+            assert np.isnan(session.mag_ut[7::10]).all(), "Missing magnetometer rows are not NaN"
+            assert np.count_nonzero(session.mag_valid) == 54
+            raw = samples[3]
+            assert np.allclose(session.mag_ut[3], np.array([raw['mx'], raw['my'], raw['mz']]) * MAG_SCALE_LSB_TO_UT)
+            assert np.allclose(session.mag_ut[0], [samples[0]['mx_ut'], samples[0]['my_ut'], samples[0]['mz_ut']])
+            assert np.allclose(session.accel_g, [8192 * ACCEL_SPEC['conversion_factor'], 0, 0])
+            assert np.isnan(session.orientation).all()
+
+            warm_first = load_session_arrays(path)
+            warm = load_session_arrays(path)
+            for name in ('mag_ut', 'accel_g', 'gyro_dps', 'label_codes'):
+                assert np.array_equal(getattr(warm, name), getattr(session, name), equal_nan=True)
+            assert np.array_equal(warm_first.mag_ut, session.mag_ut, equal_nan=True)
+            assert warm.labels == session.labels
+            print(f"✅ {make_label.__name__}: units, NaN rows, label codes and cached arrays")
+
+        path = write_session(Path(tmp) / 'unlabeled.json', [])
+        assert (load_session_arrays(path, use_cache=False).label_codes == UNLABELED).all()
+        print("✅ Unlabeled samples have code -1")
+
+
+def test_combo_samples():
+    """Grouping by combo, NaN rows dropped, min_segment cutoff, unknown fingers."""
+    print("\n" + "=" * 70)
+    print("TEST 2: combo_samples")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_session(Path(tmp) / 'session.json', [
+            v21_label(0, 20, EXTENDED), v21_label(20, 30, FIST), v21_label(30, 34, FIST),
+            v21_label(34, 40, {}), v21_label(40, 60, MIXED)])
+        session = load_session_arrays(path, use_cache=False)
+
+        combos = combo_samples(session)
+        assert set(combos) == {'eeeee', 'fffff', 'eeef?'}, set(combos)
+        assert len(combos['eeeee']) == 18 and len(combos['fffff']) == 13
+        assert not np.isnan(np.concatenate(list(combos.values()))).any()
+        assert np.array_equal(combos['eeeee'], session.mag_ut[:20][session.mag_valid[:20]])
+        print("✅ Segments grouped by combo, NaN rows dropped, all-unknown segment skipped")
+
+        combos = combo_samples(session, min_segment=5)
+        assert len(combos['fffff']) == 9, "4-sample segment not cut by min_segment=5"
+        combos = combo_samples(session, min_segment=21)
+        assert combos == {}
+        print("✅ min_segment drops short segments")
+
+        assert set(combo_samples(session, symbols='epf')) == {'eeeee', 'fffff', 'eeefp'}
+        print("✅ symbols picks the partial character")
+
+
+def test_combo_residuals():
+    """Residuals vs the baseline mean; a missing baseline raises ValueError."""
+    print("\n" + "=" * 70)
+    print("TEST 3: combo_residuals")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_session(Path(tmp) / 'session.json',
+                             [v21_label(0, 20, EXTENDED), v21_label(20, 40, FIST)])
+        session = load_session_arrays(path, use_cache=False)
+        residuals = combo_residuals(session)
+        samples = combo_samples(session, min_segment=5)
+        reference = samples['eeeee'].mean(axis=0)
+        mean, std = residuals['fffff']
+        assert np.allclose(mean, (samples['fffff'] - reference).mean(axis=0))
+        assert np.allclose(std, samples['fffff'].std(axis=0))
+        assert np.allclose(residuals['eeeee'][0], 0.0)
+        assert np.allclose(mean, 30.0, atol=1.0)
+        print("✅ Residual means and stds relative to the 'eeeee' baseline")
+
+        cases = {
+            'no_baseline': [v21_label(20, 40, FIST)],
+            'short_baseline': [v21_label(0, 3, EXTENDED), v21_label(20, 40, FIST)],
+        }
+        for name, labels in cases.items():
+            session = load_session_arrays(write_session(Path(tmp) / f'{name}.json', labels),
+                                          use_cache=False)
+            try:
+                combo_residuals(session)
+            except ValueError as e:
+                assert f'{name}.json' in str(e) and 'eeeee' in str(e), str(e)
+            else:
+                raise AssertionError(f"{name}: missing baseline did not raise")
+
+        # Baseline segment whose samples all lack a magnetometer reading
+        no_mag = [{k: v for k, v in s.items() if not k.startswith('m')} for s in make_samples()]
+        session = load_session_arrays(write_session(Path(tmp) / 'no_mag.json',
+                                                    [v21_label(0, 20, EXTENDED)], no_mag),
+                                      use_cache=False)
+        try:
+            combo_residuals(session)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Baseline without magnetometer data did not raise")
+        print("✅ Missing, too-short or empty baseline raises ValueError naming the session")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("load_session_arrays", test_load_session_arrays),
+        ("combo_samples", test_combo_samples),
+        ("combo_residuals", test_combo_residuals),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk session cache (ml.session_cache) behind load_session_data.
+
+Cold (parse + store) and warm (memory-mapped) loads must return exactly what
+an uncached load returns, for V1 and V2.1 session JSON, and editing a session
+file must invalidate its cache entry.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ml.data_loader import load_session_columns, load_session_data, load_session_stats
+from ml.session_cache import SessionCache, samples_to_columns
+
+IMU_FIELDS = ['ax', 'ay', 'az', 'gx', 'gy', 'gz', 'mx', 'my', 'mz']
+
+
+def make_samples(n: int = 120, seed: int = 0):
+    """Sample dicts with IMU fields, a bool, a string and a field missing from some samples."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(n):
+        sample = {name: float(v) for name, v in zip(IMU_FIELDS, rng.normal(0, 100, 9))}
+        sample['t'] = i * 20
+        sample['isMoving'] = bool(i % 7 == 0)
+        sample['note'] = 'x'
+        if i % 3:
+            sample['temp'] = 25.0 + 0.01 * i
+        samples.append(sample)
+    return samples
+
+
+def write_session(path: Path, samples, version: str = '2.1'):
+    if version == '1.0':
+        data = samples
+    else:
+        data = {'version': version, 'timestamp': path.stem, 'samples': samples,
+                'labels': [{'start_sample': 0, 'end_sample': len(samples)}],
+                'metadata': {'sample_rate': 50}}
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def check_round_trip(path: Path):
+    """Uncached, cold and warm loads agree; returns the cold-load array."""
+    for apply_filtering in (False, True):
+        kwargs = dict(apply_calibration=False, apply_filtering=apply_filtering)
+        expected = load_session_data(path, use_cache=False, **kwargs)
+        cold = load_session_data(path, **kwargs)
+        warm = load_session_data(path, **kwargs)
+        assert expected.shape == (120, 9)
+        assert np.array_equal(cold, expected), "Cold cache load differs from uncached load"
+        assert np.array_equal(warm, expected), "Warm cache load differs from uncached load"
+        assert isinstance(warm, np.memmap), "Warm load is not memory-mapped"
+        assert cold.flags.writeable and warm.flags.writeable, "Cold and warm loads differ in writability"
+    return expected
+
+
+def test_session_data_round_trip():
+    """load_session_data through the cache matches an uncached load (V1 and V2.1)."""
+    print("\n" + "=" * 70)
+    print("TEST 1: Session cache round-trip")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for version in ('2.1', '1.0'):
+            path = Path(tmp) / f'session_v{version}.json'
+            write_session(path, make_samples(), version)
+            check_round_trip(path)
+            print(f"✅ V{version}: uncached, cold and warm loads identical (raw and filtered)")
+
+        # Columns and header as stored
+        path = Path(tmp) / 'session_v2.1.json'
+        cache = SessionCache.for_data_dir(Path(tmp))
+        names, columns = samples_to_columns(make_samples())
+        info, cached_names, cached_columns = load_session_columns(path, cache)
+        assert cached_names == names and np.array_equal(cached_columns, columns, equal_nan=True)
+        assert 'isMoving' not in cached_names and 'note' not in cached_names
+        assert np.isnan(cached_columns[0, cached_names.index('temp')])
+        assert info.version == '2.1' and info.metadata == {'sample_rate': 50}
+        assert info.labels == [{'start_sample': 0, 'end_sample': 120}]
+        print("✅ Cached columns (NaN for missing values) and header match the JSON")
+
+        # Cached stats agree with stats of the data
+        stats = load_session_stats(path, apply_calibration=False)
+        data = load_session_data(path, apply_calibration=False, use_cache=False)
+        assert stats.count == len(data) and np.allclose(stats.mean, data.mean(axis=0))
+        again = load_session_stats(path, apply_calibration=False)
+        assert np.array_equal(again.mean, stats.mean)
+        print("✅ Cached session stats match the data")
+
+        # In-place edits work on every load and never reach the cache
+        for _ in range(2):
+            data = load_session_data(path, apply_calibration=False, apply_filtering=False)
+            data[:, 0] = -1.0
+        assert not np.array_equal(load_session_data(path, apply_calibration=False,
+                                                    apply_filtering=False)[:, 0], data[:, 0])
+        print("✅ Loads are writable and in-place edits leave the cache unchanged")
+
+
+def test_cache_invalidation():
+    """Editing a session file invalidates its cache entry."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Cache invalidation on file change")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'session.json'
+        write_session(path, make_samples(seed=0))
+        first = np.array(load_session_data(path, apply_calibration=False, apply_filtering=False))
+
+        # Same size, new contents and mtime
+        write_session(path, make_samples(seed=1))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        second = load_session_data(path, apply_calibration=False, apply_filtering=False)
+        expected = load_session_data(path, apply_calibration=False, apply_filtering=False,
+                                     use_cache=False)
+        assert np.array_equal(second, expected), "Stale cache entry returned after edit"
+        assert not np.array_equal(second, first)
+        print("✅ Edited file reloads fresh data")
+
+        entries = list(SessionCache.for_data_dir(Path(tmp)).cache_dir.iterdir())
+        assert len(entries) == 1, f"Stale entries left behind: {entries}"
+        print("✅ Stale entry removed")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Session cache round-trip", test_session_data_round_trip),
+        ("Cache invalidation", test_cache_invalidation),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the compact .session.npz session format (ml.session_npz).
+
+Sessions written in the compact format must read back as the same sample
+dicts and the same numeric columns as the equivalent session JSON, both for
+hand-built sample lists and for MagneticFieldSimulator's columnar output.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ml.data_loader import find_session_files, load_session_data
+from ml.session_cache import samples_to_columns
+from ml.session_npz import (
+    is_compact_session, read_compact_columns, read_compact_header,
+    read_compact_samples, sample_count, write_compact_session
+)
+from ml.simulation import DEFAULT_MAGNET_CONFIG, MagneticFieldSimulator
+
+
+def make_session(n: int = 60, seed: int = 0):
+    """v2.1 session exercising every field encoding."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(n):
+        sample = {name: float(v) for name, v in
+                  zip(['ax', 'ay', 'az', 'gx', 'gy', 'gz', 'mx', 'my', 'mz'], rng.normal(0, 100, 9))}
+        sample['filtered_mx'] = sample['mx']          # alias
+        sample['dt'] = 0.02                           # constant
+        sample['t'] = i * 20                          # small integers
+        sample['isMoving'] = bool(i % 5 == 0)         # bool
+        sample['gesture'] = ['open', 'fist', 'point'][i % 3]   # categorical
+        if i % 4:
+            sample['temp'] = 25.0 + 0.5 * i           # sparse (missing in some samples)
+        sample['_ground_truth'] = {
+            'finger_states': {'thumb': 'extended' if i % 2 else 'flexed', 'index': 'flexed'},
+            'true_field': [float(v) for v in rng.normal(0, 50, 3)],
+        }
+        if i == 3:
+            sample['events'] = [1, 'tap']             # irregular -> JSON
+        samples.append(sample)
+    return {
+        'version': '2.1',
+        'timestamp': '2026-01-01T00:00:00Z',
+        'samples': samples,
+        'labels': [{'start_sample': 0, 'end_sample': n, 'pose': 'open'}],
+        'metadata': {'synthetic': True, 'sample_rate': 50},
+    }
+
+
+def json_round_trip(value):
+    return json.loads(json.dumps(value))
+
+
+def test_sample_round_trip():
+    """Sample dicts survive write/read unchanged."""
+    print("\n" + "=" * 70)
+    print("TEST 1: Compact session round-trip (sample dicts)")
+    print("=" * 70)
+
+    session = make_session()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'session.session.npz'
+        write_compact_session(path, session)
+        assert is_compact_session(path)
+
+        header, samples = read_compact_samples(path)
+        assert samples == json_round_trip(session['samples']), "Samples differ after round-trip"
+        for key in ('version', 'timestamp', 'labels', 'metadata'):
+            assert header[key] == session[key], f"Header {key} differs"
+        print(f"✅ {len(samples)} samples (aliases, constants, categories, sparse, nested, JSON) identical")
+
+        small = read_compact_header(path)
+        assert small['sample_count'] == len(samples)
+        assert 'filtered_mx' in small['aliases'] and 'dt' in small['constants']
+        print("✅ Header records aliases and constants")
+
+        _, names, columns = read_compact_columns(path)
+        expected_names, expected = samples_to_columns(session['samples'])
+        assert names == expected_names, f"{names} != {expected_names}"
+        assert np.array_equal(columns, expected, equal_nan=True)
+        print("✅ Numeric columns match samples_to_columns on the JSON samples")
+
+
+def test_simulator_columnar():
+    """Simulator columnar output written compactly equals the JSON sample path."""
+    print("\n" + "=" * 70)
+    print("TEST 2: MagneticFieldSimulator columnar sessions")
+    print("=" * 70)
+
+    sim = MagneticFieldSimulator(magnet_config=DEFAULT_MAGNET_CONFIG)
+    columns, labels = sim.generate_session_columns(['open_palm', 'fist'], samples_per_pose=40,
+                                                   transition_samples=10)
+    metadata = {'synthetic': True, 'sample_rate': sim.sample_rate}
+    fields_session = {'version': '2.1', 'timestamp': 'synthetic', 'labels': labels,
+                      'metadata': metadata, 'samples': sim.session_fields(columns)}
+    json_session = dict(fields_session, samples=sim.samples_from_columns(columns))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz_path = Path(tmp) / 'synthetic.session.npz'
+        json_path = Path(tmp) / 'synthetic.json'
+        write_compact_session(npz_path, fields_session)
+        with open(json_path, 'w') as f:
+            json.dump(json_session, f)
+
+        _, samples = read_compact_samples(npz_path)
+        assert samples == json_round_trip(json_session['samples']), "Columnar samples differ from JSON path"
+        assert sample_count(fields_session['samples']) == sample_count(json_session['samples']) == len(samples)
+        print(f"✅ {len(samples)} samples from session_fields match samples_from_columns")
+
+        assert find_session_files(Path(tmp)) == sorted([json_path, npz_path])
+        kwargs = dict(apply_calibration=False, apply_filtering=False, use_cache=False)
+        assert np.array_equal(load_session_data(npz_path, **kwargs), load_session_data(json_path, **kwargs))
+        print("✅ load_session_data reads .session.npz like the equivalent JSON")
+
+    try:
+        sim.generate_session(['open_palm'], samples_per_pose=5, columnar=True, batch=False)
+    except ValueError:
+        print("✅ columnar=True with batch=False raises ValueError")
+    else:
+        raise AssertionError("columnar=True with batch=False did not raise")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Compact sample round-trip", test_sample_round_trip),
+        ("Simulator columnar sessions", test_simulator_columnar),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
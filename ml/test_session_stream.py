@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test the streaming session reader (ml.session_stream).
+
+Headers read by streaming must match a full json.load of V1, V2.0 and V2.1
+files, report timestamp=None when the file has none, and keep a timestamp
+equal to the filename stem (the normal naming convention) in the
+generate-manifests session index.
+"""
+
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from ml.session_stream import SessionStreamReader, read_session_header
+
+STEM = '2025-12-11T13_26_33.209Z'
+SAMPLES = [{'ax': i, 'mx': 0.5 * i, 'note': 'a,b]}'} for i in range(25)]
+
+
+def load_manifest_script():
+    path = Path(__file__).resolve().parent.parent / 'scripts' / 'generate-manifests.py'
+    spec = importlib.util.spec_from_file_location('generate_manifests', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_headers():
+    """Streamed headers match json.load; missing timestamps are None."""
+    print("\n" + "=" * 70)
+    print("TEST 1: Streamed session headers")
+    print("=" * 70)
+
+    sessions = {
+        'v1': SAMPLES,
+        'v20': {'version': '2.0', 'timestamp': '2025-12-11T13:26:33.209Z', 'samples': SAMPLES},
+        'v21': {'version': '2.1', 'samples': SAMPLES, 'labels': [{'start_sample': 0}],
+                'metadata': {'sample_rate': 50}, 'timestamp': STEM},
+        'no_timestamp': {'version': '2.1', 'samples': SAMPLES},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data in sessions.items():
+            path = Path(tmp) / f'{name}.json'
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=1)
+            header = read_session_header(path)
+            assert header.sample_count == len(SAMPLES)
+            if name == 'v1':
+                assert header.version == '1.0' and header.timestamp is None
+            else:
+                assert header.version == data['version']
+                assert header.timestamp == data.get('timestamp')
+                assert header.labels == data.get('labels')
+                assert header.metadata == data.get('metadata', {})
+            assert list(SessionStreamReader(path).iter_samples()) == SAMPLES
+            print(f"✅ {name}: version {header.version}, timestamp {header.timestamp!r}, "
+                  f"{header.sample_count} samples")
+
+
+def test_manifest_timestamp():
+    """generate-manifests keeps a timestamp equal to the filename stem."""
+    print("\n" + "=" * 70)
+    print("TEST 2: generate-manifests session timestamps")
+    print("=" * 70)
+
+    manifests = load_manifest_script()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f'{STEM}.json'
+        with open(path, 'w') as f:
+            json.dump({'version': '2.1', 'timestamp': STEM, 'samples': SAMPLES}, f)
+        assert manifests.get_session_info(path, 'u')['timestamp'] == STEM
+        print("✅ Timestamp equal to the filename stem is kept")
+
+        with open(path, 'w') as f:
+            json.dump({'version': '2.1', 'samples': SAMPLES}, f)
+        info = manifests.get_session_info(path, 'u')
+        assert info['timestamp'] == '2025-12-11T13:26:33.209Z', info['timestamp']
+        assert info['sampleCount'] == len(SAMPLES)
+        print("✅ Missing timestamp falls back to the one parsed from the filename")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Streamed headers", test_headers),
+        ("Manifest timestamps", test_manifest_timestamp),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
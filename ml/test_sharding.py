@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test sharded synthetic dataset generation (ml.simulation.sharding).
+
+Shard contents depend only on the master seed and shard index, the caller's
+global numpy RNG is left untouched, and resuming into a directory generated
+with another seed or other parameters is refused unless overwriting.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ml.simulation.sharding import MANIFEST_FILENAME, generate_shards
+
+
+def random_session_task(index, params):
+    """generate_shards task drawing from the global numpy RNG."""
+    return {'version': '2.1', 'samples': [{'v': float(v)} for v in np.random.randn(params['n'])]}
+
+
+def read_shards(paths):
+    values = []
+    for path in paths:
+        with open(path) as f:
+            values.append([s['v'] for s in json.load(f)['samples']])
+    return values
+
+
+def test_deterministic_shards():
+    """Same seed gives the same shards for any worker count; caller RNG is restored."""
+    print("\n" + "=" * 70)
+    print("TEST 1: Deterministic shards")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.random.seed(123)
+        expected_next = np.random.rand()
+        np.random.seed(123)
+        serial = generate_shards(Path(tmp) / 'serial', random_session_task, 4,
+                                 params={'n': 5}, seed=7)
+        assert np.random.rand() == expected_next, "generate_shards changed the caller's RNG state"
+        print("✅ Serial generation leaves the caller's np.random state unchanged")
+
+        pooled = generate_shards(Path(tmp) / 'pooled', random_session_task, 4,
+                                 params={'n': 5}, seed=7, max_workers=2)
+        assert read_shards(serial) == read_shards(pooled), "Shards depend on the worker count"
+        assert read_shards(serial)[0] != read_shards(serial)[1], "Shards share an RNG stream"
+        print("✅ 1 and 2 workers produce identical, independent shards")
+
+
+def test_manifest_mismatch():
+    """Resuming with another seed/params raises unless overwriting."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Manifest mismatch")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = read_shards(generate_shards(tmp, random_session_task, 3, params={'n': 4}, seed=1))
+
+        # Resume with the manifest's seed: nothing regenerated
+        assert read_shards(generate_shards(tmp, random_session_task, 3, params={'n': 4})) == first
+        print("✅ Resume reuses the manifest seed")
+
+        for kwargs in ({'seed': 2, 'params': {'n': 4}}, {'seed': 1, 'params': {'n': 6}}):
+            try:
+                generate_shards(tmp, random_session_task, 3, **kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"Mismatched {kwargs} did not raise")
+            with open(Path(tmp) / MANIFEST_FILENAME) as f:
+                manifest = json.load(f)
+            assert manifest['master_seed'] == 1 and manifest['params'] == {'n': 4}, "Manifest rewritten"
+        print("✅ Different seed or params raise ValueError and keep the manifest")
+
+        second = read_shards(generate_shards(tmp, random_session_task, 3, params={'n': 4},
+                                             seed=2, overwrite=True))
+        expected = read_shards(generate_shards(Path(tmp) / 'fresh', random_session_task, 3,
+                                               params={'n': 4}, seed=2))
+        assert second == expected, "overwrite=True left old shards in place"
+        with open(Path(tmp) / MANIFEST_FILENAME) as f:
+            assert json.load(f)['master_seed'] == 2
+        print("✅ overwrite=True regenerates every shard and rewrites the manifest")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Deterministic shards", test_deterministic_shards),
+        ("Manifest mismatch", test_manifest_mismatch),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            test_func()
+            results.append((name, True))
+        except Exception as e:  # includes failed assertions
+            print(f"\n❌ {name} raised exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    for name, passed in results:
+        print(f"{'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,42 +19,50 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 
+from ml.calibration import EnvironmentalCalibration, quaternions_to_rotation_matrices
+
 DATA_DIR = Path('/home/user/simcap/data/GAMBIT')
 OUTPUT_DIR = Path('/home/user/simcap/visualizations')
 CALIBRATION_FILE = DATA_DIR / 'gambit_calibration.json'
 
 
-def quaternion_to_rotation_matrix(w, x, y, z):
-    """Convert quaternion to 3x3 rotation matrix (sensor → world)."""
-    return np.array([
-        [1 - 2*y*y - 2*z*z, 2*x*y - 2*z*w, 2*x*z + 2*y*w],
-        [2*x*y + 2*z*w, 1 - 2*x*x - 2*z*z, 2*y*z - 2*x*w],
-        [2*x*z - 2*y*w, 2*y*z + 2*x*w, 1 - 2*x*x - 2*y*y]
-    ])
+def session_calibration(calibration):
+    """Build an EnvironmentalCalibration from a JS-format calibration dict."""
+    cal = EnvironmentalCalibration()
+    cal.load_dict(calibration)
+    return cal
 
 
-def apply_iron_correction(mx, my, mz, calibration):
-    """Apply hard/soft iron calibration."""
-    hi = calibration['hardIronOffset']
-    si = np.array(calibration['softIronMatrix']).reshape(3, 3)
-    corrected = np.array([mx - hi['x'], my - hi['y'], mz - hi['z']])
-    return si @ corrected
+def session_arrays(samples):
+    """
+    Extract arrays for samples that have both magnetometer and orientation data.
 
+    Returns (indices, mag, quat) with mag (N, 3) and quat (N, 4) [w, x, y, z].
+    """
+    indices = [i for i, s in enumerate(samples)
+               if s.get('mx') is not None and s.get('orientation_w') is not None]
+    mag = np.array([[samples[i]['mx'], samples[i]['my'], samples[i]['mz']]
+                    for i in indices], dtype=np.float64).reshape(-1, 3)
+    quat = np.array([[samples[i]['orientation_w'], samples[i]['orientation_x'],
+                      samples[i]['orientation_y'], samples[i]['orientation_z']]
+                     for i in indices], dtype=np.float64).reshape(-1, 4)
+    return np.array(indices, dtype=int), mag, quat
 
-def old_earth_subtraction(corrected_mag, qw, qx, qy, qz, earth_field):
+
+def old_earth_subtraction(corrected_mag, quat, earth_field):
     """OLD (BUGGY) algorithm: R @ earthField."""
-    R = quaternion_to_rotation_matrix(qw, qx, qy, qz)
+    R = quaternions_to_rotation_matrices(quat)
     ef = np.array([earth_field['x'], earth_field['y'], earth_field['z']])
     rotated_earth = R @ ef
     return corrected_mag - rotated_earth
 
 
-def new_earth_subtraction(corrected_mag, qw, qx, qy, qz, earth_field_world):
+def new_earth_subtraction(mag, quat, calibration, earth_field_world):
     """NEW (CORRECT) algorithm: R.T @ earthField (world→sensor)."""
-    R = quaternion_to_rotation_matrix(qw, qx, qy, qz)
-    ef = np.array([earth_field_world['x'], earth_field_world['y'], earth_field_world['z']])
-    rotated_earth = R.T @ ef
-    return corrected_mag - rotated_earth
+    cal = session_calibration(calibration)
+    cal.earth_field = np.array([earth_field_world['x'], earth_field_world['y'],
+                                earth_field_world['z']], dtype=np.float64)
+    return cal.correct_batch(mag, quat)
 
 
 def estimate_world_frame_earth_field(samples, calibration):
@@ -62,31 +70,17 @@ def estimate_world_frame_earth_field(samples, calibration):
     Estimate earth field in world frame from samples with diverse orientations.
     This is the heading-informed approach.
     """
-    world_estimates = []
-
-    for s in samples:
-        if s.get('mx') is None or s.get('orientation_w') is None:
-            continue
-
-        # Iron-corrected sensor reading
-        b_sensor = apply_iron_correction(
-            s['mx'], s['my'], s['mz'], calibration
-        )
-
-        # Rotation matrix from quaternion
-        R = quaternion_to_rotation_matrix(
-            s['orientation_w'], s['orientation_x'],
-            s['orientation_y'], s['orientation_z']
-        )
-
-        # Transform to world frame: B_world = R @ B_sensor
-        b_world = R @ b_sensor
-        world_estimates.append(b_world)
+    _, mag, quat = session_arrays(samples)
 
-    if len(world_estimates) < 10:
+    if len(mag) < 10:
         return None
 
-    world_estimates = np.array(world_estimates)
+    # Iron-corrected sensor readings
+    b_sensor = session_calibration(calibration).correct_iron_only_batch(mag)
+
+    # Transform to world frame: B_world = R @ B_sensor
+    R = quaternions_to_rotation_matrices(quat)
+    world_estimates = np.einsum('nij,nj->ni', R, b_sensor)
     mean_world = np.mean(world_estimates, axis=0)
 
     return {
@@ -145,55 +139,36 @@ def reprocess_session(session_path, calibration):
 
     print(f"  Estimated world-frame earth field: [{earth_field_world['x']:.1f}, {earth_field_world['y']:.1f}, {earth_field_world['z']:.1f}]")
 
-    # Process each sample
-    results = {
-        'time': [],
-        'yaw': [],
-        'pitch': [],
-        'roll': [],
-        'iron_corrected_mag': [],
-        'old_mag': [],
-        'new_mag': [],
-        'iron_corrected_mx': [],
-        'iron_corrected_my': [],
-        'iron_corrected_mz': [],
-        'new_mx': [],
-        'new_my': [],
-        'new_mz': [],
-    }
+    # Process the whole session in one batch
+    indices, mag, quat = session_arrays(samples)
 
-    for i, s in enumerate(samples):
-        if s.get('mx') is None or s.get('orientation_w') is None:
-            continue
+    # Iron correction
+    iron_corrected = session_calibration(use_cal).correct_iron_only_batch(mag)
+
+    # Old algorithm (using stored earth field in sensor frame)
+    old_result = old_earth_subtraction(iron_corrected, quat, use_cal['earthField'])
 
-        qw, qx, qy, qz = s['orientation_w'], s['orientation_x'], s['orientation_y'], s['orientation_z']
-
-        # Iron correction
-        iron_corrected = apply_iron_correction(s['mx'], s['my'], s['mz'], use_cal)
-
-        # Old algorithm (using stored earth field in sensor frame)
-        old_result = old_earth_subtraction(iron_corrected, qw, qx, qy, qz, use_cal['earthField'])
-
-        # New algorithm (using world-frame earth field)
-        new_result = new_earth_subtraction(iron_corrected, qw, qx, qy, qz, earth_field_world)
-
-        results['time'].append(i / 50.0)
-        results['yaw'].append(s.get('euler_yaw', 0))
-        results['pitch'].append(s.get('euler_pitch', 0))
-        results['roll'].append(s.get('euler_roll', 0))
-        results['iron_corrected_mag'].append(np.linalg.norm(iron_corrected))
-        results['old_mag'].append(np.linalg.norm(old_result))
-        results['new_mag'].append(np.linalg.norm(new_result))
-        results['iron_corrected_mx'].append(iron_corrected[0])
-        results['iron_corrected_my'].append(iron_corrected[1])
-        results['iron_corrected_mz'].append(iron_corrected[2])
-        results['new_mx'].append(new_result[0])
-        results['new_my'].append(new_result[1])
-        results['new_mz'].append(new_result[2])
-
-    # Convert to numpy arrays
-    for key in results:
-        results[key] = np.array(results[key])
+    # New algorithm (using world-frame earth field)
+    new_result = new_earth_subtraction(mag, quat, use_cal, earth_field_world)
+
+    def field(key):
+        return np.array([samples[i].get(key, 0) for i in indices], dtype=np.float64)
+
+    results = {
+        'time': indices / 50.0,
+        'yaw': field('euler_yaw'),
+        'pitch': field('euler_pitch'),
+        'roll': field('euler_roll'),
+        'iron_corrected_mag': np.linalg.norm(iron_corrected, axis=1),
+        'old_mag': np.linalg.norm(old_result, axis=1),
+        'new_mag': np.linalg.norm(new_result, axis=1),
+        'iron_corrected_mx': iron_corrected[:, 0],
+        'iron_corrected_my': iron_corrected[:, 1],
+        'iron_corrected_mz': iron_corrected[:, 2],
+        'new_mx': new_result[:, 0],
+        'new_my': new_result[:, 1],
+        'new_mz': new_result[:, 2],
+    }
 
     return results
 
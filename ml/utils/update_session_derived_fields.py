@@ -18,36 +18,38 @@ from pathlib import Path
 import shutil
 from datetime import datetime
 
+from ml.calibration import EnvironmentalCalibration, quaternions_to_rotation_matrices
+
 DATA_DIR = Path('/home/user/simcap/data/GAMBIT')
 CALIBRATION_FILE = DATA_DIR / 'gambit_calibration.json'
 
 
-def quaternion_to_rotation_matrix(w, x, y, z):
-    """Convert quaternion to 3x3 rotation matrix (sensor → world)."""
-    return np.array([
-        [1 - 2*y*y - 2*z*z, 2*x*y - 2*z*w, 2*x*z + 2*y*w],
-        [2*x*y + 2*z*w, 1 - 2*x*x - 2*z*z, 2*y*z - 2*x*w],
-        [2*x*z - 2*y*w, 2*y*z + 2*x*w, 1 - 2*x*x - 2*y*y]
-    ])
-
+def session_calibration(calibration):
+    """Build an EnvironmentalCalibration from a JS-format calibration dict."""
+    cal = EnvironmentalCalibration()
+    cal.load_dict(calibration)
+    return cal
 
-def apply_iron_correction(mx, my, mz, calibration):
-    """Apply hard/soft iron calibration."""
-    hi = calibration['hardIronOffset']
-    si = np.array(calibration['softIronMatrix']).reshape(3, 3)
-    corrected = np.array([mx - hi['x'], my - hi['y'], mz - hi['z']])
-    return si @ corrected
 
-
-def correct_earth_subtraction(corrected_mag, qw, qx, qy, qz, earth_field_world):
+def session_arrays(samples):
     """
-    CORRECT algorithm: R.T @ earthField (world→sensor).
-    Earth field is in world frame, we transform to current sensor frame.
+    Extract magnetometer and orientation arrays from samples.
+
+    Returns (mag, quat, has_mag, has_q): (N, 3) and (N, 4) float arrays with
+    NaN for missing values, plus per-sample availability masks.
     """
-    R = quaternion_to_rotation_matrix(qw, qx, qy, qz)
-    ef = np.array([earth_field_world['x'], earth_field_world['y'], earth_field_world['z']])
-    rotated_earth = R.T @ ef
-    return corrected_mag - rotated_earth
+    def value(s, key):
+        v = s.get(key)
+        return np.nan if v is None else v
+
+    mag = np.array([[value(s, 'mx'), value(s, 'my'), value(s, 'mz')]
+                    for s in samples], dtype=np.float64).reshape(-1, 3)
+    quat = np.array([[value(s, 'orientation_w'), value(s, 'orientation_x'),
+                      value(s, 'orientation_y'), value(s, 'orientation_z')]
+                     for s in samples], dtype=np.float64).reshape(-1, 4)
+    has_mag = ~np.isnan(mag).any(axis=1)
+    has_q = ~np.isnan(quat).any(axis=1)
+    return mag, quat, has_mag, has_q
 
 
 def estimate_world_frame_earth_field(samples, calibration):
@@ -55,31 +57,18 @@ def estimate_world_frame_earth_field(samples, calibration):
     Estimate earth field in world frame from samples with diverse orientations.
     Uses the heading-informed approach: average B_world = R @ B_sensor across orientations.
     """
-    world_estimates = []
-
-    for s in samples:
-        if s.get('mx') is None or s.get('orientation_w') is None:
-            continue
-
-        # Iron-corrected sensor reading
-        b_sensor = apply_iron_correction(
-            s['mx'], s['my'], s['mz'], calibration
-        )
+    mag, quat, has_mag, has_q = session_arrays(samples)
+    valid = has_mag & has_q
 
-        # Rotation matrix from quaternion
-        R = quaternion_to_rotation_matrix(
-            s['orientation_w'], s['orientation_x'],
-            s['orientation_y'], s['orientation_z']
-        )
-
-        # Transform to world frame: B_world = R @ B_sensor
-        b_world = R @ b_sensor
-        world_estimates.append(b_world)
-
-    if len(world_estimates) < 10:
+    if np.count_nonzero(valid) < 10:
         return None
 
-    world_estimates = np.array(world_estimates)
+    # Iron-corrected sensor readings
+    b_sensor = session_calibration(calibration).correct_iron_only_batch(mag[valid])
+
+    # Transform to world frame: B_world = R @ B_sensor
+    R = quaternions_to_rotation_matrices(quat[valid])
+    world_estimates = np.einsum('nij,nj->ni', R, b_sensor)
     mean_world = np.mean(world_estimates, axis=0)
 
     return {
@@ -174,38 +163,33 @@ def update_session(session_path, calibration, backup=True):
     kf_y = SimpleKalmanFilter(process_noise=0.1, measurement_noise=1.0)
     kf_z = SimpleKalmanFilter(process_noise=0.1, measurement_noise=1.0)
 
+    # Calibrate the whole session in one batch
+    mag, quat, has_mag, has_q = session_arrays(samples)
+    cal = session_calibration(use_cal)
+    cal.earth_field = np.array([earth_field_world['x'], earth_field_world['y'],
+                                earth_field_world['z']], dtype=np.float64)
+
+    # Iron correction (calibrated_*)
+    iron_corrected = cal.correct_iron_only_batch(mag)
+
+    # Earth field subtraction (fused_*); no orientation - use iron-corrected only
+    fused = np.where(has_q[:, None], cal.correct_batch(mag, quat), iron_corrected)
+
     # Update each sample
     updated_count = 0
-    for s in samples:
-        if s.get('mx') is None:
-            continue
-
-        # Iron correction (calibrated_*)
-        iron_corrected = apply_iron_correction(s['mx'], s['my'], s['mz'], use_cal)
-        s['calibrated_mx'] = float(iron_corrected[0])
-        s['calibrated_my'] = float(iron_corrected[1])
-        s['calibrated_mz'] = float(iron_corrected[2])
-
-        # Earth field subtraction (fused_*)
-        if s.get('orientation_w') is not None:
-            qw, qx, qy, qz = s['orientation_w'], s['orientation_x'], s['orientation_y'], s['orientation_z']
-            fused = correct_earth_subtraction(iron_corrected, qw, qx, qy, qz, earth_field_world)
-            s['fused_mx'] = float(fused[0])
-            s['fused_my'] = float(fused[1])
-            s['fused_mz'] = float(fused[2])
-
-            # Kalman filtered (filtered_*)
-            s['filtered_mx'] = float(kf_x.update(fused[0]))
-            s['filtered_my'] = float(kf_y.update(fused[1]))
-            s['filtered_mz'] = float(kf_z.update(fused[2]))
-        else:
-            # No orientation - use iron-corrected only
-            s['fused_mx'] = s['calibrated_mx']
-            s['fused_my'] = s['calibrated_my']
-            s['fused_mz'] = s['calibrated_mz']
-            s['filtered_mx'] = float(kf_x.update(s['calibrated_mx']))
-            s['filtered_my'] = float(kf_y.update(s['calibrated_my']))
-            s['filtered_mz'] = float(kf_z.update(s['calibrated_mz']))
+    for i in np.flatnonzero(has_mag):
+        s = samples[i]
+        s['calibrated_mx'] = float(iron_corrected[i, 0])
+        s['calibrated_my'] = float(iron_corrected[i, 1])
+        s['calibrated_mz'] = float(iron_corrected[i, 2])
+        s['fused_mx'] = float(fused[i, 0])
+        s['fused_my'] = float(fused[i, 1])
+        s['fused_mz'] = float(fused[i, 2])
+
+        # Kalman filtered (filtered_*)
+        s['filtered_mx'] = float(kf_x.update(s['fused_mx']))
+        s['filtered_my'] = float(kf_y.update(s['fused_my']))
+        s['filtered_mz'] = float(kf_z.update(s['fused_mz']))
 
         updated_count += 1
 
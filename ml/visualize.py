@@ -25,6 +25,11 @@ import matplotlib.patches as mpatches
 from datetime import datetime
 import colorsys
 
+try:
+    from .session_stream import SessionStreamReader
+except ImportError:
+    from session_stream import SessionStreamReader
+
 # Import schema if available
 try:
     from schema import Gesture
@@ -42,18 +47,25 @@ class SensorDataProcessor:
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
         self.sessions = []
+        self._samples_cache: Tuple[Optional[Path], List[Dict]] = (None, [])
         self.load_sessions()
 
     def load_sessions(self):
-        """Load all JSON data files from data directory."""
+        """
+        Index all JSON data files in the data directory.
+
+        Only header fields are read here (streamed, without keeping samples);
+        sample data is loaded per session on demand via get_session_samples().
+        """
         json_files = sorted(self.data_dir.glob("*.json"))
         # Exclude metadata files
         json_files = [f for f in json_files if not f.name.endswith('.meta.json')]
 
         for json_file in json_files:
             try:
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
+                reader = SessionStreamReader(json_file)
+                header = reader.header()
+                first_sample = next(reader.iter_samples(), None)
 
                 # Handle v1, v2.0, and v2.1 formats
                 version = '1.0'
@@ -64,12 +76,11 @@ class SensorDataProcessor:
                 calibration_types = []
                 metadata = {}
 
-                if isinstance(data, dict) and 'samples' in data:
+                if header.version != '1.0':
                     # New format with wrapper (v2.0 or v2.1)
-                    samples = data['samples']
-                    metadata = data.get('metadata', {})
-                    version = data.get('version', '2.0')
-                    labels = data.get('labels', [])
+                    metadata = header.metadata or {}
+                    version = header.version
+                    labels = header.labels or []
 
                     # Extract v2.1 fields from embedded metadata
                     if metadata:
@@ -85,36 +96,34 @@ class SensorDataProcessor:
                             if lab.get('calibration') and lab['calibration'] != 'none':
                                 calibration_types.append(lab['calibration'])
 
-                elif isinstance(data, list):
+                else:
                     # Old format: direct array
-                    samples = data
                     # Load metadata from separate file if available
                     meta_file = json_file.with_suffix('.meta.json')
                     if meta_file.exists():
                         with open(meta_file, 'r') as f:
                             metadata = json.load(f)
-                else:
-                    print(f"Skipping {json_file.name}: unexpected format")
-                    continue
 
-                if not samples or not isinstance(samples, list):
+                num_samples = header.sample_count
+                if not num_samples or not isinstance(first_sample, dict):
                     print(f"Skipping {json_file.name}: no valid samples")
                     continue
 
                 # Determine actual sample rate from metadata or data
                 sample_rate = metadata.get('sample_rate', 50) if metadata else 50
                 # Use dt from first sample if available for more accurate rate
-                if samples and 'dt' in samples[0]:
-                    dt = samples[0].get('dt', 0.02)
+                if 'dt' in first_sample:
+                    dt = first_sample.get('dt', 0.02)
                     if dt > 0:
                         sample_rate = 1.0 / dt
 
                 session = {
                     'filename': json_file.name,
                     'timestamp': json_file.stem,
-                    'data': samples,
+                    'path': json_file,
+                    'num_samples': num_samples,
                     'metadata': metadata,
-                    'duration': len(samples) / sample_rate,
+                    'duration': num_samples / sample_rate,
                     'sample_rate': sample_rate,
                     # V2.1 extended fields
                     'version': version,
@@ -137,13 +146,20 @@ class SensorDataProcessor:
 
                 self.sessions.append(session)
                 fw_info = f" | fw:{firmware_version}" if firmware_version else ""
-                print(f"Loaded {json_file.name}: {len(samples)} samples ({session['duration']:.1f}s @ {sample_rate:.0f}Hz){fw_info}")
+                print(f"Loaded {json_file.name}: {num_samples} samples ({session['duration']:.1f}s @ {sample_rate:.0f}Hz){fw_info}")
 
             except Exception as e:
                 print(f"Error loading {json_file}: {e}")
 
         print(f"\nTotal sessions loaded: {len(self.sessions)}")
 
+    def get_session_samples(self, session: Dict) -> List[Dict]:
+        """Load the samples for one indexed session (the last one is kept in memory)."""
+        path = session['path']
+        if self._samples_cache[0] != path:
+            self._samples_cache = (path, list(SessionStreamReader(path).iter_samples()))
+        return self._samples_cache[1]
+
     def extract_sensor_arrays(self, data: List[Dict]) -> Dict[str, np.ndarray]:
         """Extract sensor data into numpy arrays, including calibrated/fused/filtered fields.
 
@@ -369,7 +385,7 @@ class SessionVisualizer:
 
     def create_composite_session_image(self, session: Dict, processor: SensorDataProcessor) -> Path:
         """Create a comprehensive composite visualization for an entire session."""
-        data = session['data']
+        data = processor.get_session_samples(session)
         sensors = processor.extract_sensor_arrays(data)
 
         # Create figure with multiple subplots
@@ -541,7 +557,7 @@ class SessionVisualizer:
         1. Composite window image (backward compatible)
         2. Individual figure images (new: timeseries, trajectories, signature, stats, trajectory_comparison)
         """
-        data = session['data']
+        data = processor.get_session_samples(session)
         sensors = processor.extract_sensor_arrays(data)
 
         window_size = 50  # 1 second at 50Hz
@@ -1308,7 +1324,7 @@ WINDOW {window_num} TRAJECTORY STATS
 
     def create_raw_axis_images(self, session: Dict, processor: SensorDataProcessor) -> List[Path]:
         """Create detailed raw axis/orientation visualization images."""
-        data = session['data']
+        data = processor.get_session_samples(session)
         sensors = processor.extract_sensor_arrays(data)
         output_files = []
 
@@ -1509,7 +1525,7 @@ WINDOW {window_num} TRAJECTORY STATS
 
         Returns dict with paths to individual images for flexible HTML display.
         """
-        data = session['data']
+        data = processor.get_session_samples(session)
         sensors = processor.extract_sensor_arrays(data)
 
         has_calibrated = sensors.get('_has_calibrated', False)
@@ -1726,7 +1742,7 @@ Duration: {session['duration']:.1f}s | Samples: {len(data)}
         Shows all 4 calibration stages (Raw, Iron Corrected, Fused, Filtered)
         in a clear comparison format per the documentation requirements.
         """
-        data = session['data']
+        data = processor.get_session_samples(session)
         sensors = processor.extract_sensor_arrays(data)
 
         has_calibrated = sensors.get('_has_calibrated', False)
@@ -29,6 +29,7 @@ import argparse
 import re
 from pathlib import Path
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from typing import Optional, List, Dict, Any
 
 # Add project root to path for imports
@@ -71,6 +72,32 @@ def parse_timestamp_from_filename(filename: str) -> Optional[str]:
         return None
 
 
+def read_session_header(filepath: Path):
+    """
+    Read a session's version, timestamp (None if absent), sample count and metadata.
+
+    Streams the file with ml.session_stream when the ml package (and NumPy)
+    can be imported; otherwise falls back to json.load so the manifest
+    script keeps working with the standard library alone.
+    """
+    try:
+        from ml.session_stream import read_session_header as stream_header
+    except ImportError:
+        pass
+    else:
+        return stream_header(filepath)
+
+    with open(filepath, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return SimpleNamespace(version='1.0', timestamp=None,
+                               sample_count=len(data), metadata=None)
+    return SimpleNamespace(version=data.get('version', '2.0'),
+                           timestamp=data.get('timestamp'),
+                           sample_count=len(data.get('samples', [])),
+                           metadata=data.get('metadata', {}))
+
+
 def get_session_info(filepath: Path, base_url: str) -> Dict[str, Any]:
     """Extract metadata from a session file."""
     filename = filepath.name
@@ -87,33 +114,26 @@ def get_session_info(filepath: Path, base_url: str) -> Dict[str, Any]:
     if ts:
         info['timestamp'] = ts
 
-    # Try to read file metadata
+    # Try to read file metadata (streamed: samples are counted, not kept)
     try:
-        with open(filepath, 'r') as f:
-            chunk = f.read(2000)
-
-            if chunk.strip().startswith('{'):
-                f.seek(0)
-                data = json.load(f)
-                info['version'] = data.get('version', '2.0')
-                info['timestamp'] = data.get('timestamp', info.get('timestamp'))
-                info['sampleCount'] = len(data.get('samples', []))
-
-                # Calculate duration
-                metadata = data.get('metadata', {})
-                sample_rate = metadata.get('sample_rate', 26)
-                if info.get('sampleCount', 0) > 0:
-                    info['durationSec'] = round(info['sampleCount'] / sample_rate, 1)
-
-            elif chunk.strip().startswith('['):
-                f.seek(0)
-                data = json.load(f)
-                info['version'] = '1.0'
-                info['sampleCount'] = len(data) if isinstance(data, list) else 0
-                if info.get('sampleCount', 0) > 0:
-                    info['durationSec'] = round(info['sampleCount'] / 20, 1)
-
-    except (json.JSONDecodeError, IOError) as e:
+        header = read_session_header(filepath)
+        info['version'] = header.version
+        info['sampleCount'] = header.sample_count
+
+        if header.version == '1.0':
+            if info['sampleCount'] > 0:
+                info['durationSec'] = round(info['sampleCount'] / 20, 1)
+        else:
+            if header.timestamp is not None:
+                info['timestamp'] = header.timestamp
+
+            # Calculate duration
+            metadata = header.metadata or {}
+            sample_rate = metadata.get('sample_rate', 26)
+            if info['sampleCount'] > 0:
+                info['durationSec'] = round(info['sampleCount'] / sample_rate, 1)
+
+    except (ValueError, IOError) as e:
         info['version'] = 'error'
         info['error'] = str(e)
 